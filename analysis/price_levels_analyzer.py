@@ -7,6 +7,8 @@ import numpy as np
 import logging
 from typing import Dict, List, Optional, Tuple
 
+from strategy_creation.max_pain import calculate_max_pain
+
 logger = logging.getLogger(__name__)
 
 class PriceLevelsAnalyzer:
@@ -305,33 +307,8 @@ class PriceLevelsAnalyzer:
                                   strikes: np.ndarray) -> float:
         """Calculate the max pain strike price"""
         try:
-            min_pain_value = float('inf')
-            max_pain_strike = strikes[0] if len(strikes) > 0 else 0
-            
-            for strike in strikes:
-                # ITM calls value at expiry
-                itm_calls = calls[calls['strike'] < strike].copy()
-                if not itm_calls.empty:
-                    itm_calls['value'] = (strike - itm_calls['strike']) * itm_calls['open_interest']
-                    call_pain = itm_calls['value'].sum()
-                else:
-                    call_pain = 0
-                
-                # ITM puts value at expiry
-                itm_puts = puts[puts['strike'] > strike].copy()
-                if not itm_puts.empty:
-                    itm_puts['value'] = (itm_puts['strike'] - strike) * itm_puts['open_interest']
-                    put_pain = itm_puts['value'].sum()
-                else:
-                    put_pain = 0
-                
-                total_pain = call_pain + put_pain
-                
-                if total_pain < min_pain_value:
-                    min_pain_value = total_pain
-                    max_pain_strike = strike
-            
-            return max_pain_strike
+            result = calculate_max_pain(calls, puts, strikes)
+            return result['max_pain'] if result else 0
             
         except Exception as e:
             logger.error(f"Error calculating max pain strike: {e}")
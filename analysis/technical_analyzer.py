@@ -10,6 +10,12 @@ from typing import Dict, Optional, Tuple
 import yfinance as yf
 from datetime import datetime, timedelta
 
+try:
+    from strategy_creation.price_history_store import get_price_history_store, PERIOD_OFFSETS
+    PRICE_STORE_AVAILABLE = True
+except ImportError:
+    PRICE_STORE_AVAILABLE = False
+
 logger = logging.getLogger(__name__)
 
 class TechnicalAnalyzer:
@@ -58,8 +64,14 @@ class TechnicalAnalyzer:
             return self._empty_technical_analysis()
     
     def _fetch_price_data(self, symbol: str, period: str, interval: str) -> pd.DataFrame:
-        """Fetch price data from Yahoo Finance"""
+        """Fetch price data from the local price history store, falling back to Yahoo Finance"""
         try:
+            # Daily bars are served as slices of the shared local store
+            if PRICE_STORE_AVAILABLE and interval == '1d' and period in PERIOD_OFFSETS:
+                df = get_price_history_store().get_history(symbol, period)
+                if not df.empty:
+                    return df
+            
             ticker = yf.Ticker(f"{symbol}.NS")  # NSE suffix for Indian stocks
             df = ticker.history(period=period, interval=interval)
             
@@ -0,0 +1,256 @@
+#!/usr/bin/env python3
+"""
+Async Supabase Check
+Runs the async data access layer and the bulk chain preload against a
+local PostgREST stand-in and fails on any difference from the synchronous
+supabase-py path or from the stored rows: paginated chain streams, per
+symbol expiries, lot sizes, metadata, inserts, retries of transient
+statuses and the fallback to sequential streaming.
+
+Usage:
+    python -m benchmarks.async_supabase_check
+"""
+
+import os
+import sys
+import time
+import random
+import asyncio
+import logging
+import argparse
+from typing import Callable, Dict, List, Tuple
+
+import httpx
+from supabase import create_client
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.postgrest_standin import PostgRESTStandIn
+from strategy_creation.chain_loader import BulkChainLoader
+from utils.async_supabase import AsyncSupabasePool, AsyncDataAccess
+
+TRADE_DATE = '2026-10-15'
+PREVIOUS_DATE = '2026-10-14'
+STOCK_EXPIRIES = ['2026-10-28', '2026-11-25', '2026-12-30']
+INDEX_EXPIRIES = ['2026-10-20', '2026-10-27', '2026-11-03', '2026-11-10']
+STOCKS = [f"STOCK{i:02d}" for i in range(12)]
+INDEX = 'NIFTY'
+MONTH_COLUMN = 'oct'
+
+
+def build_tables(seed: int) -> Dict[str, List[Dict]]:
+    """Snapshot rows for stocks and an index, an older snapshot, lots, stock_data and strategies"""
+    rng = random.Random(seed)
+    chain_rows = []
+    for trade_date in (PREVIOUS_DATE, TRADE_DATE):
+        for symbol in STOCKS + [INDEX]:
+            expiries = INDEX_EXPIRIES if symbol == INDEX else STOCK_EXPIRIES
+            spot = rng.randint(200, 5000)
+            for expiry in expiries:
+                for step in range(-6, 7):
+                    for option_type in ('CALL', 'PUT'):
+                        chain_rows.append({
+                            'symbol': symbol,
+                            'created_at': f"{trade_date}T15:30:00",
+                            'expiry_date': expiry,
+                            'strike_price': spot + step * 20,
+                            'option_type': option_type,
+                            'open_interest': rng.randint(100, 50000),
+                            'ltp': round(rng.uniform(1, 200), 2),
+                            'implied_volatility': round(rng.uniform(10, 60), 2),
+                            'underlying_price': spot
+                        })
+    # Interleave symbols in id order like concurrent scrapers do
+    rng.shuffle(chain_rows)
+    for i, row in enumerate(chain_rows, start=1):
+        row['id'] = i
+
+    lots = [{'id': i + 1, 'symbol': f"{symbol}BS", MONTH_COLUMN: 25 * (i + 1)} for i, symbol in enumerate(STOCKS)]
+    lots.append({'id': len(lots) + 1, 'symbol': STOCKS[0], MONTH_COLUMN: 1})
+    stock_data = [{'id': i + 1, 'symbol': symbol, 'fno_stock': 'yes' if i % 4 else 'no',
+                   'sector': f"Sector {i % 3}", 'industry': f"Industry {i}",
+                   'market_capitalization': 1000 * (i + 1), 'atm_iv': 20 + i}
+                  for i, symbol in enumerate(STOCKS)]
+    strategies = [{'id': 1, 'stock_name': STOCKS[1], 'strategy_name': 'Iron Condor',
+                   'generated_on': f"{TRADE_DATE}T10:00:00"}]
+
+    return {'option_chain_data': chain_rows, 'lots': lots, 'stock_data': stock_data, 'strategies': strategies}
+
+
+def _by_id(rows: List[Dict]) -> List[Dict]:
+    return sorted(rows, key=lambda row: row['id'])
+
+
+def check_bulk_preload(server: PostgRESTStandIn, tables: Dict) -> List[str]:
+    """Async and sequential bulk preloads return the same full snapshot per symbol"""
+    failures = []
+    symbols = STOCKS + [INDEX]
+    client = create_client(server.url, 'anon-key')
+
+    sync_loader = BulkChainLoader(client, page_size=100, symbol_chunk_size=5, use_async=False)
+    sync_result = sync_loader.load(symbols)
+    async_loader = BulkChainLoader(client, page_size=100, symbol_chunk_size=5,
+                                   async_pool=AsyncSupabasePool(base_url=server.base_url, requests_per_second=200))
+    sync_requests = len(server.requests)
+    async_result = async_loader.load(symbols)
+    async_requests = server.requests[sync_requests:]
+
+    expected = {}
+    for row in tables['option_chain_data']:
+        if row['created_at'].startswith(TRADE_DATE):
+            expected.setdefault(row['symbol'], []).append(row)
+
+    for name, result in (('sequential', sync_result), ('async', async_result)):
+        if result['trade_date'] != TRADE_DATE:
+            failures.append(f"{name}: trade date {result['trade_date']}, expected {TRADE_DATE}")
+        if set(result['chains']) != set(expected):
+            failures.append(f"{name}: symbols {sorted(result['chains'])}")
+            continue
+        for symbol, rows in expected.items():
+            loaded = _by_id(result['chains'][symbol].to_dict('records'))
+            if loaded != _by_id(rows):
+                failures.append(f"{name}: {symbol} chain differs from the stored snapshot")
+        wanted_expiries = {s: INDEX_EXPIRIES if s == INDEX else STOCK_EXPIRIES for s in expected}
+        if result['expiries'] != wanted_expiries:
+            failures.append(f"{name}: per-symbol expiries {result['expiries']}")
+
+    # Only the latest-date lookup may go through supabase-py; the chunks must use the pool
+    chunks = -(-len(symbols) // 5)
+    pooled = [r for r in async_requests if not r['client'].startswith('supabase-py')]
+    if len(pooled) <= chunks or len(pooled) != len(async_requests) - 1:
+        failures.append(f"async load sent {len(pooled)}/{len(async_requests)} requests through the pool, "
+                        f"expected paginated streams for {chunks} chunks")
+    return failures
+
+
+def check_fallback(server: PostgRESTStandIn, tables: Dict) -> List[str]:
+    """An unreachable async pool falls back to sequential streaming through the client"""
+    client = create_client(server.url, 'anon-key')
+    dead_pool = AsyncSupabasePool(base_url='http://127.0.0.1:9/rest/v1', max_retries=1, timeout=2.0)
+    result = BulkChainLoader(client, page_size=100, async_pool=dead_pool).load(STOCKS)
+
+    loaded = sum(len(chain) for chain in result['chains'].values())
+    expected = sum(1 for row in tables['option_chain_data']
+                   if row['created_at'].startswith(TRADE_DATE) and row['symbol'] in STOCKS)
+    if loaded != expected:
+        return [f"fallback loaded {loaded} rows, expected {expected}"]
+    return []
+
+
+def check_data_access(server: PostgRESTStandIn, tables: Dict) -> List[str]:
+    """AsyncDataAccess queries return exactly the stored rows"""
+    failures = []
+
+    async def run():
+        async with AsyncSupabasePool(base_url=server.base_url, requests_per_second=200) as pool:
+            access = AsyncDataAccess(pool, page_size=100)
+
+            symbols = await access.get_portfolio_symbols()
+            expected = [row['symbol'] for row in tables['stock_data'] if row['fno_stock'] == 'yes']
+            if symbols != expected:
+                failures.append(f"portfolio symbols {symbols}, expected {expected}")
+
+            latest = await access.get_latest_chain_date(STOCKS[0])
+            if latest != TRADE_DATE:
+                failures.append(f"latest chain date {latest}, expected {TRADE_DATE}")
+
+            expiries = await access.get_chain_expiries(TRADE_DATE, INDEX)
+            if expiries != INDEX_EXPIRIES:
+                failures.append(f"{INDEX} expiries {expiries}, expected {INDEX_EXPIRIES}")
+            limited = await access.get_chain_expiries(TRADE_DATE, STOCKS[0], max_expiries=2)
+            if limited != STOCK_EXPIRIES[:2]:
+                failures.append(f"first 2 expiries {limited}, expected {STOCK_EXPIRIES[:2]}")
+
+            chain = await access.get_option_chain(STOCKS[2], TRADE_DATE, STOCK_EXPIRIES[:1])
+            expected_chain = [row for row in tables['option_chain_data']
+                              if row['symbol'] == STOCKS[2] and row['expiry_date'] == STOCK_EXPIRIES[0]
+                              and row['created_at'].startswith(TRADE_DATE)]
+            if _by_id(chain) != _by_id(expected_chain):
+                failures.append(f"{STOCKS[2]} chain: {len(chain)} rows, expected {len(expected_chain)}")
+
+            lots = await access.get_lot_sizes([f"{s}BS" for s in STOCKS[:3]], MONTH_COLUMN)
+            expected_lots = {f"{s}BS": 25 * (i + 1) for i, s in enumerate(STOCKS[:3])}
+            if lots != expected_lots:
+                failures.append(f"lot sizes {lots}, expected {expected_lots}")
+
+            metadata = await access.get_stock_metadata(STOCKS[:2])
+            if sorted(metadata) != STOCKS[:2] or metadata[STOCKS[1]]['atm_iv'] != 21:
+                failures.append(f"stock metadata {metadata}")
+
+            if await access.find_existing_strategy(STOCKS[1], 'Iron Condor', TRADE_DATE) != 1:
+                failures.append("existing strategy not found")
+            if await access.find_existing_strategy(STOCKS[1], 'Iron Condor', PREVIOUS_DATE) is not None:
+                failures.append("strategy found on the wrong day")
+
+            rows = [{'stock_name': s, 'strategy_name': 'Butterfly Spread', 'generated_on': f"{TRADE_DATE}T11:00:00"}
+                    for s in STOCKS]
+            inserted = await access.insert_rows('strategies', rows, batch_size=5)
+            if [row['stock_name'] for row in inserted] != STOCKS or len({row['id'] for row in inserted}) != len(STOCKS):
+                failures.append(f"inserted rows out of order or without ids: {inserted}")
+
+    asyncio.run(run())
+    return failures
+
+
+def check_retries(server: PostgRESTStandIn, tables: Dict) -> List[str]:
+    """Transient statuses are retried with back-off, client errors are raised at once"""
+    failures = []
+
+    async def run():
+        async with AsyncSupabasePool(base_url=server.base_url, requests_per_second=200) as pool:
+            server.fail_next(503)
+            started = time.monotonic()
+            response = await pool.table('lots').select('symbol').eq('symbol', f"{STOCKS[0]}BS").execute()
+            if response.data != [{'symbol': f"{STOCKS[0]}BS"}] or pool.request_count != 2:
+                failures.append(f"503 retry returned {response.data} after {pool.request_count} requests")
+            if time.monotonic() - started < 1.0:
+                failures.append("503 retried without backing off")
+
+            server.fail_next(400)
+            try:
+                await pool.table('lots').select('symbol').execute()
+                failures.append("400 was not raised")
+            except httpx.HTTPStatusError as e:
+                if e.response.status_code != 400 or pool.request_count != 3:
+                    failures.append(f"400 raised as {e.response.status_code} after {pool.request_count} requests")
+
+    asyncio.run(run())
+    return failures
+
+
+CHECKS: List[Tuple[str, Callable[[PostgRESTStandIn, Dict], List[str]]]] = [
+    ('bulk preload parity', check_bulk_preload),
+    ('sequential fallback', check_fallback),
+    ('data access queries', check_data_access),
+    ('retries', check_retries),
+]
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Async Supabase layer check against a local PostgREST stand-in')
+    parser.add_argument('--seed', type=int, default=7, help='Random seed for the stored rows')
+    parser.add_argument('--verbose', action='store_true', help='Keep logging enabled')
+    args = parser.parse_args()
+
+    if not args.verbose:
+        logging.disable(logging.CRITICAL)
+
+    failed = 0
+    for name, check in CHECKS:
+        tables = build_tables(args.seed)
+        with PostgRESTStandIn(tables) as server:
+            started = time.monotonic()
+            failures = check(server, tables)
+        print(f"  {name:<24s} {'FAILED' if failures else 'ok':<7s} {time.monotonic() - started:>6.2f}s")
+        for failure in failures:
+            print(f"    {failure}")
+        failed += bool(failures)
+
+    if failed:
+        print(f"\n  FAILED: {failed}/{len(CHECKS)} checks")
+        sys.exit(1)
+    print(f"\n  OK: all {len(CHECKS)} async Supabase checks passed")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+"""
+Exit Evaluator Parity Check
+Evaluates randomised books through the scalar and the columnar
+ExitEvaluator.evaluate_portfolio paths over several P&L ticks, fails on
+any difference in action, urgency, reason, details or ordering, and
+times both paths.
+
+Usage:
+    python -m benchmarks.exit_evaluator_parity --positions 500 --books 20 --ticks 5
+"""
+
+import os
+import sys
+import time
+import random
+import logging
+import argparse
+from typing import Dict, List, Tuple
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from trade_execution.exit_evaluator import ExitEvaluator
+
+COMPARED_FIELDS = ('strategy_id', 'recommended_action', 'urgency', 'action_reason', 'details')
+ACTIONS = ['CLOSE_IMMEDIATELY', 'CLOSE_POSITION', 'CLOSE_75%', 'CLOSE_50%', 'CLOSE_25%', 'ADJUST', 'UNKNOWN']
+STRATEGIES = ['Iron Condor', 'Butterfly Spread', 'Bull Call Spread', 'Short Strangle']
+
+
+def random_exit_conditions(rng: random.Random) -> Dict:
+    """Exit conditions covering every branch of the check methods"""
+    conditions = {}
+
+    if rng.random() < 0.9:
+        profit_targets = {}
+        if rng.random() < 0.8:
+            profit_targets['primary'] = {
+                'trigger_type': rng.choice(['percentage', 'price', None]),
+                'trigger_value': rng.choice([0, 25, 50, 75, 2000, 5000, -10]),
+            }
+            if rng.random() < 0.7:
+                profit_targets['primary']['action'] = rng.choice(ACTIONS)
+        for k in range(rng.randrange(4)):
+            key = rng.choice(['scaling_', 'level_']) + str(k + 1)
+            level = {rng.choice(['trigger_value', 'profit']): rng.choice([0, 500, 1500, 3000])}
+            if rng.random() < 0.5:
+                level['action'] = rng.choice(ACTIONS)
+            profit_targets[key] = level
+        if rng.random() < 0.3:
+            profit_targets['trailing'] = {'activate_at': rng.choice([0, 1000])}
+        conditions['profit_targets'] = profit_targets
+
+    if rng.random() < 0.9:
+        stop_losses = {}
+        if rng.random() < 0.85:
+            if rng.random() < 0.7:
+                stop_losses['primary'] = {'trigger_type': 'percentage',
+                                          'trigger_value': rng.choice([25, 50, 100])}
+            else:
+                stop_losses['primary'] = {'loss_amount': rng.choice([0, 1000, 4000])}
+        if rng.random() < 0.3:
+            stop_losses['time_stop'] = {'trigger': rng.choice(['21 DTE', 'never'])}
+        conditions['stop_losses'] = stop_losses
+        if rng.random() < 0.7:
+            conditions['max_loss'] = rng.choice([0, 5000, 10000])
+
+    if rng.random() < 0.9:
+        time_exits = {}
+        if rng.random() < 0.8:
+            time_exits['primary'] = {'trigger_value': rng.choice([3, 7, 10])}
+            if rng.random() < 0.5:
+                time_exits['primary']['action'] = rng.choice(ACTIONS)
+        if rng.random() < 0.4:
+            time_exits['theta_decay_threshold'] = {'dte': rng.choice([5, 10])}
+            if rng.random() < 0.5:
+                time_exits['theta_decay_threshold']['action'] = rng.choice(ACTIONS)
+        conditions['time_exits'] = time_exits
+
+    # A few malformed rows exercise the scalar fallback
+    if rng.random() < 0.02:
+        conditions.setdefault('profit_targets', {})['primary'] = {'trigger_value': None}
+
+    return conditions
+
+
+def random_book(rng: random.Random, size: int) -> Tuple[List[Dict], Dict[int, Dict]]:
+    positions, conditions = [], {}
+    for strategy_id in range(1, size + 1):
+        entry_value = rng.choice([2000, 5000, 10000])
+        # Most positions sit between the thresholds; the tails reach every trigger
+        pnl_pct = rng.gauss(0, 20) if rng.random() < 0.85 else rng.uniform(-120, 120)
+        positions.append({
+            'strategy_id': strategy_id,
+            'symbol': f'SYM{strategy_id % 40}',
+            'strategy_name': rng.choice(STRATEGIES),
+            'total_pnl': round(entry_value * pnl_pct / 100, 2),
+            'total_pnl_pct': round(pnl_pct, 2),
+            'days_in_trade': rng.randrange(0, 40),
+            'actual_dte': rng.choice([None, 0, 1, 2, 3, 5] + [8, 12, 15, 21, 30] * 3)
+        })
+        conditions[strategy_id] = random_exit_conditions(rng)
+    return positions, conditions
+
+
+def move_prices(rng: random.Random, positions: List[Dict]):
+    """Next tick: P&L moves, exit conditions stay the same objects"""
+    for position in positions:
+        pnl_pct = position['total_pnl_pct'] + rng.gauss(0, 5)
+        scale = position['total_pnl'] / position['total_pnl_pct'] if position['total_pnl_pct'] else 50
+        position['total_pnl_pct'] = round(pnl_pct, 2)
+        position['total_pnl'] = round(scale * pnl_pct, 2)
+
+
+def compare(scalar: List[Dict], columnar: List[Dict]) -> List[str]:
+    mismatches = []
+    if len(scalar) != len(columnar):
+        return [f"result count {len(scalar)} != {len(columnar)}"]
+    for rank, (a, b) in enumerate(zip(scalar, columnar)):
+        for field in COMPARED_FIELDS:
+            if a.get(field) != b.get(field):
+                mismatches.append(f"rank {rank} strategy {a.get('strategy_id')}: "
+                                  f"{field} {a.get(field)!r} != {b.get(field)!r}")
+    return mismatches
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Scalar vs columnar ExitEvaluator parity check')
+    parser.add_argument('--positions', type=int, default=500, help='Positions per book')
+    parser.add_argument('--books', type=int, default=20, help='Random books to evaluate')
+    parser.add_argument('--ticks', type=int, default=5, help='P&L updates evaluated per book')
+    parser.add_argument('--seed', type=int, default=11, help='Random seed')
+    args = parser.parse_args()
+
+    evaluator = ExitEvaluator()
+    evaluator.logger.setLevel(logging.CRITICAL)
+    rng = random.Random(args.seed)
+
+    scalar_time = columnar_time = 0.0
+    mismatches = []
+    for book in range(args.books):
+        positions, conditions = random_book(rng, args.positions)
+
+        for tick in range(args.ticks):
+            if tick:
+                move_prices(rng, positions)
+
+            start = time.perf_counter()
+            scalar = evaluator.evaluate_portfolio(positions, conditions, vectorized=False)
+            scalar_time += time.perf_counter() - start
+
+            start = time.perf_counter()
+            columnar = evaluator.evaluate_portfolio(positions, conditions, vectorized=True)
+            columnar_time += time.perf_counter() - start
+
+            mismatches.extend(f"book {book} tick {tick}: {m}" for m in compare(scalar, columnar))
+
+    evaluations = args.books * args.ticks
+    evaluated = args.positions * evaluations
+    print(f"Exit evaluator parity: {args.books} books x {args.positions} positions x {args.ticks} ticks")
+    print(f"  scalar   {scalar_time / evaluations * 1000:8.2f} ms/evaluation")
+    print(f"  columnar {columnar_time / evaluations * 1000:8.2f} ms/evaluation")
+    if mismatches:
+        print(f"  FAILED: {len(mismatches)} mismatches in {evaluated} evaluations")
+        for mismatch in mismatches[:20]:
+            print(f"    {mismatch}")
+        sys.exit(1)
+    print(f"  OK: {evaluated} evaluations identical")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,195 @@
+"""
+Fake Dhan Broker
+Scripted stand-ins for the dhanhq client and OptionsV4Executor, so
+AsyncOrderEngine can be exercised with no broker, database or network.
+
+Every order outcome is scripted per security id: how place_order answers,
+after how many get_order_by_id polls the order reaches its final status,
+and which status that is (None keeps it pending forever). All broker calls
+are timestamped for ordering, back-off and rate-limit checks.
+"""
+
+import time
+import itertools
+from threading import Lock
+from typing import Dict, List, Optional, Tuple
+
+# place_order outcomes
+PLACE_SUCCESS = 'success'
+PLACE_FAILURE = 'failure'
+PLACE_MARKET_CLOSED = 'market_closed'
+PLACE_RAISE = 'raise'
+
+DEFAULT_SCRIPT = {'place': PLACE_SUCCESS, 'fill_after': 2, 'final': 'TRADED', 'price': 100.0}
+
+
+class FakeDhanClient:
+    """
+    dhanhq stand-in with scripted order outcomes
+
+    Usage:
+        broker = FakeDhanClient({'RELIANCE-2500-PUT': {'final': 'REJECTED'}})
+        engine = AsyncOrderEngine(FakeExecutor(), broker=broker)
+    """
+
+    def __init__(self, scripts: Optional[Dict[str, Dict]] = None, latency: float = 0.0):
+        """
+        Initialize fake client
+
+        Args:
+            scripts: {security_id: overrides of DEFAULT_SCRIPT}
+            latency: Seconds every broker call takes
+        """
+        self.scripts = scripts or {}
+        self.latency = latency
+        self.orders: Dict[str, Dict] = {}
+        self.calls: List[Tuple[float, str, str]] = []     # (monotonic time, method, security_id)
+        self._ids = itertools.count(1)
+        self._lock = Lock()
+
+    def script_for(self, security_id: str) -> Dict:
+        return {**DEFAULT_SCRIPT, **self.scripts.get(security_id, {})}
+
+    def place_order(self, security_id, exchange_segment, transaction_type, quantity, order_type,
+                    product_type, price, trigger_price=0, validity='DAY', **kwargs) -> Dict:
+        self._record('place_order', security_id)
+        script = self.script_for(security_id)
+
+        if script['place'] == PLACE_RAISE:
+            raise ConnectionError(f"broker unreachable placing {security_id}")
+        if script['place'] == PLACE_MARKET_CLOSED:
+            return {'status': 'failure', 'remarks': 'Market Closed', 'data': {}}
+        if script['place'] == PLACE_FAILURE:
+            return {'status': 'failure', 'remarks': 'Insufficient margin', 'data': {}}
+
+        with self._lock:
+            order_id = str(next(self._ids))
+            self.orders[order_id] = {
+                'security_id': security_id,
+                'transaction_type': transaction_type,
+                'quantity': quantity,
+                'placed_at': time.monotonic(),
+                'polls': [],
+                'final_at': None,
+                'script': script
+            }
+        return {'status': 'success', 'remarks': '', 'data': {'orderId': order_id, 'orderStatus': 'TRANSIT'}}
+
+    def get_order_by_id(self, order_id) -> Dict:
+        with self._lock:
+            order = self.orders.get(str(order_id))
+        if order is None:
+            return {'status': 'failure', 'remarks': f'Unknown order {order_id}', 'data': []}
+
+        self._record('get_order_by_id', order['security_id'])
+        with self._lock:
+            order['polls'].append(time.monotonic())
+            script = order['script']
+            final = script['final'] is not None and len(order['polls']) >= script['fill_after']
+            if final and order['final_at'] is None:
+                order['final_at'] = order['polls'][-1]
+
+        status = script['final'] if final else 'PENDING'
+        traded = status == 'TRADED'
+        return {'status': 'success', 'remarks': '', 'data': [{
+            'orderId': order_id,
+            'orderStatus': status,
+            'averageTradedPrice': script['price'] if traded else 0,
+            'price': 0,
+            'filledQty': order['quantity'] if traded else 0,
+            'drvExpiryDate': '2026-10-29 14:30:00'
+        }]}
+
+    def orders_for(self, security_id: str) -> List[Dict]:
+        """Orders placed for a security id"""
+        return [o for o in self.orders.values() if o['security_id'] == security_id]
+
+    def _record(self, method: str, security_id: str):
+        if self.latency:
+            time.sleep(self.latency)
+        with self._lock:
+            self.calls.append((time.monotonic(), method, security_id))
+
+
+class FakeExecutor:
+    """
+    OptionsV4Executor stand-in recording what AsyncOrderEngine persists
+
+    Security ids are "<symbol>-<strike>-<option type>"; strikes listed in
+    unresolved have none, like a contract missing from the scrip master.
+    """
+
+    def __init__(self, lot_size: int = 50, unresolved: Optional[List[Tuple[str, float, str]]] = None):
+        self.dhan = None
+        self.lot_size = lot_size
+        self.unresolved = set(unresolved or [])
+        self.trades: List[Dict] = []
+        self.trade_updates: List[Tuple] = []
+        self.status_updates: List[Tuple] = []         # (monotonic time, strategy_id, status, results)
+        self.lookups: List[Tuple[float, str]] = []    # (monotonic time, symbol)
+        self._lock = Lock()
+
+    @staticmethod
+    def security_id(symbol: str, strike_price, option_type: str) -> str:
+        return f"{symbol}-{strike_price}-{option_type}"
+
+    def get_security_id(self, symbol, option_type, strike_price, expiry_date=None):
+        with self._lock:
+            self.lookups.append((time.monotonic(), symbol))
+        if (symbol, strike_price, option_type) in self.unresolved:
+            return None, None
+        return self.security_id(symbol, strike_price, option_type), self.lot_size
+
+    def store_trade(self, **trade):
+        with self._lock:
+            self.trades.append(trade)
+        return True
+
+    def update_trade_details(self, order_id, price, expiry_date=None):
+        with self._lock:
+            self.trade_updates.append((order_id, price, expiry_date))
+        return True
+
+    def update_strategy_status(self, strategy_id, status, execution_details=None):
+        with self._lock:
+            self.status_updates.append((time.monotonic(), strategy_id, status, execution_details))
+        return True
+
+    def get_order_details(self, order_id, broker=None):
+        """Same response parsing as OptionsV4Executor.get_order_details"""
+        response = broker.get_order_by_id(order_id)
+        if not response or response.get('status') != 'success' or not response.get('data'):
+            return None
+        order_data = response['data'][0]
+        return {
+            'order_id': order_id,
+            'executed_price': order_data.get('averageTradedPrice', 0) or order_data.get('price', 0),
+            'order_status': order_data.get('orderStatus', ''),
+            'filled_quantity': order_data.get('filledQty', 0),
+            'expiry_date': order_data.get('drvExpiryDate'),
+            'full_details': order_data
+        }
+
+
+def make_strategy(strategy_id: int, symbol: str, legs: List[Tuple[str, float, str]],
+                  strategy_name: str = 'Iron Condor') -> Dict:
+    """
+    Strategy row as get_marked_strategies returns it
+
+    Args:
+        strategy_id: Strategy id
+        symbol: Stock symbol
+        legs: (setup_type, strike_price, option_type) per leg
+        strategy_name: Strategy name
+    """
+    return {
+        'id': strategy_id,
+        'stock_name': symbol,
+        'strategy_name': strategy_name,
+        'strategy_parameters': [{'expiry_date': '2026-10-29'}],
+        'strategy_details': [
+            {'id': strategy_id * 100 + i, 'setup_type': setup_type, 'strike_price': strike,
+             'option_type': option_type, 'lots': 1}
+            for i, (setup_type, strike, option_type) in enumerate(legs)
+        ]
+    }
@@ -0,0 +1,285 @@
+#!/usr/bin/env python3
+"""
+Async Order Engine Check
+Runs AsyncOrderEngine against the scripted fake Dhan client and fails on
+any deviation in the fill, partial-failure and timeout paths: hedge-first
+ordering, waiting for TRADED before the short legs, fill-poll back-off,
+the poll timeout, parallel strategies and the shared broker rate limit.
+
+Poll delays are scaled down (--time-scale) so the whole check runs in a
+few seconds; the timeout path also checks the 30s production default.
+
+Usage:
+    python -m benchmarks.order_engine_check
+"""
+
+import os
+import sys
+import time
+import asyncio
+import logging
+import argparse
+from typing import Callable, Dict, List, Tuple
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.fake_dhan import (
+    FakeDhanClient, FakeExecutor, make_strategy,
+    PLACE_FAILURE, PLACE_MARKET_CLOSED, PLACE_RAISE
+)
+from trade_execution.async_order_engine import AsyncOrderEngine
+
+SYMBOL = 'RELIANCE'
+IRON_CONDOR = [('BUY', 2300, 'PUT'), ('SELL', 2400, 'PUT'), ('SELL', 2600, 'CALL'), ('BUY', 2700, 'CALL')]
+
+# Production poll settings, scaled by --time-scale
+POLL_INITIAL = 0.5
+POLL_MAX = 4.0
+POLL_TIMEOUT = 30.0
+
+# Scheduling slack allowed on every timing assertion (seconds)
+SLACK = 0.05
+
+
+def sid(strike, option_type: str, symbol: str = SYMBOL) -> str:
+    return FakeExecutor.security_id(symbol, strike, option_type)
+
+
+def build(scale: float, scripts: Dict = None, leg_order: str = 'hedge_first',
+          **engine_kwargs) -> Tuple[AsyncOrderEngine, FakeDhanClient, FakeExecutor]:
+    broker = FakeDhanClient(scripts)
+    executor = FakeExecutor(unresolved=engine_kwargs.pop('unresolved', None))
+    engine = AsyncOrderEngine(
+        executor, broker=broker, leg_order=leg_order,
+        poll_initial=POLL_INITIAL * scale, poll_max=POLL_MAX * scale, poll_timeout=POLL_TIMEOUT * scale,
+        **engine_kwargs
+    )
+    return engine, broker, executor
+
+
+def check_hedge_first_fills(scale: float) -> List[str]:
+    """All legs fill; SELL legs are placed only after every BUY leg traded"""
+    engine, broker, executor = build(scale)
+    results = asyncio.run(engine.execute_strategy(make_strategy(1, SYMBOL, IRON_CONDOR)))
+    failures = []
+
+    if [r['status'] for r in results] != ['success'] * 4:
+        failures.append(f"expected 4 successful legs, got {results}")
+    if any(r.get('order_status') != 'TRADED' or r.get('executed_price') != 100.0 for r in results):
+        failures.append(f"legs not reported TRADED at the fill price: {results}")
+
+    buys = broker.orders_for(sid(2300, 'PUT')) + broker.orders_for(sid(2700, 'CALL'))
+    sells = broker.orders_for(sid(2400, 'PUT')) + broker.orders_for(sid(2600, 'CALL'))
+    if len(buys) != 2 or len(sells) != 2:
+        failures.append(f"expected one order per leg, got {len(buys)} BUY and {len(sells)} SELL")
+    elif min(o['placed_at'] for o in sells) < max(o['final_at'] for o in buys):
+        failures.append("a SELL leg was placed before every BUY leg had traded")
+
+    if len(executor.trades) != 4 or len(executor.trade_updates) != 4:
+        failures.append(f"expected 4 stored trades and 4 fill updates, got "
+                        f"{len(executor.trades)} and {len(executor.trade_updates)}")
+    if [u[2] for u in executor.status_updates] != ['executed']:
+        failures.append(f"strategy status updates {[u[2] for u in executor.status_updates]}, expected ['executed']")
+    return failures
+
+
+def check_concurrent_fills(scale: float) -> List[str]:
+    """Concurrent mode submits every leg before any fill is polled"""
+    engine, broker, executor = build(scale, leg_order='concurrent')
+    results = asyncio.run(engine.execute_strategy(make_strategy(2, SYMBOL, IRON_CONDOR)))
+    failures = []
+
+    if [r['status'] for r in results] != ['success'] * 4:
+        failures.append(f"expected 4 successful legs, got {results}")
+    first_poll = min(t for t, method, _ in broker.calls if method == 'get_order_by_id')
+    last_place = max(t for t, method, _ in broker.calls if method == 'place_order')
+    if last_place > first_poll:
+        failures.append("concurrent mode polled a fill before all legs were placed")
+    return failures
+
+
+def check_rejected_hedge(scale: float) -> List[str]:
+    """A rejected BUY leg fails the strategy and keeps the SELL legs from being placed"""
+    engine, broker, executor = build(scale, {sid(2300, 'PUT'): {'final': 'REJECTED', 'fill_after': 1}})
+    results = asyncio.run(engine.execute_strategy(make_strategy(3, SYMBOL, IRON_CONDOR)))
+    failures = []
+
+    by_leg = {r['leg_id']: r for r in results}
+    if by_leg[300]['status'] != 'failed' or by_leg[300].get('error') != 'Order REJECTED':
+        failures.append(f"rejected hedge leg reported as {by_leg[300]}")
+    if by_leg[303]['status'] != 'success':
+        failures.append(f"filled hedge leg reported as {by_leg[303]}")
+    for leg_id in (301, 302):
+        if by_leg[leg_id]['status'] != 'failed' or 'hedge leg did not fill' not in by_leg[leg_id].get('error', ''):
+            failures.append(f"short leg {leg_id} should be withheld, got {by_leg[leg_id]}")
+    if broker.orders_for(sid(2400, 'PUT')) or broker.orders_for(sid(2600, 'CALL')):
+        failures.append("SELL legs were placed although a hedge was rejected")
+    if [u[2] for u in executor.status_updates] != ['failed']:
+        failures.append(f"strategy status updates {[u[2] for u in executor.status_updates]}, expected ['failed']")
+    return failures
+
+
+def check_partial_placement_failure(scale: float) -> List[str]:
+    """A refused or raising SELL order fails only that leg; the others still fill"""
+    engine, broker, executor = build(scale, {
+        sid(2400, 'PUT'): {'place': PLACE_FAILURE},
+        sid(2600, 'CALL'): {'place': PLACE_RAISE}
+    })
+    results = asyncio.run(engine.execute_strategy(make_strategy(4, SYMBOL, IRON_CONDOR)))
+    failures = []
+
+    by_leg = {r['leg_id']: r for r in results}
+    if by_leg[401] != {'leg_id': 401, 'status': 'failed', 'error': 'Insufficient margin'}:
+        failures.append(f"refused SELL leg reported as {by_leg[401]}")
+    if by_leg[402]['status'] != 'failed' or 'broker unreachable' not in by_leg[402].get('error', ''):
+        failures.append(f"raising SELL leg reported as {by_leg[402]}")
+    if by_leg[400]['status'] != 'success' or by_leg[403]['status'] != 'success':
+        failures.append(f"hedge legs should still fill, got {by_leg[400]} and {by_leg[403]}")
+    if len(executor.trades) != 2:
+        failures.append(f"only the 2 placed legs should be stored, got {len(executor.trades)}")
+    if [u[2] for u in executor.status_updates] != ['failed']:
+        failures.append(f"strategy status updates {[u[2] for u in executor.status_updates]}, expected ['failed']")
+    return failures
+
+
+def check_market_closed(scale: float) -> List[str]:
+    """Hedges deferred by a closed market defer the SELL legs instead of failing them"""
+    closed = {'place': PLACE_MARKET_CLOSED}
+    engine, broker, executor = build(scale, {sid(2300, 'PUT'): closed, sid(2700, 'CALL'): closed})
+    results = asyncio.run(engine.execute_strategy(make_strategy(5, SYMBOL, IRON_CONDOR)))
+    failures = []
+
+    if [r['status'] for r in results] != ['deferred'] * 4:
+        failures.append(f"expected 4 deferred legs, got {results}")
+    if broker.orders:
+        failures.append(f"no order should exist, got {len(broker.orders)}")
+    return failures
+
+
+def check_unresolved_leg(scale: float) -> List[str]:
+    """A leg without a security id stops the whole strategy before any order"""
+    engine, broker, executor = build(scale, unresolved=[(SYMBOL, 2600, 'CALL')])
+    results = asyncio.run(engine.execute_strategy(make_strategy(6, SYMBOL, IRON_CONDOR)))
+    failures = []
+
+    if [r['status'] for r in results] != ['failed'] * 4:
+        failures.append(f"expected 4 failed legs, got {results}")
+    if results[2].get('error') != 'Security ID not found':
+        failures.append(f"unresolved leg reported as {results[2]}")
+    if broker.calls:
+        failures.append(f"no broker call should be made, got {len(broker.calls)}")
+    return failures
+
+
+def check_timeout_and_backoff(scale: float) -> List[str]:
+    """A hedge that never reaches a terminal status times out with growing poll delays"""
+    failures = []
+    defaults = AsyncOrderEngine(FakeExecutor(), broker=FakeDhanClient())
+    if (defaults.poll_initial, defaults.poll_max, defaults.poll_timeout) != (POLL_INITIAL, POLL_MAX, POLL_TIMEOUT):
+        failures.append(f"default poll settings changed: {defaults.poll_initial}/{defaults.poll_max}/"
+                        f"{defaults.poll_timeout}s")
+
+    engine, broker, executor = build(scale, {sid(2300, 'PUT'): {'final': None}})
+    started = time.monotonic()
+    results = asyncio.run(engine.execute_strategy(make_strategy(7, SYMBOL, IRON_CONDOR)))
+    elapsed = time.monotonic() - started
+
+    by_leg = {r['leg_id']: r for r in results}
+    if by_leg[700]['order_status'] != 'PENDING':
+        failures.append(f"timed-out hedge reported as {by_leg[700]}")
+    for leg_id in (701, 702):
+        if by_leg[leg_id]['status'] != 'failed':
+            failures.append(f"short leg {leg_id} placed after a hedge timeout: {by_leg[leg_id]}")
+    if broker.orders_for(sid(2400, 'PUT')) or broker.orders_for(sid(2600, 'CALL')):
+        failures.append("SELL legs were placed although a hedge never filled")
+
+    timeout, poll_max = engine.poll_timeout, engine.poll_max
+    if not timeout - poll_max - SLACK <= elapsed <= timeout + poll_max + SLACK:
+        failures.append(f"gave up after {elapsed:.2f}s, expected about {timeout:.2f}s")
+
+    order = broker.orders_for(sid(2300, 'PUT'))[0]
+    polls = [order['placed_at']] + order['polls']
+    intervals = [b - a for a, b in zip(polls, polls[1:])]
+    expected = engine.poll_initial
+    for i, interval in enumerate(intervals):
+        if not expected - SLACK <= interval <= expected + SLACK:
+            failures.append(f"poll {i + 1} after {interval:.3f}s, expected {expected:.3f}s")
+            break
+        expected = min(expected * 1.5, poll_max)
+    return failures
+
+
+def check_parallel_strategies(scale: float) -> List[str]:
+    """Strategies run at most max_parallel_strategies at a time under one broker rate limit"""
+    symbols = [f"STOCK{i}" for i in range(6)]
+    strategies = [make_strategy(10 + i, symbol, IRON_CONDOR) for i, symbol in enumerate(symbols)]
+    rate = 20.0
+    engine, broker, executor = build(scale, orders_per_second=rate, max_parallel_strategies=2)
+    results = asyncio.run(engine.execute_strategies(strategies))
+    failures = []
+
+    if [r['strategy_id'] for r in results] != [s['id'] for s in strategies]:
+        failures.append("results are not in input order")
+    if any(leg['status'] != 'success' for r in results for leg in r['legs']):
+        failures.append("every leg of every strategy should fill")
+
+    # Overlap of [first lookup, status update] windows per strategy
+    started = {}
+    for t, symbol in executor.lookups:
+        started.setdefault(symbol, t)
+    finished = {strategy_id: t for t, strategy_id, _, _ in executor.status_updates}
+    windows = [(started[s['stock_name']], finished[s['id']]) for s in strategies]
+    peak = max(sum(1 for a, b in windows if a <= t < b) for t, _ in windows)
+    if peak > engine.max_parallel_strategies:
+        failures.append(f"{peak} strategies ran at once, limit {engine.max_parallel_strategies}")
+
+    # No window of broker calls may exceed the bucket's burst plus its refill
+    times = sorted(t for t, _, _ in broker.calls)
+    for i in range(len(times)):
+        for j in range(i + 1, len(times)):
+            allowed = rate + (times[j] - times[i] + SLACK) * rate + 1
+            if j - i + 1 > allowed:
+                failures.append(f"{j - i + 1} broker calls in {times[j] - times[i]:.3f}s exceed {rate:.0f}/s")
+                return failures
+    return failures
+
+
+CHECKS: List[Tuple[str, Callable[[float], List[str]]]] = [
+    ('hedge-first fills', check_hedge_first_fills),
+    ('concurrent fills', check_concurrent_fills),
+    ('rejected hedge', check_rejected_hedge),
+    ('partial placement failure', check_partial_placement_failure),
+    ('market closed', check_market_closed),
+    ('unresolved leg', check_unresolved_leg),
+    ('timeout and back-off', check_timeout_and_backoff),
+    ('parallel strategies', check_parallel_strategies),
+]
+
+
+def main():
+    parser = argparse.ArgumentParser(description='AsyncOrderEngine check against a fake Dhan client')
+    parser.add_argument('--time-scale', type=float, default=0.02,
+                        help='Factor applied to the production poll delays and timeout')
+    parser.add_argument('--verbose', action='store_true', help='Keep engine logging enabled')
+    args = parser.parse_args()
+
+    if not args.verbose:
+        logging.disable(logging.CRITICAL)
+
+    failed = 0
+    for name, check in CHECKS:
+        started = time.monotonic()
+        failures = check(args.time_scale)
+        print(f"  {name:<28s} {'FAILED' if failures else 'ok':<7s} {time.monotonic() - started:>6.2f}s")
+        for failure in failures:
+            print(f"    {failure}")
+        failed += bool(failures)
+
+    if failed:
+        print(f"\n  FAILED: {failed}/{len(CHECKS)} checks")
+        sys.exit(1)
+    print(f"\n  OK: all {len(CHECKS)} order engine checks passed")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,265 @@
+#!/usr/bin/env python3
+"""
+Offline Strategy Pipeline Benchmark
+Replays recorded chain, price-history and lot-size fixtures through
+OptionsAnalyzer.analyze_symbol with no network access, times every
+pipeline stage and every strategy class in strategy_creation/strategies,
+and compares the timings against a stored baseline.
+
+Usage:
+    # Anywhere, offline, on synthetic fixtures generated on the fly
+    python -m benchmarks.pipeline_benchmark run
+
+    # Synthetic fixtures kept on disk, e.g. to compare against a baseline
+    python -m benchmarks.pipeline_benchmark synthesize --symbols 25 --output /tmp/synthetic25
+
+    # Once, on a machine with Supabase and Yahoo Finance access
+    python -m benchmarks.pipeline_benchmark record --portfolio 25 --output benchmarks/fixtures/portfolio25
+
+    # Anywhere, offline
+    python -m benchmarks.pipeline_benchmark run --fixtures benchmarks/fixtures/portfolio25 \\
+        --save-baseline benchmarks/fixtures/portfolio25/baseline.json
+    python -m benchmarks.pipeline_benchmark run --fixtures benchmarks/fixtures/portfolio25 \\
+        --baseline benchmarks/fixtures/portfolio25/baseline.json
+"""
+
+import os
+import sys
+import json
+import time
+import logging
+import argparse
+import platform
+import tempfile
+from typing import Dict, List, Tuple
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.pipeline_fixtures import (
+    PipelineFixtures, FixtureDataManager, FixtureStockProfiler, FixtureTechnicalAnalyzer,
+    build_price_store, disable_network, record_fixtures, synthesize_fixtures
+)
+from utils.stage_timer import StageTimer
+
+# Baseline comparison: p50 must grow by both this fraction and this many ms to count
+DEFAULT_TOLERANCE = 0.25
+DEFAULT_MIN_DELTA_MS = 1.0
+
+# Symbols synthesized when run is given no fixture directory
+DEFAULT_SYNTHETIC_SYMBOLS = 25
+
+
+def build_offline_analyzer(fixtures: PipelineFixtures):
+    """OptionsAnalyzer wired to the fixture stand-ins (no database, no downloads)"""
+    from main import OptionsAnalyzer
+
+    price_store = build_price_store(fixtures)
+    analyzer = OptionsAnalyzer(
+        enable_database=False,
+        data_manager=FixtureDataManager(fixtures),
+        stock_profiler=FixtureStockProfiler(fixtures, price_store)
+    )
+    analyzer.market_analyzer.technical_analyzer = FixtureTechnicalAnalyzer(price_store)
+    return analyzer
+
+
+def time_pipeline(fixtures: PipelineFixtures, repeat: int) -> Tuple[StageTimer, Dict[str, Dict], object]:
+    """
+    Run every fixture symbol through analyze_symbol, repeat times, each with a fresh analyzer
+
+    Returns:
+        Stage timer, results of the last repetition and its analyzer
+    """
+    timer = StageTimer()
+    results, analyzer = {}, None
+
+    for _ in range(repeat):
+        analyzer = build_offline_analyzer(fixtures)
+
+        with timer.span('preload_chains'):
+            analyzer.data_manager.preload_options_data(fixtures.symbols)
+        with timer.span('prefetch_price_history'):
+            analyzer.stock_profiler.prefetch_price_history(fixtures.symbols)
+
+        results = {}
+        for symbol in fixtures.symbols:
+            result = analyzer.analyze_symbol(symbol)
+            timer.collect(symbol, result)
+            results[symbol] = result
+
+    return timer, results, analyzer
+
+
+def time_strategy_classes(analyzer, results: Dict[str, Dict], repeat: int) -> StageTimer:
+    """
+    Construct every strategy class for every analysed symbol
+
+    Uses each symbol's own market analysis, so the classes see the same
+    inputs as in the pipeline, whether or not the selector would pick them.
+    """
+    timer = StageTimer()
+    data_manager = analyzer.data_manager
+
+    for symbol, result in results.items():
+        if not result.get('success'):
+            continue
+        options_df = data_manager.get_liquid_options(symbol)
+        multi_expiry_df = data_manager.get_multi_expiry_options(symbol)
+        lot_size = data_manager.get_lot_size(symbol)
+        spot_price = result['spot_price']
+        market_analysis = result['market_analysis']
+
+        for strategy_name, strategy_class in analyzer.strategy_classes.items():
+            chain = multi_expiry_df if 'Calendar' in strategy_name else options_df
+            if chain is None:
+                continue
+            for _ in range(repeat):
+                with timer.span(strategy_name, symbol):
+                    try:
+                        instance = strategy_class(symbol, spot_price, chain.copy(), lot_size, market_analysis)
+                        analyzer._construct_single_strategy(instance, strategy_name, market_analysis)
+                    except Exception:
+                        # Timed like the pipeline, which skips strategies that raise
+                        pass
+
+    return timer
+
+
+def run_benchmark(fixture_dir: str, repeat: int = 3) -> Dict:
+    fixtures = PipelineFixtures(fixture_dir)
+
+    started = time.perf_counter()
+    stage_timer, results, analyzer = time_pipeline(fixtures, repeat)
+    strategy_timer = time_strategy_classes(analyzer, results, repeat)
+    elapsed = time.perf_counter() - started
+
+    failed = {s: r.get('reason', 'Unknown') for s, r in results.items() if not r.get('success')}
+    return {
+        'config': {
+            'fixture': fixtures.name,
+            'trade_date': fixtures.manifest.get('trade_date'),
+            'symbols': len(fixtures.symbols),
+            'repeat': repeat,
+            'python': platform.python_version(),
+            'machine': platform.machine()
+        },
+        'elapsed_s': round(elapsed, 2),
+        'successful_symbols': len(results) - len(failed),
+        'failed_symbols': failed,
+        'stages': stage_timer.summary()['stages'],
+        'strategies': strategy_timer.summary()['stages']
+    }
+
+
+def compare_to_baseline(current: Dict, baseline: Dict, tolerance: float, min_delta_ms: float) -> List[str]:
+    """Print p50 changes per stage and strategy; return the regressions"""
+    regressions = []
+    for section in ('stages', 'strategies'):
+        print(f"\n  {section:<28s} {'baseline p50':>13s} {'current p50':>12s} {'change':>8s}")
+        for name, base in sorted(baseline.get(section, {}).items()):
+            stats = current[section].get(name)
+            if stats is None:
+                print(f"  {name:<28s} {base['p50_ms']:>11.2f}ms {'missing':>12s}")
+                continue
+            change = (stats['p50_ms'] - base['p50_ms']) / base['p50_ms'] if base['p50_ms'] else 0.0
+            regressed = (stats['p50_ms'] > base['p50_ms'] * (1 + tolerance)
+                         and stats['p50_ms'] - base['p50_ms'] >= min_delta_ms)
+            flag = '  REGRESSION' if regressed else ''
+            print(f"  {name:<28s} {base['p50_ms']:>11.2f}ms {stats['p50_ms']:>10.2f}ms {change:>+7.0%}{flag}")
+            if regressed:
+                regressions.append(f"{section}/{name}: p50 {base['p50_ms']:.2f}ms -> {stats['p50_ms']:.2f}ms")
+
+    if current['successful_symbols'] != baseline.get('successful_symbols', current['successful_symbols']):
+        print(f"\n  Note: {current['successful_symbols']} successful symbols vs "
+              f"{baseline['successful_symbols']} in the baseline")
+    return regressions
+
+
+def print_results(results: Dict):
+    config = results['config']
+    print(f"Pipeline benchmark: fixture {config['fixture']} ({config['symbols']} symbols, "
+          f"recorded {config['trade_date']}), {config['repeat']} repetitions, {results['elapsed_s']}s")
+    print(f"  {results['successful_symbols']}/{config['symbols']} symbols analysed successfully")
+    for symbol, reason in results['failed_symbols'].items():
+        print(f"    {symbol}: {reason}")
+
+    for section in ('stages', 'strategies'):
+        print(f"\n  {section:<28s} {'count':>6s} {'p50':>10s} {'p95':>10s} {'max':>10s} {'total':>9s}")
+        for name, stats in sorted(results[section].items(), key=lambda item: -item[1]['total_s']):
+            print(f"  {name:<28s} {stats['count']:>6d} {stats['p50_ms']:>8.2f}ms {stats['p95_ms']:>8.2f}ms "
+                  f"{stats['max_ms']:>8.2f}ms {stats['total_s']:>8.3f}s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Offline strategy pipeline benchmark on recorded fixtures')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    record = commands.add_parser('record', help='Record live inputs into a fixture directory')
+    record.add_argument('--output', required=True, help='Fixture directory to write')
+    record.add_argument('--symbols', help='Comma-separated symbols (default: first --portfolio symbols)')
+    record.add_argument('--portfolio', type=int, default=25, help='Portfolio symbols to record')
+
+    synthesize = commands.add_parser('synthesize', help='Write a synthetic fixture directory, offline')
+    synthesize.add_argument('--output', required=True, help='Fixture directory to write')
+    synthesize.add_argument('--symbols', type=int, default=DEFAULT_SYNTHETIC_SYMBOLS, help='Synthetic symbols')
+    synthesize.add_argument('--seed', type=int, default=7, help='Random seed')
+
+    run = commands.add_parser('run', help='Time the pipeline on a fixture directory, offline')
+    run.add_argument('--fixtures', help='Fixture directory written by record or synthesize '
+                                        '(default: synthesize one in a temporary directory)')
+    run.add_argument('--repeat', type=int, default=3, help='Repetitions per symbol and strategy class')
+    run.add_argument('--baseline', help='Baseline results JSON to compare against (exit 1 on regression)')
+    run.add_argument('--save-baseline', help='Write these results as the new baseline')
+    run.add_argument('--output', help='Write results JSON to this file')
+    run.add_argument('--tolerance', type=float, default=DEFAULT_TOLERANCE,
+                     help='Allowed p50 slowdown as a fraction of the baseline')
+    run.add_argument('--min-delta-ms', type=float, default=DEFAULT_MIN_DELTA_MS,
+                     help='Ignore p50 slowdowns smaller than this')
+    run.add_argument('--allow-network', action='store_true', help='Do not block socket connections')
+    run.add_argument('--verbose', action='store_true', help='Keep pipeline logging enabled')
+    args = parser.parse_args()
+
+    if args.command == 'record':
+        logging.basicConfig(level=logging.INFO)
+        symbols = [s.strip() for s in args.symbols.split(',') if s.strip()] if args.symbols else None
+        fixture = record_fixtures(args.output, symbols, args.portfolio)
+        print(f"Recorded {len(fixture['symbols'])} symbols ({fixture['trade_date']}) into {args.output}")
+        return
+    if args.command == 'synthesize':
+        fixture = synthesize_fixtures(args.output, args.symbols, args.seed)
+        print(f"Synthesized {len(fixture['symbols'])} symbols ({fixture['trade_date']}) into {args.output}")
+        return
+
+    if not args.allow_network:
+        disable_network()
+    if not args.verbose:
+        logging.disable(logging.CRITICAL)
+
+    fixture_dir = args.fixtures
+    if fixture_dir is None:
+        fixture_dir = tempfile.mkdtemp(prefix='pipeline_synthetic_')
+        synthesize_fixtures(fixture_dir, DEFAULT_SYNTHETIC_SYMBOLS)
+
+    results = run_benchmark(fixture_dir, args.repeat)
+    print_results(results)
+
+    for path in (args.output, args.save_baseline):
+        if path:
+            with open(path, 'w') as f:
+                json.dump(results, f, indent=2)
+            print(f"\nResults written to {path}")
+
+    if args.baseline:
+        with open(args.baseline, 'r') as f:
+            baseline = json.load(f)
+        regressions = compare_to_baseline(results, baseline, args.tolerance, args.min_delta_ms)
+        if regressions:
+            print(f"\n  FAILED: {len(regressions)} regressions beyond {args.tolerance:.0%}")
+            for regression in regressions:
+                print(f"    {regression}")
+            sys.exit(1)
+        print(f"\n  OK: no stage or strategy slower than the baseline by more than {args.tolerance:.0%}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,431 @@
+"""
+Recorded Pipeline Fixtures
+Records option chains, price histories, index history, lot sizes and stock
+metadata for a symbol set into local files (or synthesizes them), and
+provides DataManager, StockProfiler and TechnicalAnalyzer stand-ins that
+replay them with no Supabase or Yahoo Finance access.
+
+Fixture directory layout:
+    fixture.json        symbols, trade date, lot sizes, stock metadata
+    chains.{arrow,pkl}  raw option_chain_data rows per symbol
+    prices.{arrow,pkl}  daily OHLCV per symbol
+    index.{arrow,pkl}   NIFTY daily OHLCV
+"""
+
+import os
+import sys
+import json
+import math
+import socket
+import logging
+import tempfile
+from datetime import date, datetime, timedelta
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from strategy_creation.data_manager import DataManager
+from strategy_creation.stock_profiler import StockProfiler
+from strategy_creation.chain_loader import BulkChainLoader, select_monthly_expiry
+from strategy_creation.chain_cache import ChainSnapshotCache
+from strategy_creation.smile_cache import SmileCalibrationCache
+from strategy_creation.volatility_surface import VolatilitySurface
+from strategy_creation.price_history_store import PriceHistoryStore, PERIOD_OFFSETS
+from analysis.technical_analyzer import TechnicalAnalyzer
+from utils.shared_frames import write_shared_frames, read_shared_frames
+
+logger = logging.getLogger(__name__)
+
+FIXTURE_FILE = 'fixture.json'
+INDEX_TICKER = '^NSEI'
+
+# Weeks either side of today searched for a replay date with the recorded expiry choices
+MAX_SHIFT_SEARCH_WEEKS = 8
+
+# Synthetic fixtures: fixed trade date (replays shift it), monthly expiries, strikes per side
+SYNTHETIC_TRADE_DATE = '2026-09-15'
+SYNTHETIC_EXPIRIES = 3
+SYNTHETIC_STRIKES_PER_SIDE = 12
+SYNTHETIC_HISTORY_DAYS = 260
+RISK_FREE_RATE = 0.07
+
+
+def record_fixtures(output_dir: str, symbols: Optional[List[str]] = None, portfolio_size: int = 25) -> Dict:
+    """
+    Record live pipeline inputs for a symbol set (needs Supabase and Yahoo Finance)
+
+    Args:
+        output_dir: Fixture directory to write
+        symbols: Symbols to record (default: the first portfolio_size portfolio symbols)
+        portfolio_size: Portfolio symbols to record when no symbols are given
+
+    Returns:
+        The fixture.json contents
+    """
+    data_manager = DataManager()
+    if not symbols:
+        symbols = data_manager.get_portfolio_symbols()[:portfolio_size]
+
+    chain_snapshot = BulkChainLoader(data_manager.supabase).load(symbols)
+
+    profiler = StockProfiler(supabase_client=data_manager.supabase)
+    profiler.prefetch_metadata(symbols)
+    profiler.price_store.refresh_all(symbols)
+    prices = profiler.price_store.export_frames(symbols)
+    index_history = profiler.index_cache.get_history(INDEX_TICKER, period='1y')
+
+    os.makedirs(output_dir, exist_ok=True)
+    fixture = {
+        'recorded_at': datetime.now().isoformat(),
+        'trade_date': chain_snapshot['trade_date'],
+        'symbols': list(symbols),
+        'lot_sizes': data_manager.lot_manager.get_all_lot_sizes(symbols),
+        'metadata': profiler.export_prefetched_data()['metadata'],
+        'files': {
+            'chains': os.path.basename(write_shared_frames(chain_snapshot['chains'], output_dir, 'chains')),
+            'prices': os.path.basename(write_shared_frames(prices, output_dir, 'prices')),
+            'index': os.path.basename(write_shared_frames({INDEX_TICKER: index_history}, output_dir, 'index'))
+        }
+    }
+    with open(os.path.join(output_dir, FIXTURE_FILE), 'w') as f:
+        json.dump(fixture, f, indent=2, default=str)
+
+    logger.info(f"Recorded {len(chain_snapshot['chains'])} chains and {len(prices)} price histories "
+                f"for {len(symbols)} symbols into {output_dir}")
+    return fixture
+
+
+def _normal_cdf(x: float) -> float:
+    return 0.5 * (1.0 + math.erf(x / math.sqrt(2.0)))
+
+
+def _monthly_expiries(trade_date: date, count: int) -> List[str]:
+    """Last Thursday of the trade month and the following months, skipping past ones"""
+    expiries = []
+    year, month = trade_date.year, trade_date.month
+    while len(expiries) < count:
+        last_day = (date(year + month // 12, month % 12 + 1, 1) - timedelta(days=1))
+        expiry = last_day - timedelta(days=(last_day.weekday() - 3) % 7)
+        if expiry > trade_date:
+            expiries.append(expiry.isoformat())
+        year, month = year + month // 12, month % 12 + 1
+    return expiries
+
+
+def _synthetic_history(rng: np.random.Generator, days: pd.DatetimeIndex, last_close: float,
+                       daily_vol: float) -> pd.DataFrame:
+    """Random-walk daily OHLCV ending at last_close"""
+    close = np.exp(np.cumsum(rng.normal(0, daily_vol, len(days))))
+    close *= last_close / close[-1]
+    return pd.DataFrame({
+        'Open': close * (1 + rng.normal(0, daily_vol / 4, len(days))),
+        'High': close * (1 + np.abs(rng.normal(0, daily_vol / 2, len(days)))),
+        'Low': close * (1 - np.abs(rng.normal(0, daily_vol / 2, len(days)))),
+        'Close': close,
+        'Volume': rng.integers(100_000, 1_000_000, len(days)).astype(float)
+    }, index=days)
+
+
+def _synthetic_chain(rng: np.random.Generator, symbol: str, spot: float, trade_date: date,
+                     expiries: List[str], first_id: int) -> pd.DataFrame:
+    """option_chain_data rows priced with Black-Scholes on a skewed smile"""
+    step = max(5.0, round(spot * 0.025, -1))
+    atm_strike = round(spot / step) * step
+    atm_iv = rng.uniform(0.18, 0.40)
+    rows = []
+    for expiry in expiries:
+        t = max((date.fromisoformat(expiry) - trade_date).days, 1) / 365
+        for i in range(-SYNTHETIC_STRIKES_PER_SIDE, SYNTHETIC_STRIKES_PER_SIDE + 1):
+            strike = atm_strike + i * step
+            for option_type in ('CALL', 'PUT'):
+                iv = atm_iv + 0.1 * abs(strike / spot - 1) + rng.normal(0, 0.005)
+                d1 = (math.log(spot / strike) + (RISK_FREE_RATE + iv * iv / 2) * t) / (iv * math.sqrt(t))
+                d2 = d1 - iv * math.sqrt(t)
+                discount = strike * math.exp(-RISK_FREE_RATE * t)
+                if option_type == 'CALL':
+                    price = spot * _normal_cdf(d1) - discount * _normal_cdf(d2)
+                    delta = _normal_cdf(d1)
+                else:
+                    price = discount * _normal_cdf(-d2) - spot * _normal_cdf(-d1)
+                    delta = _normal_cdf(d1) - 1
+                price = max(price, 0.05)
+                density = math.exp(-d1 * d1 / 2) / math.sqrt(2 * math.pi)
+                rows.append({
+                    'id': first_id + len(rows),
+                    'symbol': symbol,
+                    'created_at': f"{trade_date.isoformat()}T09:20:00",
+                    'expiry_date': expiry,
+                    'strike_price': strike,
+                    'option_type': option_type,
+                    'open_interest': int(rng.integers(100, 50_000)),
+                    'volume': int(rng.integers(50, 5_000)),
+                    'ltp': round(price, 2),
+                    'bid': round(max(price * 0.99, 0.05), 2),
+                    'ask': round(price * 1.01 + 0.05, 2),
+                    'delta': delta,
+                    'gamma': density / (spot * iv * math.sqrt(t)),
+                    'theta': -spot * density * iv / (2 * math.sqrt(t)) / 365,
+                    'vega': spot * density * math.sqrt(t) / 100,
+                    'implied_volatility': iv * 100,
+                    'underlying_price': spot,
+                    'prev_oi': int(rng.integers(100, 50_000)),
+                    'prev_close': round(price, 2)
+                })
+    return pd.DataFrame(rows)
+
+
+def synthesize_fixtures(output_dir: str, symbol_count: int = 25, seed: int = 7,
+                        trade_date: str = SYNTHETIC_TRADE_DATE) -> Dict:
+    """
+    Write a synthetic fixture directory (no Supabase or Yahoo Finance needed)
+
+    Chains cover three monthly expiries with Black-Scholes prices on a
+    skewed smile; price and index histories are random walks ending at
+    the spot. The same seed always writes the same fixture.
+
+    Args:
+        output_dir: Fixture directory to write
+        symbol_count: Number of synthetic symbols
+        seed: Random seed
+        trade_date: Snapshot date of the chains (replays shift it near today)
+
+    Returns:
+        The fixture.json contents
+    """
+    rng = np.random.default_rng(seed)
+    trade_day = date.fromisoformat(trade_date)
+    expiries = _monthly_expiries(trade_day, SYNTHETIC_EXPIRIES)
+    days = pd.bdate_range(end=trade_day, periods=SYNTHETIC_HISTORY_DAYS)
+    symbols = [f"SYN{i:02d}" for i in range(symbol_count)]
+
+    chains, prices, lot_sizes, metadata = {}, {}, {}, {}
+    next_id = 1
+    for i, symbol in enumerate(symbols):
+        spot = float(round(rng.uniform(200, 3000), 1))
+        chains[symbol] = _synthetic_chain(rng, symbol, spot, trade_day, expiries, next_id)
+        next_id += len(chains[symbol])
+        prices[symbol] = _synthetic_history(rng, days, spot, daily_vol=rng.uniform(0.01, 0.025))
+        lot_sizes[symbol] = int(rng.choice([250, 500, 1000, 1500]))
+        metadata[symbol] = {
+            'sector': f"Sector {i % 5}",
+            'industry': f"Industry {i}",
+            'market_capitalization': float(rng.uniform(1e10, 1e12)),
+            'atm_iv': float(chains[symbol]['implied_volatility'].median())
+        }
+    index_history = _synthetic_history(rng, days, 24000.0, daily_vol=0.01)
+
+    os.makedirs(output_dir, exist_ok=True)
+    fixture = {
+        'recorded_at': f"{trade_date}T09:30:00",
+        'synthetic': {'seed': seed},
+        'trade_date': trade_date,
+        'symbols': symbols,
+        'lot_sizes': lot_sizes,
+        'metadata': metadata,
+        'files': {
+            'chains': os.path.basename(write_shared_frames(chains, output_dir, 'chains')),
+            'prices': os.path.basename(write_shared_frames(prices, output_dir, 'prices')),
+            'index': os.path.basename(write_shared_frames({INDEX_TICKER: index_history}, output_dir, 'index'))
+        }
+    }
+    with open(os.path.join(output_dir, FIXTURE_FILE), 'w') as f:
+        json.dump(fixture, f, indent=2)
+
+    logger.info(f"Synthesized {symbol_count} symbols ({trade_date}, seed {seed}) into {output_dir}")
+    return fixture
+
+
+class PipelineFixtures:
+    """
+    Recorded inputs loaded for replay
+
+    Dates are shifted by whole weeks so the recorded trade date lands as
+    close to today as possible while the 20th rule, applied today, still
+    picks the expiry it picked on the recorded date for every symbol.
+    Weekdays are kept, so expiries stay on their expiry weekday and the
+    histories keep their trading days. The shifted trade date can be up
+    to a few days off today (more when no nearby week keeps the expiry
+    choices), so days to expiry can differ from the recording by as much.
+    """
+
+    def __init__(self, fixture_dir: str, shift_to_today: bool = True):
+        """
+        Load a fixture directory
+
+        Args:
+            fixture_dir: Directory written by record_fixtures
+            shift_to_today: Move all dates so the trade date is near today
+        """
+        self.fixture_dir = fixture_dir
+        with open(os.path.join(fixture_dir, FIXTURE_FILE), 'r') as f:
+            self.manifest = json.load(f)
+
+        self.symbols: List[str] = self.manifest['symbols']
+        self.lot_sizes: Dict[str, int] = self.manifest.get('lot_sizes', {})
+        self.metadata: Dict[str, Dict] = self.manifest.get('metadata', {})
+        self.trade_date: Optional[str] = self.manifest.get('trade_date')
+
+        files = self.manifest['files']
+        self.chains = read_shared_frames(os.path.join(fixture_dir, files['chains']))
+        self.prices = read_shared_frames(os.path.join(fixture_dir, files['prices']))
+        self.index_history = read_shared_frames(os.path.join(fixture_dir, files['index'])).get(INDEX_TICKER)
+
+        self.shift_days = 0
+        if shift_to_today and self.trade_date:
+            self.shift_days = self._replay_shift_days(date.today())
+        if self.shift_days:
+            self._shift_dates(pd.Timedelta(days=self.shift_days))
+
+    @property
+    def name(self) -> str:
+        return os.path.basename(os.path.normpath(self.fixture_dir))
+
+    def _expiry_choices(self, shift_days: int, today: date) -> Dict[str, Optional[int]]:
+        """Position of the 20th-rule expiry per symbol, with expiries shifted and the rule applied on today"""
+        now = datetime.combine(today, datetime.min.time())
+        choices = {}
+        for symbol, chain in self.chains.items():
+            if 'expiry_date' not in chain.columns or chain.empty:
+                choices[symbol] = None
+                continue
+            expiries = sorted((date.fromisoformat(str(e)[:10]) + timedelta(days=shift_days)).isoformat()
+                              for e in chain['expiry_date'].unique())
+            selected = select_monthly_expiry(expiries, now) or expiries[0]
+            choices[symbol] = expiries.index(selected)
+        return choices
+
+    def _replay_shift_days(self, today: date) -> int:
+        """Whole-week shift closest to today that keeps every symbol's recorded expiry choice"""
+        recorded = date.fromisoformat(self.trade_date[:10])
+        recorded_choices = self._expiry_choices(0, recorded)
+
+        weeks = round((today - recorded).days / 7)
+        candidates = range(weeks - MAX_SHIFT_SEARCH_WEEKS, weeks + MAX_SHIFT_SEARCH_WEEKS + 1)
+        for week in sorted(candidates, key=lambda w: abs((recorded + timedelta(weeks=w) - today).days)):
+            if self._expiry_choices(7 * week, today) == recorded_choices:
+                return 7 * week
+
+        logger.warning(f"No shift within {MAX_SHIFT_SEARCH_WEEKS} weeks of today keeps the recorded "
+                       f"expiry choices of fixture {self.name}; shifting by {weeks} weeks")
+        return 7 * weeks
+
+    def _shift_dates(self, offset: pd.Timedelta):
+        for symbol, chain in self.chains.items():
+            chain = chain.copy()
+            if 'expiry_date' in chain.columns:
+                chain['expiry_date'] = (pd.to_datetime(chain['expiry_date']) + offset).dt.strftime('%Y-%m-%d')
+            if 'created_at' in chain.columns:
+                chain['created_at'] = (pd.to_datetime(chain['created_at']) + offset).map(lambda ts: ts.isoformat())
+            self.chains[symbol] = chain
+
+        for symbol, frame in self.prices.items():
+            self.prices[symbol] = frame.set_axis(frame.index + offset)
+        if self.index_history is not None:
+            self.index_history = self.index_history.set_axis(self.index_history.index + offset)
+
+        self.trade_date = (date.fromisoformat(self.trade_date[:10]) + offset).isoformat()
+
+
+class FixtureLotSizeManager:
+    """LotSizeManager stand-in serving recorded lot sizes"""
+
+    def __init__(self, lot_sizes: Dict[str, int], default_lot_size: int = 100):
+        self.lot_sizes = lot_sizes
+        self.default_lot_size = default_lot_size
+
+    def get_current_lot_size(self, symbol: str) -> int:
+        return int(self.lot_sizes.get(symbol, self.default_lot_size))
+
+    def get_all_lot_sizes(self, symbols: list) -> dict:
+        return {symbol: self.get_current_lot_size(symbol) for symbol in symbols}
+
+
+class FixtureDataManager(DataManager):
+    """
+    DataManager serving recorded chains through the bulk-preload path
+
+    Skips the client setup of DataManager.__init__ so no Supabase client is
+    created; symbols without a recorded chain fail the way a missing
+    snapshot does.
+    """
+
+    def __init__(self, fixtures: PipelineFixtures):
+        self.supabase = None
+        self.connection_pool = None
+        # Private smile cache so every replay fits from scratch like a fresh run
+        self._init_state(
+            chain_cache=ChainSnapshotCache(),
+            lot_manager=FixtureLotSizeManager(fixtures.lot_sizes),
+            vol_surface=VolatilitySurface(calibration_cache=SmileCalibrationCache())
+        )
+        self.fixtures = fixtures
+
+    def get_portfolio_symbols(self) -> List[str]:
+        return list(self.fixtures.symbols)
+
+    def preload_options_data(self, symbols: List[str]) -> int:
+        chains = {s: self.fixtures.chains[s] for s in symbols if s in self.fixtures.chains}
+        self.set_preloaded_chains(self.fixtures.trade_date, chains)
+        return len(chains)
+
+    def _fetch_options_data(self, symbol: str, multiple_expiries: bool = False) -> Optional[pd.DataFrame]:
+        if symbol not in self._preloaded_chains:
+            return None
+        return super()._fetch_options_data(symbol, multiple_expiries)
+
+
+class FixtureIndexHistory:
+    """IndexHistoryCache stand-in serving the recorded NIFTY history"""
+
+    def __init__(self, history: Optional[pd.DataFrame]):
+        self.history = history if history is not None else pd.DataFrame()
+
+    def get_history(self, ticker: str = INDEX_TICKER, period: str = '1y') -> pd.DataFrame:
+        if self.history.empty or ticker != INDEX_TICKER:
+            return pd.DataFrame()
+        start = self.history.index[-1] - PERIOD_OFFSETS.get(period, PERIOD_OFFSETS['1y'])
+        return self.history.loc[self.history.index > start]
+
+
+class FixtureStockProfiler(StockProfiler):
+    """StockProfiler reading recorded metadata, price and index histories"""
+
+    def __init__(self, fixtures: PipelineFixtures, price_store: PriceHistoryStore):
+        super().__init__(supabase_client=None)
+        self.price_store = price_store
+        self.index_cache = FixtureIndexHistory(fixtures.index_history)
+        self.import_prefetched_data({'metadata': fixtures.metadata})
+
+
+class FixtureTechnicalAnalyzer(TechnicalAnalyzer):
+    """TechnicalAnalyzer reading daily bars from the fixture price store only"""
+
+    def __init__(self, price_store: PriceHistoryStore):
+        super().__init__()
+        self.price_store = price_store
+
+    def _fetch_price_data(self, symbol: str, period: str, interval: str) -> pd.DataFrame:
+        if interval == '1d' and period in PERIOD_OFFSETS:
+            return self.price_store.get_history(symbol, period)
+        return pd.DataFrame()
+
+
+def build_price_store(fixtures: PipelineFixtures) -> PriceHistoryStore:
+    """Price store holding the recorded histories, backed by an empty temporary directory"""
+    store = PriceHistoryStore(store_dir=tempfile.mkdtemp(prefix='pipeline_fixture_prices_'))
+    store.import_frames(fixtures.prices)
+    return store
+
+
+def disable_network():
+    """Make any socket connection fail immediately, so a missed stand-in shows up as an error"""
+    def refuse(*args, **kwargs):
+        raise OSError("network access disabled for the offline pipeline benchmark")
+
+    socket.socket.connect = refuse
+    socket.socket.connect_ex = refuse
+    socket.create_connection = refuse
+    socket.getaddrinfo = refuse
@@ -0,0 +1,207 @@
+#!/usr/bin/env python3
+"""
+Position Cache Tick Benchmark
+Replays a synthetic tick stream through PositionCacheManager and reports
+per-tick update latency (tick received -> P&L applied) and processing
+time per tick for the incremental path, next to the previous per-tick
+full-recompute path. The incremental path applies a tick at once when no
+flush is pending and coalesces the rest of a feed message into the next
+flush, so compare cpu/tick for throughput.
+
+Usage:
+    python -m benchmarks.position_cache_benchmark --ticks-per-second 10000 --legs 500 --duration 5
+"""
+
+import os
+import sys
+import time
+import json
+import random
+import asyncio
+import argparse
+from typing import Dict, List
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from trade_monitoring.position_book import PositionBook
+from trade_execution.position_cache_manager import PositionCacheManager
+
+IRON_CONDOR = [('BUY', 'PE', -200), ('SELL', 'PE', -100), ('SELL', 'CE', 100), ('BUY', 'CE', 200)]
+
+
+def build_book(legs: int, securities: int, rng: random.Random) -> PositionBook:
+    """Position book of iron condors over a shared pool of securities (no database)"""
+    book = PositionBook(None)
+    trade_id = 0
+    for strategy_id in range(1, legs // len(IRON_CONDOR) + 1):
+        for action, option_type, offset in IRON_CONDOR:
+            trade_id += 1
+            book.apply_change({'eventType': 'INSERT', 'record': {
+                'new_id': trade_id,
+                'strategy_id': strategy_id,
+                'symbol': f'SYM{strategy_id % 50}',
+                'strategy': 'Iron Condor',
+                'security_id': rng.randrange(securities) + 1,
+                'action': action,
+                'type': option_type,
+                'strike_price': 1000 + offset,
+                'quantity': 50,
+                'price': round(rng.uniform(5, 50), 2),
+                'order_id': str(trade_id),
+                'expiry_date': '2025-01-30',
+                'timestamp': f'2025-01-01T09:{strategy_id % 60:02d}:00',
+                'order_status': 'open'
+            }})
+    return book
+
+
+def percentiles(samples: List[float]) -> Dict[str, float]:
+    """p50/p99/max in microseconds"""
+    if not samples:
+        return {'p50_us': 0.0, 'p99_us': 0.0, 'max_us': 0.0}
+    ordered = sorted(samples)
+    pick = lambda q: ordered[min(len(ordered) - 1, int(q * len(ordered)))] * 1e6
+    return {'p50_us': round(pick(0.50), 1), 'p99_us': round(pick(0.99), 1), 'max_us': round(ordered[-1] * 1e6, 1)}
+
+
+def legacy_update_price(manager: PositionCacheManager, security_id: int, price: float):
+    """Previous update_price body: lock per tick, leg scan and full P&L recompute"""
+    timestamp = time.strftime('%Y-%m-%dT%H:%M:%S')
+    affected_positions = manager.get_positions_for_security(security_id)
+    with manager.sync_lock:
+        for position in affected_positions:
+            for leg in position.legs:
+                if leg.security_id == security_id:
+                    leg.current_price = price
+                    leg.last_price_update = timestamp
+            manager._calculate_position_pnl(position)
+            position.last_update = timestamp
+
+
+async def replay(manager: PositionCacheManager, securities: int, ticks_per_second: int,
+                 duration: float, rng: random.Random, incremental: bool, ticks_per_read: int) -> Dict:
+    """
+    Send ticks at the target rate and collect per-tick latencies and processing time
+
+    Ticks are delivered in groups of ticks_per_read (one feed message) with
+    an event-loop yield after each group, like a websocket reader.
+    """
+    latencies: List[float] = []
+    enqueued: List[float] = []
+    busy = [0.0]
+
+    apply_price_updates = manager.apply_price_updates
+
+    def timed_apply(ticks):
+        start = time.perf_counter()
+        try:
+            return apply_price_updates(ticks)
+        finally:
+            done = time.perf_counter()
+            busy[0] += done - start
+            # Every queued tick is applied here, whether or not a cached leg holds its security
+            latencies.extend(done - t for t in enqueued)
+            enqueued.clear()
+
+    manager.apply_price_updates = timed_apply
+    last_price = {sid: 25.0 for sid in range(1, securities + 1)}
+
+    started = time.perf_counter()
+    sent = 0
+    while True:
+        elapsed = time.perf_counter() - started
+        if elapsed >= duration:
+            break
+        due = int(elapsed * ticks_per_second) - sent
+        for i in range(due):
+            security_id = rng.randrange(securities) + 1
+            price = max(0.05, last_price[security_id] + rng.gauss(0, 0.25))
+            last_price[security_id] = price
+            tick_start = time.perf_counter()
+            if incremental:
+                enqueued.append(tick_start)
+                await manager.update_price(security_id, price)
+            else:
+                legacy_update_price(manager, security_id, price)
+                tick_time = time.perf_counter() - tick_start
+                latencies.append(tick_time)
+                busy[0] += tick_time
+            if (sent + i + 1) % ticks_per_read == 0:
+                await asyncio.sleep(0)
+        sent += due
+        await asyncio.sleep(0.001)
+
+    manager.flush_price_updates()
+    manager.apply_price_updates = apply_price_updates
+    wall = time.perf_counter() - started
+
+    return {
+        'ticks': sent,
+        'achieved_tps': round(sent / wall),
+        'cpu_us_per_tick': round(busy[0] / max(1, sent) * 1e6, 2),
+        **percentiles(latencies)
+    }
+
+
+def pnl_drift(manager: PositionCacheManager) -> float:
+    """Largest difference between incrementally updated and fully recomputed P&L"""
+    drift = 0.0
+    for position in manager.get_all_positions():
+        incremental = position.total_pnl
+        manager._calculate_position_pnl(position)
+        drift = max(drift, abs(incremental - position.total_pnl))
+    return drift
+
+
+async def run_benchmark(ticks_per_second: int, legs: int, duration: float, seed: int,
+                        ticks_per_read: int = 8) -> Dict:
+    results = {'config': {'ticks_per_second': ticks_per_second, 'legs': legs,
+                          'duration_seconds': duration, 'seed': seed, 'ticks_per_read': ticks_per_read}}
+
+    for mode, incremental in (('full_recompute', False), ('incremental', True)):
+        rng = random.Random(seed)
+        securities = max(1, legs // 2)
+        manager = PositionCacheManager(position_book=build_book(legs, securities, rng))
+        await manager.sync_from_book()
+
+        results[mode] = await replay(manager, securities, ticks_per_second, duration, rng, incremental, ticks_per_read)
+        if incremental:
+            results[mode]['flushes'] = manager.stats['price_flushes']
+            results[mode]['ticks_coalesced'] = manager.stats['ticks_coalesced']
+            results[mode]['max_pnl_drift'] = pnl_drift(manager)
+        manager.executor.shutdown(wait=False)
+
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark PositionCacheManager tick processing')
+    parser.add_argument('--ticks-per-second', type=int, default=10000, help='Synthetic tick rate')
+    parser.add_argument('--legs', type=int, default=500, help='Open legs in the cache (4 per strategy)')
+    parser.add_argument('--duration', type=float, default=5.0, help='Seconds per mode')
+    parser.add_argument('--ticks-per-read', type=int, default=8, help='Ticks delivered per feed message')
+    parser.add_argument('--seed', type=int, default=7, help='Random seed')
+    parser.add_argument('--output', help='Write results JSON to this file')
+    args = parser.parse_args()
+
+    results = asyncio.run(run_benchmark(args.ticks_per_second, args.legs, args.duration, args.seed,
+                                        args.ticks_per_read))
+
+    print(f"Position cache benchmark: {args.legs} legs, {args.ticks_per_second} ticks/s, {args.duration}s per mode")
+    for mode in ('full_recompute', 'incremental'):
+        r = results[mode]
+        print(f"  {mode:15s} ticks={r['ticks']:>7} tps={r['achieved_tps']:>6} "
+              f"p50={r['p50_us']:>8.1f}us p99={r['p99_us']:>8.1f}us max={r['max_us']:>9.1f}us "
+              f"cpu/tick={r['cpu_us_per_tick']:>6.2f}us")
+    print(f"  incremental: {results['incremental']['flushes']} flushes, "
+          f"{results['incremental']['ticks_coalesced']} ticks coalesced, "
+          f"max P&L drift {results['incremental']['max_pnl_drift']:.2e}")
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+        print(f"Results written to {args.output}")
+
+
+if __name__ == '__main__':
+    main()
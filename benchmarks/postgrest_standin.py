@@ -0,0 +1,197 @@
+"""
+PostgREST Stand-in
+In-memory HTTP server speaking the subset of the PostgREST API that the
+Supabase clients in this repo use: column selection, eq/neq/gt/gte/lt/lte
+and in filters, order, limit, the server-side max-rows cap and inserts
+returning their rows. It serves both /<table> (AsyncSupabasePool base_url)
+and /rest/v1/<table> (supabase-py), and can fail the next requests with a
+status code to exercise retries.
+"""
+
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional
+from urllib.parse import urlparse, parse_qsl
+
+FILTER_OPERATORS = {
+    'eq': lambda a, b: a == b,
+    'neq': lambda a, b: a != b,
+    'gt': lambda a, b: a > b,
+    'gte': lambda a, b: a >= b,
+    'lt': lambda a, b: a < b,
+    'lte': lambda a, b: a <= b,
+}
+
+
+def _coerce(value: str, like):
+    """Filter value as the type of the stored column"""
+    if isinstance(like, bool):
+        return value.lower() == 'true'
+    if isinstance(like, (int, float)):
+        return type(like)(value)
+    return value
+
+
+def _matches(row: Dict, column: str, expression: str) -> bool:
+    operator, _, value = expression.partition('.')
+    stored = row.get(column)
+    if operator == 'in':
+        values = [v.strip().strip('"') for v in value.strip('()').split(',')]
+        return str(stored) in values
+    if stored is None:
+        return False
+    return FILTER_OPERATORS[operator](stored, _coerce(value, stored))
+
+
+class PostgRESTStandIn:
+    """
+    Threaded local PostgREST server over in-memory tables
+
+    Usage:
+        with PostgRESTStandIn({'lots': [...]}) as server:
+            pool = AsyncSupabasePool(base_url=server.base_url)
+            client = create_client(server.url, 'anon-key')
+    """
+
+    def __init__(self, tables: Optional[Dict[str, List[Dict]]] = None, max_rows: int = 1000):
+        """
+        Initialize stand-in
+
+        Args:
+            tables: {table: rows}; rows without an id get one on insert
+            max_rows: Rows returned per request at most (PostgREST db-max-rows)
+        """
+        self.tables = {name: list(rows) for name, rows in (tables or {}).items()}
+        self.max_rows = max_rows
+        self.requests: List[Dict] = []
+        self._failures: List[int] = []
+        self._lock = threading.Lock()
+        self._server: Optional[ThreadingHTTPServer] = None
+
+    @property
+    def url(self) -> str:
+        """Project URL for supabase-py (serves /rest/v1)"""
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    @property
+    def base_url(self) -> str:
+        """PostgREST root for AsyncSupabasePool(base_url=...)"""
+        return f"{self.url}/rest/v1"
+
+    def fail_next(self, status: int, count: int = 1):
+        """Answer the next count requests with an error status"""
+        with self._lock:
+            self._failures.extend([status] * count)
+
+    def start(self) -> 'PostgRESTStandIn':
+        self._server = ThreadingHTTPServer(('127.0.0.1', 0), self._handler())
+        self._server.daemon_threads = True
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self):
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def __enter__(self) -> 'PostgRESTStandIn':
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
+
+    def select(self, table: str, params: List) -> List[Dict]:
+        with self._lock:
+            rows = list(self.tables.get(table, []))
+
+        columns, order, limit = '*', None, None
+        for name, value in params:
+            if name == 'select':
+                columns = value
+            elif name == 'order':
+                order = value
+            elif name == 'limit':
+                limit = int(value)
+            elif name in ('offset', 'on_conflict'):
+                continue
+            else:
+                rows = [row for row in rows if _matches(row, name, value)]
+
+        if order:
+            for clause in reversed(order.split(',')):
+                column, _, direction = clause.partition('.')
+                rows.sort(key=lambda row: (row.get(column) is None, row.get(column)),
+                          reverse=direction.startswith('desc'))
+
+        offset = next((int(value) for name, value in params if name == 'offset'), 0)
+        rows = rows[offset:offset + min(limit or self.max_rows, self.max_rows)]
+        if columns != '*':
+            wanted = [c.strip() for c in columns.split(',')]
+            rows = [{c: row.get(c) for c in wanted} for row in rows]
+        return rows
+
+    def insert(self, table: str, body) -> List[Dict]:
+        inserted = []
+        with self._lock:
+            rows = self.tables.setdefault(table, [])
+            for row in (body if isinstance(body, list) else [body]):
+                row = dict(row)
+                row.setdefault('id', max((r.get('id', 0) for r in rows), default=0) + 1)
+                rows.append(row)
+                inserted.append(row)
+        return inserted
+
+    def _next_failure(self) -> Optional[int]:
+        with self._lock:
+            return self._failures.pop(0) if self._failures else None
+
+    def _handler(self):
+        standin = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def log_message(self, *args):
+                pass
+
+            def _table(self):
+                parsed = urlparse(self.path)
+                return parsed.path.rstrip('/').rsplit('/', 1)[-1], parse_qsl(parsed.query)
+
+            def _send(self, body, status: int = 200):
+                payload = json.dumps(body).encode()
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def _fail(self) -> bool:
+                status = standin._next_failure()
+                if status is not None:
+                    self._send({'message': 'stand-in failure'}, status)
+                return status is not None
+
+            def do_GET(self):
+                table, params = self._table()
+                with standin._lock:
+                    standin.requests.append({'method': 'GET', 'table': table, 'params': params,
+                                             'client': self.headers.get('X-Client-Info', '')})
+                if self._fail():
+                    return
+                self._send(standin.select(table, params))
+
+            def do_POST(self):
+                table, params = self._table()
+                body = json.loads(self.rfile.read(int(self.headers.get('Content-Length', 0))) or b'[]')
+                with standin._lock:
+                    standin.requests.append({'method': 'POST', 'table': table, 'params': params,
+                                             'client': self.headers.get('X-Client-Info', '')})
+                if self._fail():
+                    return
+                self._send(standin.insert(table, body), 201)
+
+        return Handler
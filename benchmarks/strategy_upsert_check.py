@@ -0,0 +1,221 @@
+#!/usr/bin/env python3
+"""
+Strategy Upsert Migration Check
+Applies database/strategy_upsert_migration.sql to a scratch schema of a
+local PostgreSQL database and fails unless upsert_strategies inserts new
+natural keys once and returns the same ids with inserted = false when
+they are upserted again, for TIMESTAMP and TIMESTAMPTZ generated_on
+columns alike. The scratch schema is dropped afterwards.
+
+Needs psycopg2 and a DSN, e.g.:
+    STRATEGY_UPSERT_CHECK_DSN=postgresql://postgres@127.0.0.1:5432/postgres \\
+        python -m benchmarks.strategy_upsert_check
+"""
+
+import os
+import sys
+import json
+import time
+import logging
+import argparse
+from typing import Callable, Dict, List, Tuple
+
+try:
+    import psycopg2
+    PSYCOPG2_AVAILABLE = True
+except ImportError:
+    PSYCOPG2_AVAILABLE = False
+
+MIGRATION_FILE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                              'database', 'strategy_upsert_migration.sql')
+DSN_ENV = 'STRATEGY_UPSERT_CHECK_DSN'
+COLUMN_TYPES = ('TIMESTAMP', 'TIMESTAMPTZ')
+
+# Enough of the Supabase strategies table for the migration and the writer's rows
+BASE_TABLE = """
+CREATE TABLE strategies (
+    id BIGSERIAL PRIMARY KEY,
+    stock_name TEXT NOT NULL,
+    strategy_name TEXT NOT NULL,
+    generated_on {column_type} NOT NULL,
+    total_score DECIMAL(10,4),
+    spot_price DECIMAL(10,2),
+    component_scores JSON
+)
+"""
+
+
+def _row(stock: str, strategy: str, generated_on: str, score: float = 0.5) -> Dict:
+    return {'stock_name': stock, 'strategy_name': strategy, 'generated_on': generated_on,
+            'total_score': score, 'spot_price': 1500.0, 'component_scores': {'probability': score}}
+
+
+def upsert(cursor, rows: List[Dict]) -> Dict[Tuple[str, str], Tuple[int, bool]]:
+    """{(stock_name, strategy_name): (id, inserted)} returned by upsert_strategies"""
+    cursor.execute("SELECT id, stock_name, strategy_name, inserted FROM upsert_strategies(%s::jsonb)",
+                   (json.dumps(rows),))
+    return {(stock, strategy): (row_id, inserted) for row_id, stock, strategy, inserted in cursor.fetchall()}
+
+
+def count_rows(cursor) -> int:
+    cursor.execute("SELECT COUNT(*) FROM strategies")
+    return cursor.fetchone()[0]
+
+
+def check_repeat_upsert(cursor) -> List[str]:
+    """A second call with the same keys returns the same ids, inserted = false, and writes nothing"""
+    failures = []
+    first_rows = [_row('RELIANCE', 'Iron Condor', '2026-10-15T10:00:00'),
+                  _row('RELIANCE', 'Bull Put Spread', '2026-10-15T10:00:00'),
+                  _row('TCS', 'Iron Condor', '2026-10-15T10:00:00')]
+    first = upsert(cursor, first_rows)
+    if len(first) != 3 or not all(inserted for _, inserted in first.values()):
+        failures.append(f"first call: {first}")
+    if len({row_id for row_id, _ in first.values()}) != 3:
+        failures.append(f"first call ids not distinct: {first}")
+
+    # Same keys later the same day, with different values
+    second = upsert(cursor, [_row(r['stock_name'], r['strategy_name'], '2026-10-15T15:00:00', 0.9)
+                             for r in first_rows])
+    for key, (row_id, _) in first.items():
+        if second.get(key) != (row_id, False):
+            failures.append(f"second call {key}: {second.get(key)}, expected ({row_id}, False)")
+    if count_rows(cursor) != 3:
+        failures.append(f"second call wrote rows: {count_rows(cursor)} stored")
+
+    cursor.execute("SELECT DISTINCT total_score FROM strategies")
+    scores = [float(score) for (score,) in cursor.fetchall()]
+    if scores != [0.5]:
+        failures.append(f"existing rows were rewritten: total_score {scores}")
+    return failures
+
+
+def check_mixed_batch(cursor) -> List[str]:
+    """Existing and new keys in one call: only the new ones are inserted"""
+    failures = []
+    existing = upsert(cursor, [_row('INFY', 'Iron Condor', '2026-10-15T10:00:00')])
+    mixed = upsert(cursor, [_row('INFY', 'Iron Condor', '2026-10-15T11:00:00'),
+                            _row('INFY', 'Short Strangle', '2026-10-15T11:00:00')])
+
+    if mixed.get(('INFY', 'Iron Condor')) != (existing[('INFY', 'Iron Condor')][0], False):
+        failures.append(f"existing key in a mixed batch: {mixed.get(('INFY', 'Iron Condor'))}")
+    new = mixed.get(('INFY', 'Short Strangle'))
+    if new is None or not new[1]:
+        failures.append(f"new key in a mixed batch: {new}")
+    if count_rows(cursor) != 2:
+        failures.append(f"{count_rows(cursor)} rows stored, expected 2")
+    return failures
+
+
+def check_next_day(cursor) -> List[str]:
+    """The same strategy on the next day is a new natural key"""
+    today = upsert(cursor, [_row('HDFCBANK', 'Iron Condor', '2026-10-15T10:00:00')])
+    tomorrow = upsert(cursor, [_row('HDFCBANK', 'Iron Condor', '2026-10-16T10:00:00')])
+    row_id, inserted = tomorrow.get(('HDFCBANK', 'Iron Condor'), (None, False))
+    if not inserted or row_id == today[('HDFCBANK', 'Iron Condor')][0]:
+        return [f"next day upsert returned ({row_id}, {inserted})"]
+    return []
+
+
+def check_empty_and_rerun(cursor) -> List[str]:
+    """An empty array returns nothing and the migration can be applied again"""
+    failures = []
+    upsert(cursor, [_row('SBIN', 'Iron Condor', '2026-10-15T10:00:00')])
+    if upsert(cursor, []):
+        failures.append("empty array returned rows")
+    try:
+        apply_migration(cursor)
+    except psycopg2.Error as e:
+        failures.append(f"second migration run failed: {e}")
+    if upsert(cursor, [_row('SBIN', 'Iron Condor', '2026-10-15T12:00:00')]).get(('SBIN', 'Iron Condor'), (0, True))[1]:
+        failures.append("key inserted again after re-running the migration")
+    return failures
+
+
+def check_duplicates_refused(cursor) -> List[str]:
+    """Existing same-day duplicates stop the migration before the unique index is built"""
+    cursor.execute("DROP FUNCTION upsert_strategies(JSONB)")
+    cursor.execute("DROP INDEX uq_strategies_natural_key")
+    cursor.execute("INSERT INTO strategies (stock_name, strategy_name, generated_on) VALUES "
+                   "('ITC', 'Iron Condor', '2026-10-15T10:00:00'), ('ITC', 'Iron Condor', '2026-10-15T14:00:00')")
+    try:
+        apply_migration(cursor)
+    except psycopg2.Error as e:
+        if 'duplicated' in str(e):
+            return []
+        return [f"migration failed with an unexpected error: {e}"]
+    return ["migration applied over same-day duplicates"]
+
+
+CHECKS: List[Tuple[str, Callable]] = [
+    ('repeat upsert', check_repeat_upsert),
+    ('mixed batch', check_mixed_batch),
+    ('next day', check_next_day),
+    ('empty array, re-run', check_empty_and_rerun),
+    ('duplicates refused', check_duplicates_refused),
+]
+
+
+def apply_migration(cursor):
+    with open(MIGRATION_FILE, 'r') as f:
+        cursor.execute(f.read())
+
+
+def run_check(connection, check: Callable, column_type: str) -> List[str]:
+    """Run one check in a fresh scratch schema holding the migrated strategies table"""
+    schema = f"upsert_check_{os.getpid()}"
+    with connection.cursor() as cursor:
+        cursor.execute(f"DROP SCHEMA IF EXISTS {schema} CASCADE")
+        cursor.execute(f"CREATE SCHEMA {schema}")
+        cursor.execute(f"SET search_path TO {schema}")
+        try:
+            cursor.execute(BASE_TABLE.format(column_type=column_type))
+            apply_migration(cursor)
+            return check(cursor)
+        finally:
+            cursor.execute("SET search_path TO DEFAULT")
+            cursor.execute(f"DROP SCHEMA {schema} CASCADE")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Strategy upsert migration check against a local PostgreSQL')
+    parser.add_argument('--dsn', default=os.getenv(DSN_ENV), help=f'PostgreSQL DSN (default: ${DSN_ENV})')
+    args = parser.parse_args()
+
+    logging.disable(logging.CRITICAL)
+    if not PSYCOPG2_AVAILABLE:
+        print("  psycopg2 is not installed (pip install psycopg2-binary)")
+        sys.exit(2)
+    if not args.dsn:
+        print(f"  No database: pass --dsn or set {DSN_ENV}")
+        sys.exit(2)
+
+    connection = psycopg2.connect(args.dsn)
+    connection.autocommit = True
+
+    failed = 0
+    try:
+        for column_type in COLUMN_TYPES:
+            for name, check in CHECKS:
+                started = time.monotonic()
+                try:
+                    failures = run_check(connection, check, column_type)
+                except psycopg2.Error as e:
+                    failures = [f"{type(e).__name__}: {e}".strip()]
+                label = f"{name} ({column_type.lower()})"
+                print(f"  {label:<34s} {'FAILED' if failures else 'ok':<7s} {time.monotonic() - started:>6.2f}s")
+                for failure in failures:
+                    print(f"    {failure}")
+                failed += bool(failures)
+    finally:
+        connection.close()
+
+    total = len(CHECKS) * len(COLUMN_TYPES)
+    if failed:
+        print(f"\n  FAILED: {failed}/{total} checks")
+        sys.exit(1)
+    print(f"\n  OK: all {total} strategy upsert checks passed")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+Volatility Surface Parity Check
+Calibrates smiles on randomised chains whose spot is an int, a float or a
+numpy scalar, then compares VolatilitySurface.smile_adjusted_iv_array
+against calculate_smile_adjusted_iv strike by strike. Fails on any
+difference, including a calibrated smile that only one path finds.
+
+Usage:
+    python -m benchmarks.volatility_surface_parity --chains 50
+"""
+
+import os
+import sys
+import random
+import logging
+import argparse
+from typing import List, Tuple
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from strategy_creation.smile_cache import SmileCalibrationCache
+from strategy_creation.volatility_surface import VolatilitySurface
+
+TOLERANCE = 1e-9
+SPOT_TYPES = {
+    'int': int,
+    'float': float,
+    'numpy_int': np.int64,
+    'numpy_float': np.float64
+}
+
+
+def random_chain(rng: random.Random, spot, expiry: str) -> pd.DataFrame:
+    """Liquid chain with a skewed smile around an ATM strike"""
+    step = max(1, int(float(spot) * 0.025))
+    atm_iv = rng.uniform(15, 45)
+    rows = []
+    for i in range(-8, 9):
+        strike = int(float(spot)) + i * step
+        moneyness = strike / float(spot)
+        for option_type in ('CALL', 'PUT'):
+            skew = 0.6 if option_type == 'PUT' and moneyness < 1 else 0.3
+            rows.append({
+                'strike': strike,
+                'option_type': option_type,
+                'iv': atm_iv * (1 + skew * (moneyness - 1) ** 2 * 10) + rng.uniform(-0.5, 0.5),
+                'open_interest': rng.randint(500, 20000),
+                'spot_price': spot,
+                'expiry': expiry
+            })
+    return pd.DataFrame(rows)
+
+
+def check_chain(rng: random.Random, spot_type: str) -> Tuple[int, int, List[str]]:
+    """
+    Calibrate one chain and compare both smile paths on it
+
+    Returns:
+        Strikes compared, strikes on a calibrated smile, mismatch descriptions
+    """
+    surface = VolatilitySurface(calibration_cache=SmileCalibrationCache())
+    spot = SPOT_TYPES[spot_type](rng.randint(200, 5000))
+    expiry = f"2026-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}"
+    chain = random_chain(rng, spot, expiry)
+
+    params = surface.fit_smile_from_options_chain(chain)
+    if not params:
+        return 0, 0, [f"{spot_type} spot {spot}: calibration failed"]
+
+    # Look the chain up again with the spot as the pipeline passes it to each path
+    vectorized = surface.smile_adjusted_iv_array(
+        chain['strike'].to_numpy(), spot, chain['option_type'].to_numpy(), chain['iv'].to_numpy(), expiry
+    )
+    defaults = surface.smile_adjusted_iv_array(
+        chain['strike'].to_numpy(), spot, chain['option_type'].to_numpy(), chain['iv'].to_numpy(), expiry,
+        use_market_calibration=False
+    )
+
+    mismatches = []
+    calibrated = 0
+    for i, row in enumerate(chain.itertuples(index=False)):
+        scalar = surface.calculate_smile_adjusted_iv(row.strike, spot, expiry, row.option_type, row.iv)
+        if abs(scalar - vectorized[i]) > TOLERANCE:
+            mismatches.append(f"{spot_type} spot {spot} {expiry} {row.strike} {row.option_type}: "
+                              f"scalar {scalar:.4f} vs vectorized {vectorized[i]:.4f}")
+        if abs(vectorized[i] - defaults[i]) > TOLERANCE:
+            calibrated += 1
+
+    if calibrated == 0:
+        mismatches.append(f"{spot_type} spot {spot}: vectorized path ignored the calibrated smile")
+    return len(chain), calibrated, mismatches
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Scalar vs vectorized smile-adjusted IV parity check')
+    parser.add_argument('--chains', type=int, default=20, help='Chains per spot type')
+    parser.add_argument('--seed', type=int, default=7, help='Random seed')
+    args = parser.parse_args()
+
+    logging.disable(logging.CRITICAL)
+    rng = random.Random(args.seed)
+
+    failures = []
+    for spot_type in SPOT_TYPES:
+        compared = calibrated = 0
+        for _ in range(args.chains):
+            strikes, on_smile, mismatches = check_chain(rng, spot_type)
+            compared += strikes
+            calibrated += on_smile
+            failures.extend(mismatches)
+        print(f"  {spot_type:<12s} {compared:>6d} strikes compared, {calibrated:>6d} on a calibrated smile")
+
+    if failures:
+        print(f"\n  FAILED: {len(failures)} mismatches")
+        for failure in failures[:20]:
+            print(f"    {failure}")
+        sys.exit(1)
+    print("\n  OK: scalar and vectorized smile-adjusted IVs match")
+
+
+if __name__ == '__main__':
+    main()
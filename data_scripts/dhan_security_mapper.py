@@ -19,6 +19,7 @@ sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 load_dotenv('/Users/jaykrish/Documents/digitalocean/.env')
 
 from database import SupabaseIntegration
+from utils.scrip_master_index import get_scrip_master_index
 
 # Set up logging
 logging.basicConfig(
@@ -77,6 +78,15 @@ class DhanSecurityMapper:
             return self.security_cache[cache_key]
         
         try:
+            # Shared scrip master index (snapshot / api_scrip_master), exact strike only
+            index = get_scrip_master_index(self.db.client)
+            if index is not None:
+                security_id, lot_size = index.lookup(symbol, expiry_date, option_type, strike_price, nearest=False)
+                if security_id is not None:
+                    self.security_cache[cache_key] = (security_id, lot_size)
+                    logger.info(f"Found security ID {security_id} for {symbol} {strike_price} {option_type}")
+                    return security_id, lot_size
+            
             # Download fresh scrip master if not already done
             if not hasattr(self, 'fno_scrips') or self.fno_scrips.empty:
                 self.fno_scrips = self.download_scrip_master()
@@ -1,5 +1,7 @@
 """Database integration module for Options V4"""
 
 from .supabase_integration import SupabaseIntegration
+from .result_writer import ResultWriter
+from .write_journal import WriteJournal
 
-__all__ = ['SupabaseIntegration']
\ No newline at end of file
+__all__ = ['SupabaseIntegration', 'ResultWriter', 'WriteJournal']
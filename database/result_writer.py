@@ -0,0 +1,160 @@
+"""
+Pipelined result writer for Options V4 analysis results
+
+Analysis threads hand finished symbols to a queue and move on; a single
+writer thread owns the SupabaseIntegration batch buffers and flushes all
+tables in large multi-row inserts on size or time thresholds.
+"""
+
+import time
+import queue
+import logging
+import threading
+from typing import Dict, List, Optional, Any
+
+from .supabase_integration import SupabaseIntegration
+
+
+class ResultWriter:
+    """
+    Background writer stage between the symbol pipeline and Supabase
+
+    Usage:
+        writer = ResultWriter(db_integration, symbols=symbols)
+        writer.start()
+        writer.submit(symbol, result)   # never blocks on the database
+        stats = writer.close()          # flushes and waits for the writer
+    """
+
+    _STOP = object()
+
+    def __init__(self, integration: SupabaseIntegration, symbols: Optional[List[str]] = None,
+                 max_batch_symbols: int = 25, flush_interval: float = 5.0,
+                 insert_batch_size: int = 500, logger: Optional[logging.Logger] = None,
+                 preload_context: bool = True):
+        """
+        Initialize result writer
+
+        Args:
+            integration: Supabase integration that prepares and inserts records
+            symbols: Run symbols, used to preload the sector map
+            max_batch_symbols: Flush after this many queued symbols
+            flush_interval: Flush at least this often (seconds) while results arrive
+            insert_batch_size: Rows per multi-row INSERT
+            logger: Optional logger instance
+            preload_context: Load the write context on the writer thread (False if the caller did)
+        """
+        self.integration = integration
+        self.symbols = symbols
+        self.max_batch_symbols = max_batch_symbols
+        self.flush_interval = flush_interval
+        self.insert_batch_size = insert_batch_size
+        self.logger = logger or integration.logger
+        self.preload_context = preload_context
+
+        self._queue: "queue.Queue" = queue.Queue()
+        self._thread: Optional[threading.Thread] = None
+
+        self.stats = {
+            'symbols_submitted': 0,
+            'symbols_written': 0,
+            'strategies_stored': 0,
+            'flushes': 0,
+            'errors': []
+        }
+
+    def start(self) -> 'ResultWriter':
+        """Start the writer thread"""
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name='ResultWriter', daemon=True)
+            self._thread.start()
+        return self
+
+    def submit(self, symbol: str, result: Dict) -> None:
+        """
+        Queue a symbol result for storage (returns immediately)
+
+        Args:
+            symbol: Stock symbol
+            result: Result from OptionsAnalyzer.analyze_symbol
+        """
+        if not result.get('success', False):
+            return
+        self.stats['symbols_submitted'] += 1
+        self._queue.put((symbol, result))
+
+    def close(self, timeout: Optional[float] = None) -> Dict[str, Any]:
+        """
+        Flush remaining results and stop the writer thread
+
+        Args:
+            timeout: Seconds to wait for the final flush (None waits indefinitely)
+
+        Returns:
+            Writer statistics
+        """
+        if self._thread is not None:
+            self._queue.put(self._STOP)
+            self._thread.join(timeout)
+            self._thread = None
+        return self.stats
+
+    def _run(self):
+        """Writer loop: gather results, flush on size/time thresholds"""
+        if self.preload_context:
+            try:
+                self.integration.preload_write_context(self.symbols)
+            except Exception as e:
+                self.logger.warning(f"Result writer could not preload write context: {e}")
+
+        pending: Dict[str, Dict] = {}
+        deadline = None
+        stopping = False
+
+        while not stopping:
+            timeout = None if deadline is None else max(0.0, deadline - time.monotonic())
+            try:
+                item = self._queue.get(timeout=timeout)
+                if item is self._STOP:
+                    stopping = True
+                else:
+                    symbol, result = item
+                    pending[symbol] = result
+                    if deadline is None:
+                        deadline = time.monotonic() + self.flush_interval
+            except queue.Empty:
+                pass
+
+            if pending and (stopping or len(pending) >= self.max_batch_symbols
+                            or time.monotonic() >= deadline):
+                self._flush(pending)
+                pending = {}
+                deadline = None
+
+    def _flush(self, pending: Dict[str, Dict]):
+        """Store a group of symbol results in one collect-and-insert pass"""
+        batch_size = self.integration.batch_size
+        try:
+            self.integration.batch_size = self.insert_batch_size
+            db_result = self.integration.store_analysis_results({
+                'success': True,
+                'symbol_results': pending,
+                'total_symbols': len(pending),
+                'successful_analyses': len(pending)
+            })
+
+            self.stats['flushes'] += 1
+            self.stats['symbols_written'] += len(pending)
+            self.stats['strategies_stored'] += db_result.get('total_stored', 0)
+            for error in db_result.get('errors', []) + ([db_result['error']] if 'error' in db_result else []):
+                self.stats['errors'].append(error)
+                self.logger.warning(f"Database storage issue: {error}")
+
+            self.logger.info(f"Result writer flushed {len(pending)} symbols "
+                             f"({db_result.get('total_stored', 0)} strategies)")
+
+        except Exception as e:
+            self.stats['errors'].append(str(e))
+            self.logger.error(f"Result writer flush failed for {list(pending)}: {e}")
+        finally:
+            self.integration.batch_size = batch_size
@@ -0,0 +1,133 @@
+-- =====================================================
+-- Options V4 Strategy Upsert Migration for PostgreSQL
+-- =====================================================
+-- Adds a natural key on strategies (stock_name, strategy_name,
+-- generation date) and an upsert function that returns ids for
+-- both new and existing rows, so the writer no longer runs a
+-- SELECT per strategy before inserting.
+-- Used when STRATEGY_DEDUP_MODE=upsert
+-- Compatible with PostgreSQL/Supabase
+-- =====================================================
+
+-- =====================================================
+-- PART 1: GENERATION DATE COLUMN
+-- =====================================================
+
+-- generated_on::date is only immutable for TIMESTAMP columns, so
+-- TIMESTAMPTZ columns are pinned to UTC first
+DO $$
+DECLARE
+    v_type TEXT;
+BEGIN
+    SELECT data_type INTO v_type
+    FROM information_schema.columns
+    WHERE table_schema = current_schema()
+      AND table_name = 'strategies'
+      AND column_name = 'generated_on';
+
+    IF NOT EXISTS (
+        SELECT 1 FROM information_schema.columns
+        WHERE table_schema = current_schema()
+          AND table_name = 'strategies'
+          AND column_name = 'generated_date'
+    ) THEN
+        IF v_type = 'timestamp with time zone' THEN
+            EXECUTE 'ALTER TABLE strategies ADD COLUMN generated_date DATE
+                     GENERATED ALWAYS AS ((generated_on AT TIME ZONE ''UTC'')::date) STORED';
+        ELSE
+            EXECUTE 'ALTER TABLE strategies ADD COLUMN generated_date DATE
+                     GENERATED ALWAYS AS (generated_on::date) STORED';
+        END IF;
+    END IF;
+END;
+$$;
+
+COMMENT ON COLUMN strategies.generated_date IS 'Generation day of the strategy (natural key part)';
+
+-- =====================================================
+-- PART 2: NATURAL KEY
+-- =====================================================
+
+-- Existing same-day duplicates must be resolved before the unique
+-- index can be built; list them with:
+--   SELECT stock_name, strategy_name, generated_date, COUNT(*)
+--   FROM strategies GROUP BY 1, 2, 3 HAVING COUNT(*) > 1;
+DO $$
+DECLARE
+    v_duplicates INTEGER;
+BEGIN
+    SELECT COUNT(*) INTO v_duplicates FROM (
+        SELECT 1 FROM strategies
+        GROUP BY stock_name, strategy_name, generated_date
+        HAVING COUNT(*) > 1
+    ) d;
+
+    IF v_duplicates > 0 THEN
+        RAISE EXCEPTION 'strategies has % duplicated (stock_name, strategy_name, generated_date) keys', v_duplicates;
+    END IF;
+END;
+$$;
+
+CREATE UNIQUE INDEX IF NOT EXISTS uq_strategies_natural_key
+    ON strategies(stock_name, strategy_name, generated_date);
+
+-- =====================================================
+-- PART 3: UPSERT FUNCTION
+-- =====================================================
+
+-- Inserts a JSON array of strategy rows in one statement. Rows whose
+-- natural key already exists are left unchanged but still returned,
+-- with inserted = FALSE. Input keys must be strategies columns and
+-- each key may appear only once per call.
+CREATE OR REPLACE FUNCTION upsert_strategies(p_rows JSONB)
+RETURNS TABLE (
+    id BIGINT,
+    stock_name TEXT,
+    strategy_name TEXT,
+    inserted BOOLEAN
+)
+LANGUAGE plpgsql
+AS $$
+DECLARE
+    v_columns TEXT;
+BEGIN
+    IF p_rows IS NULL OR jsonb_array_length(p_rows) = 0 THEN
+        RETURN;
+    END IF;
+
+    SELECT string_agg(quote_ident(c.column_name), ', ' ORDER BY c.ordinal_position)
+    INTO v_columns
+    FROM information_schema.columns c
+    WHERE c.table_schema = current_schema()
+      AND c.table_name = 'strategies'
+      AND c.is_generated = 'NEVER'
+      AND c.column_name IN (SELECT jsonb_object_keys(p_rows -> 0));
+
+    -- The no-op DO UPDATE makes RETURNING include existing rows;
+    -- xmax = 0 only for freshly inserted tuples
+    RETURN QUERY EXECUTE format(
+        'INSERT INTO strategies AS s (%1$s)
+         SELECT %1$s FROM jsonb_populate_recordset(NULL::strategies, $1)
+         ON CONFLICT (stock_name, strategy_name, generated_date)
+         DO UPDATE SET stock_name = EXCLUDED.stock_name
+         RETURNING s.id::BIGINT, s.stock_name::TEXT, s.strategy_name::TEXT, (s.xmax = 0)',
+        v_columns
+    ) USING p_rows;
+END;
+$$;
+
+COMMENT ON FUNCTION upsert_strategies(JSONB) IS 'Batch insert strategies, returning ids for new and existing rows';
+
+-- =====================================================
+-- PART 4: LOCAL VERIFICATION
+-- =====================================================
+
+-- benchmarks/strategy_upsert_check.py applies this file to a scratch
+-- schema of a local Postgres and checks that a second call returns the
+-- same ids with inserted = FALSE:
+--   STRATEGY_UPSERT_CHECK_DSN=postgresql://postgres@127.0.0.1:5432/postgres \
+--       python -m benchmarks.strategy_upsert_check
+
+-- =====================================================
+-- END OF STRATEGY UPSERT MIGRATION
+-- =====================================================
@@ -11,7 +11,8 @@ This module handles:
 import os
 import json
 from datetime import datetime
-from typing import Dict, List, Optional, Any
+from threading import Lock
+from typing import Dict, List, Optional, Any, Tuple
 from decimal import Decimal
 import logging
 import numpy as np
@@ -27,18 +28,34 @@ except ImportError:
 from dotenv import load_dotenv
 load_dotenv()
 
+from .write_journal import WriteJournal
+
 class SupabaseIntegration:
     """Handles integration between Options V4 output and Supabase database"""
     
-    def __init__(self, logger: Optional[logging.Logger] = None, batch_size: int = 50):
+    def __init__(self, logger: Optional[logging.Logger] = None, batch_size: int = 50,
+                 dedup_mode: Optional[str] = None):
         """
         Initialize Supabase client and setup logging
         
         Args:
             logger: Optional logger instance
             batch_size: Number of records to insert per batch (default: 50)
+            dedup_mode: 'select' (check before insert) or 'upsert' (upsert_strategies RPC,
+                        needs strategy_upsert_migration.sql); default STRATEGY_DEDUP_MODE or 'select'
         """
         self.logger = logger or self._setup_default_logger()
+        self.dedup_mode = (dedup_mode or os.getenv('STRATEGY_DEDUP_MODE', 'select')).lower()
+        
+        # Serializes writers sharing this instance's batch buffers
+        self._write_lock = Lock()
+        
+        # Run-level lookups loaded by preload_write_context (None = query per strategy)
+        self._existing_strategies: Optional[Dict[Tuple[str, str], int]] = None
+        self._sector_map: Optional[Dict[str, Dict]] = None
+        
+        # Strategies already written this run; later passes skip them
+        self.write_journal = WriteJournal()
         
         if not SUPABASE_AVAILABLE:
             self.logger.error("Supabase package not available")
@@ -143,17 +160,28 @@ class SupabaseIntegration:
         """
         Store complete analysis results in Supabase using batch operations
         
+        Strategies recorded in the write journal (already written earlier in
+        the run) are not collected again, so storing the same results twice
+        only writes what the first pass missed.
+        
         Args:
             analysis_results: Complete output from OptionsAnalyzer
             
         Returns:
-            Dictionary with success status and stored strategy IDs
+            Dictionary with success status, stored strategy IDs and the number
+            of strategies already stored earlier in the run
         """
         if not self.client:
             return {'success': False, 'error': 'Supabase client not initialized'}
-            
+        
+        with self._write_lock:
+            return self._store_analysis_results(analysis_results)
+    
+    def _store_analysis_results(self, analysis_results: Dict) -> Dict[str, Any]:
+        """Collect and insert results (caller holds the write lock)"""
         stored_strategies = {}
         errors = []
+        already_stored = 0
         
         try:
             # Clear batch data
@@ -168,6 +196,7 @@ class SupabaseIntegration:
                     result = self._collect_symbol_data(symbol, symbol_data)
                     if result['success']:
                         stored_strategies[symbol] = result['strategy_ids']
+                        already_stored += result['already_stored']
                     else:
                         errors.append(f"{symbol}: {result['error']}")
             
@@ -177,6 +206,7 @@ class SupabaseIntegration:
                 result = self._collect_symbol_data(symbol, analysis_results)
                 if result['success']:
                     stored_strategies[symbol] = result['strategy_ids']
+                    already_stored += result['already_stored']
                 else:
                     errors.append(f"{symbol}: {result['error']}")
             
@@ -189,7 +219,8 @@ class SupabaseIntegration:
                 'success': len(stored_strategies) > 0,
                 'stored_strategies': stored_strategies,
                 'errors': errors,
-                'total_stored': sum(len(ids) for ids in stored_strategies.values())
+                'total_stored': sum(len(ids) for ids in stored_strategies.values()),
+                'already_stored': already_stored
             }
             
         except Exception as e:
@@ -199,6 +230,7 @@ class SupabaseIntegration:
     def _collect_symbol_data(self, symbol: str, symbol_data: Dict) -> Dict[str, Any]:
         """Collect analysis data for a single symbol for batch processing"""
         strategy_ids = []
+        already_stored = 0
         
         try:
             # Extract common data
@@ -208,6 +240,10 @@ class SupabaseIntegration:
             
             # Collect each recommended strategy
             for strategy_rank in symbol_data.get('top_strategies', []):
+                if self.write_journal.get(symbol, strategy_rank.get('name')) is not None:
+                    already_stored += 1
+                    continue
+                
                 strategy_id = self._collect_single_strategy(
                     symbol, 
                     strategy_rank, 
@@ -220,13 +256,127 @@ class SupabaseIntegration:
             
             return {
                 'success': True,
-                'strategy_ids': strategy_ids
+                'strategy_ids': strategy_ids,
+                'already_stored': already_stored
             }
             
         except Exception as e:
             self.logger.error(f"Error collecting symbol {symbol}: {e}")
             return {'success': False, 'error': str(e)}
     
+    def preload_write_context(self, symbols: Optional[List[str]] = None) -> None:
+        """
+        Load today's existing strategies and the sector map in bulk
+        
+        After this, duplicate checks and sector lookups are dictionary hits
+        instead of two SELECTs per strategy.
+        
+        Args:
+            symbols: Symbols whose sectors are needed (None loads all)
+        """
+        if not self.client:
+            return
+        
+        today = datetime.now().date().isoformat()
+        page_size = 1000
+        
+        # In upsert mode the upsert_strategies RPC resolves duplicates on the server
+        if self.dedup_mode != 'upsert':
+            self._existing_strategies = self._load_todays_strategies(today, page_size)
+        
+        try:
+            sector_map = {}
+            if symbols:
+                for i in range(0, len(symbols), 100):
+                    response = self.client.table('stock_data').select('symbol,sector,industry').in_(
+                        'symbol', symbols[i:i + 100]
+                    ).execute()
+                    for row in response.data or []:
+                        sector_map[row['symbol']] = row
+            else:
+                offset = 0
+                while True:
+                    response = self.client.table('stock_data').select('symbol,sector,industry')\
+                        .range(offset, offset + page_size - 1).execute()
+                    rows = response.data or []
+                    for row in rows:
+                        sector_map[row['symbol']] = row
+                    if len(rows) < page_size:
+                        break
+                    offset += page_size
+            self._sector_map = sector_map
+        except Exception as e:
+            self.logger.warning(f"Could not preload sector map, querying per strategy: {e}")
+            self._sector_map = None
+        
+        self.logger.info(f"Write context loaded: {len(self._existing_strategies or {})} strategies today, "
+                         f"{len(self._sector_map or {})} sector entries")
+    
+    def _load_todays_strategies(self, today: str, page_size: int) -> Optional[Dict[Tuple[str, str], int]]:
+        """(stock_name, strategy_name) -> id for strategies generated today, or None on failure"""
+        try:
+            existing = {}
+            offset = 0
+            while True:
+                response = self.client.table('strategies').select('id,stock_name,strategy_name').gte(
+                    'generated_on', f"{today}T00:00:00"
+                ).lte(
+                    'generated_on', f"{today}T23:59:59"
+                ).order('id').range(offset, offset + page_size - 1).execute()
+                rows = response.data or []
+                for row in rows:
+                    existing.setdefault((row['stock_name'], row['strategy_name']), row['id'])
+                if len(rows) < page_size:
+                    break
+                offset += page_size
+            return existing
+        except Exception as e:
+            self.logger.warning(f"Could not preload today's strategies, checking per strategy: {e}")
+            return None
+    
+    def _find_existing_strategy_id(self, stock_name: str, strategy_name: str) -> Optional[int]:
+        """Id of a strategy already stored today for the symbol, if any"""
+        if self._existing_strategies is not None:
+            return self._existing_strategies.get((stock_name, strategy_name))
+        
+        # Get today's date in ISO format for duplicate check
+        today = datetime.now().date().isoformat()
+        existing_check = self.client.table('strategies').select('id').eq(
+            'stock_name', stock_name
+        ).eq(
+            'strategy_name', strategy_name
+        ).gte(
+            'generated_on', f"{today}T00:00:00"
+        ).lte(
+            'generated_on', f"{today}T23:59:59"
+        ).execute()
+        
+        if existing_check.data and len(existing_check.data) > 0:
+            return existing_check.data[0]['id']
+        return None
+    
+    def _get_sector_industry(self, symbol: str) -> Tuple[Optional[str], Optional[str]]:
+        """Sector and industry for a symbol from the preloaded map or stock_data"""
+        if self._sector_map is not None:
+            stock_info = self._sector_map.get(symbol)
+            if not stock_info:
+                self.logger.warning(f"No sector/industry data found for symbol: {symbol}")
+                return None, None
+            return stock_info.get('sector'), stock_info.get('industry')
+        
+        try:
+            stock_data_result = self.client.table('stock_data').select('sector,industry').eq('symbol', symbol).execute()
+            if stock_data_result.data and len(stock_data_result.data) > 0:
+                sector = stock_data_result.data[0].get('sector')
+                industry = stock_data_result.data[0].get('industry')
+                self.logger.debug(f"Found sector: {sector}, industry: {industry} for symbol: {symbol}")
+                return sector, industry
+            self.logger.warning(f"No sector/industry data found for symbol: {symbol}")
+        except Exception as e:
+            self.logger.warning(f"Error fetching sector/industry for {symbol}: {e}")
+            # Continue with None values
+        return None, None
+    
     def _clear_batch_data(self):
         """Clear all batch data collections"""
         for table in self.batch_data:
@@ -297,38 +447,17 @@ class SupabaseIntegration:
                               spot_price: float, market_analysis: Dict) -> Optional[Dict]:
         """Prepare main strategy record for batch insert"""
         try:
-            # Get today's date in ISO format for duplicate check
-            today = datetime.now().date().isoformat()
-            
             # Check for existing record for same symbol + date + strategy
-            existing_check = self.client.table('strategies').select('id').eq(
-                'stock_name', symbol
-            ).eq(
-                'strategy_name', strategy_data['name']
-            ).gte(
-                'generated_on', f"{today}T00:00:00"
-            ).lte(
-                'generated_on', f"{today}T23:59:59"
-            ).execute()
-            
-            if existing_check.data and len(existing_check.data) > 0:
-                self.logger.info(f"Strategy {strategy_data['name']} for {symbol} already exists for today, skipping insert")
-                return None  # Return None to skip this strategy
+            # (upsert mode leaves this to the unique index on the server)
+            if self.dedup_mode != 'upsert':
+                existing_id = self._find_existing_strategy_id(symbol, strategy_data['name'])
+                if existing_id is not None:
+                    self.write_journal.record(symbol, strategy_data['name'], existing_id)
+                    self.logger.info(f"Strategy {strategy_data['name']} for {symbol} already exists for today, skipping insert")
+                    return None  # Return None to skip this strategy
             
             # Fetch sector and industry from stock_data table
-            sector = None
-            industry = None
-            try:
-                stock_data_result = self.client.table('stock_data').select('sector,industry').eq('symbol', symbol).execute()
-                if stock_data_result.data and len(stock_data_result.data) > 0:
-                    sector = stock_data_result.data[0].get('sector')
-                    industry = stock_data_result.data[0].get('industry')
-                    self.logger.debug(f"Found sector: {sector}, industry: {industry} for symbol: {symbol}")
-                else:
-                    self.logger.warning(f"No sector/industry data found for symbol: {symbol}")
-            except Exception as e:
-                self.logger.warning(f"Error fetching sector/industry for {symbol}: {e}")
-                # Continue with None values
+            sector, industry = self._get_sector_industry(symbol)
             
             # Map confidence to conviction level
             confidence = market_analysis.get('confidence', 0.5)
@@ -1504,7 +1633,9 @@ class SupabaseIntegration:
             if validation_errors:
                 self.logger.warning(f"Found {len(validation_errors)} validation issues, proceeding with insertion")
             # 1. Insert strategies first and get real IDs
-            if self.batch_data['strategies']:
+            if self.batch_data['strategies'] and self.dedup_mode == 'upsert':
+                strategy_id_map = self._upsert_strategies(self.batch_data['strategies'])
+            elif self.batch_data['strategies']:
                 # Check for duplicates and filter them out
                 unique_strategies = []
                 for strategy in self.batch_data['strategies']:
@@ -1512,20 +1643,12 @@ class SupabaseIntegration:
                     temp_id = strategy.pop('temp_id')
                     
                     # Check for existing record
-                    today = datetime.now().date().isoformat()
-                    existing_check = self.client.table('strategies').select('id').eq(
-                        'stock_name', strategy['stock_name']
-                    ).eq(
-                        'strategy_name', strategy['strategy_name']
-                    ).gte(
-                        'generated_on', f"{today}T00:00:00"
-                    ).lte(
-                        'generated_on', f"{today}T23:59:59"
-                    ).execute()
+                    existing_id = self._find_existing_strategy_id(strategy['stock_name'], strategy['strategy_name'])
                     
-                    if existing_check.data and len(existing_check.data) > 0:
+                    if existing_id is not None:
                         # Map temp_id to existing strategy_id
-                        strategy_id_map[temp_id] = existing_check.data[0]['id']
+                        strategy_id_map[temp_id] = existing_id
+                        self.write_journal.record(strategy['stock_name'], strategy['strategy_name'], existing_id)
                         self.logger.info(f"Strategy {strategy['strategy_name']} for {strategy['stock_name']} already exists")
                     else:
                         strategy['temp_id'] = temp_id  # Add back for tracking
@@ -1545,6 +1668,10 @@ class SupabaseIntegration:
                             for j, strategy in enumerate(result.data):
                                 temp_id = batch[j]['temp_id']
                                 strategy_id_map[temp_id] = strategy['id']
+                                self.write_journal.record(batch[j]['stock_name'], batch[j]['strategy_name'], strategy['id'])
+                                if self._existing_strategies is not None:
+                                    key = (strategy.get('stock_name'), strategy.get('strategy_name'))
+                                    self._existing_strategies[key] = strategy['id']
                             self.logger.info(f"Inserted {len(result.data)} strategies")
             
             # 2. Update all related records with real strategy_ids
@@ -1575,6 +1702,63 @@ class SupabaseIntegration:
             self.logger.error(f"Error executing batch inserts: {e}")
             return {'success': False, 'errors': [str(e)]}
     
+    def _upsert_strategies(self, strategies: List[Dict]) -> Dict[str, int]:
+        """
+        Insert strategies through the upsert_strategies RPC
+        
+        Strategies that already exist today are not rewritten; their related
+        records are dropped from the batch, matching the select-mode skip.
+        
+        Args:
+            strategies: Collected strategy records with temp_id
+            
+        Returns:
+            Map of temp_id to real strategy_id for newly inserted strategies
+        """
+        strategy_id_map = {}
+        skipped_temp_ids = set()
+        
+        # ON CONFLICT cannot touch the same key twice in one statement
+        by_key = {}
+        for strategy in strategies:
+            key = (strategy['stock_name'], strategy['strategy_name'])
+            if key in by_key:
+                skipped_temp_ids.add(strategy['temp_id'])
+            else:
+                by_key[key] = strategy
+        unique_strategies = list(by_key.values())
+        
+        for i in range(0, len(unique_strategies), self.batch_size):
+            batch = unique_strategies[i:i + self.batch_size]
+            rows = [{k: v for k, v in s.items() if k != 'temp_id'} for s in batch]
+            
+            result = self.client.rpc('upsert_strategies', {'p_rows': rows}).execute()
+            
+            returned = {(row['stock_name'], row['strategy_name']): row for row in result.data or []}
+            inserted = 0
+            for strategy in batch:
+                row = returned.get((strategy['stock_name'], strategy['strategy_name']))
+                if row:
+                    self.write_journal.record(strategy['stock_name'], strategy['strategy_name'], row['id'])
+                if row and row.get('inserted'):
+                    strategy_id_map[strategy['temp_id']] = row['id']
+                    inserted += 1
+                else:
+                    skipped_temp_ids.add(strategy['temp_id'])
+                    if row:
+                        self.logger.info(f"Strategy {strategy['strategy_name']} for {strategy['stock_name']} already exists")
+            self.logger.info(f"Upserted {len(batch)} strategies ({inserted} new)")
+        
+        if skipped_temp_ids:
+            for table in self.batch_data:
+                if table != 'strategies':
+                    self.batch_data[table] = [
+                        record for record in self.batch_data[table]
+                        if record.get('temp_strategy_id') not in skipped_temp_ids
+                    ]
+        
+        return strategy_id_map
+    
     def _update_batch_data_with_real_ids(self, strategy_id_map: Dict[str, int]):
         """Update all batch data with real strategy IDs"""
         # Update all tables that reference strategy_id
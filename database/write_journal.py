@@ -0,0 +1,51 @@
+"""
+Run-level write journal for Options V4 strategy storage
+
+Records which (symbol, strategy) rows are already in the database during a
+run, with their ids, so later store passes over the same results only
+write what is missing.
+"""
+
+from threading import Lock
+from typing import Dict, Optional, Tuple
+
+
+class WriteJournal:
+    """
+    Strategies persisted (or found already stored) during the current run
+
+    Usage:
+        journal.record('RELIANCE', 'Iron Condor', 1234)
+        journal.get('RELIANCE', 'Iron Condor')   # -> 1234
+        journal.reset()                          # start of a new run
+    """
+
+    def __init__(self):
+        self._lock = Lock()
+        self._rows: Dict[Tuple[str, str], int] = {}
+
+    def record(self, symbol: str, strategy_name: str, strategy_id: int) -> None:
+        """
+        Record a strategy row as persisted
+
+        Args:
+            symbol: Stock symbol (strategies.stock_name)
+            strategy_name: Strategy name (strategies.strategy_name)
+            strategy_id: Database id of the row
+        """
+        with self._lock:
+            self._rows[(symbol, strategy_name)] = strategy_id
+
+    def get(self, symbol: str, strategy_name: str) -> Optional[int]:
+        """Id of a persisted strategy row, or None if it still has to be written"""
+        with self._lock:
+            return self._rows.get((symbol, strategy_name))
+
+    def reset(self) -> None:
+        """Forget all recorded rows"""
+        with self._lock:
+            self._rows.clear()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._rows)
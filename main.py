@@ -7,6 +7,9 @@ This replaces the monolithic 2728-line script with a clean, modular architecture
 import os
 import sys
 import json
+import shutil
+import tempfile
+import time
 from datetime import datetime
 from typing import Dict, List, Optional
 import numpy as np
@@ -33,6 +36,10 @@ from trade_execution import ExitManager
 from strategy_creation import MarketAnalyzer
 from analysis import StrategyRanker, PriceLevelsAnalyzer
 from utils.parallel_processor import ParallelProcessor
+from utils.shared_frames import write_shared_frames, read_shared_frames
+from utils.run_journal import RunJournal, is_transient_failure
+from utils.analysis_result_cache import AnalysisResultCache, snapshot_fingerprint
+from utils.stage_timer import StageTimer, StageSpans, SPANS_KEY
 from strategy_creation.strategies import (
     # Directional
     LongCall, LongPut, ShortCall, ShortPut, BullCallSpread, BearCallSpread, 
@@ -54,7 +61,7 @@ from strategy_creation.strategies.strategy_metadata import (
     STRATEGY_REGISTRY
 )
 from utils.logger import setup_logger, get_default_log_file
-from database import SupabaseIntegration
+from database import SupabaseIntegration, ResultWriter
 
 # Load environment variables
 if DOTENV_AVAILABLE:
@@ -87,7 +94,17 @@ class OptionsAnalyzer:
     Replaces the monolithic script with clean, modular architecture
     """
     
-    def __init__(self, config_path: str = None, enable_database: bool = True):
+    def __init__(self, config_path: str = None, enable_database: bool = True,
+                 data_manager: Optional[DataManager] = None, stock_profiler: Optional[StockProfiler] = None):
+        """
+        Initialize analyzer
+        
+        Args:
+            config_path: Strategy config YAML (default: config/strategy_config.yaml)
+            enable_database: Store results in Supabase
+            data_manager: Market data source (default: Supabase-backed DataManager)
+            stock_profiler: Stock profiler (default: one using the database client)
+        """
         # Set up logging
         self.logger = setup_logger(
             'OptionsV4',
@@ -95,6 +112,7 @@ class OptionsAnalyzer:
         )
         
         # Load configuration
+        self.config_path = config_path
         self.config = self._load_config(config_path)
         
         # Initialize database integration first if enabled
@@ -109,14 +127,14 @@ class OptionsAnalyzer:
                 self.db_integration = None
         
         # Initialize core components
-        self.data_manager = DataManager()
+        self.data_manager = data_manager or DataManager()
         self.iv_analyzer = IVAnalyzer()
         self.price_levels_analyzer = PriceLevelsAnalyzer()
         self.probability_engine = ProbabilityEngine()
         self.risk_manager = RiskManager()
         # Pass supabase client to stock profiler if available
         supabase_client = self.db_integration.client if self.db_integration else None
-        self.stock_profiler = StockProfiler(supabase_client=supabase_client)
+        self.stock_profiler = stock_profiler or StockProfiler(supabase_client=supabase_client)
         self.market_analyzer = MarketAnalyzer()
         self.strategy_ranker = StrategyRanker()
         self.exit_manager = ExitManager()
@@ -136,6 +154,12 @@ class OptionsAnalyzer:
         # Strategy rotation tracking
         self.strategy_history = {}  # {symbol: [last 5 strategies used]}
         
+        # Results of unchanged chain snapshots, reused by incremental runs
+        self.result_cache = AnalysisResultCache(encoder=NumpyJSONEncoder)
+        
+        # Per-stage timings of the current run
+        self.stage_timer = StageTimer()
+        
         # Strategy mapping
         self.strategy_classes = {
             'Long Call': LongCall,
@@ -165,70 +189,90 @@ class OptionsAnalyzer:
         
         self.logger.info("Options V4 Analyzer initialized successfully")
     
-    def analyze_portfolio(self, risk_tolerance: str = 'moderate', max_workers: int = 5, holding_days: int = 14) -> Dict:
+    def analyze_portfolio(self, risk_tolerance: str = 'moderate', max_workers: int = 5, holding_days: int = 14,
+                          executor: str = 'thread', resume: Optional[str] = None, retry_failed: int = 0,
+                          retry_backoff: Optional[float] = None, incremental: bool = False,
+                          trace_path: Optional[str] = None) -> Dict:
         """
         Analyze entire portfolio and generate strategy recommendations
         
+        Every symbol result is checkpointed to a run journal under results/runs/,
+        so a partly failed run can be resumed without re-analysing its successes.
+        Successful results are also cached by option chain snapshot fingerprint;
+        incremental runs reuse them for symbols whose chain has not changed.
+        Per-stage timings are summarised under 'stage_timings'.
+        
         Args:
             risk_tolerance: Risk tolerance level (conservative/moderate/aggressive)
             max_workers: Maximum number of parallel workers (default: 8)
+            executor: 'thread' or 'process' (worker processes with their own analyzers)
+            resume: Run id to resume; only its failed and never-run symbols are analysed
+            retry_failed: Extra passes over transient failures at the end of the run
+            retry_backoff: Seconds before the first retry pass, doubled for each next
+                pass (default: RUN_RETRY_BACKOFF or 30)
+            incremental: Reuse today's cached results for symbols with an unchanged chain snapshot
+            trace_path: Write the stage spans to this file as a Chrome trace (speedscope/Perfetto)
         
         Returns:
             Dictionary with portfolio analysis and recommendations
         """
         try:
             self.logger.info("Starting portfolio analysis...")
-            
-            # Get portfolio symbols
-            symbols = self.data_manager.get_portfolio_symbols()
-            if not symbols:
-                self.logger.error("No symbols found in portfolio")
-                return {'success': False, 'reason': 'No portfolio symbols'}
-            
-            self.logger.info(f"Analyzing {len(symbols)} symbols with {max_workers} parallel workers")
-            
-            # Pre-fetch all sectors and industries in one query
+            self.stage_timer.reset()
+            
+            if resume:
+                run_journal = RunJournal.load(None, resume, encoder=NumpyJSONEncoder)
+                symbols = run_journal.symbols or self.data_manager.get_portfolio_symbols()
+                risk_tolerance = run_journal.header.get('risk_tolerance', risk_tolerance)
+                previous_results = {s: run_journal.results[s] for s in run_journal.successful_symbols()
+                                    if s in symbols}
+                self.logger.info(f"Resuming run {resume}: {len(previous_results)}/{len(symbols)} symbols "
+                               f"already successful")
+            else:
+                # Get portfolio symbols
+                symbols = self.data_manager.get_portfolio_symbols()
+                if not symbols:
+                    self.logger.error("No symbols found in portfolio")
+                    return {'success': False, 'reason': 'No portfolio symbols'}
+                run_journal = RunJournal.create(None, symbols, risk_tolerance, encoder=NumpyJSONEncoder)
+                previous_results = {}
+            
+            pending_symbols = [s for s in symbols if s not in previous_results]
+            
+            # Write context for the whole run, also when every symbol is resumed or reused and
+            # nothing is analysed: save_results stores those results through it
             if self.enable_database and self.db_integration:
-                self._prefetch_stock_metadata(symbols)
-            
-            # Initialize parallel processor
-            processor = ParallelProcessor(max_workers=max_workers)
-            
-            # Define process function for each symbol
-            def process_symbol(symbol: str) -> Dict:
-                try:
-                    return self.analyze_symbol(symbol, risk_tolerance)
-                except Exception as e:
-                    self.logger.error(f"Error analyzing {symbol}: {e}")
-                    return {
-                        'success': False,
-                        'reason': f'Analysis error: {str(e)}'
-                    }
-            
-            # Define callback for database storage
-            def store_symbol_result(symbol: str, result: Dict):
-                if result.get('success', False) and self.enable_database and self.db_integration:
+                self.db_integration.write_journal.reset()
+                with self.stage_timer.span('preload_write_context'):
                     try:
-                        # Wrap single symbol result for database storage
-                        single_symbol_result = {
-                            'success': True,
-                            'analysis_timestamp': result.get('analysis_timestamp'),
-                            'symbol_results': {symbol: result},
-                            'total_symbols': 1,
-                            'successful_analyses': 1
-                        }
-                        db_result = self.db_integration.store_analysis_results(single_symbol_result)
-                        if not db_result['success']:
-                            self.logger.warning(f"Database storage failed for {symbol}: {db_result.get('error', 'Unknown error')}")
+                        self.db_integration.preload_write_context(symbols)
                     except Exception as e:
-                        self.logger.error(f"Error storing {symbol} to database: {e}")
-            
-            # Process symbols in parallel
-            portfolio_results = processor.process_symbols_parallel(
-                symbols=symbols,
-                process_func=process_symbol,
-                callback_func=store_symbol_result
-            )
+                        self.logger.warning(f"Could not preload write context: {e}")
+            
+            # Incremental: reuse results of symbols whose chain snapshot is unchanged
+            fingerprints = None
+            reused = 0
+            if incremental and pending_symbols:
+                fingerprints = self._preload_chain_fingerprints(pending_symbols, risk_tolerance)
+                for symbol in pending_symbols:
+                    cached = self.result_cache.get(symbol, fingerprints.get(symbol))
+                    if cached is not None:
+                        previous_results[symbol] = cached
+                        run_journal.record(symbol, cached)
+                        reused += 1
+                pending_symbols = [s for s in pending_symbols if s not in previous_results]
+                self.logger.info(f"Incremental run: {reused} unchanged symbols reused, "
+                               f"{len(pending_symbols)} with fresh chains to analyze")
+            
+            portfolio_results = {}
+            if pending_symbols:
+                portfolio_results = self._analyze_symbols(pending_symbols, risk_tolerance, max_workers, executor,
+                                                          run_journal, retry_failed, retry_backoff, fingerprints)
+            run_journal.complete()
+            
+            # Keep portfolio order across resumed and newly analysed symbols
+            portfolio_results = {s: previous_results.get(s) or portfolio_results.get(s) for s in symbols
+                                 if s in previous_results or s in portfolio_results}
             
             # Count successful analyses
             successful_analyses = sum(1 for result in portfolio_results.values() 
@@ -237,21 +281,212 @@ class OptionsAnalyzer:
             # Generate portfolio summary
             portfolio_summary = self._generate_portfolio_summary(portfolio_results)
             
-            self.logger.info(f"\nPortfolio Analysis Complete: {successful_analyses}/{len(symbols)} successful")
-            
+            self.logger.info(f"\nPortfolio Analysis Complete: {successful_analyses}/{len(symbols)} successful "
+                           f"(run {run_journal.run_id})")
+
+            cache_stats = self.data_manager.get_cache_stats()
+            self.logger.info(f"Option chain cache: {cache_stats['hits']} hits, {cache_stats['misses']} misses "
+                           f"({cache_stats['hit_rate']:.1%} hit rate)")
+            smile_stats = self.data_manager.vol_surface.calibration_cache.get_stats()
+            self.logger.info(f"Smile calibration cache: {smile_stats['hits']} reused, {smile_stats['misses']} fitted")
+            
+            stage_timings = self.stage_timer.summary()
+            for stage, stats in sorted(stage_timings['stages'].items(), key=lambda item: -item[1]['total_s']):
+                self.logger.info(f"Stage {stage}: p50 {stats['p50_ms']:.0f}ms, p95 {stats['p95_ms']:.0f}ms, "
+                               f"max {stats['max_ms']:.0f}ms, total {stats['total_s']:.1f}s ({stats['count']}x)")
+            if trace_path:
+                written = self.stage_timer.export_chrome_trace(trace_path)
+                if written:
+                    self.logger.info(f"Stage trace written to {written}")
+
             return {
                 'success': True,
+                'run_id': run_journal.run_id,
                 'analysis_timestamp': datetime.now().isoformat(),
                 'portfolio_summary': portfolio_summary,
                 'symbol_results': portfolio_results,
                 'total_symbols': len(symbols),
-                'successful_analyses': successful_analyses
+                'successful_analyses': successful_analyses,
+                'resumed_symbols': len(previous_results) - reused,
+                'reused_symbols': reused,
+                'stage_timings': stage_timings
             }
             
         except Exception as e:
             self.logger.error(f"Error in portfolio analysis: {e}")
             return {'success': False, 'reason': str(e)}
     
+    def _analyze_symbols(self, symbols: List[str], risk_tolerance: str, max_workers: int, executor: str,
+                         run_journal: RunJournal, retry_failed: int = 0, retry_backoff: Optional[float] = None,
+                         fingerprints: Optional[Dict[str, str]] = None) -> Dict[str, Dict]:
+        """
+        Analyze symbols in parallel, checkpoint, cache and store each result, and retry transient failures
+        
+        Args:
+            symbols: Symbols to analyze
+            risk_tolerance: Risk tolerance level
+            max_workers: Maximum number of parallel workers
+            executor: 'thread' or 'process'
+            run_journal: Journal receiving every symbol result
+            retry_failed: Extra passes over transient failures
+            retry_backoff: Seconds before the first retry pass (doubled per pass)
+            fingerprints: Chain fingerprints from an earlier preload (skips preloading again)
+        
+        Returns:
+            Dictionary mapping symbols to their latest results
+        """
+        worker_dir = None
+        result_writer = None
+        try:
+            self.logger.info(f"Analyzing {len(symbols)} symbols with {max_workers} parallel workers")
+            
+            # Pre-fetch all sectors and industries in one query
+            if self.enable_database and self.db_integration:
+                with self.stage_timer.span('prefetch_metadata'):
+                    self._prefetch_stock_metadata(symbols)
+            
+            # Refresh price history for the whole universe in one batched download
+            with self.stage_timer.span('prefetch_price_history'):
+                self.stock_profiler.prefetch_price_history(symbols)
+            
+            # Bulk load option chains for the whole universe instead of per-symbol queries
+            if fingerprints is None:
+                fingerprints = self._preload_chain_fingerprints(symbols, risk_tolerance)
+            
+            # Initialize parallel processor
+            if executor == 'process':
+                # Workers get the preloaded data through shared files, results come back here
+                worker_dir = tempfile.mkdtemp(prefix='options_v4_workers_')
+                worker_context = self._export_worker_context(symbols, risk_tolerance, worker_dir)
+                processor = ParallelProcessor(
+                    max_workers=max_workers,
+                    executor='process',
+                    initializer=_init_process_worker,
+                    initargs=(worker_context,)
+                )
+                process_symbol = _analyze_symbol_in_worker
+            else:
+                processor = ParallelProcessor(max_workers=max_workers)
+                
+                # Define process function for each symbol
+                def process_symbol(symbol: str) -> Dict:
+                    try:
+                        return self.analyze_symbol(symbol, risk_tolerance)
+                    except Exception as e:
+                        self.logger.error(f"Error analyzing {symbol}: {e}")
+                        return {
+                            'success': False,
+                            'reason': f'Analysis error: {str(e)}'
+                        }
+            
+            # Results go to a background writer so analysis never waits on the database
+            # (analyze_portfolio has already reset the write journal and loaded the write context)
+            if self.enable_database and self.db_integration:
+                result_writer = ResultWriter(self.db_integration, symbols=symbols, logger=self.logger,
+                                             preload_context=False).start()
+            
+            def store_symbol_result(symbol: str, result: Dict):
+                self.stage_timer.collect(symbol, result)
+                run_journal.record(symbol, result)
+                self.result_cache.put(symbol, fingerprints.get(symbol), result)
+                if result_writer:
+                    result_writer.submit(symbol, result)
+            
+            # Process symbols in parallel
+            with self.stage_timer.span('parallel_analysis'):
+                portfolio_results = processor.process_symbols_parallel(
+                    symbols=symbols,
+                    process_func=process_symbol,
+                    callback_func=store_symbol_result
+                )
+            
+            # Requeue transient failures (network, database, timeouts) with exponential backoff
+            if retry_backoff is None:
+                retry_backoff = float(os.getenv('RUN_RETRY_BACKOFF', '30'))
+            retry_symbols = [s for s in symbols if is_transient_failure(portfolio_results.get(s, {}))]
+            for attempt in range(1, retry_failed + 1):
+                if not retry_symbols:
+                    break
+                delay = retry_backoff * 2 ** (attempt - 1)
+                self.logger.info(f"Retrying {len(retry_symbols)} failed symbols in {delay:.0f}s "
+                               f"(pass {attempt}/{retry_failed})")
+                time.sleep(delay)
+                with self.stage_timer.span('retry_analysis'):
+                    retried = processor.process_symbols_parallel(
+                        symbols=retry_symbols,
+                        process_func=process_symbol,
+                        callback_func=store_symbol_result
+                    )
+                portfolio_results.update(retried)
+                retry_symbols = [s for s in retry_symbols if is_transient_failure(retried.get(s, {}))]
+            
+            if result_writer:
+                writer_stats = result_writer.close()
+                result_writer = None
+                self.logger.info(f"Result writer: {writer_stats['symbols_written']} symbols, "
+                               f"{writer_stats['strategies_stored']} strategies in {writer_stats['flushes']} flushes")
+            
+            return portfolio_results
+        
+        finally:
+            if result_writer:
+                result_writer.close()
+            if worker_dir:
+                shutil.rmtree(worker_dir, ignore_errors=True)
+    
+    def _preload_chain_fingerprints(self, symbols: List[str], risk_tolerance: str) -> Dict[str, str]:
+        """
+        Bulk load option chains and fingerprint each symbol's snapshot
+        
+        Args:
+            symbols: Symbols to preload
+            risk_tolerance: Risk tolerance (part of the fingerprint)
+            
+        Returns:
+            Dictionary mapping preloaded symbols to their snapshot fingerprints
+        """
+        with self.stage_timer.span('preload_chains'):
+            preloaded = self.data_manager.preload_options_data(symbols)
+        self.logger.info(f"Preloaded option chains for {preloaded}/{len(symbols)} symbols")
+        
+        # Settings that change results without changing the chain
+        context = f"{risk_tolerance}_{json.dumps(self.config, sort_keys=True, default=str)}"
+        _, chains = self.data_manager.get_preloaded_chains()
+        fingerprints = {}
+        for symbol in symbols:
+            try:
+                fingerprint = snapshot_fingerprint(chains.get(symbol), context)
+            except Exception as e:
+                self.logger.debug(f"Could not fingerprint {symbol} chain: {e}")
+                fingerprint = None
+            if fingerprint:
+                fingerprints[symbol] = fingerprint
+        return fingerprints
+    
+    def _export_worker_context(self, symbols: List[str], risk_tolerance: str, worker_dir: str) -> Dict:
+        """
+        Write preloaded chains and price histories to shared files for worker processes
+        
+        Args:
+            symbols: Portfolio symbols
+            risk_tolerance: Risk tolerance for the run
+            worker_dir: Directory for the shared files
+            
+        Returns:
+            Small picklable context passed to each worker's initializer
+        """
+        trade_date, chains = self.data_manager.get_preloaded_chains()
+        price_histories = self.stock_profiler.price_store.export_frames(symbols)
+        
+        return {
+            'config_path': self.config_path,
+            'risk_tolerance': risk_tolerance,
+            'trade_date': trade_date,
+            'chains_path': write_shared_frames(chains, worker_dir, 'chains') if chains else None,
+            'prices_path': write_shared_frames(price_histories, worker_dir, 'prices') if price_histories else None,
+            'profiler_data': self.stock_profiler.export_prefetched_data()
+        }
+    
     def _prefetch_stock_metadata(self, symbols: List[str]):
         """Prefetch stock metadata for all symbols to reduce database queries"""
         try:
@@ -271,22 +506,41 @@ class OptionsAnalyzer:
             holding_days: Expected holding period in days
         
         Returns:
-            Dictionary with symbol analysis and top strategies
+            Dictionary with symbol analysis and top strategies, carrying the
+            per-stage spans for StageTimer.collect()
         """
+        spans = StageSpans()
+        result = self._analyze_symbol_stages(symbol, risk_tolerance, holding_days, spans)
+        result[SPANS_KEY] = spans.export()
+        return result
+    
+    def _analyze_symbol_stages(self, symbol: str, risk_tolerance: str, holding_days: int,
+                               spans: StageSpans) -> Dict:
+        """Run the analysis stages of analyze_symbol, timing each one"""
         try:
             # 1. Fetch market data
             options_df = self.data_manager.get_liquid_options(symbol)
+            spans.lap('chain_fetch')
             if options_df is None or options_df.empty:
+                # A fetch that raised is retried later in the run, missing data is not
+                fetch_error = self.data_manager.get_fetch_error(symbol)
+                if fetch_error:
+                    return {'success': False, 'reason': f'Options data fetch failed: {fetch_error}'}
                 return {'success': False, 'reason': 'No liquid options data'}
             
             spot_price = self.data_manager.get_spot_price(symbol)
+            spans.lap('spot_price')
             if spot_price is None:
+                fetch_error = self.data_manager.get_fetch_error(symbol)
+                if fetch_error:
+                    return {'success': False, 'reason': f'Spot price fetch failed: {fetch_error}'}
                 return {'success': False, 'reason': 'No spot price data'}
             
             self.logger.info(f"Found {len(options_df)} liquid options for {symbol} at spot ${spot_price:.2f}")
             
             # 2. Stock Profile Analysis
             stock_profile = self.stock_profiler.get_complete_profile(symbol)
+            spans.lap('stock_profile')
             self.logger.info(f"Stock Profile: {stock_profile['volatility_bucket']} volatility, "
                            f"Beta: {stock_profile.get('beta_nifty', 1.0):.2f}, "
                            f"ATR%: {stock_profile.get('atr_pct', 2.0):.2f}%")
@@ -295,6 +549,7 @@ class OptionsAnalyzer:
             market_analysis = self.market_analyzer.analyze_market_direction(
                 symbol, options_df, spot_price
             )
+            spans.lap('market_direction')
             # Add stock profile to market analysis
             market_analysis['stock_profile'] = stock_profile
             
@@ -302,12 +557,14 @@ class OptionsAnalyzer:
             # Get sector info from stock profile
             sector = stock_profile.get('sector', 'Unknown')
             iv_analysis = self.iv_analyzer.analyze_current_iv(options_df, symbol, sector)
+            spans.lap('iv_analysis')
             market_analysis['iv_analysis'] = iv_analysis
             
             # 3.5 Price Levels Analysis
             price_levels = self.price_levels_analyzer.analyze_price_levels(
                 symbol, options_df, spot_price
             )
+            spans.lap('price_levels')
             market_analysis['price_levels'] = price_levels
             market_analysis['spot_price'] = spot_price  # Add spot price for exit calculations
             
@@ -318,6 +575,7 @@ class OptionsAnalyzer:
             
             # 4. Strategy Construction
             strategies = self._construct_strategies(symbol, options_df, spot_price, market_analysis, holding_days)
+            spans.lap('strategy_construction')
             
             if not strategies:
                 return {'success': False, 'reason': 'No strategies could be constructed'}
@@ -326,6 +584,7 @@ class OptionsAnalyzer:
             ranked_strategies = self.strategy_ranker.rank_strategies(
                 strategies, market_analysis, risk_tolerance
             )
+            spans.lap('ranking')
             
             if not ranked_strategies:
                 return {'success': False, 'reason': 'No strategies passed probability filtering'}
@@ -375,6 +634,7 @@ class OptionsAnalyzer:
                     'exit_conditions': exit_conditions
                 }
                 top_strategies_with_exits.append(strategy_result)
+            spans.lap('exit_generation')
             
             return {
                 'success': True,
@@ -778,12 +1038,14 @@ class OptionsAnalyzer:
             
             self.logger.info(f"Results saved to: {filepath}")
             
-            # Store results in database if enabled
+            # Store results in database if enabled; strategies the result writer
+            # already stored are in the write journal, so only missing rows are written
             if self.enable_database and self.db_integration:
                 try:
                     db_result = self.db_integration.store_analysis_results(results)
                     if db_result['success']:
-                        self.logger.info(f"Stored {db_result['total_stored']} strategies in database")
+                        self.logger.info(f"Stored {db_result['total_stored']} strategies in database "
+                                       f"({db_result.get('already_stored', 0)} already stored during the run)")
                     else:
                         self.logger.warning(f"Database storage failed: {db_result.get('error', 'Unknown error')}")
                 except Exception as e:
@@ -795,6 +1057,40 @@ class OptionsAnalyzer:
             self.logger.error(f"Error saving results: {e}")
             return ""
 
+# Per-process analyzer used by --executor process (set up by _init_process_worker)
+_worker_analyzer: Optional[OptionsAnalyzer] = None
+_worker_risk_tolerance = 'moderate'
+
+
+def _init_process_worker(context: Dict):
+    """Create this worker's own OptionsAnalyzer and load the parent's shared data"""
+    global _worker_analyzer, _worker_risk_tolerance
+    
+    # Workers never write to the database; the parent stores results as they stream back
+    _worker_analyzer = OptionsAnalyzer(config_path=context.get('config_path'), enable_database=False)
+    _worker_risk_tolerance = context.get('risk_tolerance', 'moderate')
+    
+    if context.get('chains_path'):
+        _worker_analyzer.data_manager.set_preloaded_chains(
+            context.get('trade_date'), read_shared_frames(context['chains_path'])
+        )
+    if context.get('prices_path'):
+        _worker_analyzer.stock_profiler.price_store.import_frames(read_shared_frames(context['prices_path']))
+    _worker_analyzer.stock_profiler.import_prefetched_data(context.get('profiler_data', {}))
+
+
+def _analyze_symbol_in_worker(symbol: str) -> Dict:
+    """Analyze one symbol inside a worker process"""
+    try:
+        return _worker_analyzer.analyze_symbol(symbol, _worker_risk_tolerance)
+    except Exception as e:
+        _worker_analyzer.logger.error(f"Error analyzing {symbol}: {e}")
+        return {
+            'success': False,
+            'reason': f'Analysis error: {str(e)}'
+        }
+
+
 def main():
     """Main entry point"""
     print("🚀 Options V4 Trading System")
@@ -809,6 +1105,18 @@ def main():
                         help='Risk tolerance level')
     parser.add_argument('--holding-days', type=int, default=14,
                         help='Expected holding period in days (default: 14)')
+    parser.add_argument('--executor', type=str, default='thread', choices=['thread', 'process'],
+                        help='Portfolio worker pool: threads or one process per core (default: thread)')
+    parser.add_argument('--workers', type=int, default=None,
+                        help='Number of portfolio workers (default: 8 threads, or one process per CPU)')
+    parser.add_argument('--resume', type=str, metavar='RUN_ID',
+                        help='Resume a portfolio run, analysing only its failed and never-run symbols')
+    parser.add_argument('--retry-failed', type=int, default=0, metavar='N',
+                        help='Retry transient symbol failures up to N times at the end of the run, with backoff')
+    parser.add_argument('--incremental', action='store_true',
+                        help="Re-analyze only symbols with a fresh option chain snapshot, reusing today's results")
+    parser.add_argument('--trace', type=str, metavar='PATH',
+                        help='Write per-stage spans as a Chrome trace (open in Perfetto or speedscope)')
     args = parser.parse_args()
     
     try:
@@ -820,6 +1128,7 @@ def main():
             # Single symbol analysis
             print(f"\n🔍 Analyzing {args.symbol}...")
             results = analyzer.analyze_symbol(args.symbol, risk_tolerance=args.risk)
+            analyzer.stage_timer.collect(args.symbol, results)
             # Wrap single symbol result for consistent handling
             if results.get('success'):
                 results = {
@@ -827,11 +1136,18 @@ def main():
                     'analysis_timestamp': datetime.now().isoformat(),
                     'symbol_results': {args.symbol: results},
                     'total_symbols': 1,
-                    'successful_analyses': 1
+                    'successful_analyses': 1,
+                    'stage_timings': analyzer.stage_timer.summary()
                 }
+            if args.trace:
+                analyzer.stage_timer.export_chrome_trace(args.trace)
         else:
             # Portfolio analysis
-            results = analyzer.analyze_portfolio(risk_tolerance=args.risk, max_workers=8)
+            max_workers = args.workers or ((os.cpu_count() or 8) if args.executor == 'process' else 8)
+            results = analyzer.analyze_portfolio(risk_tolerance=args.risk, max_workers=max_workers,
+                                                 executor=args.executor, resume=args.resume,
+                                                 retry_failed=args.retry_failed, incremental=args.incremental,
+                                                 trace_path=args.trace)
         
         if results.get('success', False):
             # Save results
@@ -845,6 +1161,10 @@ def main():
             print(f"   • Success Rate: {summary.get('success_rate', 0):.1%}")
             print(f"   • Total Strategies: {summary.get('total_strategies_recommended', 0)}")
             print(f"   • Results saved to: {output_file}")
+            if results.get('run_id'):
+                print(f"   • Run ID: {results['run_id']}")
+                if results.get('successful_analyses', 0) < results.get('total_symbols', 0):
+                    print(f"   • Resume failed symbols with: --resume {results['run_id']}")
             
             # Show top strategies
             strategy_dist = summary.get('most_recommended_strategies', [])
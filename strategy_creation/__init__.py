@@ -4,6 +4,8 @@ Handles stock analysis, IV analysis, probability calculations, strike selection,
 """
 
 from .data_manager import DataManager
+from .chain_cache import ChainSnapshotCache
+from .chain_loader import BulkChainLoader
 from .iv_analyzer import IVAnalyzer
 from .probability_engine import ProbabilityEngine
 from .risk_manager import RiskManager
@@ -16,6 +18,8 @@ from .market_analyzer import MarketAnalyzer
 
 __all__ = [
     'DataManager', 
+    'ChainSnapshotCache',
+    'BulkChainLoader',
     'IVAnalyzer', 
     'ProbabilityEngine', 
     'RiskManager',
@@ -0,0 +1,127 @@
+"""
+Option Chain Snapshot Cache
+Run-scoped cache of processed option chains so each symbol is fetched once per run
+"""
+
+import os
+import time
+import logging
+from threading import Lock
+from typing import Dict, Optional, Tuple
+
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+# (symbol, trade_date, expiries)
+ChainKey = Tuple[str, str, Tuple[str, ...]]
+
+
+class ChainSnapshotCache:
+    """
+    Thread-safe cache of processed option chain snapshots
+
+    Snapshots are keyed by (symbol, trade date, expiry set). A request alias
+    (symbol, multiple_expiries) points at the snapshot key that answered it,
+    so repeat lookups within the TTL need no database round trip at all.
+    """
+
+    def __init__(self, ttl_seconds: Optional[float] = None):
+        """
+        Initialize chain cache
+
+        Args:
+            ttl_seconds: Snapshot lifetime in seconds (default: OPTION_CHAIN_CACHE_TTL or 600)
+        """
+        if ttl_seconds is None:
+            ttl_seconds = float(os.getenv('OPTION_CHAIN_CACHE_TTL', '600'))
+        self.ttl_seconds = ttl_seconds
+
+        self._lock = Lock()
+        self._snapshots: Dict[ChainKey, Tuple[float, pd.DataFrame]] = {}
+        self._aliases: Dict[Tuple[str, bool], ChainKey] = {}
+
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, symbol: str, multiple_expiries: bool = False) -> Optional[pd.DataFrame]:
+        """
+        Get cached chain for a symbol request
+
+        Args:
+            symbol: Stock symbol
+            multiple_expiries: Whether the multi-expiry chain was requested
+
+        Returns:
+            Cached DataFrame (shared, do not mutate) or None on miss/expiry
+        """
+        with self._lock:
+            key = self._aliases.get((symbol, multiple_expiries))
+            entry = self._snapshots.get(key) if key else None
+
+            if entry is None:
+                self.misses += 1
+                return None
+
+            stored_at, df = entry
+            if time.time() - stored_at > self.ttl_seconds:
+                self._drop_key(key)
+                self.misses += 1
+                return None
+
+            self.hits += 1
+            return df
+
+    def put(self, symbol: str, multiple_expiries: bool, trade_date: str,
+            expiries, df: pd.DataFrame) -> None:
+        """
+        Store a processed chain snapshot
+
+        Args:
+            symbol: Stock symbol
+            multiple_expiries: Request flavour the snapshot answers
+            trade_date: Snapshot date (YYYY-MM-DD)
+            expiries: Expiry dates contained in the snapshot
+            df: Processed options DataFrame
+        """
+        key = (symbol, trade_date, tuple(sorted(expiries)))
+        with self._lock:
+            self._snapshots[key] = (time.time(), df)
+            self._aliases[(symbol, multiple_expiries)] = key
+
+    def invalidate(self, symbol: Optional[str] = None) -> None:
+        """
+        Drop cached snapshots
+
+        Args:
+            symbol: Symbol to invalidate, or None to clear everything
+        """
+        with self._lock:
+            if symbol is None:
+                self._snapshots.clear()
+                self._aliases.clear()
+                logger.info("Option chain cache cleared")
+                return
+
+            for key in [k for k in self._snapshots if k[0] == symbol]:
+                self._drop_key(key)
+            for alias in [a for a in self._aliases if a[0] == symbol]:
+                del self._aliases[alias]
+
+    def get_stats(self) -> Dict:
+        """Get cache hit/miss statistics"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / lookups if lookups > 0 else 0.0,
+                'snapshots': len(self._snapshots),
+                'ttl_seconds': self.ttl_seconds
+            }
+
+    def _drop_key(self, key: ChainKey) -> None:
+        """Remove a snapshot and any aliases pointing at it (lock must be held)"""
+        self._snapshots.pop(key, None)
+        for alias in [a for a, k in self._aliases.items() if k == key]:
+            del self._aliases[alias]
@@ -0,0 +1,199 @@
+"""
+Bulk Option Chain Loader
+Pulls the latest option chain snapshot for the whole F&O universe in a few paginated queries
+"""
+
+import os
+import logging
+from datetime import datetime
+from typing import Dict, List, Optional
+
+import pandas as pd
+
+try:
+    from utils.async_supabase import AsyncSupabasePool, AsyncDataAccess, run_sync
+    ASYNC_SUPABASE_AVAILABLE = True
+except ImportError:
+    ASYNC_SUPABASE_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+
+def select_monthly_expiry(expiries: List[str], now: Optional[datetime] = None) -> Optional[str]:
+    """
+    Select monthly expiry using the 20th rule
+
+    Up to the 20th the current month expiry is used, after that the next
+    month's. Returns None when no expiry matches (callers fall back to the
+    nearest expiry).
+
+    Args:
+        expiries: Expiry dates (YYYY-MM-DD)
+        now: Date the rule is applied on (default: now)
+    """
+    now = now or datetime.now()
+    for expiry in sorted(expiries):
+        expiry_date = datetime.strptime(expiry, '%Y-%m-%d')
+        if now.day <= 20:
+            if expiry_date.month == now.month:
+                return expiry
+        else:
+            if expiry_date.month > now.month or expiry_date.year > now.year:
+                return expiry
+    return None
+
+
+class BulkChainLoader:
+    """
+    Loads option_chain_data for many symbols at once
+
+    Resolves the latest snapshot date once, then streams every row of that
+    date for the requested symbols using keyset pagination on the primary key
+    (Supabase caps each response at 1000 rows). Each symbol keeps all of its
+    own expiries, so the 20th rule and the two-expiry Calendar Spread chain
+    are resolved per symbol exactly as the per-symbol query path does.
+
+    The symbol chunks are streamed concurrently through AsyncSupabasePool
+    when it is available, and one after another through the Supabase client
+    otherwise or if the async load fails.
+    """
+
+    def __init__(self, supabase_client, page_size: int = 1000, symbol_chunk_size: int = 100,
+                 use_async: Optional[bool] = None, async_pool=None):
+        """
+        Initialize bulk loader
+
+        Args:
+            supabase_client: Supabase client instance
+            page_size: Rows per page (must not exceed the PostgREST max rows)
+            symbol_chunk_size: Symbols per in_() filter to keep URLs short
+            use_async: Stream chunks concurrently (default: BULK_PRELOAD_ASYNC or true)
+            async_pool: AsyncSupabasePool to stream through (default: one from the environment)
+        """
+        self.supabase = supabase_client
+        self.page_size = page_size
+        self.symbol_chunk_size = symbol_chunk_size
+        self.request_count = 0
+
+        if use_async is None:
+            use_async = os.getenv('BULK_PRELOAD_ASYNC', 'true').lower() == 'true'
+        self.use_async = use_async and ASYNC_SUPABASE_AVAILABLE
+        self.async_pool = async_pool
+
+    def resolve_latest_date(self) -> Optional[str]:
+        """Get the latest snapshot date (YYYY-MM-DD) in option_chain_data"""
+        response = self.supabase.table('option_chain_data')\
+            .select('created_at')\
+            .order('created_at', desc=True)\
+            .limit(1)\
+            .execute()
+        self.request_count += 1
+
+        if not response.data:
+            return None
+        return response.data[0]['created_at'].split('T')[0]
+
+    def load(self, symbols: Optional[List[str]] = None) -> Dict:
+        """
+        Load the latest chain snapshot for all symbols
+
+        Args:
+            symbols: Symbols to load (None loads every symbol in the snapshot)
+
+        Returns:
+            Dictionary with 'trade_date', 'requests', 'chains' mapping
+            symbol -> raw (database column) DataFrame with every expiry of the
+            snapshot, and 'expiries' mapping symbol -> its sorted expiries
+        """
+        result = {'trade_date': None, 'expiries': {}, 'requests': 0, 'chains': {}}
+        start_count = self.request_count
+
+        latest_date = self.resolve_latest_date()
+        if not latest_date:
+            logger.warning("No option chain snapshot found for bulk load")
+            return result
+
+        result['trade_date'] = latest_date
+
+        if symbols:
+            chunks = [symbols[i:i + self.symbol_chunk_size]
+                      for i in range(0, len(symbols), self.symbol_chunk_size)]
+        else:
+            chunks = [None]
+
+        rows = None
+        if self.use_async and symbols:
+            try:
+                rows = self._stream_rows_async(latest_date, symbols)
+            except Exception as e:
+                logger.warning(f"Async bulk load failed, streaming chunks sequentially: {e}")
+        if rows is None:
+            rows = []
+            for chunk in chunks:
+                rows.extend(self._stream_rows(latest_date, chunk))
+
+        result['requests'] = self.request_count - start_count
+
+        if not rows:
+            logger.warning(f"Bulk load returned no rows for {latest_date}")
+            return result
+
+        df = pd.DataFrame(rows)
+        result['chains'] = {
+            symbol: symbol_df.reset_index(drop=True)
+            for symbol, symbol_df in df.groupby('symbol', sort=False)
+        }
+        # Expiries per (symbol, expiry_date) group, not across the whole snapshot
+        for (symbol, expiry), _ in df.groupby(['symbol', 'expiry_date'], sort=True):
+            result['expiries'].setdefault(symbol, []).append(expiry)
+
+        logger.info(f"Bulk loaded {len(rows)} option rows for {len(result['chains'])} symbols "
+                    f"({latest_date}) in {result['requests']} requests")
+        return result
+
+    def _stream_rows_async(self, latest_date: str, symbols: List[str]) -> List[Dict]:
+        """Stream all symbol chunks of a snapshot date concurrently through the async pool"""
+        pool = self.async_pool or AsyncSupabasePool()
+
+        async def stream() -> Dict[str, List[Dict]]:
+            async with pool:
+                access = AsyncDataAccess(pool, page_size=self.page_size)
+                try:
+                    return await access.get_option_chains(symbols, latest_date,
+                                                          symbol_chunk_size=self.symbol_chunk_size)
+                finally:
+                    self.request_count += pool.request_count
+                    pool.request_count = 0
+
+        chains = run_sync(stream())
+        return [row for rows in chains.values() for row in rows]
+
+    def _stream_rows(self, latest_date: str, symbols: Optional[List[str]]) -> List[Dict]:
+        """Stream all rows for a snapshot date using keyset pagination on id"""
+        rows = []
+        last_id = None
+
+        while True:
+            query = self.supabase.table('option_chain_data')\
+                .select('*')\
+                .gte('created_at', f"{latest_date}T00:00:00")\
+                .lt('created_at', f"{latest_date}T23:59:59")
+
+            if symbols:
+                query = query.in_('symbol', symbols)
+            if last_id is not None:
+                query = query.gt('id', last_id)
+
+            response = query.order('id').limit(self.page_size).execute()
+            self.request_count += 1
+
+            if not response.data:
+                break
+
+            rows.extend(response.data)
+            last_id = response.data[-1]['id']
+
+            if len(response.data) < self.page_size:
+                break
+
+        return rows
@@ -7,17 +7,19 @@ from supabase import create_client
 import os
 import logging
 from datetime import datetime
-from typing import Dict, Optional, List
+from typing import Dict, Optional, List, Tuple
 
 from .lot_size_manager import LotSizeManager
 from .volatility_surface import VolatilitySurface
+from .chain_cache import ChainSnapshotCache
+from .chain_loader import BulkChainLoader, select_monthly_expiry
 
 logger = logging.getLogger(__name__)
 
 class DataManager:
     """Handles all data fetching and processing operations"""
     
-    def __init__(self):
+    def __init__(self, chain_cache: Optional[ChainSnapshotCache] = None):
         # Use connection pool for better connection management
         try:
             from ..utils.connection_pool import get_connection_pool
@@ -31,8 +33,34 @@ class DataManager:
             )
             self.connection_pool = None
             
-        self.lot_manager = LotSizeManager()
-        self.vol_surface = VolatilitySurface()
+        self._init_state(chain_cache)
+    
+    def _init_state(self, chain_cache: Optional[ChainSnapshotCache] = None,
+                    lot_manager: Optional[LotSizeManager] = None,
+                    vol_surface: Optional[VolatilitySurface] = None) -> None:
+        """
+        Set up everything except the database client
+        
+        Subclasses that replace the client (e.g., fixture replays) call this
+        instead of __init__ so no attribute is left unset.
+        
+        Args:
+            chain_cache: Option chain snapshot cache (default: new cache)
+            lot_manager: Lot size manager (default: new LotSizeManager)
+            vol_surface: Volatility surface (default: new VolatilitySurface)
+        """
+        self.lot_manager = lot_manager or LotSizeManager()
+        self.vol_surface = vol_surface or VolatilitySurface()
+        
+        # Run-scoped option chain snapshots shared by all accessors
+        self.chain_cache = chain_cache or ChainSnapshotCache()
+        
+        # Raw per-symbol chains from the bulk preload (served before any DB query)
+        self._preloaded_chains: Dict[str, pd.DataFrame] = {}
+        self._preloaded_date: Optional[str] = None
+        
+        # Last error raised while fetching a symbol's chain (None answers mean no data otherwise)
+        self._fetch_errors: Dict[str, str] = {}
         
     def get_portfolio_symbols(self) -> List[str]:
         """Fetch FNO-enabled stocks from stock_data table"""
@@ -51,97 +79,144 @@ class DataManager:
             logger.error(f"Error fetching FNO stocks: {e}")
             return []
     
+    def preload_options_data(self, symbols: List[str]) -> int:
+        """
+        Bulk load the latest chain snapshot for all symbols in a few paginated queries
+        
+        Args:
+            symbols: Symbols to preload
+            
+        Returns:
+            Number of symbols preloaded (symbols left out fall back to per-symbol queries)
+        """
+        try:
+            loader = BulkChainLoader(self.supabase)
+            result = loader.load(symbols)
+            
+            self._preloaded_chains = result['chains']
+            self._preloaded_date = result['trade_date']
+            
+            missing = len(set(symbols) - set(self._preloaded_chains))
+            if missing:
+                logger.info(f"{missing} symbols not in bulk snapshot, will be fetched individually")
+            
+            return len(self._preloaded_chains)
+            
+        except Exception as e:
+            logger.error(f"Error bulk loading options data: {e}")
+            self._preloaded_chains = {}
+            self._preloaded_date = None
+            return 0
+    
+    def get_preloaded_chains(self) -> Tuple[Optional[str], Dict[str, pd.DataFrame]]:
+        """
+        Get the bulk-preloaded raw chains (e.g., to hand them to worker processes)
+        
+        Returns:
+            Tuple of (trade_date, {symbol: raw chain DataFrame})
+        """
+        return self._preloaded_date, self._preloaded_chains
+    
+    def set_preloaded_chains(self, trade_date: Optional[str], chains: Dict[str, pd.DataFrame]) -> None:
+        """
+        Install raw chains preloaded by another DataManager (e.g., in a worker process)
+        
+        Args:
+            trade_date: Snapshot date of the chains
+            chains: {symbol: raw chain DataFrame} holding every expiry of the snapshot
+        """
+        self._preloaded_date = trade_date
+        self._preloaded_chains = chains
+    
     def get_options_data(self, symbol: str, multiple_expiries: bool = False) -> Optional[pd.DataFrame]:
-        """Fetch options chain data for symbol - MONTHLY EXPIRY ONLY WITH TOP 10 OI STRIKES"""
+        """Get options chain data for symbol - MONTHLY EXPIRY ONLY WITH TOP 10 OI STRIKES"""
+        df = self._get_chain_snapshot(symbol, multiple_expiries)
+        return df.copy() if df is not None else None
+    
+    def _get_chain_snapshot(self, symbol: str, multiple_expiries: bool = False) -> Optional[pd.DataFrame]:
+        """Get shared (read-only) chain snapshot from cache, fetching on miss"""
+        cached_df = self.chain_cache.get(symbol, multiple_expiries)
+        if cached_df is not None:
+            return cached_df
+        return self._fetch_options_data(symbol, multiple_expiries)
+    
+    def _fetch_options_data(self, symbol: str, multiple_expiries: bool = False) -> Optional[pd.DataFrame]:
+        """
+        Fetch options chain data for symbol and store it in the chain cache
+        
+        Rows come from the bulk preload when the symbol was part of it,
+        otherwise from per-symbol database queries.
+        """
         import time
         max_retries = 3
+        self._fetch_errors.pop(symbol, None)
+        
+        # Same rows the per-symbol queries below return for the snapshot date: every expiry of the symbol
+        preloaded_df = self._preloaded_chains.get(symbol)
         
         for attempt in range(max_retries):
             try:
-                # First get the latest date for this symbol
-                latest_date_response = self.supabase.table('option_chain_data')\
-                    .select('created_at')\
-                .eq('symbol', symbol)\
-                .order('created_at', desc=True)\
-                .limit(1)\
-                .execute()
-                
-                if not latest_date_response.data:
-                    logger.warning(f"No options data found for {symbol}")
-                    return None
-                
-                # Extract date part only (YYYY-MM-DD)
-                latest_date = latest_date_response.data[0]['created_at'].split('T')[0]
-                
-                # Determine which monthly expiry to fetch based on current date
-                current_day = datetime.now().day
-                
-                # Get all available expiries for the latest date
-                expiry_response = self.supabase.table('option_chain_data')\
-                .select('expiry_date')\
-                .eq('symbol', symbol)\
-                .gte('created_at', f"{latest_date}T00:00:00")\
-                .lt('created_at', f"{latest_date}T23:59:59")\
-                .execute()
-                
-                if not expiry_response.data:
-                    logger.warning(f"No expiries found for {symbol}")
-                    return None
-                
-                # Get unique expiries and sort them
-                expiries = sorted(list(set([row['expiry_date'] for row in expiry_response.data])))
-                
-                if multiple_expiries and len(expiries) >= 2:
-                    # For strategies like Calendar Spread, fetch first 2 expiries
-                    target_expiries = expiries[:2]
-                    logger.info(f"Fetching multiple expiries for {symbol}: {target_expiries}")
+                if preloaded_df is not None:
+                    latest_date = self._preloaded_date
+                    expiries = sorted(preloaded_df['expiry_date'].unique())
+                else:
+                    # First get the latest date for this symbol
+                    latest_date_response = self.supabase.table('option_chain_data')\
+                        .select('created_at')\
+                        .eq('symbol', symbol)\
+                        .order('created_at', desc=True)\
+                        .limit(1)\
+                        .execute()
                     
-                    # Fetch data for multiple expiries
-                    response = self.supabase.table('option_chain_data')\
-                        .select('*')\
+                    if not latest_date_response.data:
+                        logger.warning(f"No options data found for {symbol}")
+                        return None
+                    
+                    # Extract date part only (YYYY-MM-DD)
+                    latest_date = latest_date_response.data[0]['created_at'].split('T')[0]
+                    
+                    # Get all available expiries for the latest date
+                    expiry_response = self.supabase.table('option_chain_data')\
+                        .select('expiry_date')\
                         .eq('symbol', symbol)\
-                        .in_('expiry_date', target_expiries)\
                         .gte('created_at', f"{latest_date}T00:00:00")\
                         .lt('created_at', f"{latest_date}T23:59:59")\
                         .execute()
-                else:
-                    # Select appropriate monthly expiry based on 20th rule
-                    target_expiry = None
-                    for expiry in expiries:
-                        expiry_date = datetime.strptime(expiry, '%Y-%m-%d')
-                        # Check if this is a monthly expiry (last Thursday of month logic can be added)
-                        if current_day <= 20:
-                            # Use current month expiry
-                            if expiry_date.month == datetime.now().month:
-                                target_expiry = expiry
-                                break
-                        else:
-                            # Use next month expiry
-                            if expiry_date.month > datetime.now().month or expiry_date.year > datetime.now().year:
-                                target_expiry = expiry
-                                break
-                    
-                    if not target_expiry:
-                        # Fallback to nearest expiry
-                        target_expiry = expiries[0]
                     
-                    logger.info(f"Selected expiry: {target_expiry} for {symbol} (current day: {current_day})")
+                    if not expiry_response.data:
+                        logger.warning(f"No expiries found for {symbol}")
+                        return None
                     
-                    # Fetch all data for the selected expiry
+                    # Get unique expiries and sort them
+                    expiries = sorted(list(set([row['expiry_date'] for row in expiry_response.data])))
+                
+                if multiple_expiries and len(expiries) >= 2:
+                    # For strategies like Calendar Spread, fetch first 2 expiries
+                    target_expiries = expiries[:2]
+                    logger.info(f"Fetching multiple expiries for {symbol}: {target_expiries}")
+                else:
+                    # Select appropriate monthly expiry based on 20th rule, fallback to nearest expiry
+                    target_expiry = select_monthly_expiry(expiries) or expiries[0]
+                    target_expiries = [target_expiry]
+                    logger.info(f"Selected expiry: {target_expiry} for {symbol} (current day: {datetime.now().day})")
+                
+                if preloaded_df is not None:
+                    df = preloaded_df[preloaded_df['expiry_date'].isin(target_expiries)].copy()
+                else:
+                    # Fetch all data for the selected expiries
                     response = self.supabase.table('option_chain_data')\
                         .select('*')\
                         .eq('symbol', symbol)\
-                        .eq('expiry_date', target_expiry)\
+                        .in_('expiry_date', target_expiries)\
                         .gte('created_at', f"{latest_date}T00:00:00")\
                         .lt('created_at', f"{latest_date}T23:59:59")\
                         .execute()
+                    df = pd.DataFrame(response.data)
                 
-                if not response.data:
+                if df.empty:
                     logger.warning(f"No options data found for {symbol} on {latest_date}")
                     return None
                 
-                df = pd.DataFrame(response.data)
-                
                 # Convert numeric columns (using actual database column names)
                 numeric_cols = ['strike_price', 'open_interest', 'volume', 'ltp', 
                               'bid', 'ask', 'delta', 'gamma', 'theta', 'vega', 'implied_volatility',
@@ -180,19 +255,17 @@ class DataManager:
                     # Fit smile from market data
                     smile_params = self.vol_surface.fit_smile_from_options_chain(df_filtered)
                     
+                    # Add adjusted IV column based on smile (default smile if calibration failed)
+                    df_filtered['smile_adjusted_iv'] = self.vol_surface.smile_adjusted_iv_array(
+                        strikes=df_filtered['strike'].to_numpy(),
+                        spot=df_filtered['spot_price'].to_numpy(),
+                        option_types=df_filtered['option_type'].to_numpy(),
+                        base_ivs=df_filtered['iv'].to_numpy() if 'iv' in df_filtered.columns else 25.0,
+                        expiry=df_filtered['expiry'].to_numpy() if 'expiry' in df_filtered.columns else 'default',
+                        use_market_calibration=bool(smile_params)
+                    )
+                    
                     if smile_params:
-                        # Add adjusted IV column based on smile
-                        df_filtered['smile_adjusted_iv'] = df_filtered.apply(
-                            lambda row: self.vol_surface.calculate_smile_adjusted_iv(
-                                strike=row['strike'],
-                                spot=row['spot_price'],
-                                expiry=row.get('expiry', 'default'),
-                                option_type=row['option_type'],
-                                base_iv=row.get('iv', 25.0),
-                                use_market_calibration=True
-                            ), axis=1
-                        )
-                        
                         # Calculate smile risk metrics
                         smile_metrics = self.vol_surface.calculate_smile_risk_metrics(df_filtered)
                         
@@ -205,24 +278,14 @@ class DataManager:
                                    f"Put skew={smile_params.get('put_skew_slope', 0):.3f}, "
                                    f"Call skew={smile_params.get('call_skew_slope', 0):.3f}")
                     else:
-                        # Use default smile if calibration fails
-                        df_filtered['smile_adjusted_iv'] = df_filtered.apply(
-                            lambda row: self.vol_surface.calculate_smile_adjusted_iv(
-                                strike=row['strike'],
-                                spot=row['spot_price'],
-                                expiry=row.get('expiry', 'default'),
-                                option_type=row['option_type'],
-                                base_iv=row.get('iv', 25.0),
-                                use_market_calibration=False
-                            ), axis=1
-                        )
                         logger.warning(f"Using default smile for {symbol}")
                         
                 except Exception as e:
                     logger.error(f"Error applying volatility smile for {symbol}: {e}")
                     # Fallback: use original IV
                     df_filtered['smile_adjusted_iv'] = df_filtered['iv']
-            
+                
+                self.chain_cache.put(symbol, multiple_expiries, latest_date, target_expiries, df_filtered)
                 return df_filtered
                 
             except Exception as e:
@@ -232,16 +295,33 @@ class DataManager:
                     continue
                 else:
                     logger.error(f"Error fetching options data for {symbol}: {e}")
+                    self._fetch_errors[symbol] = str(e)
                     return None
         
         # If we exhausted all retries
         logger.error(f"Failed to fetch options data for {symbol} after {max_retries} attempts")
+        self._fetch_errors[symbol] = f"Failed after {max_retries} attempts"
         return None
     
+    def get_fetch_error(self, symbol: str) -> Optional[str]:
+        """
+        Error of the last failed chain fetch for symbol
+        
+        Tells a fetch that raised (network, database) apart from a symbol
+        that has no chain data, since both make the accessors return None.
+        
+        Args:
+            symbol: Stock symbol
+        
+        Returns:
+            Error message, or None if the last fetch did not raise
+        """
+        return self._fetch_errors.get(symbol)
+    
     def get_spot_price(self, symbol: str) -> Optional[float]:
         """Get current spot price for symbol"""
         try:
-            options_df = self.get_options_data(symbol)
+            options_df = self._get_chain_snapshot(symbol)
             if options_df is None or options_df.empty:
                 return None
             
@@ -261,7 +341,7 @@ class DataManager:
                           max_spread_pct: float = 0.05) -> Optional[pd.DataFrame]:
         """Filter options for liquidity"""
         try:
-            df = self.get_options_data(symbol)
+            df = self._get_chain_snapshot(symbol)
             if df is None or df.empty:
                 return None
             
@@ -286,13 +366,13 @@ class DataManager:
             if spot_price is None:
                 return None
             
-            df = self.get_options_data(symbol)
+            df = self._get_chain_snapshot(symbol)
             if df is None or df.empty:
                 return None
             
-            # Find closest strike to spot
-            df['strike_diff'] = abs(df['strike'] - spot_price)
-            atm_strike = df.loc[df['strike_diff'].idxmin(), 'strike']
+            # Find closest strike to spot (without mutating the shared snapshot)
+            strike_diff = (df['strike'] - spot_price).abs()
+            atm_strike = df.loc[strike_diff.idxmin(), 'strike']
             
             return float(atm_strike)
             
@@ -309,7 +389,7 @@ class DataManager:
                 return []
             
             # Filter by option type
-            type_df = df[df['option_type'] == option_type.upper()]
+            type_df = df[df['option_type'] == option_type.upper()].copy()
             if type_df.empty:
                 return []
             
@@ -362,4 +442,26 @@ class DataManager:
         Returns:
             DataFrame with options from multiple expiries, or None if insufficient expiries
         """
-        return self.get_options_data(symbol, multiple_expiries=True)
\ No newline at end of file
+        return self.get_options_data(symbol, multiple_expiries=True)
+    
+    def get_cache_stats(self) -> Dict:
+        """
+        Get option chain cache hit/miss statistics
+        
+        Returns:
+            Dictionary with hits, misses, hit_rate and snapshot count
+        """
+        return self.chain_cache.get_stats()
+    
+    def invalidate_options_cache(self, symbol: Optional[str] = None):
+        """
+        Invalidate cached option chain snapshots (and any bulk-preloaded rows)
+        
+        Args:
+            symbol: Symbol to invalidate, or None to clear all snapshots
+        """
+        self.chain_cache.invalidate(symbol)
+        if symbol is None:
+            self._preloaded_chains = {}
+        else:
+            self._preloaded_chains.pop(symbol, None)
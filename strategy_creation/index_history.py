@@ -0,0 +1,222 @@
+"""
+Market Index History Cache
+Process-wide, daily-refreshed index price history with on-disk Parquet backing,
+plus vectorized beta/correlation/relative-strength against the index
+"""
+
+import os
+import logging
+from datetime import date
+from threading import Lock
+from typing import Dict, Optional
+
+import numpy as np
+import pandas as pd
+import yfinance as yf
+
+from .price_history_store import normalize_daily_index
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CACHE_DIR = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+    'cache',
+    'index_history'
+)
+
+# Minimum aligned observations, matching the original per-symbol checks
+MIN_BETA_OBSERVATIONS = 60
+RELATIVE_STRENGTH_DAYS = 63
+
+
+class IndexHistoryCache:
+    """
+    Caches index OHLCV history for the current trading day
+
+    Each (ticker, period) is downloaded at most once per day per process.
+    When Parquet support (pyarrow) is installed the history is also written
+    to disk so later runs on the same day skip the download entirely.
+    """
+
+    def __init__(self, cache_dir: Optional[str] = None):
+        self.cache_dir = cache_dir or os.getenv('INDEX_HISTORY_CACHE_DIR', DEFAULT_CACHE_DIR)
+        self._lock = Lock()
+        self._memory: Dict[tuple, tuple] = {}  # (ticker, period) -> (as_of_date, DataFrame)
+
+    def get_history(self, ticker: str = '^NSEI', period: str = '1y') -> pd.DataFrame:
+        """
+        Get index history, refreshing at most once per day
+
+        Args:
+            ticker: Yahoo Finance index ticker
+            period: History period
+
+        Returns:
+            OHLCV DataFrame (empty if unavailable)
+        """
+        key = (ticker, period)
+        today = date.today()
+
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry and entry[0] == today:
+                return entry[1]
+
+            history = self._read_disk(ticker, period, today)
+            if history is None:
+                history = self._download(ticker, period)
+                if not history.empty:
+                    self._write_disk(ticker, period, history)
+
+            if not history.empty:
+                self._memory[key] = (today, history)
+            return history
+
+    def clear(self):
+        """Drop in-memory histories (disk snapshots expire on their own)"""
+        with self._lock:
+            self._memory.clear()
+
+    def _download(self, ticker: str, period: str) -> pd.DataFrame:
+        """Download index history from Yahoo Finance"""
+        try:
+            history = yf.Ticker(ticker).history(period=period)
+            if history.empty:
+                logger.warning(f"Could not fetch {ticker} history")
+            else:
+                history.index = normalize_daily_index(history.index)
+                logger.info(f"Downloaded {len(history)} bars of {ticker} history ({period})")
+            return history
+        except Exception as e:
+            logger.error(f"Error downloading {ticker} history: {e}")
+            return pd.DataFrame()
+
+    def _disk_path(self, ticker: str, period: str) -> str:
+        safe_ticker = ticker.replace('^', '').replace('/', '_')
+        return os.path.join(self.cache_dir, f"{safe_ticker}_{period}.parquet")
+
+    def _read_disk(self, ticker: str, period: str, today: date) -> Optional[pd.DataFrame]:
+        """Read today's on-disk snapshot if present"""
+        path = self._disk_path(ticker, period)
+        try:
+            if not os.path.exists(path) or date.fromtimestamp(os.path.getmtime(path)) != today:
+                return None
+            return pd.read_parquet(path)
+        except Exception as e:
+            logger.debug(f"Index history snapshot unavailable ({path}): {e}")
+            return None
+
+    def _write_disk(self, ticker: str, period: str, history: pd.DataFrame):
+        """Persist history snapshot (skipped when Parquet support is missing)"""
+        path = self._disk_path(ticker, period)
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            history.to_parquet(path)
+        except Exception as e:
+            logger.debug(f"Could not write index history snapshot ({path}): {e}")
+
+
+def calculate_index_metrics_bulk(closes: pd.DataFrame, index_close: pd.Series) -> pd.DataFrame:
+    """
+    Beta, correlation and relative strength of many stocks vs an index at once
+
+    Closes are aligned on the index's dates and turned into one returns
+    matrix; covariances use pairwise-complete observations per column.
+
+    Args:
+        closes: Close prices, one column per symbol
+        index_close: Index close prices
+
+    Returns:
+        DataFrame indexed by symbol with beta, correlation and relative_strength
+    """
+    closes = closes.set_axis(normalize_daily_index(closes.index), axis=0)
+    index_close = index_close.set_axis(normalize_daily_index(index_close.index))
+
+    aligned = closes.reindex(index_close.index).to_numpy(dtype=float)
+    market = index_close.to_numpy(dtype=float)
+
+    stock_returns = aligned[1:] / aligned[:-1] - 1
+    market_returns = (market[1:] / market[:-1] - 1)[:, None]
+
+    mask = ~np.isnan(stock_returns) & ~np.isnan(market_returns)
+    n_obs = mask.sum(axis=0)
+    denom = np.where(n_obs > 1, n_obs - 1, np.nan)
+
+    stock_returns = np.where(mask, stock_returns, 0.0)
+    masked_market = np.where(mask, market_returns, 0.0)
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        stock_mean = stock_returns.sum(axis=0) / n_obs
+        market_mean = masked_market.sum(axis=0) / n_obs
+
+        stock_dev = np.where(mask, stock_returns - stock_mean, 0.0)
+        market_dev = np.where(mask, masked_market - market_mean, 0.0)
+
+        covariance = (stock_dev * market_dev).sum(axis=0) / denom
+        stock_var = (stock_dev ** 2).sum(axis=0) / denom
+        market_var = (market_dev ** 2).sum(axis=0) / denom
+
+        beta = np.where((n_obs >= MIN_BETA_OBSERVATIONS) & (market_var > 0), covariance / market_var, 1.0)
+        correlation = covariance / np.sqrt(stock_var * market_var)
+        correlation = np.where(np.isfinite(correlation), correlation, 0.5)
+
+        # Relative strength ends on each stock's last close that has an index close on the same
+        # day (a stock without today's bar must not read as NaN); gaps at the start row are
+        # filled with the previous close
+        both_valid = ~np.isnan(aligned) & ~np.isnan(market)[:, None]
+        end = len(market) - 1 - np.argmax(both_valid[::-1], axis=0)
+        start = end - (RELATIVE_STRENGTH_DAYS - 1)
+        usable = both_valid.any(axis=0) & (start >= 0)
+        start = np.maximum(start, 0)
+
+        columns = np.arange(aligned.shape[1])
+        filled = pd.DataFrame(aligned).ffill().to_numpy()
+        filled_market = pd.Series(market).ffill().to_numpy()
+        stock_return = aligned[end, columns] / filled[start, columns] - 1
+        market_return = market[end] / filled_market[start] - 1
+        relative_strength = np.where(usable & (market_return != 0),
+                                     (1 + stock_return) / (1 + market_return), 1.0)
+        relative_strength = np.where(np.isfinite(relative_strength), relative_strength, 1.0)
+
+    return pd.DataFrame({
+        'beta': np.round(beta, 2),
+        'correlation': np.round(correlation, 2),
+        'relative_strength': np.round(relative_strength, 2)
+    }, index=closes.columns)
+
+
+def calculate_index_metrics(stock_close: pd.Series, index_close: pd.Series) -> Dict[str, float]:
+    """
+    Beta, correlation and relative strength of one stock vs an index
+
+    Args:
+        stock_close: Stock close prices
+        index_close: Index close prices
+
+    Returns:
+        Dictionary with beta, correlation and relative_strength
+    """
+    metrics = calculate_index_metrics_bulk(stock_close.to_frame('stock'), index_close)
+    return {key: float(value) for key, value in metrics.loc['stock'].items()}
+
+
+# Global index history cache instance
+_index_history_cache: Optional[IndexHistoryCache] = None
+_index_history_lock = Lock()
+
+
+def get_index_history_cache() -> IndexHistoryCache:
+    """
+    Get or create the process-wide index history cache
+
+    Returns:
+        IndexHistoryCache instance
+    """
+    global _index_history_cache
+
+    with _index_history_lock:
+        if _index_history_cache is None:
+            _index_history_cache = IndexHistoryCache()
+
+    return _index_history_cache
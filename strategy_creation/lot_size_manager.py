@@ -3,8 +3,11 @@ Lot Size Manager for Options V4 System
 Handles lot size fetching from Supabase with BS suffix isolation
 """
 
+import json
 import logging
-from typing import Optional
+from types import MappingProxyType
+from threading import Lock
+from typing import Dict, Mapping, Optional
 from datetime import datetime
 import sys
 import os
@@ -14,6 +17,176 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(
 
 logger = logging.getLogger(__name__)
 
+MONTH_COLUMNS = {
+    1: 'jan', 2: 'feb', 3: 'mar', 4: 'apr',
+    5: 'may', 6: 'jun', 7: 'jul', 8: 'aug',
+    9: 'sep', 10: 'oct', 11: 'nov', 12: 'dec'
+}
+
+DEFAULT_SNAPSHOT_DIR = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+    'cache',
+    'lot_sizes'
+)
+
+
+class LotSizeStore:
+    """
+    Process-wide lot sizes for the current month
+
+    The current-month column of the lots table is loaded for the whole F&O
+    universe in one paginated read and published as an immutable map. The
+    map is rebuilt when the month rolls over. A JSON snapshot per month
+    (LOT_SIZE_SNAPSHOT_DIR, empty to disable) lets cold starts skip the
+    database entirely.
+    """
+
+    PAGE_SIZE = 1000
+
+    def __init__(self, snapshot_dir: Optional[str] = None):
+        if snapshot_dir is None:
+            snapshot_dir = os.getenv('LOT_SIZE_SNAPSHOT_DIR', DEFAULT_SNAPSHOT_DIR)
+        self.snapshot_dir = snapshot_dir
+
+        self._lock = Lock()
+        self._lot_sizes: Optional[Mapping[str, int]] = None
+        self._period: Optional[str] = None
+
+    def get_lot_sizes(self, supabase_client) -> Optional[Mapping[str, int]]:
+        """
+        Get the current month's lot sizes, loading them on first use or month change
+
+        Args:
+            supabase_client: Supabase client used when no snapshot is available
+
+        Returns:
+            Read-only map of clean symbol -> lot size, or None if unavailable
+        """
+        period = datetime.now().strftime('%Y-%m')
+        if self._period == period:
+            return self._lot_sizes
+
+        with self._lock:
+            if self._period != period:
+                month_column = MONTH_COLUMNS[datetime.now().month]
+                lot_sizes = self._read_snapshot(period)
+                if lot_sizes is None and supabase_client is not None:
+                    lot_sizes = self._load_from_database(supabase_client, month_column)
+                    if lot_sizes is not None:
+                        self._write_snapshot(period, lot_sizes)
+
+                if lot_sizes is not None:
+                    self._lot_sizes = MappingProxyType(lot_sizes)
+                    self._period = period
+                    logger.info(f"Lot sizes loaded for {len(lot_sizes)} symbols ({month_column})")
+            return self._lot_sizes
+
+    def invalidate(self):
+        """Force a reload from the database on next access"""
+        with self._lock:
+            if self._period and self.snapshot_dir:
+                try:
+                    os.remove(self._snapshot_path(self._period))
+                except OSError:
+                    pass
+            self._lot_sizes = None
+            self._period = None
+
+    def _load_from_database(self, supabase_client, month_column: str) -> Optional[Dict[str, int]]:
+        """Read the month column for every symbol (BS suffix stripped)"""
+        try:
+            lot_sizes = {}
+            offset = 0
+            while True:
+                response = supabase_client.table('lots')\
+                    .select(f'symbol,{month_column}')\
+                    .range(offset, offset + self.PAGE_SIZE - 1)\
+                    .execute()
+                rows = response.data or []
+
+                for row in rows:
+                    lots_symbol, lot_size = row.get('symbol'), row.get(month_column)
+                    # Only the BS rows are lot sizes (the per-symbol lookup queries f"{symbol}BS")
+                    if not lots_symbol or not lots_symbol.endswith('BS') or lot_size is None:
+                        continue
+                    lot_sizes[lots_symbol[:-2]] = int(lot_size)
+
+                if len(rows) < self.PAGE_SIZE:
+                    return lot_sizes
+                offset += self.PAGE_SIZE
+
+        except Exception as e:
+            logger.error(f"Error bulk loading lot sizes: {e}")
+            return None
+
+    def _snapshot_path(self, period: str) -> str:
+        return os.path.join(self.snapshot_dir, f"lots_bs_{period}.json")
+
+    def _read_snapshot(self, period: str) -> Optional[Dict[str, int]]:
+        if not self.snapshot_dir:
+            return None
+        path = self._snapshot_path(period)
+        try:
+            if not os.path.exists(path):
+                return None
+            with open(path) as f:
+                return {symbol: int(size) for symbol, size in json.load(f).items()}
+        except Exception as e:
+            logger.debug(f"Lot size snapshot unavailable ({path}): {e}")
+            return None
+
+    def _write_snapshot(self, period: str, lot_sizes: Dict[str, int]):
+        if not self.snapshot_dir:
+            return
+        path = self._snapshot_path(period)
+        try:
+            os.makedirs(self.snapshot_dir, exist_ok=True)
+            with open(path, 'w') as f:
+                json.dump(lot_sizes, f)
+        except Exception as e:
+            logger.debug(f"Could not write lot size snapshot ({path}): {e}")
+
+
+# Global lot size store and Supabase client shared by all LotSizeManager instances
+_lot_size_store: Optional[LotSizeStore] = None
+_shared_client = None
+_shared_lock = Lock()
+
+
+def get_lot_size_store() -> LotSizeStore:
+    """
+    Get or create the process-wide lot size store
+
+    Returns:
+        LotSizeStore instance
+    """
+    global _lot_size_store
+
+    with _shared_lock:
+        if _lot_size_store is None:
+            _lot_size_store = LotSizeStore()
+
+    return _lot_size_store
+
+
+def _get_shared_client():
+    """Create the lots-table Supabase client once per process"""
+    global _shared_client
+
+    with _shared_lock:
+        if _shared_client is None:
+            from supabase import create_client
+            from dotenv import load_dotenv
+            load_dotenv()
+
+            _shared_client = create_client(
+                os.getenv('NEXT_PUBLIC_SUPABASE_URL'),
+                os.getenv('NEXT_PUBLIC_SUPABASE_ANON_KEY')
+            )
+
+    return _shared_client
+
+
 class LotSizeManager:
     """
     Manages lot size fetching from Supabase lots table
@@ -25,31 +198,19 @@ class LotSizeManager:
     def __init__(self):
         self.cache = {}  # Cache lot sizes to avoid repeated queries
         self.default_lot_size = 100  # Safe default
+        self.store = get_lot_size_store()  # Shared bulk-loaded lot sizes
         
-        # Initialize Supabase client
+        # Supabase client (shared across instances)
         try:
-            from supabase import create_client
-            import os
-            from dotenv import load_dotenv
-            load_dotenv()
-            
-            self.supabase = create_client(
-                os.getenv('NEXT_PUBLIC_SUPABASE_URL'),
-                os.getenv('NEXT_PUBLIC_SUPABASE_ANON_KEY')
-            )
+            self.supabase = _get_shared_client()
             self.db_available = True
-            logger.info("LotSizeManager: Supabase client initialized")
         except Exception as e:
             logger.error(f"LotSizeManager: Failed to initialize Supabase client: {e}")
             self.supabase = None
             self.db_available = False
         
         # Current month mapping
-        self.month_mapping = {
-            1: 'jan', 2: 'feb', 3: 'mar', 4: 'apr',
-            5: 'may', 6: 'jun', 7: 'jul', 8: 'aug', 
-            9: 'sep', 10: 'oct', 11: 'nov', 12: 'dec'
-        }
+        self.month_mapping = MONTH_COLUMNS
         
     
     def get_current_lot_size(self, symbol: str) -> int:
@@ -69,11 +230,22 @@ class LotSizeManager:
             if symbol in self.cache:
                 return self.cache[symbol]
             
+            # Bulk-loaded map for the whole universe (snapshot or one paginated read)
+            lot_sizes = self.store.get_lot_sizes(self.supabase if self.db_available else None)
+            if lot_sizes is not None:
+                if symbol in lot_sizes:
+                    return lot_sizes[symbol]
+                
+                fallback_size = self._get_fallback_lot_size(symbol)
+                self.cache[symbol] = fallback_size
+                logger.warning(f"No lot size found for {symbol}BS in lots table, using fallback {fallback_size}")
+                return fallback_size
+            
             # If database not available, use fallback
             if not self.db_available:
                 return self._get_fallback_lot_size(symbol)
             
-            # Get current month column
+            # Bulk load failed, query this symbol directly
             current_month = self._get_current_month_column()
             
             # Regular stock symbol - just add BS suffix
@@ -128,8 +300,9 @@ class LotSizeManager:
         return symbol  # Always return as-is for other tables
     
     def clear_cache(self):
-        """Clear lot size cache"""
+        """Clear lot size cache (including the shared bulk-loaded map)"""
         self.cache.clear()
+        self.store.invalidate()
         logger.info("Lot size cache cleared")
     
     def get_all_lot_sizes(self, symbols: list) -> dict:
@@ -144,6 +317,7 @@ class LotSizeManager:
         """
         lot_sizes = {}
         
+        # Served from the shared bulk-loaded map after the first call
         for symbol in symbols:
             lot_sizes[symbol] = self.get_current_lot_size(symbol)
         
@@ -185,6 +359,10 @@ class LotSizeManager:
             fallback_symbols = ['DIXON', 'MARICO', 'SUNPHARMA', 'RELIANCE', 'CESC', 'GRANULES']
             return symbol in fallback_symbols
         
+        lot_sizes = self.store.get_lot_sizes(self.supabase)
+        if lot_sizes is not None:
+            return symbol in lot_sizes
+        
         try:
             lots_symbol = f'{symbol}BS'
             response = self.supabase.table('lots').select('symbol').eq('symbol', lots_symbol).execute()
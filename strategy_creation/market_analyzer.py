@@ -14,6 +14,8 @@ parent_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 if parent_dir not in sys.path:
     sys.path.insert(0, parent_dir)
 
+from .max_pain import calculate_max_pain
+
 logger = logging.getLogger(__name__)
 
 class MarketAnalyzer:
@@ -598,7 +600,7 @@ class MarketAnalyzer:
             major_resistance = call_oi_sorted['strike'].min() if not call_oi_sorted.empty else spot_price * 1.05
             major_support = put_oi_sorted['strike'].max() if not put_oi_sorted.empty else spot_price * 0.95
             
-            # Max pain calculation (simplified)
+            # Max pain calculation
             all_strikes = pd.concat([calls['strike'], puts['strike']]).unique()
             max_pain = self._calculate_max_pain(calls, puts, all_strikes)
             
@@ -635,26 +637,8 @@ class MarketAnalyzer:
     def _calculate_max_pain(self, calls: pd.DataFrame, puts: pd.DataFrame, strikes: np.ndarray) -> float:
         """Calculate max pain strike price"""
         try:
-            min_pain_value = float('inf')
-            max_pain_strike = strikes[0] if len(strikes) > 0 else 0
-            
-            for strike in strikes:
-                # Calculate total value if expired at this strike
-                call_value = calls[calls['strike'] < strike]['open_interest'].mul(
-                    strike - calls[calls['strike'] < strike]['strike']
-                ).sum()
-                
-                put_value = puts[puts['strike'] > strike]['open_interest'].mul(
-                    puts[puts['strike'] > strike]['strike'] - strike
-                ).sum()
-                
-                total_value = call_value + put_value
-                
-                if total_value < min_pain_value:
-                    min_pain_value = total_value
-                    max_pain_strike = strike
-            
-            return max_pain_strike
+            result = calculate_max_pain(calls, puts, strikes)
+            return result['max_pain'] if result else 0
             
         except Exception as e:
             logger.error(f"Error calculating max pain: {e}")
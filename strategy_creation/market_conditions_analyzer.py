@@ -10,6 +10,8 @@ from typing import Dict, List, Optional, Tuple, Any
 from datetime import datetime, timedelta
 import yfinance as yf
 
+from .max_pain import calculate_max_pain_from_chain
+
 try:
     from config.options_config import (
         MARKET_CONDITIONS, VIX_THRESHOLDS, PCR_INTERPRETATION,
@@ -948,18 +950,11 @@ class MarketConditionsAnalyzer:
     def _calculate_max_pain(self, df: pd.DataFrame) -> Optional[float]:
         """Calculate max pain from options data"""
         try:
-            # Group by strike and sum OI
-            strikes = df.groupby('strike_price')['open_interest'].sum().reset_index()
-            
-            if strikes.empty:
-                return None
-            
-            # Find strike with maximum OI (simplified max pain)
-            if strikes.empty or strikes['open_interest'].isna().all():
+            if df.empty or df['open_interest'].isna().all():
                 return None
-            max_pain_strike = strikes.loc[strikes['open_interest'].idxmax(), 'strike_price']
             
-            return float(max_pain_strike)
+            result = calculate_max_pain_from_chain(df, strike_col='strike_price')
+            return result['max_pain'] if result else None
             
         except Exception as e:
             logger.error(f"Error calculating max pain: {e}")
@@ -0,0 +1,124 @@
+"""
+Max Pain / OI Profile
+Shared O(n log n) max-pain calculation used by MarketAnalyzer, PriceLevelsAnalyzer
+and MarketConditionsAnalyzer
+"""
+
+from typing import Dict, Optional
+
+import numpy as np
+import pandas as pd
+
+
+def calculate_pain_curve(call_strikes, call_oi, put_strikes, put_oi,
+                         candidates=None) -> Dict[str, np.ndarray]:
+    """
+    Total option-writer payout at expiry for every candidate strike
+
+    Strikes are sorted once; prefix sums of OI and OI x strike give the
+    payout at each candidate in one vectorized pass:
+        call pain(S) = S * sum(oi, k < S) - sum(oi * k, k < S)
+        put pain(S)  = sum(oi * k, k > S) - S * sum(oi, k > S)
+
+    Args:
+        call_strikes, call_oi: Call strikes and open interest
+        put_strikes, put_oi: Put strikes and open interest
+        candidates: Expiry prices to evaluate (default: union of all strikes)
+
+    Returns:
+        Dictionary with sorted 'strikes', 'call_pain', 'put_pain' and 'pain' arrays
+    """
+    call_strikes = np.asarray(call_strikes, dtype=float)
+    call_oi = np.nan_to_num(np.asarray(call_oi, dtype=float))
+    put_strikes = np.asarray(put_strikes, dtype=float)
+    put_oi = np.nan_to_num(np.asarray(put_oi, dtype=float))
+
+    if candidates is None:
+        candidates = np.concatenate([call_strikes, put_strikes])
+    candidates = np.unique(np.asarray(candidates, dtype=float))
+
+    call_order = np.argsort(call_strikes, kind='stable')
+    call_strikes, call_oi = call_strikes[call_order], call_oi[call_order]
+    put_order = np.argsort(put_strikes, kind='stable')
+    put_strikes, put_oi = put_strikes[put_order], put_oi[put_order]
+
+    # Prefix sums with a leading zero so index i covers the first i strikes
+    call_cum_oi = np.concatenate([[0.0], np.cumsum(call_oi)])
+    call_cum_value = np.concatenate([[0.0], np.cumsum(call_oi * call_strikes)])
+    put_cum_oi = np.concatenate([[0.0], np.cumsum(put_oi)])
+    put_cum_value = np.concatenate([[0.0], np.cumsum(put_oi * put_strikes)])
+
+    # Calls with strike strictly below S are ITM
+    below = np.searchsorted(call_strikes, candidates, side='left')
+    call_pain = candidates * call_cum_oi[below] - call_cum_value[below]
+
+    # Puts with strike strictly above S are ITM
+    above = np.searchsorted(put_strikes, candidates, side='right')
+    put_oi_above = put_cum_oi[-1] - put_cum_oi[above]
+    put_value_above = put_cum_value[-1] - put_cum_value[above]
+    put_pain = put_value_above - candidates * put_oi_above
+
+    return {
+        'strikes': candidates,
+        'call_pain': call_pain,
+        'put_pain': put_pain,
+        'pain': call_pain + put_pain
+    }
+
+
+def calculate_max_pain(calls: pd.DataFrame, puts: pd.DataFrame, strikes=None,
+                       strike_col: str = 'strike', oi_col: str = 'open_interest') -> Optional[Dict]:
+    """
+    Max pain strike and full pain curve from call/put chains
+
+    Args:
+        calls: Call options (strike and open interest columns)
+        puts: Put options (strike and open interest columns)
+        strikes: Candidate strikes (default: union of call and put strikes)
+        strike_col: Strike column name
+        oi_col: Open interest column name
+
+    Returns:
+        Dictionary with 'max_pain', 'min_pain_value' and the 'pain_curve'
+        (strike -> total pain), or None if there are no strikes
+    """
+    curve = calculate_pain_curve(
+        calls[strike_col].to_numpy(), calls[oi_col].to_numpy(),
+        puts[strike_col].to_numpy(), puts[oi_col].to_numpy(),
+        candidates=strikes
+    )
+
+    if len(curve['strikes']) == 0:
+        return None
+
+    if strikes is None:
+        best = int(np.argmin(curve['pain']))
+    else:
+        # Ties go to the first candidate in the caller's order
+        candidates = np.asarray(strikes, dtype=float)
+        positions = np.searchsorted(curve['strikes'], candidates)
+        best = int(positions[np.argmin(curve['pain'][positions])])
+
+    return {
+        'max_pain': float(curve['strikes'][best]),
+        'min_pain_value': float(curve['pain'][best]),
+        'pain_curve': dict(zip(curve['strikes'].tolist(), curve['pain'].tolist()))
+    }
+
+
+def calculate_max_pain_from_chain(options_df: pd.DataFrame, strike_col: str = 'strike',
+                                  oi_col: str = 'open_interest') -> Optional[Dict]:
+    """
+    Max pain from a combined chain with an option_type column (CALL/PUT)
+
+    Args:
+        options_df: Options chain
+        strike_col: Strike column name
+        oi_col: Open interest column name
+
+    Returns:
+        Same as calculate_max_pain
+    """
+    calls = options_df[options_df['option_type'] == 'CALL']
+    puts = options_df[options_df['option_type'] == 'PUT']
+    return calculate_max_pain(calls, puts, strike_col=strike_col, oi_col=oi_col)
@@ -0,0 +1,297 @@
+"""
+Price History Store
+Incremental local OHLCV store shared by TechnicalAnalyzer and StockProfiler
+"""
+
+import os
+import time
+import logging
+from datetime import date
+from threading import Lock
+from typing import Dict, List, Optional
+
+import pandas as pd
+import yfinance as yf
+
+try:
+    import pyarrow  # noqa: F401  (Parquet engine)
+    PARQUET_AVAILABLE = True
+except ImportError:
+    PARQUET_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_STORE_DIR = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+    'cache',
+    'price_history'
+)
+
+OHLCV_COLUMNS = ['Open', 'High', 'Low', 'Close', 'Volume']
+
+# Periods that can be served as slices of the stored daily history
+PERIOD_OFFSETS = {
+    '1mo': pd.DateOffset(months=1),
+    '3mo': pd.DateOffset(months=3),
+    '6mo': pd.DateOffset(months=6),
+    '1y': pd.DateOffset(years=1),
+}
+
+# Depth of history kept per symbol (covers the longest period above)
+INITIAL_PERIOD = '1y'
+
+# Seconds before a symbol synced today is synced again, so today's bar follows the session
+DEFAULT_RESYNC_SECONDS = 900
+
+
+class PriceHistoryStore:
+    """
+    Columnar daily OHLCV store, one Parquet file per symbol
+
+    History is downloaded once, then only bars from the last stored bar on
+    are re-fetched. A symbol counts as synced for resync_seconds, after
+    which the last (possibly partial) bar is refreshed again. Readers get
+    slices of the in-memory frame instead of their own downloads. Without
+    pyarrow the store still works in memory for the lifetime of the process.
+    """
+
+    def __init__(self, store_dir: Optional[str] = None, resync_seconds: Optional[float] = None):
+        """
+        Initialize price history store
+
+        Args:
+            store_dir: Parquet directory (default: PRICE_HISTORY_STORE_DIR or cache/price_history)
+            resync_seconds: Age after which a sync is refreshed (default: PRICE_HISTORY_RESYNC_SECONDS or 900)
+        """
+        self.store_dir = store_dir or os.getenv('PRICE_HISTORY_STORE_DIR', DEFAULT_STORE_DIR)
+        self.resync_seconds = (resync_seconds if resync_seconds is not None
+                               else float(os.getenv('PRICE_HISTORY_RESYNC_SECONDS', DEFAULT_RESYNC_SECONDS)))
+        self._frames: Dict[str, pd.DataFrame] = {}
+        self._synced_at: Dict[str, float] = {}
+        self._lock = Lock()
+        self._symbol_locks: Dict[str, Lock] = {}
+
+    def get_history(self, symbol: str, period: str = '1y') -> pd.DataFrame:
+        """
+        Get daily OHLCV history for a symbol
+
+        Args:
+            symbol: Clean symbol name (e.g., 'RELIANCE')
+            period: One of 1mo, 3mo, 6mo, 1y
+
+        Returns:
+            Read-only slice of the stored history (empty if unavailable)
+        """
+        if period not in PERIOD_OFFSETS:
+            raise ValueError(f"Unsupported period for price history store: {period}")
+
+        with self._get_symbol_lock(symbol):
+            if not self._is_fresh(symbol):
+                self._sync_symbol(symbol)
+            frame = self._frames.get(symbol)
+
+        if frame is None or frame.empty:
+            return pd.DataFrame()
+
+        # Index is sorted: binary search and a positional slice instead of a boolean mask copy
+        start = frame.index[-1] - PERIOD_OFFSETS[period]
+        return frame.iloc[frame.index.searchsorted(start, side='right'):]
+
+    def refresh_all(self, symbols: List[str]) -> int:
+        """
+        Bring every symbol up to date with one batched download
+
+        Args:
+            symbols: Clean symbol names
+
+        Returns:
+            Number of symbols with history after the refresh
+        """
+        for symbol in symbols:
+            with self._get_symbol_lock(symbol):
+                if symbol not in self._frames:
+                    self._load_from_disk(symbol)
+
+        stale = [s for s in symbols if not self._is_fresh(s)]
+        if not stale:
+            return sum(1 for s in symbols if s in self._frames)
+
+        # Symbols without history need the full period, the rest only recent bars
+        missing = [s for s in stale if s not in self._frames]
+        existing = [s for s in stale if s in self._frames]
+
+        batches = []
+        if missing:
+            batches.append((missing, {'period': INITIAL_PERIOD}))
+        if existing:
+            last_bar = min(self._frames[s].index[-1] for s in existing)
+            batches.append((existing, {'start': last_bar.strftime('%Y-%m-%d')}))
+
+        for batch_symbols, window in batches:
+            try:
+                downloaded = yf.download(
+                    [f"{s}.NS" for s in batch_symbols],
+                    interval='1d',
+                    group_by='ticker',
+                    auto_adjust=True,
+                    threads=True,
+                    progress=False,
+                    **window
+                )
+            except Exception as e:
+                logger.error(f"Batched price download failed: {e}")
+                continue
+
+            for symbol in batch_symbols:
+                ticker = f"{symbol}.NS"
+                if downloaded is None or downloaded.empty or ticker not in downloaded.columns.get_level_values(0):
+                    continue
+                bars = downloaded[ticker].dropna(how='all')
+                with self._get_symbol_lock(symbol):
+                    self._merge(symbol, bars)
+                    self._synced_at[symbol] = time.time()
+
+        available = sum(1 for s in symbols if s in self._frames)
+        logger.info(f"Price history store refreshed: {available}/{len(symbols)} symbols available")
+        return available
+
+    def export_frames(self, symbols: List[str]) -> Dict[str, pd.DataFrame]:
+        """
+        Get stored histories for symbols (e.g., to hand them to worker processes)
+
+        Args:
+            symbols: Clean symbol names
+
+        Returns:
+            {symbol: full stored history} for symbols that have one
+        """
+        return {s: self._frames[s] for s in symbols if s in self._frames}
+
+    def import_frames(self, frames: Dict[str, pd.DataFrame]):
+        """
+        Install histories synced by another process as freshly synced
+
+        Args:
+            frames: {symbol: stored history}
+        """
+        now = time.time()
+        for symbol, frame in frames.items():
+            with self._get_symbol_lock(symbol):
+                self._frames[symbol] = frame
+                self._synced_at[symbol] = now
+
+    def _is_fresh(self, symbol: str) -> bool:
+        """Whether the symbol was synced today and less than resync_seconds ago"""
+        synced_at = self._synced_at.get(symbol)
+        if synced_at is None or date.fromtimestamp(synced_at) != date.today():
+            return False
+        return time.time() - synced_at < self.resync_seconds
+
+    def _get_symbol_lock(self, symbol: str) -> Lock:
+        with self._lock:
+            if symbol not in self._symbol_locks:
+                self._symbol_locks[symbol] = Lock()
+            return self._symbol_locks[symbol]
+
+    def _sync_symbol(self, symbol: str):
+        """Load stored history and append bars newer than the last one (lock held)"""
+        if symbol not in self._frames:
+            self._load_from_disk(symbol)
+            if self._is_fresh(symbol):
+                return
+
+        frame = self._frames.get(symbol)
+        if frame is None or frame.empty:
+            bars = self._download(symbol, period=INITIAL_PERIOD)
+        else:
+            # Re-fetch the last stored bar too, it may have been a partial session
+            bars = self._download(symbol, start=frame.index[-1].strftime('%Y-%m-%d'))
+
+        self._merge(symbol, bars)
+        self._synced_at[symbol] = time.time()
+
+    def _download(self, symbol: str, **window) -> pd.DataFrame:
+        """Download daily bars for a symbol (NSE suffix first, then bare symbol)"""
+        try:
+            bars = yf.Ticker(f"{symbol}.NS").history(interval='1d', **window)
+            if bars.empty:
+                bars = yf.Ticker(symbol).history(interval='1d', **window)
+            return bars
+        except Exception as e:
+            logger.error(f"Error downloading price history for {symbol}: {e}")
+            return pd.DataFrame()
+
+    def _merge(self, symbol: str, bars: pd.DataFrame):
+        """Append new bars to the stored frame and persist it (lock held)"""
+        if bars is None or bars.empty:
+            return
+
+        bars = bars[[c for c in OHLCV_COLUMNS if c in bars.columns]].copy()
+        bars.index = normalize_daily_index(bars.index)
+
+        frame = self._frames.get(symbol)
+        if frame is not None and not frame.empty:
+            bars = pd.concat([frame, bars])
+            bars = bars[~bars.index.duplicated(keep='last')].sort_index()
+
+        # Keep one extra month beyond the initial period
+        cutoff = bars.index[-1] - PERIOD_OFFSETS[INITIAL_PERIOD] - pd.DateOffset(months=1)
+        bars = bars.loc[bars.index > cutoff]
+
+        self._frames[symbol] = bars
+        self._write_to_disk(symbol, bars)
+
+    def _path(self, symbol: str) -> str:
+        return os.path.join(self.store_dir, f"{symbol.replace('/', '_')}.parquet")
+
+    def _load_from_disk(self, symbol: str):
+        """Load a stored Parquet file (memory-mapped) if present"""
+        if not PARQUET_AVAILABLE:
+            return
+        path = self._path(symbol)
+        if not os.path.exists(path):
+            return
+        try:
+            self._frames[symbol] = pd.read_parquet(path, memory_map=True)
+            # The file was written by the last sync
+            self._synced_at[symbol] = os.path.getmtime(path)
+        except Exception as e:
+            logger.warning(f"Could not read stored price history for {symbol}: {e}")
+
+    def _write_to_disk(self, symbol: str, frame: pd.DataFrame):
+        if not PARQUET_AVAILABLE:
+            return
+        try:
+            os.makedirs(self.store_dir, exist_ok=True)
+            frame.to_parquet(self._path(symbol))
+        except Exception as e:
+            logger.warning(f"Could not persist price history for {symbol}: {e}")
+
+
+def normalize_daily_index(index: pd.Index) -> pd.DatetimeIndex:
+    """Daily bars keyed by tz-naive session date (Ticker.history and download differ)"""
+    index = pd.DatetimeIndex(index)
+    if index.tz is not None:
+        index = index.tz_localize(None)
+    return index.normalize()
+
+
+# Global price history store instance
+_price_history_store: Optional[PriceHistoryStore] = None
+_price_history_lock = Lock()
+
+
+def get_price_history_store() -> PriceHistoryStore:
+    """
+    Get or create the process-wide price history store
+
+    Returns:
+        PriceHistoryStore instance
+    """
+    global _price_history_store
+
+    with _price_history_lock:
+        if _price_history_store is None:
+            _price_history_store = PriceHistoryStore()
+
+    return _price_history_store
@@ -0,0 +1,149 @@
+"""
+Smile Calibration Cache
+Process-wide LRU cache of volatility smile fits keyed by chain fingerprint
+"""
+
+import os
+import hashlib
+import logging
+from collections import OrderedDict
+from threading import Lock
+from typing import Dict, Optional, Tuple
+
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+FINGERPRINT_COLUMNS = ['strike', 'option_type', 'iv']
+
+
+def chain_fingerprint(options_df: pd.DataFrame, spot: float, expiry) -> str:
+    """
+    Hash of the chain inputs a smile fit depends on
+
+    Args:
+        options_df: Options used for the fit (strike, option_type, iv)
+        spot: Spot price used for moneyness
+        expiry: Expiry the fit is stored under
+
+    Returns:
+        Hex digest identifying the chain snapshot
+    """
+    columns = [c for c in FINGERPRINT_COLUMNS if c in options_df.columns]
+    row_hashes = pd.util.hash_pandas_object(options_df[columns], index=False).to_numpy()
+
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(row_hashes.tobytes())
+    digest.update(f"{spot}_{expiry}".encode())
+    return digest.hexdigest()
+
+
+class SmileCalibrationCache:
+    """
+    LRU cache of fitted smile parameters
+
+    Fits are keyed by chain fingerprint, so an unchanged chain is never
+    refitted. The last fitted coefficients per (symbol, option type) are
+    kept separately as warm-start guesses for the next fit.
+    """
+
+    def __init__(self, max_entries: Optional[int] = None):
+        """
+        Initialize calibration cache
+
+        Args:
+            max_entries: Maximum cached fits (default: SMILE_CALIBRATION_CACHE_SIZE or 512)
+        """
+        if max_entries is None:
+            max_entries = int(os.getenv('SMILE_CALIBRATION_CACHE_SIZE', '512'))
+        self.max_entries = max_entries
+
+        self._lock = Lock()
+        self._fits: 'OrderedDict[str, Dict]' = OrderedDict()
+        self._warm_starts: Dict[Tuple, Tuple[float, float]] = {}
+
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, fingerprint: str) -> Optional[Dict]:
+        """
+        Get cached fit for a chain fingerprint
+
+        Args:
+            fingerprint: Chain fingerprint
+
+        Returns:
+            Copy of the fitted parameters or None on miss
+        """
+        with self._lock:
+            params = self._fits.get(fingerprint)
+            if params is None:
+                self.misses += 1
+                return None
+
+            self._fits.move_to_end(fingerprint)
+            self.hits += 1
+            return dict(params)
+
+    def put(self, fingerprint: str, params: Dict) -> None:
+        """
+        Store a fit, evicting the least recently used one when full
+
+        Args:
+            fingerprint: Chain fingerprint
+            params: Fitted smile parameters
+        """
+        with self._lock:
+            self._fits[fingerprint] = dict(params)
+            self._fits.move_to_end(fingerprint)
+            while len(self._fits) > self.max_entries:
+                self._fits.popitem(last=False)
+
+    def get_warm_start(self, symbol: Optional[str], option_type: str) -> Optional[Tuple[float, float]]:
+        """Previous (a, b) coefficients for a symbol's put or call smile"""
+        with self._lock:
+            return self._warm_starts.get((symbol, option_type))
+
+    def set_warm_start(self, symbol: Optional[str], option_type: str, coefficients: Tuple[float, float]) -> None:
+        """Remember fitted (a, b) coefficients as the next initial guess"""
+        with self._lock:
+            self._warm_starts[(symbol, option_type)] = tuple(coefficients)
+
+    def clear(self) -> None:
+        """Drop all cached fits and warm starts"""
+        with self._lock:
+            self._fits.clear()
+            self._warm_starts.clear()
+
+    def get_stats(self) -> Dict:
+        """Get cache hit/miss statistics"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / lookups if lookups > 0 else 0.0,
+                'entries': len(self._fits),
+                'max_entries': self.max_entries
+            }
+
+
+# Global smile calibration cache instance
+_smile_calibration_cache: Optional[SmileCalibrationCache] = None
+_smile_calibration_lock = Lock()
+
+
+def get_smile_calibration_cache() -> SmileCalibrationCache:
+    """
+    Get or create the process-wide smile calibration cache
+
+    Returns:
+        SmileCalibrationCache instance
+    """
+    global _smile_calibration_cache
+
+    with _smile_calibration_lock:
+        if _smile_calibration_cache is None:
+            _smile_calibration_cache = SmileCalibrationCache()
+
+    return _smile_calibration_cache
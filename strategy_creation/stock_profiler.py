@@ -10,6 +10,9 @@ import logging
 from typing import Dict, Optional, Tuple, List
 from datetime import datetime, timedelta
 
+from .index_history import get_index_history_cache, calculate_index_metrics, calculate_index_metrics_bulk
+from .price_history_store import get_price_history_store
+
 logger = logging.getLogger(__name__)
 
 class StockProfiler:
@@ -24,6 +27,9 @@ class StockProfiler:
     def __init__(self, supabase_client=None):
         self.supabase = supabase_client
         self._metadata_cache = {}  # Cache for sector/industry data
+        self.index_cache = get_index_history_cache()  # Shared NIFTY history
+        self.price_store = get_price_history_store()  # Shared local OHLCV store
+        self._nifty_metrics_cache = {}  # Bulk-computed beta/correlation/RS per symbol
         
         
         # Volatility profile definitions
@@ -120,6 +126,8 @@ class StockProfiler:
                 logger.error(f"No price data available for {symbol}")
                 return self._get_default_profile(symbol)
             
+            nifty_metrics = self._calculate_nifty_metrics(symbol, price_data)
+            
             # Calculate all metrics
             profile = {
                 'symbol': symbol,
@@ -138,9 +146,9 @@ class StockProfiler:
                 'atr_pct': self._calculate_atr_percentage(price_data),
                 
                 # Market relationship
-                'beta_nifty': self._calculate_beta_vs_nifty(symbol, price_data),
-                'correlation_nifty': self._calculate_correlation_nifty(symbol, price_data),
-                'relative_strength': self._calculate_relative_strength(symbol, price_data),
+                'beta_nifty': nifty_metrics['beta'],
+                'correlation_nifty': nifty_metrics['correlation'],
+                'relative_strength': nifty_metrics['relative_strength'],
                 
                 # Derived metrics
                 'spot_price': float(price_data['Close'].iloc[-1]),
@@ -216,6 +224,51 @@ class StockProfiler:
             logger.error(f"Error prefetching metadata: {e}")
             # Continue without cache
     
+    def prefetch_price_history(self, symbols: List[str]) -> None:
+        """
+        Refresh price history for all symbols in one batched download and
+        compute their NIFTY metrics in a single vectorized pass
+        
+        Args:
+            symbols: List of symbols to prefetch
+        """
+        if not symbols:
+            return
+        
+        try:
+            self.price_store.refresh_all(symbols)
+            
+            price_histories = {symbol: self.price_store.get_history(symbol, '1y') for symbol in symbols}
+            self._nifty_metrics_cache = self.calculate_nifty_metrics_bulk(price_histories)
+            
+            logger.info(f"Prefetched price history and NIFTY metrics for {len(self._nifty_metrics_cache)} symbols")
+            
+        except Exception as e:
+            logger.error(f"Error prefetching price history: {e}")
+            # Continue with per-symbol fetches
+    
+    def export_prefetched_data(self) -> Dict:
+        """
+        Get prefetched metadata and NIFTY metrics (e.g., to hand them to worker processes)
+        
+        Returns:
+            Dictionary with metadata and nifty_metrics caches
+        """
+        return {
+            'metadata': dict(self._metadata_cache),
+            'nifty_metrics': dict(self._nifty_metrics_cache)
+        }
+    
+    def import_prefetched_data(self, data: Dict) -> None:
+        """
+        Install metadata and NIFTY metrics prefetched by another StockProfiler
+        
+        Args:
+            data: Output of export_prefetched_data
+        """
+        self._metadata_cache.update(data.get('metadata', {}))
+        self._nifty_metrics_cache.update(data.get('nifty_metrics', {}))
+    
     def _get_database_data(self, symbol: str) -> Dict:
         """Get stock data from database or cache"""
         try:
@@ -238,8 +291,12 @@ class StockProfiler:
             return {}
     
     def _get_price_history(self, symbol: str, period: str = "1y") -> Optional[pd.DataFrame]:
-        """Get price history from yfinance"""
+        """Get price history from the local price history store, falling back to yfinance"""
         try:
+            hist = self.price_store.get_history(symbol, period)
+            if not hist.empty:
+                return hist
+            
             ticker = yf.Ticker(f"{symbol}.NS")
             hist = ticker.history(period=period)
             
@@ -316,88 +373,51 @@ class StockProfiler:
             logger.error(f"Error calculating ATR%: {e}")
             return 2.0  # Default medium volatility
     
-    def _calculate_beta_vs_nifty(self, symbol: str, stock_data: pd.DataFrame) -> float:
-        """Calculate beta relative to NIFTY"""
+    def _calculate_nifty_metrics(self, symbol: str, stock_data: pd.DataFrame) -> Dict[str, float]:
+        """Calculate beta, correlation and relative strength vs NIFTY from one aligned returns array"""
+        defaults = {'beta': 1.0, 'correlation': 0.5, 'relative_strength': 1.0}
+        if symbol in self._nifty_metrics_cache:
+            return self._nifty_metrics_cache[symbol]
+        
         try:
-            # Get NIFTY data
-            nifty = yf.Ticker("^NSEI")
-            nifty_data = nifty.history(period="1y")
+            # Shared, daily-cached NIFTY history (one download per day per process)
+            nifty_data = self.index_cache.get_history('^NSEI', period='1y')
             
             if nifty_data.empty:
                 logger.warning("Could not fetch NIFTY data")
-                return 1.0
-            
-            # Align dates
-            common_dates = stock_data.index.intersection(nifty_data.index)
-            if len(common_dates) < 60:  # Need at least 60 days
-                return 1.0
-            
-            # Calculate returns
-            stock_returns = stock_data.loc[common_dates, 'Close'].pct_change().dropna()
-            nifty_returns = nifty_data.loc[common_dates, 'Close'].pct_change().dropna()
-            
-            # Calculate beta
-            covariance = stock_returns.cov(nifty_returns)
-            nifty_variance = nifty_returns.var()
-            
-            if nifty_variance > 0:
-                beta = covariance / nifty_variance
-                return round(beta, 2)
+                return defaults
             
-            return 1.0
+            return calculate_index_metrics(stock_data['Close'], nifty_data['Close'])
             
         except Exception as e:
-            logger.error(f"Error calculating beta for {symbol}: {e}")
-            return 1.0
+            logger.error(f"Error calculating NIFTY metrics for {symbol}: {e}")
+            return defaults
     
-    def _calculate_correlation_nifty(self, symbol: str, stock_data: pd.DataFrame) -> float:
-        """Calculate correlation with NIFTY"""
-        try:
-            # Get NIFTY data
-            nifty = yf.Ticker("^NSEI")
-            nifty_data = nifty.history(period="1y")
-            
-            if nifty_data.empty:
-                return 0.5
-            
-            # Align and calculate returns
-            common_dates = stock_data.index.intersection(nifty_data.index)
-            stock_returns = stock_data.loc[common_dates, 'Close'].pct_change().dropna()
-            nifty_returns = nifty_data.loc[common_dates, 'Close'].pct_change().dropna()
-            
-            # Calculate correlation
-            correlation = stock_returns.corr(nifty_returns)
-            
-            return round(correlation, 2)
+    def calculate_nifty_metrics_bulk(self, price_histories: Dict[str, pd.DataFrame]) -> Dict[str, Dict[str, float]]:
+        """
+        Calculate beta, correlation and relative strength vs NIFTY for many symbols at once
+        
+        Args:
+            price_histories: Mapping of symbol to OHLCV price history
             
-        except Exception as e:
-            logger.error(f"Error calculating correlation: {e}")
-            return 0.5
-    
-    def _calculate_relative_strength(self, symbol: str, stock_data: pd.DataFrame) -> float:
-        """Calculate relative strength vs NIFTY"""
+        Returns:
+            Dictionary mapping symbol to its NIFTY metrics
+        """
         try:
-            # Get NIFTY data
-            nifty = yf.Ticker("^NSEI")
-            nifty_data = nifty.history(period="3mo")
-            
-            if nifty_data.empty or len(stock_data) < 63 or len(nifty_data) < 63:
-                return 1.0
-            
-            # Calculate 3-month returns
-            stock_return = (stock_data['Close'].iloc[-1] / stock_data['Close'].iloc[-63]) - 1
-            nifty_return = (nifty_data['Close'].iloc[-1] / nifty_data['Close'].iloc[-63]) - 1
-            
-            # Relative strength
-            if nifty_return != 0:
-                rs = (1 + stock_return) / (1 + nifty_return)
-                return round(rs, 2)
+            nifty_data = self.index_cache.get_history('^NSEI', period='1y')
+            if nifty_data.empty or not price_histories:
+                return {}
             
-            return 1.0
+            closes = pd.DataFrame({
+                symbol: history['Close'] for symbol, history in price_histories.items()
+                if history is not None and not history.empty
+            })
+            metrics = calculate_index_metrics_bulk(closes, nifty_data['Close'])
+            return metrics.to_dict(orient='index')
             
         except Exception as e:
-            logger.error(f"Error calculating RS: {e}")
-            return 1.0
+            logger.error(f"Error calculating bulk NIFTY metrics: {e}")
+            return {}
     
     def _calculate_price_change(self, price_data: pd.DataFrame, days: int) -> float:
         """Calculate price change over specified days"""
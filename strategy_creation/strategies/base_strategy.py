@@ -8,6 +8,8 @@ import numpy as np
 import logging
 from typing import Dict, List, Optional, Tuple
 
+from .payoff_engine import legs_to_arrays, calculate_payoffs, find_breakeven_points, calculate_profit_range
+
 logger = logging.getLogger(__name__)
 
 class BaseStrategy(ABC):
@@ -57,76 +59,22 @@ class BaseStrategy(ABC):
         pass
     
     def calculate_payoff(self, underlying_prices: List[float]) -> Dict:
-        """Calculate payoff at different underlying prices"""
+        """Calculate payoff at different underlying prices (vectorized over prices and legs)"""
         try:
-            payoffs = []
-            
-            for price in underlying_prices:
-                total_payoff = 0.0
-                
-                for leg in self.legs:
-                    leg_payoff = self._calculate_leg_payoff(leg, price)
-                    total_payoff += leg_payoff
-                
-                payoffs.append(total_payoff)
+            payoffs = calculate_payoffs(legs_to_arrays(self.legs), underlying_prices)
             
             return {
                 'prices': underlying_prices,
-                'payoffs': payoffs,
-                'max_profit': max(payoffs),
-                'max_loss': min(payoffs),
-                'breakeven_points': self._find_breakeven_points(underlying_prices, payoffs)
+                'payoffs': payoffs.tolist(),
+                'max_profit': float(payoffs.max()),
+                'max_loss': float(payoffs.min()),
+                'breakeven_points': find_breakeven_points(underlying_prices, payoffs)
             }
             
         except Exception as e:
             logger.error(f"Error calculating payoff for {self.get_strategy_name()}: {e}")
             return {'prices': [], 'payoffs': [], 'max_profit': 0, 'max_loss': 0}
     
-    def _calculate_leg_payoff(self, leg: Dict, underlying_price: float) -> float:
-        """Calculate payoff for individual leg"""
-        try:
-            strike = leg['strike']
-            option_type = leg['option_type']
-            position = leg['position']
-            premium = leg['premium']
-            
-            # Intrinsic value calculation
-            if option_type.upper() == 'CALL':
-                intrinsic = max(0, underlying_price - strike)
-            else:  # PUT
-                intrinsic = max(0, strike - underlying_price)
-            
-            # Position adjustment
-            if position.upper() == 'LONG':
-                return intrinsic - premium
-            else:  # SHORT
-                return premium - intrinsic
-                
-        except Exception as e:
-            logger.error(f"Error calculating leg payoff: {e}")
-            return 0.0
-    
-    def _find_breakeven_points(self, prices: List[float], payoffs: List[float]) -> List[float]:
-        """Find breakeven points where payoff crosses zero"""
-        breakevens = []
-        
-        try:
-            for i in range(len(payoffs) - 1):
-                if (payoffs[i] <= 0 and payoffs[i + 1] > 0) or (payoffs[i] >= 0 and payoffs[i + 1] < 0):
-                    # Linear interpolation to find exact breakeven
-                    price_diff = prices[i + 1] - prices[i]
-                    payoff_diff = payoffs[i + 1] - payoffs[i]
-                    
-                    if payoff_diff != 0:
-                        breakeven = prices[i] - (payoffs[i] * price_diff / payoff_diff)
-                        breakevens.append(round(breakeven, 2))
-            
-            return sorted(set(breakevens))  # Remove duplicates and sort
-            
-        except Exception as e:
-            logger.error(f"Error finding breakeven points: {e}")
-            return []
-    
     def get_greeks_summary(self) -> Dict:
         """Calculate total Greeks for the strategy"""
         try:
@@ -240,15 +188,7 @@ class BaseStrategy(ABC):
     def _calculate_profit_range(self, payoff_data: Dict) -> Tuple[float, float]:
         """Calculate price range where strategy is profitable"""
         try:
-            prices = payoff_data['prices']
-            payoffs = payoff_data['payoffs']
-            
-            profitable_prices = [price for price, payoff in zip(prices, payoffs) if payoff > 0]
-            
-            if not profitable_prices:
-                return (0.0, 0.0)
-            
-            return (min(profitable_prices), max(profitable_prices))
+            return calculate_profit_range(payoff_data['prices'], payoff_data['payoffs'])
             
         except Exception as e:
             logger.error(f"Error calculating profit range: {e}")
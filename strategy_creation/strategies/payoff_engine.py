@@ -0,0 +1,112 @@
+"""
+Vectorized payoff engine for multi-leg option strategies
+
+Legs are converted to strike/type/sign/premium arrays once, the expiry
+payoff for a whole price grid is a single broadcast, and breakevens are
+found with vectorized sign-change detection.
+"""
+
+import logging
+from dataclasses import dataclass
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class LegArrays:
+    """Strategy legs in columnar form"""
+    strikes: np.ndarray    # Strike per leg
+    is_call: np.ndarray    # True for CALL, False for PUT
+    signs: np.ndarray      # +1 LONG, -1 SHORT
+    premiums: np.ndarray   # Premium per leg
+
+    def __len__(self) -> int:
+        return len(self.strikes)
+
+
+def legs_to_arrays(legs: List[Dict]) -> LegArrays:
+    """
+    Convert leg dictionaries to arrays
+
+    Legs that cannot be parsed are skipped (they contribute zero payoff,
+    as in the original per-leg calculation).
+    """
+    strikes, is_call, signs, premiums = [], [], [], []
+
+    for leg in legs:
+        try:
+            strike = float(leg['strike'])
+            premium = float(leg['premium'])
+            call = leg['option_type'].upper() == 'CALL'
+            sign = 1.0 if leg['position'].upper() == 'LONG' else -1.0
+        except Exception as e:
+            logger.error(f"Error calculating leg payoff: {e}")
+            continue
+
+        strikes.append(strike)
+        is_call.append(call)
+        signs.append(sign)
+        premiums.append(premium)
+
+    return LegArrays(
+        strikes=np.asarray(strikes, dtype=float),
+        is_call=np.asarray(is_call, dtype=bool),
+        signs=np.asarray(signs, dtype=float),
+        premiums=np.asarray(premiums, dtype=float)
+    )
+
+
+def calculate_payoffs(leg_arrays: LegArrays, prices) -> np.ndarray:
+    """
+    Expiry payoff of the combined position for every price
+
+    Args:
+        leg_arrays: Legs in columnar form
+        prices: Underlying price grid
+
+    Returns:
+        Array of total payoffs, one per price
+    """
+    prices = np.asarray(prices, dtype=float)
+    if len(leg_arrays) == 0:
+        return np.zeros_like(prices)
+
+    # (n_prices, n_legs) intrinsic values
+    moneyness = prices[:, None] - leg_arrays.strikes[None, :]
+    intrinsic = np.maximum(np.where(leg_arrays.is_call, moneyness, -moneyness), 0.0)
+
+    leg_payoffs = leg_arrays.signs * (intrinsic - leg_arrays.premiums)
+    return leg_payoffs.sum(axis=1)
+
+
+def find_breakeven_points(prices, payoffs) -> List[float]:
+    """Find prices where the payoff crosses zero (linear interpolation)"""
+    prices = np.asarray(prices, dtype=float)
+    payoffs = np.asarray(payoffs, dtype=float)
+    if len(payoffs) < 2:
+        return []
+
+    current, following = payoffs[:-1], payoffs[1:]
+    crossing = ((current <= 0) & (following > 0)) | ((current >= 0) & (following < 0))
+    payoff_diff = following - current
+    crossing &= payoff_diff != 0
+
+    idx = np.nonzero(crossing)[0]
+    price_diff = prices[idx + 1] - prices[idx]
+    breakevens = prices[idx] - payoffs[idx] * price_diff / payoff_diff[idx]
+
+    return sorted(set(np.round(breakevens, 2).tolist()))
+
+
+def calculate_profit_range(prices, payoffs) -> Tuple[float, float]:
+    """Lowest and highest price with a positive payoff"""
+    prices = np.asarray(prices, dtype=float)
+    profitable = prices[np.asarray(payoffs, dtype=float) > 0]
+
+    if profitable.size == 0:
+        return (0.0, 0.0)
+
+    return (float(profitable.min()), float(profitable.max()))
@@ -11,6 +11,8 @@ from datetime import datetime
 from scipy import optimize
 from scipy.interpolate import interp1d
 
+from .smile_cache import SmileCalibrationCache, chain_fingerprint, get_smile_calibration_cache
+
 logger = logging.getLogger(__name__)
 
 class VolatilitySurface:
@@ -24,7 +26,14 @@ class VolatilitySurface:
     - Term structure adjustments
     """
     
-    def __init__(self):
+    def __init__(self, calibration_cache: Optional[SmileCalibrationCache] = None):
+        """
+        Initialize volatility surface
+        
+        Args:
+            calibration_cache: Smile fit cache (default: process-wide cache)
+        """
+        self.calibration_cache = calibration_cache or get_smile_calibration_cache()
         self.smile_parameters = {}
         self.surface_cache = {}
         self.last_calibration = {}
@@ -41,6 +50,11 @@ class VolatilitySurface:
             'max_iv_multiplier': 2.0     # Maximum 200% of ATM IV
         }
     
+    @staticmethod
+    def _smile_key(spot, expiry) -> str:
+        """Calibration key of a (spot, expiry); the spot is a float so 2450 and 2450.0 match"""
+        return f"{float(spot)}_{expiry}"
+    
     def calculate_smile_adjusted_iv(self, strike: float, spot: float, expiry: str, 
                                   option_type: str, base_iv: float, 
                                   use_market_calibration: bool = True) -> float:
@@ -62,7 +76,7 @@ class VolatilitySurface:
             moneyness = strike / spot
             
             # Check for cached market calibration
-            cache_key = f"{spot}_{expiry}"
+            cache_key = self._smile_key(spot, expiry)
             if use_market_calibration and cache_key in self.smile_parameters:
                 params = self.smile_parameters[cache_key]
                 return self._apply_calibrated_smile(moneyness, option_type, base_iv, params)
@@ -74,6 +88,93 @@ class VolatilitySurface:
             logger.error(f"Error calculating smile-adjusted IV: {e}")
             return base_iv  # Fallback to base IV
     
+    def smile_adjusted_iv_array(self, strikes, spot, option_types, base_ivs,
+                                expiry='default', use_market_calibration: bool = True) -> np.ndarray:
+        """
+        Vectorized calculate_smile_adjusted_iv for a whole options chain
+
+        Args:
+            strikes: Strike prices
+            spot: Spot price (scalar or one per strike)
+            option_types: 'CALL' or 'PUT' per strike
+            base_ivs: Base implied volatility per strike
+            expiry: Expiry (scalar or one per strike)
+            use_market_calibration: Use market-fitted parameters if available
+
+        Returns:
+            Array of smile-adjusted implied volatilities
+        """
+        strikes = np.asarray(strikes, dtype=float)
+        n = len(strikes)
+        spots = np.broadcast_to(np.asarray(spot, dtype=float), (n,))
+        base_ivs = np.broadcast_to(np.asarray(base_ivs, dtype=float), (n,))
+        expiries = np.broadcast_to(np.asarray(expiry, dtype=object), (n,))
+        is_put = pd.Series(option_types, dtype=object).str.upper().eq('PUT').to_numpy()
+
+        try:
+            valid = spots > 0
+            moneyness = np.divide(strikes, spots, out=np.ones(n), where=valid)
+
+            ratios = self._default_smile_multipliers(moneyness, is_put)
+
+            # Rows whose (spot, expiry) has a market calibration use the fitted smile
+            if use_market_calibration and self.smile_parameters and n:
+                keys = pd.DataFrame({'spot': spots, 'expiry': expiries})
+                for (key_spot, key_expiry), rows in keys.groupby(['spot', 'expiry'], sort=False).indices.items():
+                    params = self.smile_parameters.get(self._smile_key(key_spot, key_expiry))
+                    if params is not None:
+                        ratios[rows] = self._calibrated_smile_multipliers(
+                            moneyness[rows], is_put[rows], params
+                        )
+
+            return np.where(valid, base_ivs * ratios, base_ivs)
+
+        except Exception as e:
+            logger.error(f"Error calculating smile-adjusted IV array: {e}")
+            return np.array(base_ivs, dtype=float)
+
+    def _default_smile_multipliers(self, moneyness: np.ndarray, is_put: np.ndarray) -> np.ndarray:
+        """Default smile multipliers for arrays (same piecewise model as _apply_default_smile)"""
+        p = self.default_params
+        m = moneyness
+
+        put_multiplier = np.select(
+            [m < 0.80, m < 0.90, m < 0.95, m < 1.0],
+            [
+                1 + p['put_skew_atm_80'] + (0.80 - m) * 1.5,
+                1 + (p['put_skew_atm_90'] + (0.90 - m) / 0.10 * (p['put_skew_atm_80'] - p['put_skew_atm_90'])),
+                1 + (0.95 - m) / 0.05 * p['put_skew_atm_90'] * 0.7,
+                1 + (1.0 - m) / 0.05 * p['put_skew_atm_90'] * 0.3
+            ],
+            default=1.0
+        )
+
+        call_multiplier = np.select(
+            [m > 1.20, m > 1.10, m > 1.05, m > 1.0],
+            [
+                1 + p['call_skew_atm_120'] + (m - 1.20) * 1.0,
+                1 + (p['call_skew_atm_110'] + (m - 1.10) / 0.10 * (p['call_skew_atm_120'] - p['call_skew_atm_110'])),
+                1 + (m - 1.05) / 0.05 * p['call_skew_atm_110'] * 0.7,
+                1 + (m - 1.0) / 0.05 * p['call_skew_atm_110'] * 0.3
+            ],
+            default=1.0
+        )
+
+        return np.clip(np.where(is_put, put_multiplier, call_multiplier),
+                       p['min_iv_multiplier'], p['max_iv_multiplier'])
+
+    def _calibrated_smile_multipliers(self, moneyness: np.ndarray, is_put: np.ndarray,
+                                      params: Dict) -> np.ndarray:
+        """Calibrated smile multipliers for arrays (same quadratic as _apply_calibrated_smile)"""
+        a = np.where(is_put, params.get('put_smile_a', 0.1), params.get('call_smile_a', 0.1))
+        b = np.where(is_put, params.get('put_smile_b', 0.1), params.get('call_smile_b', -0.1))
+
+        x = moneyness - 1
+        iv_ratio = a * x**2 + b * x + 1
+
+        return np.clip(iv_ratio, self.default_params['min_iv_multiplier'],
+                       self.default_params['max_iv_multiplier'])
+
     def _apply_default_smile(self, moneyness: float, option_type: str, base_iv: float) -> float:
         """Apply default quadratic smile based on market observations"""
         
@@ -151,6 +252,16 @@ class VolatilitySurface:
             # Get spot price and expiry (using correct column names)
             spot = liquid_df['spot_price'].iloc[0] if 'spot_price' in liquid_df.columns else liquid_df.get('underlying_price', liquid_df['strike'].mean()).iloc[0]
             expiry = liquid_df['expiry'].iloc[0] if 'expiry' in liquid_df.columns else 'default'
+            symbol = liquid_df['symbol'].iloc[0] if 'symbol' in liquid_df.columns else None
+            cache_key = self._smile_key(spot, expiry)
+            
+            # Skip fitting when this exact chain was calibrated before
+            fingerprint = chain_fingerprint(liquid_df, spot, expiry)
+            cached_params = self.calibration_cache.get(fingerprint)
+            if cached_params is not None:
+                self.smile_parameters[cache_key] = cached_params
+                logger.debug(f"Reusing smile calibration for {cache_key} (chain unchanged)")
+                return dict(cached_params)
             
             # Separate calls and puts
             calls = liquid_df[liquid_df['option_type'] == 'CALL'].copy()
@@ -182,9 +293,14 @@ class VolatilitySurface:
                     puts['moneyness'].values,
                     puts['iv'].values,
                     atm_iv,
-                    option_type='PUT'
+                    option_type='PUT',
+                    p0=self.calibration_cache.get_warm_start(symbol, 'PUT')
                 )
                 params.update(put_params)
+                if put_params:
+                    self.calibration_cache.set_warm_start(
+                        symbol, 'PUT', (put_params['put_smile_a'], put_params['put_smile_b'])
+                    )
             
             # Fit call smile  
             if len(calls) >= 3:
@@ -192,13 +308,18 @@ class VolatilitySurface:
                     calls['moneyness'].values,
                     calls['iv'].values,
                     atm_iv,
-                    option_type='CALL'
+                    option_type='CALL',
+                    p0=self.calibration_cache.get_warm_start(symbol, 'CALL')
                 )
                 params.update(call_params)
+                if call_params:
+                    self.calibration_cache.set_warm_start(
+                        symbol, 'CALL', (call_params['call_smile_a'], call_params['call_smile_b'])
+                    )
             
             # Cache the parameters
-            cache_key = f"{spot}_{expiry}"
             self.smile_parameters[cache_key] = params
+            self.calibration_cache.put(fingerprint, params)
             self.last_calibration[cache_key] = datetime.now()
             
             logger.info(f"Smile calibration complete for {cache_key}: "
@@ -213,8 +334,9 @@ class VolatilitySurface:
             return {}
     
     def _fit_quadratic_smile(self, moneyness: np.ndarray, ivs: np.ndarray, 
-                            atm_iv: float, option_type: str) -> Dict:
-        """Fit quadratic function to smile data"""
+                            atm_iv: float, option_type: str,
+                            p0: Optional[Tuple[float, float]] = None) -> Dict:
+        """Fit quadratic function to smile data (p0: warm-start guess from a previous fit)"""
         try:
             # Normalize IVs by ATM
             iv_ratios = ivs / atm_iv
@@ -231,8 +353,9 @@ class VolatilitySurface:
             def quadratic(x, a, b):
                 return a * (x - 1)**2 + b * (x - 1) + 1
             
-            # Initial guess
-            p0 = [0.1, 0.1] if option_type == 'PUT' else [0.1, -0.1]
+            # Initial guess (previous fit if available)
+            if p0 is None:
+                p0 = [0.1, 0.1] if option_type == 'PUT' else [0.1, -0.1]
             
             # Fit the curve
             popt, _ = optimize.curve_fit(quadratic, moneyness_clean, iv_ratios_clean, p0=p0)
@@ -292,7 +415,7 @@ class VolatilitySurface:
         try:
             # If base_iv not provided, try to get from cache
             if base_iv is None:
-                cache_key = f"{spot}_{expiry}"
+                cache_key = self._smile_key(spot, expiry)
                 if cache_key in self.smile_parameters:
                     base_iv = self.smile_parameters[cache_key].get('atm_iv', 25.0)
                 else:
@@ -0,0 +1,282 @@
+"""
+Async Order Engine for Options V4
+
+Places all legs of a strategy together (or hedges first), polls fills
+concurrently with backoff and runs independent strategies in parallel
+under a shared broker rate limit. Broker and database calls go through the
+synchronous Dhan SDK and Supabase client, so they run in worker threads.
+"""
+
+import os
+import time
+import asyncio
+import logging
+from typing import Dict, List, Optional
+
+from utils.async_supabase import AsyncTokenBucket
+
+logger = logging.getLogger(__name__)
+
+LEG_ORDERS = ('hedge_first', 'concurrent')
+TERMINAL_ORDER_STATUSES = {'TRADED', 'REJECTED', 'CANCELLED', 'EXPIRED'}
+
+
+class AsyncOrderEngine:
+    """
+    Concurrent multi-leg order placement
+
+    leg_order='concurrent' submits every leg at once. leg_order='hedge_first'
+    submits the BUY legs together, waits for their fills and only then submits
+    the SELL legs, so a short leg is never left open without its hedge.
+    """
+
+    def __init__(self, executor, broker=None, leg_order: Optional[str] = None,
+                 orders_per_second: Optional[float] = None, max_parallel_strategies: Optional[int] = None,
+                 poll_initial: float = 0.5, poll_max: float = 4.0, poll_timeout: float = 30.0):
+        """
+        Initialize order engine
+
+        Args:
+            executor: OptionsV4Executor providing security-id lookup and trade persistence
+            broker: Dhan client (default: executor.dhan); any object with place_order/get_order_by_id
+            leg_order: 'hedge_first' or 'concurrent' (default: EXECUTION_LEG_ORDER or 'hedge_first')
+            orders_per_second: Broker request rate limit (default: BROKER_ORDERS_PER_SECOND or 10)
+            max_parallel_strategies: Strategies executed at once (default: MAX_PARALLEL_STRATEGIES or 4)
+            poll_initial: First fill poll delay in seconds
+            poll_max: Maximum delay between fill polls
+            poll_timeout: Give up waiting for a terminal order status after this many seconds
+        """
+        self.executor = executor
+        self.broker = broker if broker is not None else executor.dhan
+
+        self.leg_order = (leg_order or os.getenv('EXECUTION_LEG_ORDER', 'hedge_first')).lower()
+        if self.leg_order not in LEG_ORDERS:
+            raise ValueError(f"leg_order must be one of {LEG_ORDERS}, got {self.leg_order!r}")
+
+        self.orders_per_second = orders_per_second or float(os.getenv('BROKER_ORDERS_PER_SECOND', '10'))
+        self.max_parallel_strategies = max_parallel_strategies or int(os.getenv('MAX_PARALLEL_STRATEGIES', '4'))
+        self.poll_initial = poll_initial
+        self.poll_max = poll_max
+        self.poll_timeout = poll_timeout
+
+    async def execute_strategies(self, strategies: List[Dict]) -> List[Dict]:
+        """
+        Execute independent strategies in parallel
+
+        Args:
+            strategies: Strategies with strategy_details and strategy_parameters
+
+        Returns:
+            One result per strategy (strategy_id, symbol, strategy_name, legs) in input order
+        """
+        limiter = AsyncTokenBucket(self.orders_per_second)
+        semaphore = asyncio.Semaphore(self.max_parallel_strategies)
+
+        async def run(strategy: Dict) -> Dict:
+            async with semaphore:
+                try:
+                    legs = await self.execute_strategy(strategy, limiter)
+                except Exception as e:
+                    logger.error(f"Failed to execute strategy {strategy['id']}: {e}")
+                    legs = [{'status': 'failed', 'error': str(e)}]
+                    await asyncio.to_thread(self.executor.update_strategy_status, strategy['id'], 'failed', legs)
+                return {
+                    'strategy_id': strategy['id'],
+                    'symbol': strategy['stock_name'],
+                    'strategy_name': strategy['strategy_name'],
+                    'legs': legs
+                }
+
+        return list(await asyncio.gather(*(run(strategy) for strategy in strategies)))
+
+    async def execute_strategy(self, strategy: Dict, limiter: Optional[AsyncTokenBucket] = None) -> List[Dict]:
+        """
+        Execute all legs of one strategy
+
+        Args:
+            strategy: Strategy with strategy_details and strategy_parameters
+            limiter: Shared broker rate limiter (default: a new one for this strategy)
+
+        Returns:
+            Per-leg results (leg_id, status, order_id, executed_price / error)
+        """
+        limiter = limiter or AsyncTokenBucket(self.orders_per_second)
+        strategy_id = strategy['id']
+        started = time.monotonic()
+        logger.info(f"Executing strategy {strategy_id}: {strategy['stock_name']} - {strategy['strategy_name']} "
+                    f"({self.leg_order})")
+
+        legs = strategy.get('strategy_details') or []
+        if not legs:
+            logger.error(f"No strategy details found for strategy {strategy_id}")
+            return []
+
+        expiry_date = None
+        if strategy.get('strategy_parameters'):
+            expiry_date = strategy['strategy_parameters'][0].get('expiry_date')
+
+        # Resolve every leg before placing anything so a strategy is never half-built
+        orders = await asyncio.gather(*(
+            asyncio.to_thread(self._prepare_order, strategy, leg, expiry_date) for leg in legs
+        ))
+        if any(order is None for order in orders):
+            results = [
+                {'leg_id': leg['id'], 'status': 'failed',
+                 'error': 'Security ID not found' if order is None else 'Not placed: another leg could not be resolved'}
+                for leg, order in zip(legs, orders)
+            ]
+            await asyncio.to_thread(self.executor.update_strategy_status, strategy_id, 'failed', results)
+            return results
+
+        if self.leg_order == 'hedge_first':
+            waves = [
+                [i for i, leg in enumerate(legs) if leg['setup_type'] == 'BUY'],
+                [i for i, leg in enumerate(legs) if leg['setup_type'] != 'BUY']
+            ]
+        else:
+            waves = [list(range(len(legs)))]
+
+        results: List[Optional[Dict]] = [None] * len(legs)
+        for wave in waves:
+            if not wave:
+                continue
+            # Later waves only go out once every earlier leg has actually traded
+            blocking = [r for r in results if r is not None and r.get('order_status') != 'TRADED']
+            if blocking:
+                deferred = all(r['status'] == 'deferred' for r in blocking)
+                for i in wave:
+                    results[i] = {'leg_id': legs[i]['id'], 'status': 'deferred' if deferred else 'failed',
+                                  'error': 'Not placed: hedge leg did not fill'}
+                continue
+
+            wave_results = await asyncio.gather(*(
+                self._place_leg(strategy, legs[i], orders[i], limiter) for i in wave
+            ))
+            for i, result in zip(wave, wave_results):
+                results[i] = result
+
+        execution_failed = any(r['status'] == 'failed' for r in results)
+        await asyncio.to_thread(
+            self.executor.update_strategy_status, strategy_id,
+            'failed' if execution_failed else 'executed', results
+        )
+
+        logger.info(f"Strategy {strategy_id} legs completed in {time.monotonic() - started:.1f}s")
+        return results
+
+    def _prepare_order(self, strategy: Dict, leg: Dict, expiry_date) -> Optional[Dict]:
+        """Security id and order parameters for a leg (None if unresolved)"""
+        logger.info(f"Processing leg: {leg['setup_type']} {leg['strike_price']} {leg['option_type']}")
+
+        security_id, lot_size = self.executor.get_security_id(
+            strategy['stock_name'],
+            leg['option_type'],
+            leg['strike_price'],
+            expiry_date
+        )
+        if not security_id:
+            logger.error(f"Cannot find security ID for leg: {leg}")
+            return None
+
+        lots = leg.get('lots', 1)
+        quantity = lots * (lot_size or 25)
+        return {
+            'security_id': security_id,
+            'exchange_segment': 'NSE_FNO',
+            'transaction_type': leg['setup_type'],
+            'quantity': quantity,
+            'order_type': 'MARKET',
+            'product_type': 'MARGIN',
+            'price': 0,
+            'trigger_price': 0,
+            'validity': 'DAY'
+        }
+
+    async def _place_leg(self, strategy: Dict, leg: Dict, order_params: Dict,
+                         limiter: AsyncTokenBucket) -> Dict:
+        """Place one leg, record the trade and wait for its fill"""
+        try:
+            await limiter.acquire()
+            logger.info(f"Placing order with params: {order_params}")
+            order_response = await asyncio.to_thread(self.broker.place_order, **order_params)
+            logger.info(f"Order response: {order_response}")
+
+            if order_response.get('status') != 'success':
+                if 'market closed' in str(order_response.get('remarks', '')).lower():
+                    logger.info("Market is closed, order deferred")
+                    return {'leg_id': leg['id'], 'status': 'deferred', 'remarks': 'Market closed'}
+                logger.error(f"Order failed: {order_response}")
+                return {'leg_id': leg['id'], 'status': 'failed',
+                        'error': order_response.get('remarks', 'Unknown error')}
+
+            order_id = order_response['data']['orderId']
+            await asyncio.to_thread(
+                self.executor.store_trade,
+                strategy_id=strategy['id'],
+                order_id=order_id,
+                security_id=order_params['security_id'],
+                transaction_type=leg['setup_type'],
+                quantity=order_params['quantity'],
+                price=0,  # Updated once the fill is known
+                option_type=leg['option_type'],
+                strategy_name=strategy['strategy_name'],
+                symbol=strategy['stock_name'],
+                strike_price=leg['strike_price']
+            )
+
+            order_details = await self._await_fill(order_id, limiter)
+            if order_details:
+                await asyncio.to_thread(
+                    self.executor.update_trade_details,
+                    order_id,
+                    order_details.get('executed_price', 0),
+                    order_details.get('expiry_date')
+                )
+            else:
+                logger.warning(f"Could not fetch order details for {order_id}, will need manual update")
+
+            status = 'success'
+            if order_details and order_details.get('order_status') in ('REJECTED', 'CANCELLED', 'EXPIRED'):
+                status = 'failed'
+
+            result = {
+                'leg_id': leg['id'],
+                'status': status,
+                'order_id': order_id,
+                'order_status': order_details.get('order_status') if order_details else None,
+                'executed_price': order_details.get('executed_price', 0) if order_details else 0
+            }
+            if status == 'failed':
+                result['error'] = f"Order {order_details.get('order_status')}"
+            return result
+
+        except Exception as e:
+            logger.error(f"Order placement exception: {e}")
+            return {'leg_id': leg['id'], 'status': 'failed', 'error': str(e)}
+
+    async def _await_fill(self, order_id, limiter: AsyncTokenBucket) -> Optional[Dict]:
+        """
+        Poll an order with exponential backoff until it reaches a terminal status
+
+        Args:
+            order_id: Broker order id
+            limiter: Shared broker rate limiter
+
+        Returns:
+            Last order details from get_order_details (None if never available)
+        """
+        deadline = time.monotonic() + self.poll_timeout
+        delay = self.poll_initial
+        details = None
+
+        while True:
+            await asyncio.sleep(delay)
+            await limiter.acquire()
+            details = await asyncio.to_thread(self.executor.get_order_details, order_id, self.broker) or details
+
+            if details and details.get('order_status') in TERMINAL_ORDER_STATUSES:
+                return details
+            if time.monotonic() + delay > deadline:
+                logger.warning(f"Order {order_id} not in a terminal state after {self.poll_timeout:.0f}s")
+                return details
+            delay = min(delay * 1.5, self.poll_max)
@@ -10,6 +10,10 @@ import numpy as np
 
 logger = logging.getLogger(__name__)
 
+# Check order of evaluate_position; ties on action priority go to the earlier check
+CHECK_TYPES = ('profit_target', 'stop_loss', 'time_exit', 'adjustment')
+
+
 class ExitEvaluator:
     """
     Evaluates exit conditions for options positions
@@ -22,10 +26,16 @@ class ExitEvaluator:
     - Recommend actions
     """
     
+    # evaluate_portfolio switches to the columnar path from this many positions
+    VECTORIZE_MIN_POSITIONS = 64
+    
     def __init__(self, logger: Optional[logging.Logger] = None):
         """Initialize exit evaluator"""
         self.logger = logger or self._setup_logger()
         
+        # strategy_id -> (exit_conditions object, compiled thresholds) for the columnar path
+        self._compiled_conditions: Dict[int, Tuple[Dict, Optional[Tuple]]] = {}
+        
         # Action priorities
         self.action_priorities = {
             'CLOSE_IMMEDIATELY': 1,
@@ -397,26 +407,82 @@ class ExitEvaluator:
                 'details': [str(e)]
             }
     
+    def exit_proximity(self, position_data: Dict, exit_conditions: Dict) -> float:
+        """
+        Distance from the current P&L to the nearest stop loss or profit target
+
+        Uses the same primary thresholds as _check_stop_losses and
+        _check_profit_targets, expressed as a fraction of the threshold.
+
+        Args:
+            position_data: Current position metrics including P&L
+            exit_conditions: Stored exit conditions for the strategy
+
+        Returns:
+            0.0 at or beyond a threshold, e.g. 0.1 when within 10% of one,
+            inf when the strategy has no price-based thresholds
+        """
+        current_pnl = position_data.get('total_pnl', 0)
+        current_pnl_pct = position_data.get('total_pnl_pct', 0)
+        distances = []
+
+        # (current, threshold, direction): direction +1 for targets above, -1 for stops below
+        stop = exit_conditions.get('stop_losses', {}).get('primary')
+        if stop:
+            if stop.get('trigger_type') == 'percentage':
+                stop_pct = stop.get('trigger_value', 50)
+                max_loss = exit_conditions.get('max_loss', 0)
+                if max_loss > 0:
+                    distances.append((current_pnl, -(max_loss * stop_pct / 100), -1))
+                else:
+                    distances.append((current_pnl_pct, -stop_pct, -1))
+            elif stop.get('loss_amount'):
+                distances.append((current_pnl, -stop['loss_amount'], -1))
+
+        target = exit_conditions.get('profit_targets', {}).get('primary')
+        if target:
+            target_value = target.get('trigger_value', 0)
+            if target.get('trigger_type') == 'percentage':
+                distances.append((current_pnl_pct, target_value, 1))
+            elif target_value > 0:
+                distances.append((current_pnl, target_value, 1))
+
+        proximity = float('inf')
+        for current, threshold, direction in distances:
+            if threshold:
+                proximity = min(proximity, direction * (threshold - current) / abs(threshold))
+        return max(proximity, 0.0)
+
     def evaluate_portfolio(self, positions_with_pnl: List[Dict], 
-                          exit_conditions_map: Dict[int, Dict]) -> List[Dict]:
+                          exit_conditions_map: Dict[int, Dict],
+                          vectorized: Optional[bool] = None) -> List[Dict]:
         """
         Evaluate entire portfolio of positions
         
         Args:
             positions_with_pnl: List of positions with current P&L data
             exit_conditions_map: Map of strategy_id to exit conditions
+            vectorized: Use the columnar NumPy evaluation (default: from
+                VECTORIZE_MIN_POSITIONS positions). Its results carry the same
+                action, urgency, reason and details but no per-check 'checks' map.
             
         Returns:
             List of evaluation results for all positions
         """
-        evaluations = []
+        if vectorized is None:
+            vectorized = len(positions_with_pnl) >= self.VECTORIZE_MIN_POSITIONS
         
-        for position in positions_with_pnl:
-            strategy_id = position.get('strategy_id')
-            exit_conditions = exit_conditions_map.get(strategy_id, {})
-            
-            evaluation = self.evaluate_position(position, exit_conditions)
-            evaluations.append(evaluation)
+        if vectorized:
+            evaluations = self._evaluate_portfolio_vectorized(positions_with_pnl, exit_conditions_map)
+        else:
+            evaluations = []
+            
+            for position in positions_with_pnl:
+                strategy_id = position.get('strategy_id')
+                exit_conditions = exit_conditions_map.get(strategy_id, {})
+                
+                evaluation = self.evaluate_position(position, exit_conditions)
+                evaluations.append(evaluation)
         
         # Sort by urgency and action priority
         urgency_order = {'HIGH': 1, 'MEDIUM': 2, 'NORMAL': 3}
@@ -429,6 +495,212 @@ class ExitEvaluator:
         
         return evaluations
     
+    def _compile_exit_conditions(self, exit_conditions: Dict) -> Optional[Tuple]:
+        """
+        Flatten the thresholds used by the check methods into one row
+        
+        Returns None when the conditions hold values the columnar path does not
+        model (non-numeric thresholds); those positions use evaluate_position.
+        
+        Returns:
+            (profit_pct, profit_abs, profit_action, scaling[(target, action)],
+             stop_pnl, stop_pct, dte_threshold, dte_action, theta_dte, theta_action)
+        """
+        def number(value) -> float:
+            if not isinstance(value, (int, float)):
+                raise TypeError(f"non-numeric threshold {value!r}")
+            return float(value)
+        
+        inf = float('inf')
+        try:
+            profit_targets = exit_conditions.get('profit_targets', {})
+            profit_pct, profit_abs, profit_action = inf, inf, 'CLOSE_POSITION'
+            if 'primary' in profit_targets:
+                primary = profit_targets['primary']
+                target_value = number(primary.get('trigger_value', 0))
+                profit_action = primary.get('action', 'CLOSE_POSITION')
+                if primary.get('trigger_type') == 'percentage':
+                    profit_pct = target_value
+                elif target_value > 0:
+                    profit_abs = target_value
+            
+            scaling = []
+            for level, data in profit_targets.items():
+                if level.startswith('scaling_') or level.startswith('level_'):
+                    target = number(data.get('trigger_value', 0) or data.get('profit', 0))
+                    if target > 0:
+                        scaling.append((target, data.get('action', 'CLOSE_25%')))
+            
+            stop_losses = exit_conditions.get('stop_losses', {})
+            stop_pnl, stop_pct = -inf, -inf
+            if 'primary' in stop_losses:
+                primary = stop_losses['primary']
+                if primary.get('trigger_type') == 'percentage':
+                    trigger_pct = number(primary.get('trigger_value', 50))
+                    max_loss = number(exit_conditions.get('max_loss', 0))
+                    if max_loss > 0:
+                        stop_pnl = -(max_loss * trigger_pct / 100)
+                    else:
+                        stop_pct = -trigger_pct
+                elif primary.get('loss_amount'):
+                    loss_amount = number(primary.get('loss_amount', 0))
+                    if loss_amount > 0:
+                        stop_pnl = -loss_amount
+            
+            time_exits = exit_conditions.get('time_exits', {})
+            dte_threshold, dte_action = -inf, 'CLOSE_POSITION'
+            if 'primary' in time_exits:
+                dte_threshold = number(time_exits['primary'].get('trigger_value', 7))
+                dte_action = time_exits['primary'].get('action', 'CLOSE_POSITION')
+            theta_dte, theta_action = -inf, 'CLOSE_POSITION'
+            if 'theta_decay_threshold' in time_exits:
+                theta_dte = number(time_exits['theta_decay_threshold'].get('dte', 7))
+                theta_action = time_exits['theta_decay_threshold'].get('action', 'CLOSE_POSITION')
+            
+            return (profit_pct, profit_abs, profit_action, scaling,
+                    stop_pnl, stop_pct, dte_threshold, dte_action, theta_dte, theta_action)
+            
+        except (TypeError, AttributeError):
+            return None
+    
+    def _evaluate_portfolio_vectorized(self, positions_with_pnl: List[Dict],
+                                       exit_conditions_map: Dict[int, Dict]) -> List[Dict]:
+        """
+        Columnar evaluate_position over the whole book
+        
+        P&L, P&L %, DTE and every threshold become NumPy columns; each check is
+        a handful of array comparisons and the winning action per row is the
+        lowest action priority in check order, as in _determine_action.
+        Detail strings are only built for rows that trigger.
+        """
+        n = len(positions_with_pnl)
+        if n == 0:
+            return []
+        
+        rows, conditions, scalar_rows = [], [], []
+        pnl, pnl_pct, dte = [], [], []
+        empty_row = self._compile_exit_conditions({})
+        estimated_dte = 0
+        
+        for i, position in enumerate(positions_with_pnl):
+            strategy_id = position.get('strategy_id')
+            exit_conditions = exit_conditions_map.get(strategy_id, {})
+            conditions.append(exit_conditions)
+            
+            cached = self._compiled_conditions.get(strategy_id)
+            if cached is not None and cached[0] is exit_conditions:
+                row = cached[1]
+            else:
+                row = self._compile_exit_conditions(exit_conditions)
+                self._compiled_conditions[strategy_id] = (exit_conditions, row)
+            
+            current_pnl = position.get('total_pnl', 0)
+            current_pnl_pct = position.get('total_pnl_pct', 0)
+            days_in_trade = position.get('days_in_trade', 0)
+            actual_dte = position.get('actual_dte')
+            if row is None or not isinstance(current_pnl, (int, float)) or \
+               not isinstance(current_pnl_pct, (int, float)) or not isinstance(days_in_trade, (int, float)) or \
+               not isinstance(actual_dte, (int, float, type(None))):
+                scalar_rows.append(i)
+                row, current_pnl, current_pnl_pct, days_in_trade, actual_dte = empty_row, 0, 0, 0, 30
+            
+            if actual_dte is None:
+                # Same fallback as _check_time_exits
+                actual_dte = max(30 - days_in_trade, 0)
+                estimated_dte += 1
+            
+            rows.append(row)
+            pnl.append(current_pnl)
+            pnl_pct.append(current_pnl_pct)
+            dte.append(actual_dte)
+        
+        pnl = np.array(pnl, dtype=float)
+        pnl_pct = np.array(pnl_pct, dtype=float)
+        dte = np.array(dte, dtype=float)
+        
+        if estimated_dte:
+            self.logger.warning(f"No actual DTE available for {estimated_dte} positions, using estimates")
+        
+        (profit_pct, profit_abs, profit_action, scaling, stop_pnl, stop_pct,
+         dte_threshold, dte_action, theta_dte, theta_action) = zip(*rows)
+        profit_action = np.array(profit_action, dtype=object)
+        dte_action = np.array(dte_action, dtype=object)
+        theta_action = np.array(theta_action, dtype=object)
+        
+        # Profit targets: primary, else the first scaling level reached
+        profit_hit = (pnl_pct >= np.array(profit_pct)) | (pnl >= np.array(profit_abs))
+        profit_act = profit_action.copy()
+        levels = max(len(s) for s in scaling)
+        if levels:
+            targets = np.full((n, levels), np.inf)
+            actions = np.empty((n, levels), dtype=object)
+            for i, row_levels in enumerate(scaling):
+                for j, (target, action) in enumerate(row_levels):
+                    targets[i, j] = target
+                    actions[i, j] = action
+            reached = pnl[:, None] >= targets
+            first = reached.argmax(axis=1)
+            scaling_hit = reached.any(axis=1) & ~profit_hit
+            profit_act[scaling_hit] = actions[scaling_hit, first[scaling_hit]]
+            profit_hit |= scaling_hit
+        
+        # Stop losses
+        stop_hit = (pnl <= np.array(stop_pnl)) | (pnl_pct <= np.array(stop_pct))
+        
+        # Time exits: primary DTE, theta decay (overrides), expiry emergency
+        dte_hit = dte <= np.array(dte_threshold)
+        theta_hit = (dte <= np.array(theta_dte)) & (pnl <= 0)
+        expiring = dte <= 1
+        time_act = np.where(dte_hit & expiring, 'CLOSE_IMMEDIATELY', dte_action).astype(object)
+        time_act = np.where(theta_hit, theta_action, time_act).astype(object)
+        time_hit = dte_hit | theta_hit
+        time_act[expiring & ~time_hit] = 'CLOSE_IMMEDIATELY'
+        time_hit |= expiring
+        time_urgency = np.where(expiring, 'HIGH', 'MEDIUM')
+        
+        # Adjustments
+        adjust_hit = (pnl_pct < -25) & (pnl_pct > -50)
+        
+        # Highest priority triggered check (first in check order on ties)
+        priority_of = np.vectorize(lambda action: self.action_priorities.get(action, 999), otypes=[float])
+        priorities = np.full((n, len(CHECK_TYPES)), np.inf)
+        priorities[:, 0] = np.where(profit_hit, priority_of(profit_act), np.inf)
+        priorities[:, 1] = np.where(stop_hit, self.action_priorities['CLOSE_IMMEDIATELY'], np.inf)
+        priorities[:, 2] = np.where(time_hit, priority_of(time_act), np.inf)
+        priorities[:, 3] = np.where(adjust_hit, self.action_priorities['ADJUST'], np.inf)
+        winner = priorities.argmin(axis=1).tolist()
+        triggered = np.isfinite(priorities).any(axis=1).tolist()
+        profit_act, time_act, time_urgency = profit_act.tolist(), time_act.tolist(), time_urgency.tolist()
+        
+        check_methods = (self._check_profit_targets, self._check_stop_losses,
+                         self._check_time_exits, self._check_adjustments)
+        evaluations = []
+        for i, position in enumerate(positions_with_pnl):
+            evaluation = {
+                'strategy_id': position.get('strategy_id'),
+                'symbol': position.get('symbol'),
+                'strategy_name': position.get('strategy_name'),
+                'recommended_action': 'MONITOR',
+                'action_reason': 'No exit conditions triggered',
+                'urgency': 'NORMAL',
+                'details': []
+            }
+            if triggered[i]:
+                check = winner[i]
+                evaluation['recommended_action'] = (profit_act[i], 'CLOSE_IMMEDIATELY', time_act[i], 'ADJUST')[check]
+                evaluation['urgency'] = ('NORMAL', 'HIGH', time_urgency[i], 'NORMAL')[check]
+                evaluation['action_reason'] = f"{CHECK_TYPES[check].replace('_', ' ').title()} triggered"
+                evaluation['details'] = check_methods[check](position, conditions[i]).get('details', [])
+            evaluations.append(evaluation)
+        
+        # Rows the columnar path cannot model keep the scalar result
+        for i in scalar_rows:
+            evaluation = self.evaluate_position(positions_with_pnl[i], conditions[i])
+            evaluation.pop('checks', None)
+            evaluations[i] = evaluation
+        
+        return evaluations
+    
     def get_action_summary(self, evaluations: List[Dict]) -> Dict:
         """Get summary of recommended actions"""
         summary = {
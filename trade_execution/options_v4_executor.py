@@ -11,7 +11,7 @@ from datetime import datetime
 from dotenv import load_dotenv
 from dhanhq import dhanhq
 import json
-import time
+import asyncio
 
 # Add parent directory to path for imports
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -20,6 +20,8 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 load_dotenv('/Users/jaykrish/Documents/digitalocean/.env')
 
 from database import SupabaseIntegration
+from utils.scrip_master_index import get_scrip_master_index
+from trade_execution.async_order_engine import AsyncOrderEngine
 
 # Set up logging configuration
 logging.basicConfig(
@@ -34,8 +36,13 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 class OptionsV4Executor:
-    def __init__(self):
-        """Initialize executor with database and Dhan API connections"""
+    def __init__(self, leg_order=None):
+        """
+        Initialize executor with database and Dhan API connections
+        
+        Args:
+            leg_order: 'hedge_first' or 'concurrent' leg submission (default: EXECUTION_LEG_ORDER)
+        """
         # Initialize database
         self.db = SupabaseIntegration(logger)
         if not self.db.client:
@@ -58,6 +65,9 @@ class OptionsV4Executor:
         except Exception as e:
             logger.error(f"Failed to initialize DHAN client: {str(e)}")
             raise
+        
+        # Concurrent leg placement and fill polling
+        self.order_engine = AsyncOrderEngine(self, leg_order=leg_order)
     
     def get_marked_strategies(self):
         """Fetch all strategies marked for execution"""
@@ -191,6 +201,15 @@ class OptionsV4Executor:
             if expiry_date is None:
                 expiry_date = self.get_smart_expiry_date()
             
+            # Exact or nearest strike from the shared in-memory scrip master index
+            index = get_scrip_master_index(self.db.client)
+            if index is not None:
+                security_id, lot_size = index.lookup(symbol, expiry_date, option_type, strike_price)
+                if security_id is not None:
+                    logger.info(f"✅ Found in scrip master index: {symbol} {strike_price} {option_type} → {security_id}")
+                    return security_id, lot_size
+                logger.info("Not found in scrip master index, querying api_scrip_master...")
+            
             # Construct the option symbol
             option_symbol = self.get_option_symbol(symbol, expiry_date, strike_price, option_type)
             
@@ -249,12 +268,13 @@ class OptionsV4Executor:
             logger.error(f"Error fetching security ID: {e}")
             return None, None
     
-    def get_order_details(self, order_id):
+    def get_order_details(self, order_id, broker=None):
         """
         Fetch order details from Dhan API to get executed price
         
         Args:
             order_id: The order ID to fetch details for
+            broker: Dhan client to query (default: self.dhan)
             
         Returns:
             Dictionary with order details or None if failed
@@ -263,7 +283,7 @@ class OptionsV4Executor:
             logger.info(f"Fetching order details for order ID: {order_id}")
             
             # Fetch order details from Dhan API
-            order_details = self.dhan.get_order_by_id(order_id)
+            order_details = (broker or self.dhan).get_order_by_id(order_id)
             
             if order_details and order_details.get('status') == 'success':
                 order_data_list = order_details.get('data', [])
@@ -341,143 +361,8 @@ class OptionsV4Executor:
             return False
     
     def execute_strategy_legs(self, strategy):
-        """Execute all legs of a strategy"""
-        strategy_id = strategy['id']
-        logger.info(f"Executing strategy {strategy_id}: {strategy['stock_name']} - {strategy['strategy_name']}")
-        
-        if not strategy.get('strategy_details'):
-            logger.error(f"No strategy details found for strategy {strategy_id}")
-            return []
-        
-        all_responses = []
-        execution_failed = False
-        
-        # Get expiry date from strategy_parameters
-        expiry_date = None
-        if strategy.get('strategy_parameters') and len(strategy['strategy_parameters']) > 0:
-            expiry_date = strategy['strategy_parameters'][0].get('expiry_date')
-        
-        for leg in strategy['strategy_details']:
-            logger.info(f"Processing leg: {leg['setup_type']} {leg['strike_price']} {leg['option_type']}")
-            
-            # Get security ID
-            security_id, lot_size = self.get_security_id(
-                strategy['stock_name'],
-                leg['option_type'],
-                leg['strike_price'],
-                expiry_date
-            )
-            
-            if not security_id:
-                logger.error(f"Cannot find security ID for leg: {leg}")
-                execution_failed = True
-                all_responses.append({
-                    'leg_id': leg['id'],
-                    'status': 'failed',
-                    'error': 'Security ID not found'
-                })
-                continue
-            
-            # Calculate quantity
-            lots = leg.get('lots', 1)
-            quantity = lots * (lot_size or 25)
-            logger.info(f"Calculated quantity: {quantity} (lots: {lots} × lot size: {lot_size})")
-            
-            # Prepare order parameters
-            order_params = {
-                'security_id': security_id,
-                'exchange_segment': 'NSE_FNO',
-                'transaction_type': leg['setup_type'],
-                'quantity': quantity,
-                'order_type': 'MARKET',
-                'product_type': 'MARGIN',
-                'price': 0,
-                'trigger_price': 0,
-                'validity': 'DAY'
-            }
-            
-            logger.info(f"Placing order with params: {order_params}")
-            
-            try:
-                # Place the order
-                order_response = self.dhan.place_order(**order_params)
-                logger.info(f"Order response: {order_response}")
-                
-                # Handle response
-                if order_response['status'] == 'success':
-                    order_id = order_response['data']['orderId']
-                    
-                    # Store trade in database with initial price as 0
-                    self.store_trade(
-                        strategy_id=strategy_id,
-                        order_id=order_id,
-                        security_id=security_id,
-                        transaction_type=leg['setup_type'],
-                        quantity=quantity,
-                        price=0,  # Will be updated after fetching order details
-                        option_type=leg['option_type'],
-                        strategy_name=strategy['strategy_name'],
-                        symbol=strategy['stock_name'],
-                        strike_price=leg['strike_price']
-                    )
-                    
-                    # Wait 5 seconds for order to be processed
-                    logger.info(f"Waiting 5 seconds before fetching order details for {order_id}...")
-                    time.sleep(5)
-                    
-                    # Fetch order details to get executed price
-                    order_details = self.get_order_details(order_id)
-                    
-                    if order_details:
-                        # Update the trade with actual executed price and expiry date
-                        self.update_trade_details(
-                            order_id, 
-                            order_details.get('executed_price', 0),
-                            order_details.get('expiry_date')
-                        )
-                        logger.info(f"Updated order {order_id} with price {order_details.get('executed_price')} and expiry {order_details.get('expiry_date')}")
-                    else:
-                        logger.warning(f"Could not fetch order details for {order_id}, will need manual update")
-                    
-                    all_responses.append({
-                        'leg_id': leg['id'],
-                        'status': 'success',
-                        'order_id': order_id,
-                        'executed_price': order_details.get('executed_price', 0) if order_details else 0
-                    })
-                    
-                elif 'market closed' in str(order_response.get('remarks', '')).lower():
-                    logger.info(f"Market is closed, order deferred")
-                    all_responses.append({
-                        'leg_id': leg['id'],
-                        'status': 'deferred',
-                        'remarks': 'Market closed'
-                    })
-                else:
-                    logger.error(f"Order failed: {order_response}")
-                    execution_failed = True
-                    all_responses.append({
-                        'leg_id': leg['id'],
-                        'status': 'failed',
-                        'error': order_response.get('remarks', 'Unknown error')
-                    })
-                    
-            except Exception as e:
-                logger.error(f"Order placement exception: {e}")
-                execution_failed = True
-                all_responses.append({
-                    'leg_id': leg['id'],
-                    'status': 'failed',
-                    'error': str(e)
-                })
-        
-        # Update strategy execution status
-        if not execution_failed:
-            self.update_strategy_status(strategy_id, 'executed', all_responses)
-        else:
-            self.update_strategy_status(strategy_id, 'failed', all_responses)
-        
-        return all_responses
+        """Execute all legs of a strategy (legs submitted concurrently, fills polled in parallel)"""
+        return asyncio.run(self.order_engine.execute_strategy(strategy))
     
     def store_trade(self, strategy_id, order_id, security_id, transaction_type, 
                    quantity, price, option_type, strategy_name, symbol, strike_price):
@@ -552,25 +437,11 @@ class OptionsV4Executor:
             logger.info("No strategies to execute")
             return
         
-        logger.info(f"Starting execution of {len(strategies)} strategies")
+        logger.info(f"Starting execution of {len(strategies)} strategies "
+                    f"({self.order_engine.max_parallel_strategies} in parallel)")
         
-        results = []
-        for strategy in strategies:
-            logger.info(f"\n{'='*60}")
-            logger.info(f"Executing: {strategy['stock_name']} - {strategy['strategy_name']}")
-            logger.info(f"Priority: {strategy.get('execution_priority', 0)}")
-            
-            try:
-                leg_results = self.execute_strategy_legs(strategy)
-                results.append({
-                    'strategy_id': strategy['id'],
-                    'symbol': strategy['stock_name'],
-                    'strategy_name': strategy['strategy_name'],
-                    'legs': leg_results
-                })
-            except Exception as e:
-                logger.error(f"Failed to execute strategy {strategy['id']}: {e}")
-                self.update_strategy_status(strategy['id'], 'failed', [{'error': str(e)}])
+        # Strategies are independent; the engine runs them concurrently under the broker rate limit
+        results = asyncio.run(self.order_engine.execute_strategies(strategies))
         
         # Summary
         logger.info(f"\n{'='*60}")
@@ -628,12 +499,14 @@ def main():
                        help='Execute all marked strategies')
     parser.add_argument('--strategy-id', type=int,
                        help='Execute specific strategy by ID')
+    parser.add_argument('--leg-order', choices=['hedge_first', 'concurrent'],
+                       help='Submit BUY legs before SELL legs, or all legs at once (default: hedge_first)')
     
     args = parser.parse_args()
     
     try:
         logger.info("Starting Options V4 Strategy Executor")
-        executor = OptionsV4Executor()
+        executor = OptionsV4Executor(leg_order=args.leg_order)
         
         if args.strategy_id:
             # Execute specific strategy
@@ -7,13 +7,14 @@ import asyncio
 import logging
 import json
 import time
-from typing import Dict, List, Optional, Set
+from typing import Callable, Dict, List, Optional, Set, Tuple
 from datetime import datetime, timedelta
 from dataclasses import dataclass, asdict
 from concurrent.futures import ThreadPoolExecutor
 import threading
 
 from database.supabase_integration import SupabaseIntegration
+from trade_monitoring.position_book import get_position_book, LegRecord
 
 @dataclass
 class PositionLeg:
@@ -58,21 +59,34 @@ class PositionCacheManager:
     Manages in-memory position cache with real-time updates and database sync
     """
     
-    def __init__(self, sync_interval_seconds=60):
+    def __init__(self, sync_interval_seconds=60, position_book=None):
         """
         Initialize Position Cache Manager
         
         Args:
             sync_interval_seconds: How often to sync with database (default 60s)
+            position_book: PositionBook to read open trades from (default: the shared book)
         """
         self.logger = logging.getLogger(__name__)
         
-        # Database integration
-        self.db = SupabaseIntegration()
+        # Open trades come from the position book shared with the monitors
+        if position_book is None:
+            self.db = SupabaseIntegration()
+            position_book = get_position_book(self.db.client)
+        else:
+            self.db = None
+        self.position_book = position_book
+        self._position_versions: Dict[int, int] = {}  # strategy_id -> book version cached
         
         # Cache storage
         self.positions_cache: Dict[int, CachedPosition] = {}  # strategy_id -> position
         self.security_to_positions: Dict[int, Set[int]] = {}  # security_id -> set(strategy_ids)
+        self.security_to_legs: Dict[int, List[Tuple[CachedPosition, int]]] = {}  # security_id -> [(position, leg index)]
+        
+        # Ticks received since the last flush (coalesced only while a flush is pending)
+        self._pending_ticks: Dict[int, Tuple[float, Optional[str]]] = {}  # security_id -> (price, timestamp)
+        self._flush_handle: Optional[asyncio.Handle] = None
+        self.price_listeners: List[Callable[[Set[int]], None]] = []
         
         # Synchronization
         self.sync_interval = sync_interval_seconds
@@ -92,6 +106,8 @@ class PositionCacheManager:
             'cache_misses': 0,
             'db_syncs': 0,
             'price_updates': 0,
+            'price_flushes': 0,
+            'ticks_coalesced': 0,
             'positions_tracked': 0
         }
         
@@ -125,61 +141,89 @@ class PositionCacheManager:
             except asyncio.CancelledError:
                 pass
         
+        # Apply ticks still waiting for the next loop iteration
+        self.flush_price_updates()
+        
         # Final sync before shutdown
         await self.sync_to_database()
         
         self.logger.info("Position cache manager stopped")
     
     async def refresh_from_database(self):
-        """Refresh cache from database"""
+        """Refresh cache from the position book, rebuilding only changed positions"""
         try:
             self.logger.info("Refreshing position cache from database...")
             
-            # Clear current cache
-            with self.sync_lock:
-                self.positions_cache.clear()
-                self.security_to_positions.clear()
-            
-            # Fetch open trades from database
-            response = self.db.client.table('trades').select('*').eq(
-                'order_status', 'open'
-            ).order('timestamp', desc=False).execute()
+            await asyncio.get_running_loop().run_in_executor(self.executor, self.position_book.refresh)
+            await self.sync_from_book()
             
-            if not response.data:
-                self.logger.info("No open trades found in database")
-                return
+        except Exception as e:
+            self.logger.error(f"Error refreshing from database: {e}")
+    
+    async def sync_from_book(self):
+        """Bring the cache in line with the position book without querying the database"""
+        try:
+            versions = self.position_book.strategy_versions()
             
-            # Group trades by strategy_id
-            strategy_trades = {}
-            for trade in response.data:
-                strategy_id = trade.get('strategy_id')
-                if not strategy_id:
-                    continue
+            with self.sync_lock:
+                # Drop positions that are no longer open
+                for strategy_id in [sid for sid in self.positions_cache if sid not in versions]:
+                    self._remove_cached_position(strategy_id)
                 
-                if strategy_id not in strategy_trades:
-                    strategy_trades[strategy_id] = []
-                strategy_trades[strategy_id].append(trade)
+                changed = [
+                    sid for sid, version in versions.items()
+                    if self._position_versions.get(sid) != version
+                ]
             
-            # Create cached positions
-            for strategy_id, trades in strategy_trades.items():
-                await self._create_cached_position(strategy_id, trades)
+            for strategy_id in changed:
+                await self._create_cached_position(strategy_id, self.position_book.get_legs(strategy_id))
+                self._position_versions[strategy_id] = versions[strategy_id]
             
             self.stats['positions_tracked'] = len(self.positions_cache)
-            self.logger.info(f"Loaded {len(self.positions_cache)} positions into cache")
+            self.logger.info(f"Loaded {len(self.positions_cache)} positions into cache "
+                           f"({len(changed)} updated)")
             
         except Exception as e:
-            self.logger.error(f"Error refreshing from database: {e}")
+            self.logger.error(f"Error syncing from position book: {e}")
+    
+    def _remove_cached_position(self, strategy_id: int):
+        """Remove a position and its security mappings (caller holds sync_lock)"""
+        position = self.positions_cache.pop(strategy_id, None)
+        self._position_versions.pop(strategy_id, None)
+        if position is None:
+            return
+        for leg in position.legs:
+            if leg.security_id in self.security_to_positions:
+                self.security_to_positions[leg.security_id].discard(strategy_id)
+                if not self.security_to_positions[leg.security_id]:
+                    del self.security_to_positions[leg.security_id]
+            if leg.security_id in self.security_to_legs:
+                remaining = [entry for entry in self.security_to_legs[leg.security_id] if entry[0] is not position]
+                if remaining:
+                    self.security_to_legs[leg.security_id] = remaining
+                else:
+                    del self.security_to_legs[leg.security_id]
     
-    async def _create_cached_position(self, strategy_id: int, trades: List[Dict]):
-        """Create a cached position from trade data"""
+    async def _create_cached_position(self, strategy_id: int, trades: List[LegRecord]):
+        """Create a cached position from position book legs (keeps live leg prices)"""
         try:
             if not trades:
                 return
             
+            trades = sorted(trades, key=lambda t: t.timestamp or '')
+            
             # Get strategy info from first trade
             first_trade = trades[0]
-            symbol = first_trade.get('symbol', f'STRATEGY_{strategy_id}')
-            strategy_name = first_trade.get('strategy', 'Unknown')
+            symbol = first_trade.symbol or f'STRATEGY_{strategy_id}'
+            strategy_name = first_trade.strategy_name or 'Unknown'
+            
+            with self.sync_lock:
+                previous = self.positions_cache.get(strategy_id)
+                live_prices = {
+                    leg.trade_id: (leg.current_price, leg.last_price_update)
+                    for leg in (previous.legs if previous else [])
+                }
+                self._remove_cached_position(strategy_id)
             
             # Create position legs
             legs = []
@@ -187,18 +231,21 @@ class PositionCacheManager:
             net_premium = 0.0
             
             for trade in trades:
+                current_price, last_price_update = live_prices.get(
+                    trade.trade_id, (trade.entry_price or 0, datetime.now().isoformat())
+                )
                 leg = PositionLeg(
-                    trade_id=trade.get('new_id', trade.get('id')),
-                    security_id=trade.get('security_id'),
-                    action=trade.get('action'),
-                    type=trade.get('type'),
-                    strike_price=trade.get('strike_price', 0),
-                    quantity=trade.get('quantity', 0),
-                    entry_price=trade.get('price', 0),
-                    order_id=trade.get('order_id', ''),
-                    expiry_date=trade.get('expiry_date', ''),
-                    current_price=trade.get('price', 0),  # Will be updated with real-time prices
-                    last_price_update=datetime.now().isoformat()
+                    trade_id=trade.trade_id,
+                    security_id=trade.security_id,
+                    action=trade.action,
+                    type=trade.type,
+                    strike_price=trade.strike_price or 0,
+                    quantity=trade.quantity or 0,
+                    entry_price=trade.entry_price or 0,
+                    order_id=trade.order_id or '',
+                    expiry_date=trade.expiry_date or '',
+                    current_price=current_price,  # Will be updated with real-time prices
+                    last_price_update=last_price_update
                 )
                 
                 legs.append(leg)
@@ -211,13 +258,6 @@ class PositionCacheManager:
                     net_premium += leg.entry_price * leg.quantity
                 else:
                     net_premium -= leg.entry_price * leg.quantity
-                
-                # Update security mapping
-                security_id = leg.security_id
-                if security_id:
-                    if security_id not in self.security_to_positions:
-                        self.security_to_positions[security_id] = set()
-                    self.security_to_positions[security_id].add(strategy_id)
             
             # Create cached position
             position = CachedPosition(
@@ -227,14 +267,23 @@ class PositionCacheManager:
                 legs=legs,
                 total_quantity=total_quantity,
                 net_premium=net_premium,
-                entry_time=first_trade.get('timestamp', datetime.now().isoformat()),
+                entry_time=first_trade.timestamp or datetime.now().isoformat(),
                 last_update=datetime.now().isoformat(),
                 status='open'
             )
+            if previous is not None:
+                position.last_evaluation = previous.last_evaluation
+                position.exit_conditions_checked = previous.exit_conditions_checked
             
-            # Store in cache
+            # Store in cache and update security mappings
             with self.sync_lock:
                 self.positions_cache[strategy_id] = position
+                for leg_index, leg in enumerate(legs):
+                    if leg.security_id:
+                        self.security_to_positions.setdefault(leg.security_id, set()).add(strategy_id)
+                        self.security_to_legs.setdefault(leg.security_id, []).append((position, leg_index))
+                # Full valuation once; ticks then apply per-leg deltas
+                self._calculate_position_pnl(position)
             
             self.logger.debug(f"Cached position: {symbol} (strategy {strategy_id})")
             
@@ -286,34 +335,99 @@ class PositionCacheManager:
             return []
     
     async def update_price(self, security_id: int, price: float, timestamp: str = None):
-        """Update price for a security across all affected positions"""
+        """
+        Apply a price tick for a security
+        
+        With no flush pending the tick is applied at once. Further ticks in
+        the same event-loop iteration (the rest of a feed burst) are
+        coalesced: only the latest price per security is kept and they are
+        applied together on the next iteration.
+        
+        Args:
+            security_id: Security that ticked
+            price: Last traded price
+            timestamp: Tick time (default: time of the flush)
+        """
         try:
-            if timestamp is None:
-                timestamp = datetime.now().isoformat()
-            
-            affected_positions = self.get_positions_for_security(security_id)
-            
-            with self.sync_lock:
-                for position in affected_positions:
-                    # Update leg prices
-                    for leg in position.legs:
-                        if leg.security_id == security_id:
-                            leg.current_price = price
-                            leg.last_price_update = timestamp
-                    
-                    # Recalculate position P&L
-                    self._calculate_position_pnl(position)
-                    position.last_update = timestamp
-            
+            if security_id in self._pending_ticks:
+                self.stats['ticks_coalesced'] += 1
+            self._pending_ticks[security_id] = (price, timestamp)
             self.stats['price_updates'] += 1
             
-            if affected_positions:
-                self.logger.debug(f"Updated price for security {security_id}: ₹{price} "
-                                f"(affected {len(affected_positions)} positions)")
+            if self._flush_handle is None:
+                # No backlog: apply now and coalesce whatever else arrives before the next iteration
+                self._flush_handle = asyncio.get_running_loop().call_soon(self.flush_price_updates)
+                self._apply_pending_ticks()
             
         except Exception as e:
             self.logger.error(f"Error updating price: {e}")
     
+    def flush_price_updates(self) -> Set[int]:
+        """Apply all queued ticks now and notify price listeners"""
+        self._flush_handle = None
+        return self._apply_pending_ticks()
+    
+    def _apply_pending_ticks(self) -> Set[int]:
+        ticks, self._pending_ticks = self._pending_ticks, {}
+        if not ticks:
+            return set()
+        
+        affected = self.apply_price_updates(ticks)
+        self.stats['price_flushes'] += 1
+        
+        if affected:
+            for listener in self.price_listeners:
+                try:
+                    listener(affected)
+                except Exception as e:
+                    self.logger.error(f"Error in price listener: {e}")
+        return affected
+    
+    def apply_price_updates(self, ticks: Dict[int, Tuple[float, Optional[str]]]) -> Set[int]:
+        """
+        Apply prices to the affected legs, updating P&L by per-leg deltas
+        
+        Args:
+            ticks: security_id -> (price, timestamp or None)
+        
+        Returns:
+            Strategy ids whose P&L changed
+        """
+        affected: Set[int] = set()
+        now = datetime.now().isoformat()
+        
+        try:
+            with self.sync_lock:
+                for security_id, (price, timestamp) in ticks.items():
+                    timestamp = timestamp or now
+                    for position, leg_index in self.security_to_legs.get(security_id, ()):
+                        leg = position.legs[leg_index]
+                        
+                        # Short legs gain value as the price rises, long legs lose it
+                        delta = (price - leg.current_price) * leg.quantity
+                        position.current_value += delta if leg.action == 'SELL' else -delta
+                        leg.current_price = price
+                        leg.last_price_update = timestamp
+                        position.last_update = timestamp
+                        affected.add(position.strategy_id)
+                
+                for strategy_id in affected:
+                    position = self.positions_cache[strategy_id]
+                    position.total_pnl = position.current_value - position.net_premium
+                    if abs(position.net_premium) > 0:
+                        position.total_pnl_pct = (position.total_pnl / abs(position.net_premium)) * 100
+                    else:
+                        position.total_pnl_pct = 0.0
+                    position.last_pnl_update = now
+            
+            if affected:
+                self.logger.debug(f"Applied {len(ticks)} price ticks (affected {len(affected)} positions)")
+            
+        except Exception as e:
+            self.logger.error(f"Error applying price updates: {e}")
+        
+        return affected
+    
     def _calculate_position_pnl(self, position: CachedPosition):
         """Calculate P&L for a position"""
         try:
@@ -367,15 +481,8 @@ class PositionCacheManager:
                     position.status = 'closed'
                     position.last_update = datetime.now().isoformat()
                     
-                    # Remove from security mappings
-                    for leg in position.legs:
-                        if leg.security_id in self.security_to_positions:
-                            self.security_to_positions[leg.security_id].discard(strategy_id)
-                            if not self.security_to_positions[leg.security_id]:
-                                del self.security_to_positions[leg.security_id]
-                    
-                    # Remove from main cache
-                    del self.positions_cache[strategy_id]
+                    # Remove from security mappings and main cache
+                    self._remove_cached_position(strategy_id)
                     
                     self.logger.info(f"Removed closed position {position.symbol} from cache")
                     
@@ -456,6 +563,8 @@ class PositionCacheManager:
                 'hit_ratio': self.stats['cache_hits'] / max(1, self.stats['cache_hits'] + self.stats['cache_misses']),
                 'db_syncs': self.stats['db_syncs'],
                 'price_updates': self.stats['price_updates'],
+                'price_flushes': self.stats['price_flushes'],
+                'ticks_coalesced': self.stats['ticks_coalesced'],
                 'last_sync': self.last_db_sync,
                 'is_running': self.is_running
             }
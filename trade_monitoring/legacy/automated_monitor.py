@@ -109,6 +109,14 @@ class AutomatedMonitor:
             # Get current prices
             current_prices = self.position_monitor.get_current_prices(positions)
             
+            # Exit conditions for all open strategies in one batch (two queries), re-read
+            # every cycle since this monitor receives no change events; the cache only
+            # serves the per-position lookups within the cycle
+            self.position_monitor.invalidate_exit_conditions()
+            self.position_monitor.load_exit_conditions(
+                (p['strategy_id'] for p in positions), prune=True
+            )
+            
             # Process each position
             for position in positions:
                 try:
@@ -5,9 +5,11 @@ Real-time monitoring of open positions with P&L tracking
 
 import os
 import sys
+import time
 import logging
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional, Tuple
+from threading import Lock
+from typing import Dict, Iterable, List, Optional, Tuple
 import pandas as pd
 import numpy as np
 from decimal import Decimal
@@ -21,6 +23,7 @@ os.chdir(PROJECT_ROOT)
 
 from database.supabase_integration import SupabaseIntegration
 from data_scripts.market_quote_fetcher import MarketQuoteFetcher
+from trade_monitoring.position_book import get_position_book
 
 # Ensure logs directory exists
 logs_dir = os.path.join(PROJECT_ROOT, 'logs')
@@ -49,6 +52,17 @@ class PositionMonitor:
         if not self.db.client:
             raise ValueError("Failed to initialize database connection")
         
+        # Open positions shared with the other monitors and PositionCacheManager
+        self.position_book = get_position_book(self.db.client)
+        
+        # Parsed exit conditions per strategy, kept for EXIT_CONDITIONS_TTL_SECONDS. Callers
+        # may invalidate entries earlier; no change events reach this cache yet, so the TTL
+        # is what makes edits visible
+        self._exit_conditions_cache: Dict[int, Dict] = {}
+        self._exit_conditions_loaded_at: Dict[int, float] = {}
+        self._exit_conditions_lock = Lock()
+        self.exit_conditions_ttl = float(os.getenv('EXIT_CONDITIONS_TTL_SECONDS', '60'))
+        
         # Initialize market quote fetcher
         try:
             self.quote_fetcher = MarketQuoteFetcher()
@@ -71,61 +85,14 @@ class PositionMonitor:
         return logger
     
     def get_open_positions(self) -> List[Dict]:
-        """Fetch all open positions from database"""
+        """Open positions from the shared position book (refreshed incrementally)"""
         try:
-            # Get open trades
-            response = self.db.client.table('trades').select(
-                '*'
-            ).eq(
-                'order_status', 'open'
-            ).order('timestamp', desc=False).execute()
+            self.position_book.refresh()
+            positions = self.position_book.get_open_positions()
             
-            if not response.data:
+            if not positions:
                 self.logger.info("No open positions found")
-                return []
-            
-            # Group trades by strategy
-            positions = {}
-            for trade in response.data:
-                strategy_id = trade.get('strategy_id')
-                if strategy_id not in positions:
-                    # Fetch strategy info separately if needed
-                    positions[strategy_id] = {
-                        'strategy_id': strategy_id,
-                        'symbol': trade.get('symbol'),
-                        'strategy_name': trade.get('strategy'),
-                        'legs': [],
-                        'entry_time': trade.get('timestamp'),
-                        'total_quantity': 0,
-                        'net_premium': 0
-                    }
-                
-                # Add leg details
-                leg = {
-                    'trade_id': trade.get('new_id'),
-                    'security_id': trade.get('security_id'),
-                    'action': trade.get('action'),  # BUY/SELL
-                    'type': trade.get('type'),      # CE/PE
-                    'strike_price': trade.get('strike_price'),
-                    'quantity': trade.get('quantity', 0),
-                    'entry_price': trade.get('price', 0),
-                    'order_id': trade.get('order_id'),
-                    'expiry_date': trade.get('expiry_date')
-                }
-                
-                positions[strategy_id]['legs'].append(leg)
-                positions[strategy_id]['total_quantity'] = max(
-                    positions[strategy_id]['total_quantity'], 
-                    trade.get('quantity', 0)
-                )
-                
-                # Calculate net premium (positive for credit, negative for debit)
-                if trade.get('action') == 'SELL':
-                    positions[strategy_id]['net_premium'] += trade.get('price', 0) * trade.get('quantity', 0)
-                else:
-                    positions[strategy_id]['net_premium'] -= trade.get('price', 0) * trade.get('quantity', 0)
-            
-            return list(positions.values())
+            return positions
             
         except Exception as e:
             self.logger.error(f"Error fetching open positions: {e}")
@@ -287,64 +254,135 @@ class PositionMonitor:
             }
     
     def get_exit_conditions(self, strategy_id: int) -> Dict:
-        """Fetch exit conditions for a strategy from database"""
-        try:
-            # Get exit levels
-            exit_response = self.db.client.table('strategy_exit_levels').select(
-                '*'
-            ).eq('strategy_id', strategy_id).execute()
-            
-            # Get risk management data
-            risk_response = self.db.client.table('strategy_risk_management').select(
-                '*'
-            ).eq('strategy_id', strategy_id).execute()
-            
-            exit_conditions = {
-                'profit_targets': {},
-                'stop_losses': {},
-                'time_exits': {},
-                'adjustments': {}
+        """Fetch exit conditions for a strategy (cached, see load_exit_conditions)"""
+        return self.load_exit_conditions([strategy_id]).get(strategy_id, {})
+    
+    def load_exit_conditions(self, strategy_ids: Iterable[int], prune: bool = False) -> Dict[int, Dict]:
+        """
+        Bulk load exit conditions for many strategies
+        
+        Strategies not yet cached, or cached longer than the TTL, are fetched
+        together with one in_() query on strategy_exit_levels and one on
+        strategy_risk_management (more only when the ids need several
+        chunks or pages), instead of two queries per strategy.
+        
+        Args:
+            strategy_ids: Strategy IDs to load
+            prune: Drop cached strategies not in strategy_ids (e.g., closed positions)
+            
+        Returns:
+            Dictionary of strategy_id -> exit conditions
+        """
+        strategy_ids = list(dict.fromkeys(sid for sid in strategy_ids if sid is not None))
+        
+        expired_before = time.monotonic() - self.exit_conditions_ttl
+        with self._exit_conditions_lock:
+            if prune:
+                wanted = set(strategy_ids)
+                for cached_id in list(self._exit_conditions_cache):
+                    if cached_id not in wanted:
+                        del self._exit_conditions_cache[cached_id]
+                        self._exit_conditions_loaded_at.pop(cached_id, None)
+            missing = [sid for sid in strategy_ids
+                       if sid not in self._exit_conditions_cache
+                       or self._exit_conditions_loaded_at.get(sid, 0.0) < expired_before]
+        
+        if missing:
+            try:
+                exit_rows = self._fetch_rows_for_strategies('strategy_exit_levels', missing)
+                risk_rows = self._fetch_rows_for_strategies('strategy_risk_management', missing)
+                
+                grouped_exits: Dict[int, List[Dict]] = {sid: [] for sid in missing}
+                for row in exit_rows:
+                    grouped_exits.setdefault(row.get('strategy_id'), []).append(row)
+                
+                first_risk: Dict[int, Dict] = {}
+                for row in risk_rows:
+                    first_risk.setdefault(row.get('strategy_id'), row)
+                
+                loaded = {
+                    sid: self._parse_exit_conditions(grouped_exits[sid], first_risk.get(sid))
+                    for sid in missing
+                }
+                loaded_at = time.monotonic()
+                with self._exit_conditions_lock:
+                    self._exit_conditions_cache.update(loaded)
+                    self._exit_conditions_loaded_at.update(dict.fromkeys(loaded, loaded_at))
+                self.logger.debug(f"Loaded exit conditions for {len(missing)} strategies")
+                
+            except Exception as e:
+                self.logger.error(f"Error fetching exit conditions for strategies {missing}: {e}")
+        
+        with self._exit_conditions_lock:
+            return {
+                sid: self._exit_conditions_cache[sid]
+                for sid in strategy_ids if sid in self._exit_conditions_cache
             }
-            
-            # Process exit levels
-            if exit_response.data:
-                for exit in exit_response.data:
-                    exit_type = exit.get('exit_type')
-                    level_name = exit.get('level_name')
-                    
-                    if exit_type == 'profit_target':
-                        exit_conditions['profit_targets'][level_name] = {
-                            'trigger_value': exit.get('trigger_value'),
-                            'trigger_type': exit.get('trigger_type'),
-                            'action': exit.get('action'),
-                            'reasoning': exit.get('reasoning')
-                        }
-                    elif exit_type == 'stop_loss':
-                        exit_conditions['stop_losses'][level_name] = {
-                            'trigger_value': exit.get('trigger_value'),
-                            'trigger_type': exit.get('trigger_type'),
-                            'action': exit.get('action'),
-                            'reasoning': exit.get('reasoning')
-                        }
-                    elif exit_type == 'time_exit':
-                        exit_conditions['time_exits'][level_name] = {
-                            'trigger_value': exit.get('trigger_value'),
-                            'trigger_type': exit.get('trigger_type'),
-                            'action': exit.get('action'),
-                            'reasoning': exit.get('reasoning')
-                        }
-            
-            # Add risk management data
-            if risk_response.data and len(risk_response.data) > 0:
-                risk_data = risk_response.data[0]
-                exit_conditions['max_loss'] = risk_data.get('max_capital_at_risk', 0)
-                exit_conditions['adjustment_criteria'] = risk_data.get('adjustment_criteria', {})
-            
-            return exit_conditions
-            
-        except Exception as e:
-            self.logger.error(f"Error fetching exit conditions for strategy {strategy_id}: {e}")
-            return {}
+    
+    def invalidate_exit_conditions(self, strategy_id: Optional[int] = None):
+        """
+        Drop cached exit conditions so they are reloaded on next access
+        
+        Args:
+            strategy_id: Strategy to invalidate (None clears all)
+        """
+        with self._exit_conditions_lock:
+            if strategy_id is None:
+                self._exit_conditions_cache.clear()
+                self._exit_conditions_loaded_at.clear()
+            else:
+                self._exit_conditions_cache.pop(strategy_id, None)
+                self._exit_conditions_loaded_at.pop(strategy_id, None)
+    
+    def _fetch_rows_for_strategies(self, table: str, strategy_ids: List[int],
+                                   chunk_size: int = 100, page_size: int = 1000) -> List[Dict]:
+        """All rows of a table for a set of strategies (chunked in_() with pagination)"""
+        rows = []
+        for i in range(0, len(strategy_ids), chunk_size):
+            chunk = strategy_ids[i:i + chunk_size]
+            offset = 0
+            while True:
+                response = self.db.client.table(table).select('*').in_(
+                    'strategy_id', chunk
+                ).order('id').range(offset, offset + page_size - 1).execute()
+                page = response.data or []
+                rows.extend(page)
+                if len(page) < page_size:
+                    break
+                offset += page_size
+        return rows
+    
+    def _parse_exit_conditions(self, exit_levels: List[Dict], risk_data: Optional[Dict]) -> Dict:
+        """Build the exit conditions structure from exit level and risk management rows"""
+        exit_conditions = {
+            'profit_targets': {},
+            'stop_losses': {},
+            'time_exits': {},
+            'adjustments': {}
+        }
+        
+        # Process exit levels
+        section_by_type = {
+            'profit_target': 'profit_targets',
+            'stop_loss': 'stop_losses',
+            'time_exit': 'time_exits'
+        }
+        for exit in exit_levels:
+            section = section_by_type.get(exit.get('exit_type'))
+            if section:
+                exit_conditions[section][exit.get('level_name')] = {
+                    'trigger_value': exit.get('trigger_value'),
+                    'trigger_type': exit.get('trigger_type'),
+                    'action': exit.get('action'),
+                    'reasoning': exit.get('reasoning')
+                }
+        
+        # Add risk management data
+        if risk_data:
+            exit_conditions['max_loss'] = risk_data.get('max_capital_at_risk', 0)
+            exit_conditions['adjustment_criteria'] = risk_data.get('adjustment_criteria', {})
+        
+        return exit_conditions
     
     def get_position_summary(self, positions: List[Dict]) -> pd.DataFrame:
         """Create summary DataFrame of all positions with P&L"""
@@ -354,6 +392,7 @@ class PositionMonitor:
             
             # Calculate P&L for each position
             summary_data = []
+            self.load_exit_conditions(p['strategy_id'] for p in positions)
             
             for position in positions:
                 pnl_data = self.calculate_position_pnl(position, current_prices)
@@ -0,0 +1,315 @@
+"""
+Incremental Position Book
+Shared in-memory view of open trades, seeded once and updated incrementally
+"""
+
+import logging
+from threading import RLock
+from typing import Dict, List, Optional, Set
+
+logger = logging.getLogger(__name__)
+
+
+class LegRecord:
+    """Compact record of one open trade leg"""
+
+    __slots__ = (
+        'trade_id', 'strategy_id', 'symbol', 'strategy_name', 'security_id',
+        'action', 'type', 'strike_price', 'quantity', 'entry_price',
+        'order_id', 'expiry_date', 'timestamp'
+    )
+
+    def __init__(self, trade: Dict, security_id=None):
+        self.trade_id = trade.get('new_id', trade.get('id'))
+        self.strategy_id = trade.get('strategy_id')
+        self.symbol = trade.get('symbol')
+        self.strategy_name = trade.get('strategy')
+        self.security_id = security_id if security_id is not None else trade.get('security_id')
+        self.action = trade.get('action')            # BUY/SELL
+        self.type = trade.get('type')                # CE/PE
+        self.strike_price = trade.get('strike_price')
+        self.quantity = trade.get('quantity', 0)
+        self.entry_price = trade.get('price', 0)
+        self.order_id = trade.get('order_id')
+        self.expiry_date = trade.get('expiry_date')
+        self.timestamp = trade.get('timestamp')
+
+    @property
+    def awaiting_fill(self) -> bool:
+        """Entry price/expiry are filled in after the order executes"""
+        return not self.entry_price or not self.expiry_date
+
+    def to_dict(self) -> Dict:
+        """Leg in the PositionMonitor.get_open_positions format"""
+        return {
+            'trade_id': self.trade_id,
+            'security_id': self.security_id,
+            'action': self.action,
+            'type': self.type,
+            'strike_price': self.strike_price,
+            'quantity': self.quantity,
+            'entry_price': self.entry_price,
+            'order_id': self.order_id,
+            'expiry_date': self.expiry_date
+        }
+
+
+class PositionBook:
+    """
+    Open positions kept in memory and updated incrementally
+
+    The book is seeded with one paginated read of open trades. After that it
+    is kept current by trade change events (apply_change) or by refresh(),
+    which reads only the open trade ids and then fetches just the legs it
+    has not seen yet or that are still waiting for their fill price.
+    """
+
+    PAGE_SIZE = 1000
+
+    def __init__(self, supabase_client):
+        """
+        Initialize position book
+
+        Args:
+            supabase_client: Supabase client for the trades table
+        """
+        self.client = supabase_client
+
+        self._lock = RLock()
+        self._legs: Dict[int, LegRecord] = {}
+        self._by_strategy: Dict[int, Dict[int, LegRecord]] = {}
+        self._by_security: Dict[int, Set[int]] = {}
+        self._strategy_versions: Dict[int, int] = {}
+        self._seeded = False
+
+        self.stats = {'seeds': 0, 'refreshes': 0, 'events': 0, 'rows_fetched': 0}
+
+    def seed(self) -> None:
+        """Load all open trades, replacing the current book"""
+        trades = []
+        offset = 0
+        while True:
+            # Offset pages need a unique order; rows sharing a timestamp could repeat or go missing
+            response = self.client.table('trades').select('*').eq(
+                'order_status', 'open'
+            ).order('new_id').range(offset, offset + self.PAGE_SIZE - 1).execute()
+            page = response.data or []
+            trades.extend(page)
+            if len(page) < self.PAGE_SIZE:
+                break
+            offset += self.PAGE_SIZE
+
+        with self._lock:
+            self._legs.clear()
+            self._by_strategy.clear()
+            self._by_security.clear()
+            for trade in trades:
+                self._upsert(trade)
+            self._seeded = True
+
+        self.stats['seeds'] += 1
+        self.stats['rows_fetched'] += len(trades)
+        logger.info(f"Position book seeded with {len(trades)} open legs")
+
+    def refresh(self) -> None:
+        """
+        Bring the book up to date with the trades table
+
+        Seeds on first use. Afterwards it runs one narrow query for the open
+        trade ids, drops legs that are no longer open and fetches only new
+        legs and legs still awaiting their fill.
+        """
+        if not self._seeded:
+            self.seed()
+            return
+
+        open_ids = set()
+        offset = 0
+        while True:
+            response = self.client.table('trades').select('new_id').eq(
+                'order_status', 'open'
+            ).order('new_id').range(offset, offset + self.PAGE_SIZE - 1).execute()
+            page = response.data or []
+            open_ids.update(row['new_id'] for row in page)
+            if len(page) < self.PAGE_SIZE:
+                break
+            offset += self.PAGE_SIZE
+
+        with self._lock:
+            for trade_id in [t for t in self._legs if t not in open_ids]:
+                self._remove(trade_id)
+            to_fetch = [t for t in open_ids if t not in self._legs or self._legs[t].awaiting_fill]
+
+        fetched = []
+        for i in range(0, len(to_fetch), 100):
+            response = self.client.table('trades').select('*').in_(
+                'new_id', to_fetch[i:i + 100]
+            ).execute()
+            fetched.extend(response.data or [])
+
+        with self._lock:
+            for trade in sorted(fetched, key=lambda t: t.get('timestamp') or ''):
+                if trade.get('order_status') == 'open':
+                    self._upsert(trade)
+
+        self.stats['refreshes'] += 1
+        self.stats['rows_fetched'] += len(open_ids) + len(fetched)
+
+    def apply_change(self, change_data: Dict) -> None:
+        """
+        Apply a trades table change event (Supabase realtime payload)
+
+        Args:
+            change_data: Dict with eventType, record and old_record
+        """
+        event_type = change_data.get('eventType')
+        record = change_data.get('record') or {}
+
+        with self._lock:
+            if event_type == 'DELETE':
+                old_record = change_data.get('old_record') or {}
+                self._remove(old_record.get('new_id', old_record.get('id')))
+            elif record.get('order_status') == 'open':
+                self._upsert(record)
+            else:
+                self._remove(record.get('new_id', record.get('id')))
+
+        self.stats['events'] += 1
+
+    def get_open_positions(self) -> List[Dict]:
+        """Open positions grouped by strategy (PositionMonitor.get_open_positions format)"""
+        with self._lock:
+            return [self._position_dict(strategy_id, legs) for strategy_id, legs in self._by_strategy.items()]
+
+    def get_position(self, strategy_id: int) -> Optional[Dict]:
+        """Open position for a strategy, or None"""
+        with self._lock:
+            legs = self._by_strategy.get(strategy_id)
+            return self._position_dict(strategy_id, legs) if legs else None
+
+    def get_legs(self, strategy_id: int) -> List[LegRecord]:
+        """Leg records of a strategy"""
+        with self._lock:
+            return list(self._by_strategy.get(strategy_id, {}).values())
+
+    def get_strategy_ids_for_security(self, security_id: int) -> Set[int]:
+        """Strategies holding a leg on a security"""
+        with self._lock:
+            return {self._legs[t].strategy_id for t in self._by_security.get(security_id, ())}
+
+    def get_positions_for_security(self, security_id: int) -> List[Dict]:
+        """Open positions that include a security"""
+        with self._lock:
+            return [
+                self._position_dict(strategy_id, self._by_strategy[strategy_id])
+                for strategy_id in self.get_strategy_ids_for_security(security_id)
+            ]
+
+    def security_ids(self) -> Set[int]:
+        """Securities with open legs"""
+        with self._lock:
+            return set(self._by_security)
+
+    def strategy_versions(self) -> Dict[int, int]:
+        """Change counter per open strategy (bumped whenever its legs change)"""
+        with self._lock:
+            return {sid: self._strategy_versions.get(sid, 0) for sid in self._by_strategy}
+
+    def _upsert(self, trade: Dict) -> None:
+        leg = LegRecord(trade, security_id=self._resolve_security_id(trade))
+        if leg.trade_id is None or leg.strategy_id is None:
+            return
+
+        previous = self._legs.get(leg.trade_id)
+        if previous is not None:
+            self._unindex(previous)
+
+        self._legs[leg.trade_id] = leg
+        self._by_strategy.setdefault(leg.strategy_id, {})[leg.trade_id] = leg
+        if leg.security_id:
+            self._by_security.setdefault(leg.security_id, set()).add(leg.trade_id)
+        self._bump(leg.strategy_id)
+
+    def _remove(self, trade_id) -> None:
+        leg = self._legs.pop(trade_id, None)
+        if leg is not None:
+            self._unindex(leg)
+            self._bump(leg.strategy_id)
+
+    def _unindex(self, leg: LegRecord) -> None:
+        strategy_legs = self._by_strategy.get(leg.strategy_id)
+        if strategy_legs is not None:
+            strategy_legs.pop(leg.trade_id, None)
+            if not strategy_legs:
+                del self._by_strategy[leg.strategy_id]
+        if leg.security_id in self._by_security:
+            self._by_security[leg.security_id].discard(leg.trade_id)
+            if not self._by_security[leg.security_id]:
+                del self._by_security[leg.security_id]
+
+    def _bump(self, strategy_id) -> None:
+        self._strategy_versions[strategy_id] = self._strategy_versions.get(strategy_id, 0) + 1
+
+    def _resolve_security_id(self, trade: Dict):
+        """Security id from the trade, or from the scrip master index when missing"""
+        security_id = trade.get('security_id')
+        if security_id or not trade.get('strike_price') or not trade.get('type'):
+            return security_id
+
+        from utils.scrip_master_index import get_scrip_master_index
+        index = get_scrip_master_index(self.client)
+        if index is None:
+            return security_id
+        security_id, _ = index.lookup(
+            trade.get('symbol'), trade.get('expiry_date'), trade['type'],
+            trade['strike_price'], nearest=False
+        )
+        return security_id
+
+    @staticmethod
+    def _position_dict(strategy_id: int, legs: Dict[int, LegRecord]) -> Dict:
+        ordered = sorted(legs.values(), key=lambda leg: leg.timestamp or '')
+        first = ordered[0]
+
+        net_premium = 0
+        for leg in ordered:
+            # Positive for credit, negative for debit
+            sign = 1 if leg.action == 'SELL' else -1
+            net_premium += sign * (leg.entry_price or 0) * (leg.quantity or 0)
+
+        return {
+            'strategy_id': strategy_id,
+            'symbol': first.symbol,
+            'strategy_name': first.strategy_name,
+            'legs': [leg.to_dict() for leg in ordered],
+            'entry_time': first.timestamp,
+            'total_quantity': max((leg.quantity or 0) for leg in ordered),
+            'net_premium': net_premium
+        }
+
+
+# Global position book shared by the monitors and PositionCacheManager
+_position_book: Optional[PositionBook] = None
+_position_book_lock = RLock()
+
+
+def get_position_book(supabase_client=None) -> PositionBook:
+    """
+    Get or create the process-wide position book
+
+    Args:
+        supabase_client: Supabase client used when the book is first created
+
+    Returns:
+        PositionBook instance
+    """
+    global _position_book
+
+    with _position_book_lock:
+        if _position_book is None:
+            if supabase_client is None:
+                from database.supabase_integration import SupabaseIntegration
+                supabase_client = SupabaseIntegration().client
+            _position_book = PositionBook(supabase_client)
+
+    return _position_book
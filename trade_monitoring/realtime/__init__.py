@@ -9,9 +9,11 @@ Recommended for live trading with immediate execution capabilities.
 # from .realtime_automated_monitor import RealtimeAutomatedMonitor
 # from .supabase_realtime import SupabaseRealtime
 # from .websocket_manager import WebSocketManager
+# from .evaluation_scheduler import EvaluationScheduler
 
 __all__ = [
     'RealtimeAutomatedMonitor',
     'SupabaseRealtime', 
-    'WebSocketManager'
+    'WebSocketManager',
+    'EvaluationScheduler'
 ]
\ No newline at end of file
@@ -0,0 +1,213 @@
+"""
+Event-driven Exit Evaluation Scheduler
+Price ticks mark positions dirty; a bounded pool of workers evaluates them,
+debounced per position and nearest-to-trigger first
+"""
+
+import os
+import time
+import heapq
+import asyncio
+import logging
+from typing import Awaitable, Callable, Dict, List, Optional, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Proximity to return for a position that is at a threshold but must not be
+# re-evaluated in the urgent window (exit alerted only, or exit order failed)
+DEFERRED_PROXIMITY = 1.0
+
+
+class EvaluationScheduler:
+    """
+    Debounced, prioritised exit evaluation queue
+
+    A position is evaluated at most once per debounce window; ticks that
+    arrive inside the window only keep it dirty, so the latest prices are
+    evaluated when the window ends. Positions whose last evaluation put
+    them close to a stop loss or profit target use the much shorter urgent
+    window and are taken first by the workers. With no ticks the workers
+    sleep until the next scheduled evaluation instead of polling. A
+    position whose evaluation raises backs off exponentially from the
+    normal window until an evaluation succeeds.
+    """
+
+    def __init__(self, evaluate: Callable[[int], Awaitable[Optional[float]]],
+                 workers: Optional[int] = None, debounce_seconds: Optional[float] = None,
+                 urgent_debounce_seconds: Optional[float] = None,
+                 urgent_proximity: Optional[float] = None,
+                 max_backoff_seconds: Optional[float] = None):
+        """
+        Initialize evaluation scheduler
+
+        Args:
+            evaluate: Coroutine evaluating one strategy; returns its exit proximity
+                (ExitEvaluator.exit_proximity) or None when it no longer needs monitoring
+            workers: Concurrent evaluations (default: REALTIME_EVAL_WORKERS or 2)
+            debounce_seconds: Minimum time between evaluations of a position
+                (default: REALTIME_EVAL_DEBOUNCE or 5.0)
+            urgent_debounce_seconds: Window for positions near a threshold
+                (default: REALTIME_EVAL_URGENT_DEBOUNCE or 0.2)
+            urgent_proximity: Proximity at or below which a position is urgent
+                (default: REALTIME_EVAL_URGENT_PROXIMITY or 0.15)
+            max_backoff_seconds: Longest window after repeated evaluation errors
+                (default: REALTIME_EVAL_MAX_BACKOFF or 60.0)
+        """
+        self.evaluate = evaluate
+        self.workers = workers or int(os.getenv('REALTIME_EVAL_WORKERS', '2'))
+        self.debounce_seconds = (debounce_seconds if debounce_seconds is not None
+                                 else float(os.getenv('REALTIME_EVAL_DEBOUNCE', '5.0')))
+        self.urgent_debounce_seconds = (urgent_debounce_seconds if urgent_debounce_seconds is not None
+                                        else float(os.getenv('REALTIME_EVAL_URGENT_DEBOUNCE', '0.2')))
+        self.urgent_proximity = (urgent_proximity if urgent_proximity is not None
+                                 else float(os.getenv('REALTIME_EVAL_URGENT_PROXIMITY', '0.15')))
+        self.max_backoff_seconds = (max_backoff_seconds if max_backoff_seconds is not None
+                                    else float(os.getenv('REALTIME_EVAL_MAX_BACKOFF', '60.0')))
+
+        self._proximity: Dict[int, float] = {}     # strategy_id -> proximity from last evaluation
+        self._last_run: Dict[int, float] = {}      # strategy_id -> monotonic time of last evaluation
+        self._scheduled: Dict[int, float] = {}     # strategy_id -> due time of its queue entry
+        self._running: Set[int] = set()
+        self._rerun: Set[int] = set()              # marked dirty while being evaluated
+        self._failures: Dict[int, int] = {}        # strategy_id -> consecutive evaluation errors
+
+        self._waiting: List[Tuple[float, int]] = []         # (due, strategy_id)
+        self._ready: List[Tuple[float, int, int]] = []      # (proximity, seq, strategy_id)
+        self._seq = 0
+
+        self._wakeup: Optional[asyncio.Event] = None
+        self._stopped: Optional[asyncio.Event] = None
+
+        self.stats = {
+            'marks': 0,
+            'coalesced': 0,
+            'evaluations': 0,
+            'urgent_evaluations': 0,
+            'errors': 0
+        }
+
+    def mark_dirty(self, strategy_id: int) -> None:
+        """
+        Schedule a strategy for evaluation after a price change
+
+        Args:
+            strategy_id: Strategy whose prices moved
+        """
+        self.stats['marks'] += 1
+
+        if strategy_id in self._running:
+            self._rerun.add(strategy_id)
+            self.stats['coalesced'] += 1
+            return
+
+        due = self._last_run.get(strategy_id, 0.0) + self._window(strategy_id)
+        scheduled = self._scheduled.get(strategy_id)
+        if scheduled is not None and scheduled <= due:
+            self.stats['coalesced'] += 1
+            return
+
+        # New entry, or an earlier one after the position became urgent;
+        # the stale heap entry is skipped when it surfaces
+        self._scheduled[strategy_id] = due
+        heapq.heappush(self._waiting, (due, strategy_id))
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    def forget(self, strategy_id: int) -> None:
+        """Drop all state for a strategy that is no longer open"""
+        self._proximity.pop(strategy_id, None)
+        self._last_run.pop(strategy_id, None)
+        self._scheduled.pop(strategy_id, None)
+        self._rerun.discard(strategy_id)
+        self._failures.pop(strategy_id, None)
+
+    def pending(self) -> int:
+        """Strategies waiting for evaluation"""
+        return len(self._scheduled)
+
+    async def run(self) -> None:
+        """Run the workers until stop() is called"""
+        self._wakeup = asyncio.Event()
+        self._stopped = asyncio.Event()
+        if self._scheduled:
+            self._wakeup.set()
+
+        tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+        logger.info(f"Evaluation scheduler started with {self.workers} workers")
+        try:
+            await self._stopped.wait()
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            logger.info(f"Evaluation scheduler stopped: {self.stats}")
+
+    def stop(self) -> None:
+        """Stop the workers (safe to call before run or more than once)"""
+        if self._stopped is not None:
+            self._stopped.set()
+
+    def _window(self, strategy_id: int) -> float:
+        failures = self._failures.get(strategy_id, 0)
+        if failures:
+            return min(self.debounce_seconds * 2 ** (failures - 1), self.max_backoff_seconds)
+        if self._proximity.get(strategy_id, 0.0) <= self.urgent_proximity:
+            return self.urgent_debounce_seconds
+        return self.debounce_seconds
+
+    def _next_ready(self) -> Tuple[Optional[int], Optional[float]]:
+        """Pop the most urgent due strategy, or return the wait until the next one"""
+        now = time.monotonic()
+        while self._waiting and self._waiting[0][0] <= now:
+            due, strategy_id = heapq.heappop(self._waiting)
+            if self._scheduled.get(strategy_id) != due:
+                continue
+            self._seq += 1
+            heapq.heappush(self._ready, (self._proximity.get(strategy_id, 0.0), self._seq, strategy_id))
+
+        while self._ready:
+            _, _, strategy_id = heapq.heappop(self._ready)
+            if strategy_id in self._scheduled:
+                del self._scheduled[strategy_id]
+                return strategy_id, None
+
+        return None, (self._waiting[0][0] - now if self._waiting else None)
+
+    async def _worker(self) -> None:
+        while True:
+            strategy_id, wait = self._next_ready()
+            if strategy_id is None:
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=wait)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            urgent = (self._proximity.get(strategy_id, 0.0) <= self.urgent_proximity
+                      and not self._failures.get(strategy_id))
+            self._running.add(strategy_id)
+            self._last_run[strategy_id] = time.monotonic()
+            try:
+                proximity = await self.evaluate(strategy_id)
+                self.stats['evaluations'] += 1
+                if urgent:
+                    self.stats['urgent_evaluations'] += 1
+                self._failures.pop(strategy_id, None)
+            except Exception as e:
+                logger.error(f"Error evaluating strategy {strategy_id}: {e}")
+                self.stats['errors'] += 1
+                # An error says nothing about the thresholds; back off instead of retrying urgently
+                self._failures[strategy_id] = self._failures.get(strategy_id, 0) + 1
+                proximity = self._proximity.get(strategy_id, DEFERRED_PROXIMITY)
+            finally:
+                self._running.discard(strategy_id)
+
+            if proximity is None:
+                self.forget(strategy_id)
+                continue
+
+            self._proximity[strategy_id] = proximity
+            if strategy_id in self._rerun:
+                self._rerun.discard(strategy_id)
+                self.mark_dirty(strategy_id)
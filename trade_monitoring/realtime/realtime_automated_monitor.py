@@ -11,7 +11,7 @@ import sys
 import time
 import argparse
 from datetime import datetime
-from typing import Dict, List, Optional
+from typing import Dict, Optional
 from tabulate import tabulate
 import os
 
@@ -23,6 +23,7 @@ from trade_execution.exit_executor import ExitExecutor
 from data_scripts.realtime_market_fetcher import RealtimeMarketFetcher
 from trade_monitoring.realtime.websocket_manager import WebSocketManager
 from trade_monitoring.realtime.supabase_realtime import SupabaseRealtime
+from trade_monitoring.realtime.evaluation_scheduler import EvaluationScheduler, DEFERRED_PROXIMITY
 from database.supabase_integration import SupabaseIntegration
 
 # Configure logging
@@ -82,13 +83,17 @@ class RealtimeAutomatedMonitor:
             try:
                 self.supabase_realtime = SupabaseRealtime()
                 self.supabase_realtime.add_trade_handler(self._handle_trade_update)
+                self.supabase_realtime.add_general_handler(self._handle_exit_config_change)
                 self.logger.info("Supabase realtime initialized")
             except Exception as e:
                 self.logger.warning(f"Supabase realtime initialization failed: {e}")
         
         # Exit tracking to prevent duplicates
         self.executed_exits = set()
-        self.last_evaluation_time = {}
+        
+        # Ticks mark positions dirty; evaluations are debounced and prioritised
+        self.evaluation_scheduler = EvaluationScheduler(self._evaluate_strategy)
+        self._loop = None
         
         # Statistics
         self.stats = {
@@ -113,6 +118,8 @@ class RealtimeAutomatedMonitor:
         """Handle shutdown signals gracefully"""
         self.logger.info(f"Received signal {signum}, initiating graceful shutdown...")
         self.shutdown_requested = True
+        if self._loop is not None:
+            self._loop.call_soon_threadsafe(self.evaluation_scheduler.stop)
     
     async def start(self, interval_seconds=300):
         """
@@ -123,6 +130,7 @@ class RealtimeAutomatedMonitor:
         """
         try:
             self.is_running = True
+            self._loop = asyncio.get_running_loop()
             self.logger.info("Starting real-time automated monitor...")
             
             # Start real-time market feed
@@ -167,6 +175,8 @@ class RealtimeAutomatedMonitor:
         self.is_running = False
         self.logger.info("Stopping real-time monitoring system...")
         
+        self.evaluation_scheduler.stop()
+        
         # Stop real-time feeds
         if self.market_fetcher:
             await self.market_fetcher.stop_realtime_feed()
@@ -207,18 +217,14 @@ class RealtimeAutomatedMonitor:
                 await asyncio.sleep(30)  # Wait before retrying
     
     async def _realtime_evaluation_loop(self):
-        """Real-time evaluation loop for instant price-based exits"""
+        """Real-time evaluation of positions marked dirty by price updates"""
         self.logger.info("Real-time evaluation loop started")
         
-        while self.is_running and not self.shutdown_requested:
-            try:
-                # This loop handles events triggered by price updates
-                # The actual work is done in _handle_price_update
-                await asyncio.sleep(1)  # Minimal sleep to prevent busy loop
-                
-            except Exception as e:
-                self.logger.error(f"Error in real-time evaluation loop: {e}")
-                await asyncio.sleep(5)
+        try:
+            # Workers sleep until a tick marks a position dirty or a debounce window ends
+            await self.evaluation_scheduler.run()
+        except Exception as e:
+            self.logger.error(f"Error in real-time evaluation loop: {e}")
     
     async def _perform_monitoring_cycle(self):
         """Perform a complete monitoring cycle"""
@@ -266,6 +272,12 @@ class RealtimeAutomatedMonitor:
                 'details': []
             }
             
+            # Exit conditions for all open strategies in one batch, cached for the TTL
+            # (EXIT_CONDITIONS_TTL_SECONDS; at the defaults, 60s vs a 300s interval, every cycle reloads them)
+            self.position_monitor.load_exit_conditions(
+                (p['strategy_id'] for p in positions), prune=True
+            )
+            
             for position in positions:
                 try:
                     await self._process_position(position, current_prices, results)
@@ -338,32 +350,13 @@ class RealtimeAutomatedMonitor:
             self.stats['errors'] += 1
     
     async def _handle_price_update(self, price_data: Dict):
-        """Handle real-time price updates for instant evaluation"""
+        """Handle real-time price updates by marking affected positions for evaluation"""
         try:
             self.stats['price_updates_processed'] += 1
             security_id = price_data.get('security_id')
-            ltp = price_data.get('ltp', 0)
             
-            # Get positions that include this security ID
-            affected_positions = self._get_positions_for_security(security_id)
-            
-            for position in affected_positions:
-                position_key = f"{position['strategy_id']}_{position['symbol']}"
-                
-                # Skip if already executed
-                if position_key in self.executed_exits:
-                    continue
-                
-                # Throttle evaluation (max once per 5 seconds per position)
-                current_time = time.time()
-                last_eval = self.last_evaluation_time.get(position_key, 0)
-                if current_time - last_eval < 5:
-                    continue
-                
-                self.last_evaluation_time[position_key] = current_time
-                
-                # Quick evaluation for critical exit conditions
-                await self._quick_evaluate_position(position, price_data)
+            for strategy_id in self.position_monitor.position_book.get_strategy_ids_for_security(security_id):
+                self.evaluation_scheduler.mark_dirty(strategy_id)
                 
         except Exception as e:
             self.logger.error(f"Error handling price update: {e}")
@@ -379,6 +372,9 @@ class RealtimeAutomatedMonitor:
             
             self.logger.info(f"Trade update: {event_type} - {record.get('symbol')}")
             
+            # Keep the shared position book current without re-reading trades
+            self.position_monitor.position_book.apply_change(trade_data)
+            
             # If new trade opened, refresh instruments and subscriptions
             if event_type == 'INSERT':
                 await self._handle_new_trade(record)
@@ -389,59 +385,80 @@ class RealtimeAutomatedMonitor:
             self.logger.error(f"Error handling trade update: {e}")
             self.stats['errors'] += 1
     
-    def _get_positions_for_security(self, security_id: int) -> List[Dict]:
-        """Get positions that include a specific security ID"""
+    async def _handle_exit_config_change(self, change_data: Dict):
+        """
+        Invalidate cached exit conditions when a strategy or its exit levels change
+        
+        Inactive until SupabaseRealtime._process_messages delivers messages;
+        until then the exit-condition TTL is what picks up edits.
+        """
         try:
-            all_positions = self.position_monitor.get_open_positions()
-            affected_positions = []
-            
-            for position in all_positions:
-                for leg in position.get('legs', []):
-                    if leg.get('security_id') == security_id:
-                        affected_positions.append(position)
-                        break
+            table = change_data.get('table')
+            if table not in ('strategies', 'strategy_exit_levels', 'strategy_risk_management'):
+                return
             
-            return affected_positions
+            record = change_data.get('record') or change_data.get('old_record') or {}
+            strategy_id = record.get('id') if table == 'strategies' else record.get('strategy_id')
+            self.position_monitor.invalidate_exit_conditions(strategy_id)
+            self.logger.debug(f"Exit conditions invalidated for strategy {strategy_id or 'ALL'} ({table})")
             
         except Exception as e:
-            self.logger.error(f"Error getting positions for security: {e}")
-            return []
+            self.logger.error(f"Error handling exit condition change: {e}")
     
-    async def _quick_evaluate_position(self, position: Dict, price_data: Dict):
-        """Quick evaluation for critical exit conditions"""
-        try:
-            # Get current prices with the updated price
-            current_prices = self.market_fetcher.get_market_quotes()
-            
-            # Calculate P&L
-            pnl_data = self.position_monitor.calculate_position_pnl(position, current_prices)
-            
-            # Get exit conditions
-            exit_conditions = self.position_monitor.get_exit_conditions(position['strategy_id'])
-            
-            # Quick evaluation focusing on critical conditions
-            evaluation = self.exit_evaluator.evaluate_position(pnl_data, exit_conditions)
-            
-            # Only act on HIGH urgency exits
-            if evaluation.get('urgency') == 'HIGH' and \
-               evaluation.get('recommended_action') in ['CLOSE_IMMEDIATELY']:
-                
-                self.logger.warning(f"URGENT EXIT TRIGGERED: {position['symbol']} - {evaluation.get('action_reason')}")
-                
-                # Generate alert
-                await self._generate_alert(position, pnl_data, evaluation)
-                
-                # Execute exit immediately if enabled
-                if not self.alert_only:
-                    position_key = f"{position['strategy_id']}_{position['symbol']}"
-                    success = await self._execute_position_exit(position, evaluation)
-                    if success:
-                        self.executed_exits.add(position_key)
-                        self.stats['exits_executed'] += 1
-                        self.logger.info(f"URGENT EXIT EXECUTED: {position['symbol']}")
-                
-        except Exception as e:
-            self.logger.error(f"Error in quick evaluation: {e}")
+    async def _evaluate_strategy(self, strategy_id: int) -> Optional[float]:
+        """
+        Evaluate one position for critical exit conditions (evaluation scheduler worker)
+        
+        Returns:
+            Exit proximity used to prioritise the next evaluation, inf once the
+            position has been exited, DEFERRED_PROXIMITY after an alert or a
+            failed exit (normal window, not urgent), or None when it is no
+            longer open
+        """
+        position = self.position_monitor.position_book.get_position(strategy_id)
+        if position is None:
+            return None
+        
+        position_key = f"{position['strategy_id']}_{position['symbol']}"
+        if position_key in self.executed_exits:
+            return float('inf')
+        
+        # Prices, P&L and rule evaluation are synchronous; keep them off the event loop
+        pnl_data, exit_conditions, evaluation = await asyncio.to_thread(self._evaluate_position_sync, position)
+        
+        # Only act on HIGH urgency exits
+        if evaluation.get('urgency') == 'HIGH' and \
+           evaluation.get('recommended_action') in ['CLOSE_IMMEDIATELY']:
+            
+            self.logger.warning(f"URGENT EXIT TRIGGERED: {position['symbol']} - {evaluation.get('action_reason')}")
+            
+            # Generate alert
+            await self._generate_alert(position, pnl_data, evaluation)
+            
+            # Execute exit immediately if enabled
+            if not self.alert_only:
+                success = await self._execute_position_exit(position, evaluation)
+                if success:
+                    self.executed_exits.add(position_key)
+                    self.stats['exits_executed'] += 1
+                    self.logger.info(f"URGENT EXIT EXECUTED: {position['symbol']}")
+                    return float('inf')
+            # Re-check in the normal window; the urgent one would re-alert and poll quotes 5x a second
+            return DEFERRED_PROXIMITY
+        
+        return self.exit_evaluator.exit_proximity(pnl_data, exit_conditions)
+    
+    def _evaluate_position_sync(self, position: Dict):
+        """Latest prices, P&L and exit evaluation for one position"""
+        security_ids = [leg['security_id'] for leg in position['legs'] if leg.get('security_id')]
+        prices = self.market_fetcher.get_multiple_latest_prices(security_ids)
+        current_prices = {security_id: price_data.get('ltp', 0) for security_id, price_data in prices.items()}
+        
+        pnl_data = self.position_monitor.calculate_position_pnl(position, current_prices)
+        exit_conditions = self.position_monitor.get_exit_conditions(position['strategy_id'])
+        evaluation = self.exit_evaluator.evaluate_position(pnl_data, exit_conditions)
+        
+        return pnl_data, exit_conditions, evaluation
     
     async def _execute_position_exit(self, position: Dict, evaluation: Dict) -> bool:
         """Execute position exit"""
@@ -153,6 +153,9 @@ class SupabaseRealtime:
             # Subscribe to strategy_exit_levels table
             await self.subscribe_to_table('strategy_exit_levels', self._handle_exit_levels_change)
             
+            # Subscribe to strategy_risk_management table (max loss feeds exit conditions)
+            await self.subscribe_to_table('strategy_risk_management', self._handle_exit_levels_change)
+            
             self.logger.info("Default subscriptions set up successfully")
             
         except Exception as e:
@@ -0,0 +1,157 @@
+"""
+Analysis Result Cache
+On-disk cache of per-symbol analysis results keyed by option chain snapshot
+fingerprint, so intraday reruns only re-analyse symbols with fresh chains
+"""
+
+import os
+import json
+import hashlib
+import logging
+from datetime import date, datetime
+from threading import Lock
+from typing import Dict, Optional, Type
+
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CACHE_DIR = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+    'cache',
+    'analysis_results'
+)
+
+# Raw option_chain_data columns whose changes require a re-analysis
+FINGERPRINT_COLUMNS = ['expiry_date', 'strike_price', 'option_type', 'open_interest', 'implied_volatility', 'ltp']
+
+
+def snapshot_fingerprint(raw_chain: pd.DataFrame, context: str = '') -> Optional[str]:
+    """
+    Hash of the chain snapshot an analysis depends on
+
+    Combines the latest created_at, the spot price of the latest rows and a
+    hash of the strike-level OI/IV/premium columns.
+
+    Args:
+        raw_chain: Raw (database column) chain from the bulk preload
+        context: Run settings that also change the result (risk tolerance, config)
+
+    Returns:
+        Hex digest, or None when the chain has no created_at to fingerprint
+    """
+    if raw_chain is None or raw_chain.empty or 'created_at' not in raw_chain.columns:
+        return None
+
+    latest_created_at = str(raw_chain['created_at'].max())
+    latest_rows = raw_chain[raw_chain['created_at'].astype(str) == latest_created_at]
+    spot = (pd.to_numeric(latest_rows['underlying_price'], errors='coerce').dropna().iloc[0]
+            if 'underlying_price' in latest_rows.columns and latest_rows['underlying_price'].notna().any()
+            else None)
+
+    columns = [c for c in FINGERPRINT_COLUMNS if c in raw_chain.columns]
+    keys = [c for c in ('expiry_date', 'strike_price', 'option_type') if c in columns]
+    rows = raw_chain[columns].sort_values(keys, kind='mergesort') if keys else raw_chain[columns]
+    row_hashes = pd.util.hash_pandas_object(rows.astype(str), index=False).to_numpy()
+
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(row_hashes.tobytes())
+    digest.update(f"{latest_created_at}_{spot}_{context}".encode())
+    return digest.hexdigest()
+
+
+class AnalysisResultCache:
+    """
+    Per-symbol analysis results of the current trading day
+
+    One JSON file per symbol holds the fingerprint of the chain snapshot it
+    was computed from. A result is reused only for the same fingerprint and
+    only on the day it was computed, since DTE-dependent scores move daily.
+    """
+
+    def __init__(self, cache_dir: Optional[str] = None, encoder: Optional[Type[json.JSONEncoder]] = None):
+        """
+        Initialize result cache
+
+        Args:
+            cache_dir: Cache directory (default: ANALYSIS_RESULT_CACHE_DIR or cache/analysis_results)
+            encoder: JSON encoder for results (numpy types)
+        """
+        self.cache_dir = cache_dir or os.getenv('ANALYSIS_RESULT_CACHE_DIR', DEFAULT_CACHE_DIR)
+        self.encoder = encoder
+        self._lock = Lock()
+
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, symbol: str, fingerprint: Optional[str]) -> Optional[Dict]:
+        """
+        Get today's result for an unchanged chain snapshot
+
+        Args:
+            symbol: Stock symbol
+            fingerprint: Current snapshot fingerprint
+
+        Returns:
+            Cached symbol result or None on miss
+        """
+        entry = self._read(symbol) if fingerprint else None
+        hit = (entry is not None and entry.get('fingerprint') == fingerprint
+               and str(entry.get('analyzed_at', ''))[:10] == date.today().isoformat())
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+        if not hit:
+            return None
+        result = entry.get('result') or {}
+        result['reused_analysis'] = entry['analyzed_at']
+        return result
+
+    def put(self, symbol: str, fingerprint: Optional[str], result: Dict) -> None:
+        """
+        Store a successful symbol result
+
+        Args:
+            symbol: Stock symbol
+            fingerprint: Snapshot fingerprint the result was computed from
+            result: Result from analyze_symbol
+        """
+        if not fingerprint or not result.get('success', False):
+            return
+        path = self._path(symbol)
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            payload = json.dumps({
+                'symbol': symbol,
+                'fingerprint': fingerprint,
+                'analyzed_at': datetime.now().isoformat(),
+                'result': result
+            }, cls=self.encoder)
+            tmp_path = f"{path}.{os.getpid()}.tmp"
+            with open(tmp_path, 'w') as f:
+                f.write(payload)
+            os.replace(tmp_path, path)
+        except Exception as e:
+            logger.debug(f"Could not cache analysis result for {symbol}: {e}")
+
+    def get_stats(self) -> Dict:
+        """Hit/miss counters"""
+        with self._lock:
+            return {'hits': self.hits, 'misses': self.misses}
+
+    def _path(self, symbol: str) -> str:
+        safe_symbol = symbol.replace('/', '_')
+        return os.path.join(self.cache_dir, f"{safe_symbol}.json")
+
+    def _read(self, symbol: str) -> Optional[Dict]:
+        path = self._path(symbol)
+        try:
+            if not os.path.exists(path):
+                return None
+            with open(path, 'r') as f:
+                return json.load(f)
+        except Exception as e:
+            logger.debug(f"Cached analysis result unavailable ({path}): {e}")
+            return None
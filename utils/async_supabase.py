@@ -0,0 +1,415 @@
+"""
+Async Supabase (PostgREST) data access layer
+Bounded pool of persistent HTTP/2 clients with a non-blocking token-bucket limiter
+"""
+
+import os
+import time
+import asyncio
+import logging
+from typing import Any, Dict, List, Optional, Tuple
+
+import httpx
+
+try:
+    import h2  # noqa: F401  (HTTP/2 support for httpx)
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+RETRYABLE_STATUS = {429, 500, 502, 503, 504}
+
+
+class AsyncTokenBucket:
+    """
+    Token bucket for asyncio tasks
+
+    A task reserves its token immediately and then awaits its own delay, so
+    one throttled request never holds up the event loop or other tasks.
+    """
+
+    def __init__(self, rate: float, capacity: Optional[float] = None):
+        """
+        Initialize token bucket
+
+        Args:
+            rate: Tokens added per second
+            capacity: Burst size (default: one second worth of tokens)
+        """
+        self.rate = float(rate)
+        self.capacity = float(capacity if capacity is not None else max(1.0, rate))
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+
+    async def acquire(self):
+        """Wait until a token is available"""
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+        self._tokens -= 1.0
+
+        wait = -self._tokens / self.rate
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+
+class AsyncResponse:
+    """Query result with the same .data/.count shape as supabase-py responses"""
+
+    def __init__(self, data: Any, count: Optional[int] = None):
+        self.data = data
+        self.count = count
+
+
+class AsyncQuery:
+    """
+    Fluent PostgREST query mirroring the supabase-py builder
+
+    Example:
+        response = await pool.table('lots').select('symbol,jan').eq('symbol', 'TCSBS').execute()
+    """
+
+    def __init__(self, pool: 'AsyncSupabasePool', table: str):
+        self._pool = pool
+        self._table = table
+        self._method = 'GET'
+        self._params: List[Tuple[str, str]] = []
+        self._body: Any = None
+        self._headers: Dict[str, str] = {}
+
+    def select(self, columns: str = '*') -> 'AsyncQuery':
+        self._params.append(('select', columns))
+        return self
+
+    def insert(self, rows) -> 'AsyncQuery':
+        self._method = 'POST'
+        self._body = rows
+        self._headers['Prefer'] = 'return=representation'
+        return self
+
+    def upsert(self, rows, on_conflict: Optional[str] = None) -> 'AsyncQuery':
+        self._method = 'POST'
+        self._body = rows
+        self._headers['Prefer'] = 'return=representation,resolution=merge-duplicates'
+        if on_conflict:
+            self._params.append(('on_conflict', on_conflict))
+        return self
+
+    def eq(self, column: str, value) -> 'AsyncQuery':
+        return self._filter(column, 'eq', value)
+
+    def neq(self, column: str, value) -> 'AsyncQuery':
+        return self._filter(column, 'neq', value)
+
+    def gt(self, column: str, value) -> 'AsyncQuery':
+        return self._filter(column, 'gt', value)
+
+    def gte(self, column: str, value) -> 'AsyncQuery':
+        return self._filter(column, 'gte', value)
+
+    def lt(self, column: str, value) -> 'AsyncQuery':
+        return self._filter(column, 'lt', value)
+
+    def lte(self, column: str, value) -> 'AsyncQuery':
+        return self._filter(column, 'lte', value)
+
+    def in_(self, column: str, values) -> 'AsyncQuery':
+        quoted = ','.join(f'"{v}"' if isinstance(v, str) else str(v) for v in values)
+        self._params.append((column, f'in.({quoted})'))
+        return self
+
+    def order(self, column: str, desc: bool = False) -> 'AsyncQuery':
+        self._params.append(('order', f"{column}.{'desc' if desc else 'asc'}"))
+        return self
+
+    def limit(self, count: int) -> 'AsyncQuery':
+        self._params.append(('limit', str(count)))
+        return self
+
+    def _filter(self, column: str, operator: str, value) -> 'AsyncQuery':
+        self._params.append((column, f'{operator}.{value}'))
+        return self
+
+    async def execute(self) -> AsyncResponse:
+        """Run the query through the pool"""
+        data = await self._pool.request(
+            self._method, self._table, params=self._params, json=self._body, headers=self._headers
+        )
+        return AsyncResponse(data)
+
+
+class AsyncSupabasePool:
+    """
+    Bounded pool of persistent async PostgREST clients
+
+    Each client keeps one HTTP/2 connection (HTTP/1.1 without the h2
+    package) open for the life of the pool. A request checks a client out,
+    waits for a rate-limit token and retries transient failures with
+    exponential backoff. Pointing base_url at a local PostgREST stand-in
+    makes the whole layer testable offline.
+    """
+
+    def __init__(self, url: Optional[str] = None, key: Optional[str] = None,
+                 max_connections: Optional[int] = None, requests_per_second: Optional[float] = None,
+                 timeout: float = 30.0, max_retries: int = 3, base_url: Optional[str] = None):
+        """
+        Initialize async pool
+
+        Args:
+            url: Supabase project URL (default: NEXT_PUBLIC_SUPABASE_URL)
+            key: API key (default: NEXT_PUBLIC_SUPABASE_ANON_KEY)
+            max_connections: Pooled clients (default: SUPABASE_MAX_CONNECTIONS or 5)
+            requests_per_second: Rate limit (default: SUPABASE_RPS or 10)
+            timeout: Per-request timeout in seconds
+            max_retries: Attempts for transient failures
+            base_url: PostgREST root, overrides url + '/rest/v1' (e.g., a local PostgREST)
+        """
+        self.url = url or os.getenv('NEXT_PUBLIC_SUPABASE_URL') or os.getenv('SUPABASE_URL')
+        self.key = key or os.getenv('NEXT_PUBLIC_SUPABASE_ANON_KEY') or os.getenv('SUPABASE_ANON_KEY')
+        self.base_url = base_url or (f"{self.url.rstrip('/')}/rest/v1" if self.url else None)
+
+        if not self.base_url:
+            raise ValueError("Supabase credentials not found in environment")
+
+        self.max_connections = max_connections or int(os.getenv('SUPABASE_MAX_CONNECTIONS', '5'))
+        self.rate_limiter = AsyncTokenBucket(requests_per_second or float(os.getenv('SUPABASE_RPS', '10')))
+        self.timeout = timeout
+        self.max_retries = max_retries
+
+        self._clients: Optional[asyncio.Queue] = None
+        self._all_clients: List[httpx.AsyncClient] = []
+        self.request_count = 0
+
+    async def __aenter__(self) -> 'AsyncSupabasePool':
+        await self.open()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+
+    async def open(self):
+        """Create the pooled clients"""
+        if self._clients is not None:
+            return
+
+        headers = {'Content-Type': 'application/json'}
+        if self.key:
+            headers.update({'apikey': self.key, 'Authorization': f"Bearer {self.key}"})
+
+        self._clients = asyncio.Queue()
+        for _ in range(self.max_connections):
+            client = httpx.AsyncClient(
+                base_url=self.base_url,
+                headers=headers,
+                http2=HTTP2_AVAILABLE,
+                timeout=self.timeout,
+                limits=httpx.Limits(max_connections=1, max_keepalive_connections=1)
+            )
+            self._all_clients.append(client)
+            self._clients.put_nowait(client)
+
+        logger.info(f"Async Supabase pool opened: {self.max_connections} clients, "
+                    f"http2={HTTP2_AVAILABLE}, rps={self.rate_limiter.rate}")
+
+    async def close(self):
+        """Close all pooled clients"""
+        for client in self._all_clients:
+            await client.aclose()
+        self._all_clients = []
+        self._clients = None
+
+    def table(self, name: str) -> AsyncQuery:
+        """Start a query on a table"""
+        return AsyncQuery(self, name)
+
+    async def request(self, method: str, table: str, params=None, json=None, headers=None) -> Any:
+        """
+        Send one PostgREST request through a pooled client
+
+        Returns:
+            Decoded JSON body (list of rows for selects and representations)
+        """
+        if self._clients is None:
+            await self.open()
+
+        delay = 1.0
+        client = await self._clients.get()
+        try:
+            for attempt in range(self.max_retries):
+                await self.rate_limiter.acquire()
+                self.request_count += 1
+                try:
+                    response = await client.request(method, f"/{table}", params=params, json=json, headers=headers)
+                    if response.status_code in RETRYABLE_STATUS and attempt < self.max_retries - 1:
+                        raise httpx.HTTPStatusError(
+                            f"Retryable status {response.status_code}", request=response.request, response=response
+                        )
+                    response.raise_for_status()
+                    return response.json() if response.content else []
+
+                except (httpx.TransportError, httpx.HTTPStatusError) as e:
+                    retryable = isinstance(e, httpx.TransportError) or \
+                        e.response.status_code in RETRYABLE_STATUS
+                    if not retryable or attempt >= self.max_retries - 1:
+                        raise
+                    logger.warning(f"{method} {table} failed, retrying in {delay}s "
+                                   f"(attempt {attempt + 1}/{self.max_retries}): {e}")
+                    await asyncio.sleep(delay)
+                    delay *= 2
+        finally:
+            self._clients.put_nowait(client)
+
+
+class AsyncDataAccess:
+    """
+    Async versions of the queries used by DataManager, LotSizeManager and
+    SupabaseIntegration
+    """
+
+    def __init__(self, pool: AsyncSupabasePool, page_size: int = 1000):
+        """
+        Initialize data access
+
+        Args:
+            pool: Async Supabase pool
+            page_size: Rows per page for paginated reads (PostgREST max rows)
+        """
+        self.pool = pool
+        self.page_size = page_size
+
+    # --- DataManager ---
+
+    async def get_portfolio_symbols(self) -> List[str]:
+        """FNO-enabled symbols from stock_data"""
+        response = await self.pool.table('stock_data').select('symbol').eq('fno_stock', 'yes').limit(250).execute()
+        return [row['symbol'] for row in response.data]
+
+    async def get_latest_chain_date(self, symbol: Optional[str] = None) -> Optional[str]:
+        """Latest option_chain_data snapshot date (YYYY-MM-DD), optionally for one symbol"""
+        query = self.pool.table('option_chain_data').select('created_at')
+        if symbol:
+            query = query.eq('symbol', symbol)
+        response = await query.order('created_at', desc=True).limit(1).execute()
+        if not response.data:
+            return None
+        return response.data[0]['created_at'].split('T')[0]
+
+    async def get_chain_expiries(self, trade_date: str, symbol: Optional[str] = None,
+                                 max_expiries: Optional[int] = None) -> List[str]:
+        """
+        Sorted distinct expiries in a snapshot (one symbol's rows, or the whole snapshot)
+
+        PostgREST has no DISTINCT, so this skip-scans the expiry index one
+        value at a time.
+        """
+        expiries: List[str] = []
+        while max_expiries is None or len(expiries) < max_expiries:
+            query = self.pool.table('option_chain_data').select('expiry_date')
+            if symbol:
+                query = query.eq('symbol', symbol)
+            if expiries:
+                query = query.gt('expiry_date', expiries[-1])
+
+            response = await self._day_filter(query, trade_date).order('expiry_date').limit(1).execute()
+            if not response.data:
+                break
+            expiries.append(response.data[0]['expiry_date'])
+
+        return expiries
+
+    async def get_option_chain(self, symbol: str, trade_date: str, expiries: List[str]) -> List[Dict]:
+        """All chain rows for one symbol and expiry set"""
+        query = self.pool.table('option_chain_data').select('*').eq('symbol', symbol).in_('expiry_date', expiries)
+        return await self._paginate(self._day_filter(query, trade_date))
+
+    async def get_option_chains(self, symbols: List[str], trade_date: str, expiries: Optional[List[str]] = None,
+                                symbol_chunk_size: int = 100) -> Dict[str, List[Dict]]:
+        """
+        Chain rows for many symbols, one concurrent paginated stream per symbol chunk
+
+        Without expiries every expiry of the snapshot is returned (BulkChainLoader).
+        """
+        chunks = [symbols[i:i + symbol_chunk_size] for i in range(0, len(symbols), symbol_chunk_size)]
+
+        async def load_chunk(chunk: List[str]) -> List[Dict]:
+            query = self.pool.table('option_chain_data').select('*')
+            if expiries:
+                query = query.in_('expiry_date', expiries)
+            query = query.in_('symbol', chunk)
+            return await self._paginate(self._day_filter(query, trade_date))
+
+        chains: Dict[str, List[Dict]] = {}
+        for rows in await asyncio.gather(*(load_chunk(chunk) for chunk in chunks)):
+            for row in rows:
+                chains.setdefault(row['symbol'], []).append(row)
+        return chains
+
+    # --- LotSizeManager ---
+
+    async def get_lot_sizes(self, lots_symbols: List[str], month_column: str) -> Dict[str, Any]:
+        """Lot sizes for lots-table symbols (with BS suffix) for one month column"""
+        query = self.pool.table('lots').select(f'id,symbol,{month_column}').in_('symbol', lots_symbols)
+        rows = await self._paginate(query)
+        return {row['symbol']: row.get(month_column) for row in rows}
+
+    # --- SupabaseIntegration ---
+
+    async def get_stock_metadata(self, symbols: List[str]) -> Dict[str, Dict]:
+        """Sector/industry/market cap/ATM IV per symbol from stock_data"""
+        response = await self.pool.table('stock_data')\
+            .select('symbol,sector,industry,market_capitalization,atm_iv')\
+            .in_('symbol', symbols).execute()
+        return {row['symbol']: row for row in response.data if row.get('symbol')}
+
+    async def find_existing_strategy(self, stock_name: str, strategy_name: str, day: str) -> Optional[int]:
+        """Id of a strategy already generated for the symbol on a day (YYYY-MM-DD)"""
+        response = await self.pool.table('strategies').select('id')\
+            .eq('stock_name', stock_name).eq('strategy_name', strategy_name)\
+            .gte('generated_on', f"{day}T00:00:00").lte('generated_on', f"{day}T23:59:59")\
+            .execute()
+        return response.data[0]['id'] if response.data else None
+
+    async def insert_rows(self, table: str, rows: List[Dict], batch_size: int = 50) -> List[Dict]:
+        """Insert rows in concurrent batches, returning inserted records in input order"""
+        batches = [rows[i:i + batch_size] for i in range(0, len(rows), batch_size)]
+        results = await asyncio.gather(*(self.pool.table(table).insert(batch).execute() for batch in batches))
+        return [record for result in results for record in (result.data or [])]
+
+    # --- helpers ---
+
+    @staticmethod
+    def _day_filter(query: AsyncQuery, trade_date: str) -> AsyncQuery:
+        return query.gte('created_at', f"{trade_date}T00:00:00").lt('created_at', f"{trade_date}T23:59:59")
+
+    async def _paginate(self, query: AsyncQuery) -> List[Dict]:
+        """Keyset pagination on id (PostgREST caps each response at page_size rows)"""
+        rows: List[Dict] = []
+        last_id = None
+
+        # The cursor column must be selected
+        base_params = [
+            ('select', f"{value},id") if name == 'select' and value != '*' and 'id' not in value.split(',')
+            else (name, value)
+            for name, value in query._params
+        ]
+
+        while True:
+            query._params = list(base_params)
+            if last_id is not None:
+                query.gt('id', last_id)
+            response = await query.order('id').limit(self.page_size).execute()
+
+            page = response.data or []
+            rows.extend(page)
+            if len(page) < self.page_size:
+                break
+            last_id = page[-1]['id']
+
+        return rows
+
+
+def run_sync(coroutine):
+    """Run a coroutine from synchronous code (e.g., a worker thread without an event loop)"""
+    return asyncio.run(coroutine)
@@ -7,12 +7,51 @@ import os
 import time
 import logging
 from threading import Lock, Semaphore
-from typing import Optional, Any, Callable
+from typing import Optional, Any, Callable, List
 from functools import wraps
 from supabase import create_client, Client
 
 logger = logging.getLogger(__name__)
 
+
+class TokenBucket:
+    """
+    Thread-safe token bucket rate limiter
+
+    Callers reserve a token under the lock and sleep outside it, so a
+    throttled thread never blocks others from reserving their own slot.
+    """
+
+    def __init__(self, rate: float, capacity: Optional[float] = None):
+        """
+        Initialize token bucket
+
+        Args:
+            rate: Tokens added per second
+            capacity: Burst size (default: one second worth of tokens)
+        """
+        self.rate = float(rate)
+        self.capacity = float(capacity if capacity is not None else max(1.0, rate))
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = Lock()
+
+    def reserve(self) -> float:
+        """Take one token and return how long the caller must wait before using it"""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= 1.0
+            return max(0.0, -self._tokens / self.rate)
+
+    def acquire(self):
+        """Block until a token is available (without holding the lock)"""
+        wait = self.reserve()
+        if wait > 0:
+            time.sleep(wait)
+
+
 class ConnectionPool:
     """
     Manages a pool of Supabase connections with rate limiting
@@ -32,8 +71,12 @@ class ConnectionPool:
         
         # Connection management
         self.connection_semaphore = Semaphore(max_connections)
-        self.rate_limit_lock = Lock()
-        self.last_request_time = 0
+        self.rate_limiter = TokenBucket(requests_per_second)
+        
+        # Persistent clients, created lazily and handed out round-robin
+        self._clients: List[Client] = []
+        self._client_lock = Lock()
+        self._next_client = 0
         
         # Create base client
         self.url = os.getenv('NEXT_PUBLIC_SUPABASE_URL')
@@ -48,12 +91,21 @@ class ConnectionPool:
         """
         Get a Supabase client from the pool
         
+        At most max_connections clients are created; each keeps its HTTP
+        connection alive and is shared round-robin between callers.
+        
         Returns:
             Supabase client instance
         """
-        # For thread safety, create a new client for each request
-        # Supabase Python client is thread-safe this way
-        return create_client(self.url, self.key)
+        with self._client_lock:
+            if len(self._clients) < self.max_connections:
+                client = create_client(self.url, self.key)
+                self._clients.append(client)
+                return client
+            
+            client = self._clients[self._next_client % len(self._clients)]
+            self._next_client += 1
+            return client
     
     def rate_limited_request(self, func: Callable) -> Callable:
         """
@@ -69,16 +121,8 @@ class ConnectionPool:
         def wrapper(*args, **kwargs):
             # Acquire connection slot
             with self.connection_semaphore:
-                # Apply rate limiting
-                with self.rate_limit_lock:
-                    current_time = time.time()
-                    time_since_last = current_time - self.last_request_time
-                    
-                    if time_since_last < self.min_request_interval:
-                        sleep_time = self.min_request_interval - time_since_last
-                        time.sleep(sleep_time)
-                    
-                    self.last_request_time = time.time()
+                # Apply rate limiting (waits outside any shared lock)
+                self.rate_limiter.acquire()
                 
                 # Make the request
                 return func(*args, **kwargs)
@@ -115,6 +159,12 @@ class ConnectionPool:
         
         raise last_exception
 
+    def close(self):
+        """Drop pooled clients"""
+        with self._client_lock:
+            self._clients.clear()
+            self._next_client = 0
+
 # Global connection pool instance
 _connection_pool: Optional[ConnectionPool] = None
 
@@ -144,4 +194,5 @@ def close_connection_pool():
     global _connection_pool
     if _connection_pool:
         logger.info("Closing connection pool")
+        _connection_pool.close()
         _connection_pool = None
\ No newline at end of file
@@ -4,8 +4,9 @@ Parallel processor for concurrent symbol analysis
 
 import os
 import logging
-from concurrent.futures import ThreadPoolExecutor, as_completed
-from typing import Dict, List, Callable, Any, Optional
+import multiprocessing
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, as_completed
+from typing import Dict, List, Callable, Any, Optional, Tuple
 from threading import Lock
 import time
 from datetime import datetime
@@ -17,14 +18,26 @@ class ParallelProcessor:
     Handles parallel processing of symbols with progress tracking
     """
     
-    def __init__(self, max_workers: int = 5):
+    EXECUTORS = ('thread', 'process')
+    
+    def __init__(self, max_workers: int = 5, executor: str = 'thread',
+                 initializer: Optional[Callable] = None, initargs: Tuple = ()):
         """
         Initialize parallel processor
         
         Args:
-            max_workers: Maximum number of concurrent threads (default: 8)
+            max_workers: Maximum number of concurrent threads/processes (default: 8)
+            executor: 'thread' (shared memory, GIL-bound) or 'process' (one interpreter per worker)
+            initializer: Per-worker setup function (process mode)
+            initargs: Arguments for the initializer
         """
+        if executor not in self.EXECUTORS:
+            raise ValueError(f"Unknown executor '{executor}', expected one of {self.EXECUTORS}")
+        
         self.max_workers = max_workers
+        self.executor = executor
+        self.initializer = initializer
+        self.initargs = initargs
         self.progress_lock = Lock()
         self.completed_count = 0
         self.total_count = 0
@@ -35,12 +48,12 @@ class ParallelProcessor:
                                process_func: Callable[[str], Dict],
                                callback_func: Optional[Callable[[str, Dict], None]] = None) -> Dict[str, Dict]:
         """
-        Process symbols in parallel using ThreadPoolExecutor
+        Process symbols in parallel using a thread or process pool
         
         Args:
             symbols: List of symbols to process
-            process_func: Function to process each symbol
-            callback_func: Optional callback after each symbol completion
+            process_func: Function to process each symbol (module-level in process mode)
+            callback_func: Optional callback after each symbol completion (runs in this process)
             
         Returns:
             Dictionary mapping symbols to their results
@@ -50,9 +63,10 @@ class ParallelProcessor:
         self.completed_count = 0
         self.start_time = time.time()
         
-        logger.info(f"Starting parallel processing of {self.total_count} symbols with {self.max_workers} workers")
+        logger.info(f"Starting parallel processing of {self.total_count} symbols with "
+                   f"{self.max_workers} {self.executor} workers")
         
-        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+        with self._create_executor() as executor:
             # Submit all tasks
             future_to_symbol = {
                 executor.submit(process_func, symbol): symbol 
@@ -132,6 +146,22 @@ class ParallelProcessor:
         
         return results
     
+    def _create_executor(self):
+        """Create the configured pool executor"""
+        if self.executor == 'process':
+            # Spawn rather than fork: the parent holds HTTP clients and worker threads
+            return ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                mp_context=multiprocessing.get_context('spawn'),
+                initializer=self.initializer,
+                initargs=self.initargs
+            )
+        return ThreadPoolExecutor(
+            max_workers=self.max_workers,
+            initializer=self.initializer,
+            initargs=self.initargs
+        )
+    
     def _log_progress(self, symbol: str, success: bool):
         """Log progress with ETA calculation"""
         elapsed = time.time() - self.start_time
@@ -0,0 +1,226 @@
+"""
+Run journal for checkpointed, resumable portfolio runs
+
+Every symbol result is appended to an NDJSON file under results/runs/ as
+soon as it completes, so an interrupted or partly failed run can be
+resumed without re-analysing the symbols that already succeeded.
+"""
+
+import os
+import json
+import logging
+from datetime import datetime
+from threading import Lock
+from typing import Dict, List, Optional, Type
+
+logger = logging.getLogger(__name__)
+
+# Failures that a retry in the same run cannot fix (no data, nothing constructible)
+PERMANENT_FAILURE_REASONS = (
+    'No liquid options data',
+    'No spot price data',
+    'No strategies could be constructed',
+    'No strategies passed probability filtering',
+    'No portfolio symbols'
+)
+
+
+def is_transient_failure(result: Dict) -> bool:
+    """
+    Whether a failed symbol result is worth retrying later in the run
+
+    Args:
+        result: Symbol result from analyze_symbol
+
+    Returns:
+        True for errors raised while analysing (network, database, timeouts)
+    """
+    if result.get('success', False):
+        return False
+    reason = str(result.get('reason', ''))
+    return not reason.startswith(PERMANENT_FAILURE_REASONS)
+
+
+class RunJournal:
+    """
+    Append-only NDJSON journal of one portfolio run
+
+    Line types:
+        {"type": "run", "run_id", "started_at", "risk_tolerance", "symbols"}
+        {"type": "symbol", "symbol", "attempt", "success", "transient", "recorded_at", "result"}
+        {"type": "complete", "completed_at", "successful", "total"}
+
+    The last symbol line wins, so a resumed run appends to the same file.
+
+    Usage:
+        journal = RunJournal.create(run_dir, symbols, 'moderate')
+        journal.record('RELIANCE', result)
+        journal = RunJournal.load(run_dir, '20250630_092933')
+        journal.pending_symbols()   # failed or never ran
+    """
+
+    FILE_SUFFIX = '.ndjson'
+
+    def __init__(self, path: str, run_id: str, encoder: Optional[Type[json.JSONEncoder]] = None):
+        """
+        Initialize run journal (use create() or load())
+
+        Args:
+            path: Journal file path
+            run_id: Run identifier (file name without suffix)
+            encoder: JSON encoder for results (numpy types)
+        """
+        self.path = path
+        self.run_id = run_id
+        self.encoder = encoder
+        self.header: Dict = {}
+        self.results: Dict[str, Dict] = {}
+        self.attempts: Dict[str, int] = {}
+        self._lock = Lock()
+
+    @staticmethod
+    def default_dir() -> str:
+        """results/runs next to main.py"""
+        return os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'results', 'runs')
+
+    @classmethod
+    def create(cls, run_dir: Optional[str], symbols: List[str], risk_tolerance: str,
+               encoder: Optional[Type[json.JSONEncoder]] = None) -> 'RunJournal':
+        """
+        Start the journal of a new run
+
+        Args:
+            run_dir: Journal directory (default: results/runs)
+            symbols: Portfolio symbols of the run
+            risk_tolerance: Risk tolerance of the run
+            encoder: JSON encoder for results
+
+        Returns:
+            New RunJournal with its header written
+        """
+        run_dir = run_dir or cls.default_dir()
+        os.makedirs(run_dir, exist_ok=True)
+
+        run_id = datetime.now().strftime('%Y%m%d_%H%M%S')
+        path = os.path.join(run_dir, run_id + cls.FILE_SUFFIX)
+        suffix = 1
+        while os.path.exists(path):
+            suffix += 1
+            path = os.path.join(run_dir, f"{run_id}_{suffix}{cls.FILE_SUFFIX}")
+        run_id = os.path.basename(path)[:-len(cls.FILE_SUFFIX)]
+
+        journal = cls(path, run_id, encoder)
+        journal.header = {
+            'type': 'run',
+            'run_id': run_id,
+            'started_at': datetime.now().isoformat(),
+            'risk_tolerance': risk_tolerance,
+            'symbols': list(symbols)
+        }
+        journal._append(journal.header)
+        logger.info(f"Run journal {run_id}: {path}")
+        return journal
+
+    @classmethod
+    def load(cls, run_dir: Optional[str], run_id: str,
+             encoder: Optional[Type[json.JSONEncoder]] = None) -> 'RunJournal':
+        """
+        Load the journal of an earlier run to resume it
+
+        Args:
+            run_dir: Journal directory (default: results/runs)
+            run_id: Run to resume
+            encoder: JSON encoder for results
+
+        Returns:
+            RunJournal with the latest result of every recorded symbol
+
+        Raises:
+            FileNotFoundError: No journal for run_id
+        """
+        run_dir = run_dir or cls.default_dir()
+        path = os.path.join(run_dir, run_id + cls.FILE_SUFFIX)
+        if not os.path.exists(path):
+            raise FileNotFoundError(f"No run journal for run {run_id} in {run_dir}")
+
+        journal = cls(path, run_id, encoder)
+        skipped = 0
+        with open(path, 'r') as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    # Torn last line of an interrupted run
+                    skipped += 1
+                    continue
+                if entry.get('type') == 'run' and not journal.header:
+                    journal.header = entry
+                elif entry.get('type') == 'symbol':
+                    journal.results[entry['symbol']] = entry.get('result') or {}
+                    journal.attempts[entry['symbol']] = entry.get('attempt', 1)
+
+        if skipped:
+            logger.warning(f"Run journal {run_id}: skipped {skipped} unreadable lines")
+        logger.info(f"Loaded run journal {run_id}: {len(journal.results)} symbols recorded, "
+                   f"{len(journal.successful_symbols())} successful")
+        return journal
+
+    @property
+    def symbols(self) -> List[str]:
+        """Portfolio symbols of the run"""
+        return list(self.header.get('symbols', []))
+
+    def record(self, symbol: str, result: Dict) -> None:
+        """
+        Append a symbol result
+
+        Args:
+            symbol: Stock symbol
+            result: Result from analyze_symbol
+        """
+        with self._lock:
+            attempt = self.attempts.get(symbol, 0) + 1
+            self.attempts[symbol] = attempt
+            self.results[symbol] = result
+        success = bool(result.get('success', False))
+        self._append({
+            'type': 'symbol',
+            'symbol': symbol,
+            'attempt': attempt,
+            'success': success,
+            'transient': is_transient_failure(result),
+            'recorded_at': datetime.now().isoformat(),
+            'result': result
+        })
+
+    def complete(self) -> None:
+        """Mark the run (or this resume of it) as finished"""
+        successful = len(self.successful_symbols())
+        self._append({
+            'type': 'complete',
+            'completed_at': datetime.now().isoformat(),
+            'successful': successful,
+            'total': len(self.symbols) or len(self.results)
+        })
+
+    def successful_symbols(self) -> List[str]:
+        """Symbols whose latest result succeeded"""
+        return [s for s, r in self.results.items() if r.get('success', False)]
+
+    def pending_symbols(self) -> List[str]:
+        """Symbols of the run that failed or never ran, in portfolio order"""
+        symbols = self.symbols or list(self.results)
+        return [s for s in symbols if not self.results.get(s, {}).get('success', False)]
+
+    def _append(self, entry: Dict) -> None:
+        try:
+            line = json.dumps(entry, cls=self.encoder)
+        except (TypeError, ValueError) as e:
+            # Keep the checkpoint even if a result is not serialisable
+            logger.warning(f"Run journal {self.run_id}: storing {entry.get('symbol')} without result: {e}")
+            line = json.dumps({**entry, 'result': {'success': False, 'reason': f'Unserialisable result: {e}'},
+                               'success': False, 'transient': True})
+        with self._lock:
+            with open(self.path, 'a') as f:
+                f.write(line + '\n')
+                f.flush()
@@ -0,0 +1,412 @@
+"""
+Scrip Master Index
+In-memory security-id lookup for F&O option contracts
+
+The scrip master is loaded once per trading day (local snapshot first, then
+the api_scrip_master table) into sorted NumPy arrays. Each (underlying,
+expiry, option type) key owns a contiguous slice of strikes, so exact and
+nearest-strike lookups are a dict hit plus a binary search.
+"""
+
+import os
+import re
+import logging
+from datetime import datetime, date
+from threading import Lock
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SNAPSHOT_DIR = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+    'cache',
+    'scrip_master'
+)
+
+INDEX_COLUMNS = [
+    'sem_smst_security_id', 'sem_trading_symbol', 'sem_custom_symbol',
+    'sem_option_type', 'sem_strike_price', 'sem_expiry_date', 'sem_lot_units'
+]
+
+# BASE-MonYYYY-STRIKE-CE/PE, e.g. DIXON-Aug2025-14000-CE or BAJAJ-AUTO-Aug2025-9000-PE
+_OPTION_SYMBOL_PATTERN = re.compile(r'^(?P<underlying>.+)-[A-Za-z]{3}\d{4}-[\d.]+-(?:CE|PE)$')
+_ISO_DATE_PATTERN = re.compile(r'^\d{4}-\d{2}-\d{2}(?:$|[T ])')
+
+
+def expiry_key(expiry) -> Optional[str]:
+    """
+    Normalize an expiry (date, datetime, Timestamp or string) to YYYY-MM-DD
+
+    Args:
+        expiry: Expiry value
+
+    Returns:
+        ISO date string or None if the value cannot be parsed
+    """
+    if expiry is None:
+        return None
+    if isinstance(expiry, (datetime, date)):
+        return expiry.strftime('%Y-%m-%d')
+    if isinstance(expiry, str) and _ISO_DATE_PATTERN.match(expiry):
+        return expiry[:10]
+    try:
+        return pd.Timestamp(expiry).strftime('%Y-%m-%d')
+    except (ValueError, TypeError):
+        return None
+
+
+def _underlying_from_symbol(trading_symbol, custom_symbol) -> Optional[str]:
+    """Underlying name from the trading or custom option symbol"""
+    for symbol in (trading_symbol, custom_symbol):
+        if isinstance(symbol, str):
+            match = _OPTION_SYMBOL_PATTERN.match(symbol.strip())
+            if match:
+                return match.group('underlying').upper()
+    for symbol in (trading_symbol, custom_symbol):
+        if isinstance(symbol, str) and symbol.strip():
+            return re.split(r'[-\s]', symbol.strip(), maxsplit=1)[0].upper()
+    return None
+
+
+class ScripMasterIndex:
+    """
+    Array-backed option contract index
+
+    Rows are sorted by (underlying, expiry, option type, strike). Strikes,
+    security ids and lot units live in parallel NumPy arrays; a dict maps
+    each contract key to its [start, end) slice. A second ordering by
+    security id serves reverse lookups.
+    """
+
+    def __init__(self, frame: Optional[pd.DataFrame] = None, trade_date: Optional[str] = None):
+        """
+        Initialize index
+
+        Args:
+            frame: Scrip master rows (any SEM_* column case)
+            trade_date: Trading day the index was built for
+        """
+        self.trade_date = trade_date
+        self._slices: Dict[Tuple[str, str, str], Tuple[int, int]] = {}
+        self._expiries: Dict[Tuple[str, str], List[str]] = {}
+
+        self._strikes = np.empty(0, dtype=np.float64)
+        self._security_ids = np.empty(0, dtype=np.int64)
+        self._lot_units = np.empty(0, dtype=np.int64)
+        self._keys: List[Tuple[str, str, str]] = []
+        self._row_keys = np.empty(0, dtype=np.int32)
+        self._id_order = np.empty(0, dtype=np.int64)
+        self._sorted_ids = np.empty(0, dtype=np.int64)
+
+        if frame is not None:
+            self._build(frame)
+
+    def __len__(self) -> int:
+        return len(self._security_ids)
+
+    def _build(self, frame: pd.DataFrame):
+        """Sort rows and lay out the lookup arrays"""
+        df = frame.rename(columns=str.lower)
+        df = df[[c for c in INDEX_COLUMNS + ['underlying'] if c in df.columns]].copy()
+
+        if 'underlying' not in df.columns:
+            df['underlying'] = [
+                _underlying_from_symbol(t, c) for t, c in zip(
+                    df.get('sem_trading_symbol', pd.Series(None, index=df.index)),
+                    df.get('sem_custom_symbol', pd.Series(None, index=df.index))
+                )
+            ]
+        df['expiry'] = pd.to_datetime(df['sem_expiry_date'], errors='coerce').dt.strftime('%Y-%m-%d')
+        df['option_type'] = df['sem_option_type'].astype(str).str.upper()
+        df['strike'] = pd.to_numeric(df['sem_strike_price'], errors='coerce')
+        df['security_id'] = pd.to_numeric(df['sem_smst_security_id'], errors='coerce')
+        df['lot_units'] = pd.to_numeric(df.get('sem_lot_units'), errors='coerce').fillna(0)
+
+        df = df.dropna(subset=['underlying', 'expiry', 'strike', 'security_id'])
+        df = df[df['option_type'].isin(['CE', 'PE'])]
+        df = df.sort_values(['underlying', 'expiry', 'option_type', 'strike'], kind='mergesort')
+        df = df.drop_duplicates(subset=['underlying', 'expiry', 'option_type', 'strike'], keep='first')
+
+        self._strikes = df['strike'].to_numpy(dtype=np.float64)
+        self._security_ids = df['security_id'].to_numpy(dtype=np.int64)
+        self._lot_units = df['lot_units'].to_numpy(dtype=np.int64)
+
+        groups = df.groupby(['underlying', 'expiry', 'option_type'], sort=False).size()
+        self._keys = list(groups.index)
+        self._row_keys = np.repeat(np.arange(len(groups), dtype=np.int32), groups.to_numpy())
+
+        start = 0
+        for key, count in zip(self._keys, groups.to_numpy()):
+            self._slices[key] = (start, start + int(count))
+            start += int(count)
+            underlying, expiry, option_type = key
+            self._expiries.setdefault((underlying, option_type), []).append(expiry)
+
+        self._id_order = np.argsort(self._security_ids, kind='mergesort')
+        self._sorted_ids = self._security_ids[self._id_order]
+
+    def lookup(self, underlying: str, expiry, option_type: str, strike: float,
+               nearest: bool = True) -> Tuple[Optional[int], Optional[int]]:
+        """
+        Resolve a contract to its security id
+
+        Args:
+            underlying: Underlying symbol (e.g., 'DIXON')
+            expiry: Expiry date; None picks the nearest expiry on or after today
+            option_type: 'CE' or 'PE'
+            strike: Strike price
+            nearest: Fall back to the closest listed strike if there is no exact match
+
+        Returns:
+            Tuple of (security_id, lot_units) or (None, None) if not found
+        """
+        underlying = str(underlying).upper()
+        option_type = str(option_type).upper()
+
+        expiry = expiry_key(expiry) if expiry is not None else self.next_expiry(underlying, option_type)
+        bounds = self._slices.get((underlying, expiry, option_type))
+        if bounds is None:
+            return None, None
+
+        start, end = bounds
+        strikes = self._strikes[start:end]
+        strike = float(strike)
+        pos = int(np.searchsorted(strikes, strike))
+
+        if pos < len(strikes) and strikes[pos] == strike:
+            row = start + pos
+        elif not nearest:
+            return None, None
+        else:
+            # Closest neighbour; ties go to the lower strike
+            if pos == 0:
+                row = start
+            elif pos == len(strikes) or strike - strikes[pos - 1] <= strikes[pos] - strike:
+                row = start + pos - 1
+            else:
+                row = start + pos
+
+        return int(self._security_ids[row]), int(self._lot_units[row])
+
+    def expiries(self, underlying: str, option_type: str) -> List[str]:
+        """Listed expiries (YYYY-MM-DD, ascending) for an underlying and option type"""
+        return list(self._expiries.get((str(underlying).upper(), str(option_type).upper()), []))
+
+    def next_expiry(self, underlying: str, option_type: str, on_or_after=None) -> Optional[str]:
+        """
+        Nearest listed expiry on or after a date
+
+        Args:
+            underlying: Underlying symbol
+            option_type: 'CE' or 'PE'
+            on_or_after: Reference date (default: today)
+
+        Returns:
+            Expiry as YYYY-MM-DD or None
+        """
+        reference = expiry_key(on_or_after or date.today())
+        for expiry in self.expiries(underlying, option_type):
+            if expiry >= reference:
+                return expiry
+        return None
+
+    def strikes(self, underlying: str, expiry, option_type: str) -> np.ndarray:
+        """Sorted listed strikes for a contract key (read-only view)"""
+        bounds = self._slices.get((str(underlying).upper(), expiry_key(expiry), str(option_type).upper()))
+        if bounds is None:
+            return np.empty(0, dtype=np.float64)
+        view = self._strikes[bounds[0]:bounds[1]]
+        view.flags.writeable = False
+        return view
+
+    def get_instrument(self, security_id: int) -> Optional[Dict]:
+        """
+        Reverse lookup of a security id
+
+        Args:
+            security_id: Dhan security id
+
+        Returns:
+            Dict with underlying, expiry, option_type, strike and lot_units, or None
+        """
+        ids = self._sorted_ids
+        pos = int(np.searchsorted(ids, int(security_id)))
+        if pos >= len(ids) or ids[pos] != int(security_id):
+            return None
+
+        row = int(self._id_order[pos])
+        underlying, expiry, option_type = self._keys[self._row_keys[row]]
+        return {
+            'security_id': int(security_id),
+            'underlying': underlying,
+            'expiry': expiry,
+            'option_type': option_type,
+            'strike': float(self._strikes[row]),
+            'lot_units': int(self._lot_units[row])
+        }
+
+    def to_frame(self) -> pd.DataFrame:
+        """Index rows as a DataFrame (used for snapshots)"""
+        keys = [self._keys[k] for k in self._row_keys]
+        return pd.DataFrame({
+            'sem_smst_security_id': self._security_ids,
+            'underlying': [k[0] for k in keys],
+            'sem_option_type': [k[2] for k in keys],
+            'sem_strike_price': self._strikes,
+            'sem_expiry_date': [k[1] for k in keys],
+            'sem_lot_units': self._lot_units
+        })
+
+
+class ScripMasterStore:
+    """
+    Process-wide scrip master index for the current trading day
+
+    The index is built once per day from a local snapshot
+    (SCRIP_MASTER_SNAPSHOT_DIR, empty to disable) or, failing that, from a
+    paginated read of the api_scrip_master table, and is shared by the
+    executor, the security mapper and the monitors.
+    """
+
+    PAGE_SIZE = 1000
+
+    def __init__(self, snapshot_dir: Optional[str] = None):
+        if snapshot_dir is None:
+            snapshot_dir = os.getenv('SCRIP_MASTER_SNAPSHOT_DIR', DEFAULT_SNAPSHOT_DIR)
+        self.snapshot_dir = snapshot_dir
+
+        self._lock = Lock()
+        self._index: Optional[ScripMasterIndex] = None
+
+    def get_index(self, supabase_client=None, frame: Optional[pd.DataFrame] = None) -> Optional[ScripMasterIndex]:
+        """
+        Get today's index, building it on first use or day change
+
+        Args:
+            supabase_client: Supabase client used when no snapshot is available
+            frame: Already downloaded scrip master to build from instead of the database
+
+        Returns:
+            ScripMasterIndex or None if no source is available
+        """
+        trade_date = date.today().isoformat()
+        index = self._index
+        if index is not None and index.trade_date == trade_date:
+            return index
+
+        with self._lock:
+            if self._index is None or self._index.trade_date != trade_date:
+                source = None
+                if frame is not None and not frame.empty:
+                    source = frame
+                if source is None:
+                    source = self._read_snapshot(trade_date)
+                if source is None and supabase_client is not None:
+                    source = self._load_from_database(supabase_client, trade_date)
+
+                if source is not None:
+                    index = ScripMasterIndex(source, trade_date=trade_date)
+                    if len(index) > 0:
+                        self._write_snapshot(trade_date, index)
+                        self._index = index
+                        logger.info(f"Scrip master index built: {len(index)} contracts for {trade_date}")
+            return self._index
+
+    def invalidate(self):
+        """Force a rebuild from the database on next access"""
+        with self._lock:
+            if self._index is not None and self.snapshot_dir:
+                try:
+                    os.remove(self._snapshot_path(self._index.trade_date))
+                except OSError:
+                    pass
+            self._index = None
+
+    def _load_from_database(self, supabase_client, trade_date: str) -> Optional[pd.DataFrame]:
+        """Read all unexpired option contracts from api_scrip_master"""
+        try:
+            rows = []
+            offset = 0
+            while True:
+                response = supabase_client.table('api_scrip_master')\
+                    .select(','.join(INDEX_COLUMNS))\
+                    .gte('sem_expiry_date', trade_date)\
+                    .in_('sem_option_type', ['CE', 'PE'])\
+                    .order('sem_smst_security_id')\
+                    .range(offset, offset + self.PAGE_SIZE - 1)\
+                    .execute()
+                page = response.data or []
+                rows.extend(page)
+
+                if len(page) < self.PAGE_SIZE:
+                    return pd.DataFrame(rows) if rows else None
+                offset += self.PAGE_SIZE
+
+        except Exception as e:
+            logger.error(f"Error loading scrip master: {e}")
+            return None
+
+    def _snapshot_path(self, trade_date: str) -> str:
+        return os.path.join(self.snapshot_dir, f"scrip_master_{trade_date}.pkl")
+
+    def _read_snapshot(self, trade_date: str) -> Optional[pd.DataFrame]:
+        if not self.snapshot_dir:
+            return None
+        path = self._snapshot_path(trade_date)
+        try:
+            if not os.path.exists(path):
+                return None
+            return pd.read_pickle(path)
+        except Exception as e:
+            logger.debug(f"Scrip master snapshot unavailable ({path}): {e}")
+            return None
+
+    def _write_snapshot(self, trade_date: str, index: ScripMasterIndex):
+        if not self.snapshot_dir:
+            return
+        path = self._snapshot_path(trade_date)
+        if os.path.exists(path):
+            return
+        try:
+            os.makedirs(self.snapshot_dir, exist_ok=True)
+            index.to_frame().to_pickle(path)
+        except Exception as e:
+            logger.debug(f"Could not write scrip master snapshot ({path}): {e}")
+
+
+# Global scrip master store instance
+_scrip_master_store: Optional[ScripMasterStore] = None
+_scrip_master_lock = Lock()
+
+
+def get_scrip_master_store() -> ScripMasterStore:
+    """
+    Get or create the process-wide scrip master store
+
+    Returns:
+        ScripMasterStore instance
+    """
+    global _scrip_master_store
+
+    with _scrip_master_lock:
+        if _scrip_master_store is None:
+            _scrip_master_store = ScripMasterStore()
+
+    return _scrip_master_store
+
+
+def get_scrip_master_index(supabase_client=None, frame: Optional[pd.DataFrame] = None) -> Optional[ScripMasterIndex]:
+    """
+    Get today's shared scrip master index
+
+    Args:
+        supabase_client: Supabase client used when the index must be built
+        frame: Already downloaded scrip master to build from
+
+    Returns:
+        ScripMasterIndex or None if unavailable
+    """
+    return get_scrip_master_store().get_index(supabase_client, frame)
@@ -0,0 +1,78 @@
+"""
+Shared DataFrame files for process-pool workers
+
+A group of DataFrames is written once by the parent process and read by
+every worker, instead of being pickled into each task. Arrow IPC files are
+memory-mapped when pyarrow is installed; otherwise a single pickle file is
+used so workers still load the data once at start-up.
+"""
+
+import os
+import logging
+from typing import Dict
+
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.ipc  # noqa: F401
+    ARROW_AVAILABLE = True
+except ImportError:
+    ARROW_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+KEY_COLUMN = '__frame_key__'
+
+
+def write_shared_frames(frames: Dict[str, pd.DataFrame], directory: str, name: str) -> str:
+    """
+    Write a group of DataFrames to one shared file
+
+    Args:
+        frames: DataFrames keyed by name (e.g., symbol)
+        directory: Directory for the shared file
+        name: File name without extension
+
+    Returns:
+        Path of the written file
+    """
+    parts = [frame.assign(**{KEY_COLUMN: key}) for key, frame in frames.items() if frame is not None]
+    combined = pd.concat(parts) if parts else pd.DataFrame({KEY_COLUMN: pd.Series(dtype=object)})
+
+    if ARROW_AVAILABLE:
+        path = os.path.join(directory, f"{name}.arrow")
+        try:
+            table = pa.Table.from_pandas(combined, preserve_index=True)
+            with pa.OSFile(path, 'wb') as sink:
+                with pa.ipc.new_file(sink, table.schema) as writer:
+                    writer.write_table(table)
+            return path
+        except Exception as e:
+            logger.warning(f"Arrow IPC export failed for {name}, using pickle: {e}")
+
+    path = os.path.join(directory, f"{name}.pkl")
+    combined.to_pickle(path)
+    return path
+
+
+def read_shared_frames(path: str) -> Dict[str, pd.DataFrame]:
+    """
+    Read a group of DataFrames written by write_shared_frames
+
+    Args:
+        path: Shared file path
+
+    Returns:
+        DataFrames keyed by name
+    """
+    if path.endswith('.arrow'):
+        with pa.memory_map(path, 'r') as source:
+            combined = pa.ipc.open_file(source).read_all().to_pandas()
+    else:
+        combined = pd.read_pickle(path)
+
+    return {
+        key: frame.drop(columns=[KEY_COLUMN])
+        for key, frame in combined.groupby(KEY_COLUMN, sort=False)
+    }
@@ -0,0 +1,179 @@
+"""
+Stage timing for portfolio runs
+Lightweight spans around analysis stages, aggregated into per-stage
+p50/p95/max and exportable as a Chrome trace (also opens in speedscope)
+"""
+
+import os
+import json
+import time
+import logging
+import threading
+from contextlib import contextmanager
+from threading import Lock
+from typing import Dict, Iterator, List, Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Result key carrying a symbol's spans from analyze_symbol (possibly in a worker process)
+SPANS_KEY = '_stage_spans'
+
+
+class StageSpans:
+    """
+    Spans of one symbol analysis
+
+    Sequential stages are timed with lap(), which closes the stage running
+    since the previous lap. The spans travel back with the symbol result so
+    worker processes report them too.
+
+    Usage:
+        spans = StageSpans()
+        options_df = fetch(...)
+        spans.lap('chain_fetch')
+    """
+
+    def __init__(self):
+        self.pid = os.getpid()
+        self.tid = threading.get_ident()
+        self.started = time.time()
+        self.spans: List[List] = []       # [stage, start epoch seconds, duration seconds]
+        self._last = time.perf_counter()
+        self._origin = self._last
+
+    def lap(self, stage: str) -> None:
+        """Record the stage that ran since the previous lap"""
+        now = time.perf_counter()
+        self.spans.append([stage, self.started + (self._last - self._origin), now - self._last])
+        self._last = now
+
+    def export(self) -> Dict:
+        """Picklable/JSON form, including the whole analysis as 'total'"""
+        total = time.perf_counter() - self._origin
+        return {'pid': self.pid, 'tid': self.tid,
+                'spans': [['total', self.started, total]] + self.spans}
+
+
+class StageTimer:
+    """
+    Run-level collector of stage timings
+
+    Symbol spans arrive through collect(); portfolio-level stages (preloads,
+    parallel analysis) are timed directly with span().
+    """
+
+    def __init__(self):
+        self._lock = Lock()
+        self._durations: Dict[str, List[float]] = {}
+        self._events: List[Dict] = []
+        self._symbols = 0
+
+    def reset(self) -> None:
+        """Forget all timings (start of a new run)"""
+        with self._lock:
+            self._durations.clear()
+            self._events.clear()
+            self._symbols = 0
+
+    @contextmanager
+    def span(self, stage: str, symbol: Optional[str] = None) -> Iterator[None]:
+        """
+        Time a block as one stage
+
+        Args:
+            stage: Stage name
+            symbol: Symbol the stage belongs to (None for portfolio-level stages)
+        """
+        started = time.time()
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self._record(stage, started, time.perf_counter() - start,
+                         os.getpid(), threading.get_ident(), symbol)
+
+    def collect(self, symbol: str, result: Dict) -> None:
+        """
+        Take the spans attached to a symbol result
+
+        Args:
+            symbol: Stock symbol
+            result: Result from analyze_symbol; its spans key is removed
+        """
+        exported = result.pop(SPANS_KEY, None) if isinstance(result, dict) else None
+        if not exported:
+            return
+        with self._lock:
+            self._symbols += 1
+        for stage, started, duration in exported.get('spans', []):
+            self._record(stage, started, duration, exported.get('pid'), exported.get('tid'), symbol)
+
+    def summary(self) -> Dict:
+        """
+        Per-stage duration statistics
+
+        Returns:
+            Dictionary with 'symbols' timed and 'stages' mapping each stage to
+            count, p50_ms, p95_ms, max_ms and total_s
+        """
+        with self._lock:
+            durations = {stage: list(values) for stage, values in self._durations.items()}
+            symbols = self._symbols
+
+        stages = {}
+        for stage, values in durations.items():
+            ms = np.asarray(values) * 1000
+            stages[stage] = {
+                'count': len(values),
+                'p50_ms': round(float(np.percentile(ms, 50)), 2),
+                'p95_ms': round(float(np.percentile(ms, 95)), 2),
+                'max_ms': round(float(ms.max()), 2),
+                'total_s': round(float(ms.sum()) / 1000, 3)
+            }
+        return {'symbols': symbols, 'stages': stages}
+
+    def export_chrome_trace(self, path: str) -> str:
+        """
+        Write all spans in Chrome trace event format
+
+        Open in chrome://tracing, Perfetto or speedscope.
+
+        Args:
+            path: Output file
+
+        Returns:
+            Path written, or "" on failure
+        """
+        with self._lock:
+            events = list(self._events)
+        if not events:
+            return ""
+
+        origin = min(e['start'] for e in events)
+        trace = [{
+            'name': e['stage'],
+            'cat': 'portfolio' if e['symbol'] is None else 'symbol',
+            'ph': 'X',
+            'ts': round((e['start'] - origin) * 1e6, 1),
+            'dur': round(e['duration'] * 1e6, 1),
+            'pid': e['pid'],
+            'tid': e['tid'],
+            'args': {'symbol': e['symbol']} if e['symbol'] else {}
+        } for e in events]
+
+        try:
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+            with open(path, 'w') as f:
+                json.dump({'traceEvents': trace, 'displayTimeUnit': 'ms'}, f)
+            return path
+        except Exception as e:
+            logger.error(f"Could not write stage trace to {path}: {e}")
+            return ""
+
+    def _record(self, stage: str, started: float, duration: float, pid, tid, symbol: Optional[str]):
+        with self._lock:
+            self._durations.setdefault(stage, []).append(duration)
+            self._events.append({'stage': stage, 'start': started, 'duration': duration,
+                                 'pid': pid, 'tid': tid, 'symbol': symbol})